@@ -4,20 +4,73 @@ Eve AI Retrieval Layer
 Provides unified knowledge retrieval for the Eve AI assistant:
 - Florida Statutes
 - Industry Experts
-- Firm Documentation (Gamma)
+- Deep Knowledge Base
 
 Usage:
     context = await get_eve_context(query, user)
     # context includes relevant statutes, expert insights, and docs
+
+    packed = await assemble_eve_context(query, user)
+    # packed.text is the prompt-ready knowledge section for Eve chat
+
+``assemble_eve_context`` is the single pipeline Eve chat uses per turn: all
+retrievers run concurrently, each under its own deadline (a slow source is
+dropped, not waited on), overlapping passages are deduped, and what is left
+is packed into ``EVE_CONTEXT_TOKEN_BUDGET`` tokens. The packed result is
+cached per (normalized query, user role) for ``EVE_CONTEXT_CACHE_TTL_SECONDS``
+so follow-up turns on the same question skip retrieval.
 """
 
-from typing import Optional, List, Dict, Any
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Awaitable, Optional, List, Dict, Any, Tuple
 from dependencies import db
+from services.observability import MetricsCollector
+from services.retrieval_index import retrieval_index, tokenize
+import asyncio
+import os
 import re
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+EVE_CONTEXT_TOKEN_BUDGET = int(os.environ.get("EVE_CONTEXT_TOKEN_BUDGET", "3000"))
+EVE_CONTEXT_CACHE_TTL_SECONDS = int(os.environ.get("EVE_CONTEXT_CACHE_TTL_SECONDS", "300"))
+
+# Per-source deadlines (seconds). In-memory sources answer in microseconds;
+# Mongo-backed ones get room for one round trip.
+SOURCE_DEADLINES = {
+    "statutes": 0.8,
+    "experts": 0.25,
+    "knowledge": 0.8,
+}
+
+QUOTE_INDICATORS = ("verbatim", "exact", "quote", "word for word", "says exactly")
+
+STATUTE_TRIGGERS = (
+    "florida", "fl ", "statute", "law", "regulation", "license", "fee", "contract",
+    "rescission", "bond", "apprentice", "conflict of interest", "ethics", "timeline",
+    "aob", "assignment of benefits", "appraisal", "627", "626", "emergency",
+    "disclosure", "public adjuster", "quote", "exact", "verbatim", "wording",
+)
+
+DEEP_KNOWLEDGE_TRIGGERS = (
+    "case law", "case", "ruling", "court", "decision", "precedent",
+    "merlin", "zalma", "senac", "voelpel", "perri", "quinn", "gurczak",
+    "specific", "detail", "explain", "how to", "step by step",
+    "appraisal process", "umpire", "supplement", "xactimate",
+    "bad faith", "crn", "civil remedy", "euo",
+    "iicrc", "s500", "s520", "s700", "building code", "25% rule",
+    "wind mitigation", "depreciation", "rcv", "acv",
+    "ho-3", "ho-6", "dp-3", "policy form",
+    "carrier tactic", "delay", "deny", "underpay",
+    "negotiate", "negotiation", "strategy",
+    "constructive total loss", "valued policy",
+    "matching", "o&p", "overhead", "code upgrade",
+    "doah", "arbitration",
+)
+
 # ============================================
 # RETRIEVAL FUNCTIONS
 # ============================================
@@ -26,6 +79,10 @@ async def search_statutes(query: str, limit: int = 3) -> List[Dict[str, Any]]:
     """
     Search Florida statutes for relevant sections.
     Returns verbatim text when available.
+
+    Section numbers in the query (e.g. "626.854") are looked up directly;
+    the rest is ranked by the BM25 retrieval index, or by the
+    ``florida_statutes`` text index until the index has loaded.
     """
     statutes = []
     
@@ -35,34 +92,27 @@ async def search_statutes(query: str, limit: int = 3) -> List[Dict[str, Any]]:
         section_matches = re.findall(section_pattern, query)
         
         # Direct lookup if section number mentioned
-        if section_matches:
-            for section in section_matches[:limit]:
-                statute = await db.statutes.find_one(
-                    {"section_number": section},
-                    {"_id": 0}
-                )
-                if statute:
-                    statutes.append(statute)
-        
-        # If no direct matches, do text search
-        if not statutes:
-            # Search by keywords
-            keywords = query.lower().split()
-            relevant_keywords = [
-                w for w in keywords 
-                if len(w) > 3 and w not in ['what', 'does', 'the', 'about', 'tell']
-            ]
-            
-            if relevant_keywords:
-                # Search in heading and body
-                search_query = {
-                    "$or": [
-                        {"heading": {"$regex": "|".join(relevant_keywords), "$options": "i"}},
-                        {"body_text": {"$regex": "|".join(relevant_keywords[:3]), "$options": "i"}}
-                    ]
-                }
-                cursor = db.statutes.find(search_query, {"_id": 0}).limit(limit)
-                statutes = await cursor.to_list(limit)
+        for section in section_matches[:limit]:
+            statute = await db.florida_statutes.find_one(
+                {"section_number": section},
+                {"_id": 0},
+                sort=[("year", -1)],
+            )
+            if statute:
+                statutes.append(statute)
+
+        remaining = limit - len(statutes)
+        if remaining > 0:
+            seen = {s.get("section_number") for s in statutes}
+            if retrieval_index.is_ready("statutes"):
+                hits = retrieval_index.search("statutes", query, limit)
+                ranked = [hit.payload for hit in hits]
+            else:
+                ranked = await db.florida_statutes.find(
+                    {"$text": {"$search": query}},
+                    {"_id": 0, "score": {"$meta": "textScore"}},
+                ).sort([("score", {"$meta": "textScore"})]).limit(limit).to_list(limit)
+            statutes.extend([s for s in ranked if s.get("section_number") not in seen][:remaining])
     
     except Exception as e:
         logger.error("Statute search error: %s", e)
@@ -72,48 +122,16 @@ async def search_statutes(query: str, limit: int = 3) -> List[Dict[str, Any]]:
 
 async def get_expert_insights(topic: str, limit: int = 2) -> List[Dict[str, Any]]:
     """
-    Get relevant expert insights for a topic.
+    Get relevant expert insights for a topic, ranked by the retrieval index.
+    Falls back to the first experts when nothing matches.
     """
     experts = []
     
     try:
-        # Map topics to experts
-        topic_lower = topic.lower()
-        
-        expert_mapping = {
-            "roof": ["john-senac"],
-            "roofing": ["john-senac"],
-            "shingle": ["john-senac"],
-            "claim strategy": ["matthew-mulholland"],
-            "prove it": ["matthew-mulholland"],
-            "bad faith": ["chip-merlin"],
-            "policy": ["bill-wilson"],
-            "coverage": ["bill-wilson"],
-            "appraisal": ["john-voelpel"],
-            "florida": ["vince-perri"],
-            "leadership": ["simon-sinek", "jocko-willink"],
-            "ai": ["lynette-young"],
-            "technology": ["lynette-young"]
-        }
-        
-        # Find matching experts
-        matched_expert_ids = set()
-        for keyword, expert_ids in expert_mapping.items():
-            if keyword in topic_lower:
-                matched_expert_ids.update(expert_ids)
-        
-        # Fetch expert data
-        if matched_expert_ids:
-            cursor = db.experts.find(
-                {"id": {"$in": list(matched_expert_ids)}},
-                {"_id": 0}
-            ).limit(limit)
-            experts = await cursor.to_list(limit)
-        
-        # If no matches, return top 2 general experts
+        experts = [hit.payload for hit in retrieval_index.search("experts", topic, limit)]
         if not experts:
-            cursor = db.experts.find({}, {"_id": 0}).limit(limit)
-            experts = await cursor.to_list(limit)
+            from routes.knowledge_base import INDUSTRY_EXPERTS
+            experts = INDUSTRY_EXPERTS["figures"][:limit]
     
     except Exception as e:
         logger.error("Expert search error: %s", e)
@@ -180,19 +198,22 @@ async def get_eve_context(
     }
     
     # Determine if user wants exact quotes
-    quote_indicators = ["verbatim", "exact", "quote", "word for word", "says exactly"]
-    if any(ind in query.lower() for ind in quote_indicators):
+    if _is_quote_mode(query):
         context["mode"] = "quote"
     
     # Gather context in parallel
+    retrievers = {}
     if include_statutes:
-        context["statutes"] = await search_statutes(query, max_statutes)
-    
+        retrievers["statutes"] = search_statutes(query, max_statutes)
     if include_experts:
-        context["experts"] = await get_expert_insights(query, max_experts)
-    
+        retrievers["experts"] = get_expert_insights(query, max_experts)
     if include_notion and user:
-        context["notion_context"] = await get_gamma_context(query, user)
+        retrievers["gamma"] = get_gamma_context(query, user)
+    results, _ = await _gather_with_deadlines(retrievers)
+    
+    context["statutes"] = results.get("statutes") or []
+    context["experts"] = results.get("experts") or []
+    context["notion_context"] = results.get("gamma")
     
     # Build summary
     parts = []
@@ -248,7 +269,7 @@ def format_expert_for_prompt(expert: Dict[str, Any]) -> str:
     Format an expert profile for inclusion in Eve's prompt.
     """
     name = expert.get("name", "Unknown")
-    specialty = expert.get("specialty", "")
+    specialty = expert.get("specialty") or expert.get("category", "")
     insights = expert.get("key_insights", [])
     
     insights_text = "\n".join([f"- {i}" for i in insights[:5]])
@@ -290,6 +311,343 @@ def build_eve_system_context(context: Dict[str, Any]) -> str:
     return "\n".join(parts)
 
 
+# ============================================
+# CONTEXT ASSEMBLY (Eve chat)
+# ============================================
+
+CHARS_PER_TOKEN = 4
+MIN_TRUNCATED_TOKENS = 120
+TRUNCATION_MARKER = "\n[... truncated, ask for more detail ...]"
+VERBATIM_OMITTED_NOTICE = (
+    "[Exact text omitted: it does not fit in this context. Do not quote this "
+    "section from memory; point the user to the official text at the citation above.]"
+)
+
+# Render order and section banners, as in Eve's prompt layout.
+_SECTIONS = {
+    "statutes": ("\n--- FLORIDA STATUTES (from verified database) ---", "--- END FLORIDA STATUTES ---\n"),
+    "experts": ("\n--- INDUSTRY EXPERT INSIGHTS ---", "--- END EXPERT INSIGHTS ---\n"),
+    "knowledge": ("\n--- DEEP KNOWLEDGE BASE CONTEXT ---", "--- END DEEP KNOWLEDGE ---\n"),
+}
+_QUOTE_STATUTES_BANNER = (
+    "\n--- VERBATIM FLORIDA STATUTE TEXT (from Online Sunshine) ---\n"
+    "IMPORTANT: Use ONLY this exact text when user asks for verbatim/quote. Do NOT modify."
+)
+_SOURCE_ORDER = {name: i for i, name in enumerate(_SECTIONS)}
+
+
+@dataclass
+class Passage:
+    """One retrieved unit of context, before dedupe and packing."""
+    source: str
+    key: str
+    text: str
+    rank: int = 0
+    verbatim: bool = False  # never truncated (statute text in quote mode)
+    citation: str = ""  # packed with a notice when verbatim text cannot fit
+
+
+@dataclass
+class PackedContext:
+    text: str = ""
+    mode: str = "explain"
+    tokens: int = 0
+    passages: List[str] = field(default_factory=list)  # passage keys, in packed order
+    dropped: int = 0
+    missing_sources: List[str] = field(default_factory=list)
+    cached: bool = False
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split()).strip(" ?!.")
+
+
+def _is_quote_mode(query: str) -> bool:
+    query_lower = query.lower()
+    return any(ind in query_lower for ind in QUOTE_INDICATORS)
+
+
+async def _gather_with_deadlines(
+    retrievers: Dict[str, Awaitable],
+    deadlines: Optional[Dict[str, float]] = None,
+) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Await *retrievers* concurrently, each bounded by its deadline.
+
+    A source that times out or raises yields None; its name is returned in
+    the second element so callers know the result is partial.
+    """
+    limits = {**SOURCE_DEADLINES, **(deadlines or {})}
+    names = list(retrievers)
+
+    async def run(name: str):
+        started = time.perf_counter()
+        result, outcome = None, "ok"
+        try:
+            result = await asyncio.wait_for(retrievers[name], limits.get(name, 1.0))
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            logger.warning("Eve context source %s missed its %.2fs deadline", name, limits.get(name, 1.0))
+        except Exception as e:
+            outcome = "error"
+            logger.error("Eve context source %s failed: %s", name, e)
+        MetricsCollector.increment("eve_context_source_total", {"source": name, "result": outcome})
+        MetricsCollector.record_timing(
+            "eve_context_source_ms", (time.perf_counter() - started) * 1000, {"source": name}
+        )
+        return result, outcome
+
+    outcomes = await asyncio.gather(*(run(name) for name in names))
+    results = {name: result for name, (result, _) in zip(names, outcomes)}
+    missing = [name for name, (_, outcome) in zip(names, outcomes) if outcome != "ok"]
+    return results, missing
+
+
+def _statute_passage(statute: Dict[str, Any], quote_mode: bool, rank: int) -> Passage:
+    section = statute.get("section_number", "")
+    heading = statute.get("heading", "")
+    body = statute.get("body_text", "")
+    year = statute.get("year")
+    url = statute.get("source_url", "")
+
+    if year is None:
+        # FLORIDA_PA_LAWS summary rather than the enacted text
+        text = "\n".join(p for p in (f"**{heading}**", statute.get("summary", ""), body) if p)
+        return Passage("statutes", f"statute:{section}", text, rank=rank)
+
+    citation = f"\u00a7{section}, {year} Fla. Stat." + (f", {url}" if url else "")
+    if quote_mode:
+        text = f"**{citation}**\nHeading: {heading}\nEXACT TEXT:\n{body}"
+        return Passage(
+            "statutes", f"statute:{section}", text, rank=rank, verbatim=True,
+            citation=f"**{citation}**\nHeading: {heading}",
+        )
+    if len(body) > 1500:
+        body = body[:1500] + "... [truncated]"
+    text = f"**\u00a7{section}** - {heading}\nCitation: {citation}\n{body}"
+    return Passage("statutes", f"statute:{section}", text, rank=rank)
+
+
+def _key_numbers_text() -> str:
+    from routes.knowledge_base import FLORIDA_PA_LAWS
+
+    key_nums = FLORIDA_PA_LAWS["key_numbers"]
+    return "\n".join([
+        "**Quick Reference Numbers:**",
+        f"  - Max fee (standard): {key_nums['max_fee_standard']}",
+        f"  - Max fee (emergency): {key_nums['max_fee_emergency']}",
+        f"  - Surety bond: ${key_nums['surety_bond']}",
+        f"  - Claim pay/deny deadline: {key_nums['claim_pay_deny_days']} days",
+    ])
+
+
+async def _statute_passages(query: str, quote_mode: bool, limit: int = 3) -> List[Passage]:
+    query_lower = query.lower()
+    if not any(kw in query_lower for kw in STATUTE_TRIGGERS):
+        return []
+    # A section can come back both as enacted text and as a FLORIDA_PA_LAWS
+    # summary; keep its first position but prefer the enacted text.
+    by_section: Dict[str, Dict[str, Any]] = {}
+    for statute in await search_statutes(query, limit):
+        section = statute.get("section_number", "")
+        current = by_section.get(section)
+        if current is None or (current.get("year") is None and statute.get("year") is not None):
+            by_section[section] = statute
+    passages = [_statute_passage(s, quote_mode, rank) for rank, s in enumerate(by_section.values())]
+    passages.append(Passage("statutes", "statute:key-numbers", _key_numbers_text(), rank=len(passages)))
+    return passages
+
+
+async def _expert_passages(query: str, limit: int = 2) -> List[Passage]:
+    passages = []
+    for rank, hit in enumerate(retrieval_index.search("experts", query, limit)):
+        expert = hit.payload
+        insights = expert.get("key_insights", [])[:3]
+        if not insights:
+            continue
+        lines = [f"**{expert.get('name', 'Unknown')}** ({expert.get('category', '')}):"]
+        lines.extend(f"  - {insight}" for insight in insights)
+        passages.append(Passage("experts", f"expert:{expert.get('id')}", "\n".join(lines), rank=rank))
+    return passages
+
+
+async def _knowledge_passages(query: str, limit: int = 3) -> List[Passage]:
+    query_lower = query.lower()
+    if not any(trigger in query_lower for trigger in DEEP_KNOWLEDGE_TRIGGERS):
+        return []
+    if retrieval_index.is_ready("knowledge"):
+        results = [hit.payload for hit in retrieval_index.search("knowledge", query, limit)]
+    else:
+        results = await db.eve_knowledge_base.find(
+            {"$text": {"$search": query}},
+            {"score": {"$meta": "textScore"}, "_id": 0, "title": 1, "content": 1, "source": 1, "category": 1},
+        ).sort([("score", {"$meta": "textScore"})]).limit(limit).to_list(limit)
+    return [
+        Passage(
+            "knowledge",
+            f"knowledge:{r.get('title', '')}",
+            f"**{r.get('title', 'Untitled')}** (Source: {r.get('source', 'Unknown')})\n{r.get('content', '')}",
+            rank=rank,
+        )
+        for rank, r in enumerate(results)
+    ]
+
+
+def _shingles(text: str, n: int = 5) -> set:
+    tokens = tokenize(text)
+    if len(tokens) <= n:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1)}
+
+
+def dedupe_passages(passages: List[Passage], threshold: float = 0.8) -> List[Passage]:
+    """
+    Drop passages already covered by earlier ones: same key (one statute
+    from two sources), or at least *threshold* of their 5-token shingles
+    already seen (a knowledge section quoting a statute or an expert).
+    """
+    kept: List[Passage] = []
+    keys: set = set()
+    seen: set = set()
+    for passage in passages:
+        if passage.key in keys:
+            continue
+        shingles = _shingles(passage.text)
+        if shingles and len(shingles & seen) >= threshold * len(shingles):
+            continue
+        kept.append(passage)
+        keys.add(passage.key)
+        seen |= shingles
+    return kept
+
+
+def pack_passages(passages: List[Passage], budget_tokens: int, mode: str = "explain") -> PackedContext:
+    """
+    Greedily pack *passages* (already in priority order) into *budget_tokens*.
+
+    Verbatim passages are packed first. One that still does not fit is never
+    cut mid-text: its citation goes in with ``VERBATIM_OMITTED_NOTICE`` so
+    the model knows the exact wording exists but was withheld. Any other
+    passage that does not fit is truncated to the remaining room, unless the
+    room is under ``MIN_TRUNCATED_TOKENS``, in which case it is skipped and
+    smaller passages behind it still get their chance.
+    """
+    banners = dict(_SECTIONS)
+    if mode == "quote":
+        banners["statutes"] = (_QUOTE_STATUTES_BANNER, banners["statutes"][1])
+
+    remaining = budget_tokens
+    chosen: Dict[str, List[str]] = {}
+    packed = PackedContext(mode=mode)
+    for passage in sorted(passages, key=lambda p: not p.verbatim):
+        opening, closing = banners[passage.source]
+        # one token per joining newline; a new section also pays for its banners
+        overhead = 1 if passage.source in chosen else estimate_tokens(opening + closing) + 2
+        text = passage.text
+        if overhead + estimate_tokens(text) > remaining:
+            room = remaining - overhead
+            if passage.verbatim and passage.citation:
+                text = f"{passage.citation}\n{VERBATIM_OMITTED_NOTICE}"
+                if estimate_tokens(text) > room:
+                    packed.dropped += 1
+                    continue
+            elif passage.verbatim or room < MIN_TRUNCATED_TOKENS:
+                packed.dropped += 1
+                continue
+            else:
+                text = text[: room * CHARS_PER_TOKEN - len(TRUNCATION_MARKER)] + TRUNCATION_MARKER
+        remaining -= overhead + estimate_tokens(text)
+        chosen.setdefault(passage.source, []).append(text)
+        packed.passages.append(passage.key)
+
+    packed.text = "".join(
+        "\n".join([banners[source][0], *chosen[source], banners[source][1]])
+        for source in _SECTIONS if source in chosen
+    )
+    packed.tokens = estimate_tokens(packed.text)
+    return packed
+
+
+class _PackedContextCache:
+    """Small TTL LRU of packed contexts keyed by (normalized query, role, budget)."""
+
+    def __init__(self, maxsize: int = 256, ttl_seconds: int = EVE_CONTEXT_CACHE_TTL_SECONDS):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple, Tuple[float, PackedContext]]" = OrderedDict()
+
+    def get(self, key: Tuple) -> Optional[PackedContext]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Tuple, value: PackedContext) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+context_cache = _PackedContextCache()
+
+
+async def assemble_eve_context(
+    query: str,
+    user: Optional[dict] = None,
+    budget_tokens: int = EVE_CONTEXT_TOKEN_BUDGET,
+    deadlines: Optional[Dict[str, float]] = None,
+) -> PackedContext:
+    """
+    Build the knowledge section of an Eve chat prompt.
+
+    Statutes, expert insights and deep knowledge are retrieved concurrently
+    under ``SOURCE_DEADLINES``, deduped, and packed into *budget_tokens*.
+    Results are cached per (normalized query, user role) unless a source
+    was missing.
+    """
+    role = (user or {}).get("role") or "anonymous"
+    key = (normalize_query(query), role, budget_tokens)
+    cached = context_cache.get(key)
+    if cached is not None:
+        MetricsCollector.increment("eve_context_cache_total", {"result": "hit"})
+        return PackedContext(**{**cached.__dict__, "passages": list(cached.passages), "cached": True})
+    MetricsCollector.increment("eve_context_cache_total", {"result": "miss"})
+
+    mode = "quote" if _is_quote_mode(query) else "explain"
+    retrievers = {
+        "statutes": _statute_passages(query, mode == "quote"),
+        "experts": _expert_passages(query),
+        "knowledge": _knowledge_passages(query),
+    }
+    results, missing = await _gather_with_deadlines(retrievers, deadlines)
+
+    passages = [p for name in retrievers for p in (results.get(name) or [])]
+    # Interleave by rank so every source's best passage is packed before
+    # any source's second-best.
+    passages.sort(key=lambda p: (p.rank, _SOURCE_ORDER[p.source]))
+    unique = dedupe_passages(passages)
+    packed = pack_passages(unique, budget_tokens, mode)
+    packed.dropped += len(passages) - len(unique)
+    packed.missing_sources = missing
+
+    if not missing:
+        context_cache.put(key, packed)
+    return packed
+
+
 # ============================================
 # INTERACTION LOGGING
 # ============================================
@@ -356,6 +714,8 @@ __all__ = [
     'get_expert_insights',
     'get_gamma_context',
     'get_eve_context',
+    'assemble_eve_context',
+    'PackedContext',
     'format_statute_for_prompt',
     'format_expert_for_prompt',
     'build_eve_system_context',
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field, ConfigDict
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from datetime import datetime, timezone
 import uuid
 
@@ -181,6 +181,13 @@ class Claim(ClaimBase):
     next_actions_client: Optional[str] = None
     last_client_update_at: Optional[datetime] = None
 
+class ClaimListPage(BaseModel):
+    """Keyset page for claim tables; rows are projected dicts, not ``Claim`` models."""
+    claims: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+    fields: List[str]
+
 # Note Models
 class NoteCreate(BaseModel):
     claim_id: str
@@ -15,6 +15,7 @@ Endpoints:
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import json
 import logging
 import os
@@ -26,6 +27,7 @@ from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
+from pymongo import UpdateOne
 
 from dependencies import db, get_current_active_user, require_role
 
@@ -39,6 +41,19 @@ router = APIRouter(prefix="/api/adjuster-intel", tags=["adjuster-intel"])
 
 GEMINI_MODEL = "gemini-2.5-flash"
 
+# Bump when profile logic changes so every profile is rebuilt once
+PROFILE_VERSION = 1
+# Profiles built (and Gemini calls in flight) at the same time
+PROFILE_BUILD_CONCURRENCY = int(os.environ.get("ADJUSTER_PROFILE_CONCURRENCY", "4"))
+MAX_PROFILE_CLAIMS = 20000
+
+# Claim fields read by _build_adjuster_profile; also what the fingerprint covers
+PROFILE_CLAIM_FIELDS = (
+    "id", "claim_number", "created_at", "carrier_adjuster_name", "carrier_name",
+    "carrier_adjuster_email", "carrier_adjuster_phone", "status", "description",
+    "settlement_amount", "estimated_value", "replacement_cost_value",
+)
+
 BEHAVIOR_SCORE_THRESHOLDS = {
     "A": {"max_response_days": 5, "min_settlement_rate": 0.7, "max_denial_rate": 0.1},
     "B": {"max_response_days": 10, "min_settlement_rate": 0.5, "max_denial_rate": 0.2},
@@ -86,6 +101,8 @@ class AdjusterProfile(BaseModel):
     best_counter: str = ""
     behavior_score: str = "C"
     claims: List[str] = Field(default_factory=list)
+    ai_analyzed: bool = False
+    input_fingerprint: str = ""
     generated_at: str = Field(
         default_factory=lambda: datetime.now(timezone.utc).isoformat()
     )
@@ -94,6 +111,7 @@ class AdjusterProfile(BaseModel):
 class GenerateResponse(BaseModel):
     profiles_created: int = 0
     profiles_updated: int = 0
+    profiles_unchanged: int = 0
     errors: List[str] = Field(default_factory=list)
 
 
@@ -119,13 +137,17 @@ async def _call_gemini_for_tactics(
     carrier: str,
     notes_text: str,
 ) -> dict:
-    """Call Gemini to extract tactics, counter-strategy, and behavior score."""
+    """Call Gemini to extract tactics, counter-strategy, and behavior score.
+
+    ``ai_ok`` is False when Gemini was unavailable or failed; the empty
+    behavior score then falls back to the deterministic calculation.
+    """
     import google.generativeai as genai
 
     api_key = os.environ.get("GEMINI_API_KEY") or os.environ.get("GOOGLE_AI_API_KEY")
     if not api_key:
         logger.warning("No Gemini API key — skipping AI analysis for %s", adjuster_name)
-        return {"tactics": [], "best_counter": "", "behavior_score": "C"}
+        return {"tactics": [], "best_counter": "", "behavior_score": "", "ai_ok": False}
 
     genai.configure(api_key=api_key)
 
@@ -158,10 +180,11 @@ async def _call_gemini_for_tactics(
             "tactics": parsed.get("tactics", [])[:10],
             "best_counter": str(parsed.get("best_counter", ""))[:500],
             "behavior_score": str(parsed.get("behavior_score", "C"))[:1],
+            "ai_ok": True,
         }
     except Exception as exc:
         logger.error("Gemini tactics analysis failed for %s: %s", adjuster_name, exc)
-        return {"tactics": [], "best_counter": "", "behavior_score": "C"}
+        return {"tactics": [], "best_counter": "", "behavior_score": "", "ai_ok": False}
 
 
 # ---------------------------------------------------------------------------
@@ -328,7 +351,7 @@ async def get_adjuster_profile(
     normalized = _normalize_adjuster_name(adjuster_name)
 
     profile = await db.adjuster_profiles.find_one(
-        {"name": {"$regex": f"^{re.escape(normalized)}$", "$options": "i"}},
+        {"name": normalized},
         {"_id": 0},
     )
     if not profile:
@@ -402,8 +425,51 @@ async def get_carrier_adjusters(
     }
 
 
+def _ai_enabled() -> bool:
+    return bool(os.environ.get("GEMINI_API_KEY") or os.environ.get("GOOGLE_AI_API_KEY"))
+
+
+async def _note_stats_by_claim(claim_ids: list[str]) -> dict[str, tuple]:
+    """(count, newest created_at, newest updated_at) of notes per claim, in one aggregation."""
+    if not claim_ids:
+        return {}
+    rows = await db.notes.aggregate([
+        {"$match": {"claim_id": {"$in": claim_ids}}},
+        {"$group": {
+            "_id": "$claim_id",
+            "count": {"$sum": 1},
+            "last_created": {"$max": "$created_at"},
+            "last_updated": {"$max": "$updated_at"},
+        }},
+    ]).to_list(None)
+    return {row["_id"]: (row["count"], row.get("last_created"), row.get("last_updated")) for row in rows}
+
+
+def _profile_fingerprint(claims: list[dict], note_stats: dict[str, tuple]) -> str:
+    """Hash of every input a profile is built from.
+
+    Covers the claim fields the metrics read and, per claim, the note count
+    and newest note timestamps — enough to notice added, edited or removed
+    notes without loading their content.
+    """
+    payload = {
+        "v": PROFILE_VERSION,
+        "ai": _ai_enabled(),
+        "claims": sorted(
+            json.dumps(
+                [[claim.get(field) for field in PROFILE_CLAIM_FIELDS], note_stats.get(claim.get("id"))],
+                default=str,
+            )
+            for claim in claims
+        ),
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
 @router.post("/generate", response_model=GenerateResponse)
 async def generate_adjuster_profiles(
+    force: bool = False,
     current_user: dict = Depends(require_role(["admin", "manager"])),
 ):
     """
@@ -412,15 +478,19 @@ async def generate_adjuster_profiles(
     Groups claims by carrier_adjuster_name, calculates metrics from claim data
     and notes, uses Gemini to extract behavior patterns, and stores results
     in db.adjuster_profiles.
+
+    Only adjusters whose claims or notes changed since their profile was built
+    are rebuilt (``force=true`` rebuilds all). Builds run concurrently up to
+    PROFILE_BUILD_CONCURRENCY and are upserted by name in one bulk write.
     """
     # Fetch all claims that have a carrier adjuster name set
     claims_cursor = db.claims.find(
         {
             "carrier_adjuster_name": {"$exists": True, "$nin": ["", None]},
         },
-        {"_id": 0},
+        {"_id": 0, **{field: 1 for field in PROFILE_CLAIM_FIELDS}},
     )
-    all_claims = await claims_cursor.to_list(5000)
+    all_claims = await claims_cursor.to_list(MAX_PROFILE_CLAIMS)
 
     if not all_claims:
         return GenerateResponse(profiles_created=0, profiles_updated=0, errors=["No claims with carrier_adjuster_name found"])
@@ -434,45 +504,70 @@ async def generate_adjuster_profiles(
         normalized = _normalize_adjuster_name(raw_name)
         adjuster_claims[normalized].append(claim)
 
-    created = 0
-    updated = 0
-    errors: list[str] = []
-
-    for adjuster_name, claims in adjuster_claims.items():
-        try:
-            profile = await _build_adjuster_profile(adjuster_name, claims)
+    note_stats = await _note_stats_by_claim([c["id"] for c in all_claims if c.get("id")])
+    fingerprints = {
+        name: _profile_fingerprint(claims, note_stats)
+        for name, claims in adjuster_claims.items()
+    }
+    existing = {
+        p["name"]: p.get("input_fingerprint")
+        async for p in db.adjuster_profiles.find(
+            {"name": {"$in": list(adjuster_claims)}},
+            {"_id": 0, "name": 1, "input_fingerprint": 1},
+        )
+    }
+    stale = [
+        name for name in adjuster_claims
+        if force or existing.get(name) != fingerprints[name]
+    ]
 
-            # Upsert into MongoDB
-            existing = await db.adjuster_profiles.find_one(
-                {"name": {"$regex": f"^{re.escape(adjuster_name)}$", "$options": "i"}},
-            )
-            profile_dict = profile.model_dump()
-
-            if existing:
-                await db.adjuster_profiles.update_one(
-                    {"_id": existing["_id"]},
-                    {"$set": profile_dict},
-                )
-                updated += 1
-            else:
-                await db.adjuster_profiles.insert_one(profile_dict)
-                created += 1
-
-            logger.info(
-                "Adjuster profile %s: %s (%d claims, score=%s)",
-                "updated" if existing else "created",
-                adjuster_name,
-                len(claims),
-                profile.behavior_score,
-            )
-        except Exception as exc:
-            error_msg = f"Failed to build profile for {adjuster_name}: {exc}"
-            logger.error(error_msg)
-            errors.append(error_msg)
+    errors: list[str] = []
+    semaphore = asyncio.Semaphore(PROFILE_BUILD_CONCURRENCY)
+
+    async def _build(adjuster_name: str) -> Optional[AdjusterProfile]:
+        async with semaphore:
+            try:
+                profile = await _build_adjuster_profile(adjuster_name, adjuster_claims[adjuster_name])
+            except Exception as exc:
+                error_msg = f"Failed to build profile for {adjuster_name}: {exc}"
+                logger.error(error_msg)
+                errors.append(error_msg)
+                return None
+        # A configured Gemini call that failed leaves the profile provisional:
+        # keep the fingerprint empty so the next run tries again. Without a
+        # key the fingerprint records ai=False, so adding one still rebuilds.
+        if profile.ai_analyzed or not _ai_enabled():
+            profile.input_fingerprint = fingerprints[adjuster_name]
+        else:
+            profile.input_fingerprint = ""
+        logger.info(
+            "Adjuster profile built: %s (%d claims, score=%s)",
+            adjuster_name, profile.claims_handled, profile.behavior_score,
+        )
+        return profile
+
+    profiles = [p for p in await asyncio.gather(*(_build(name) for name in stale)) if p]
+
+    created = updated = 0
+    if profiles:
+        operations = []
+        for profile in profiles:
+            fields = profile.model_dump()
+            # Keep the profile id stable across rebuilds
+            profile_id = fields.pop("id")
+            operations.append(UpdateOne(
+                {"name": profile.name},
+                {"$set": fields, "$setOnInsert": {"id": profile_id}},
+                upsert=True,
+            ))
+        result = await db.adjuster_profiles.bulk_write(operations, ordered=False)
+        created = result.upserted_count
+        updated = len(profiles) - created
 
     return GenerateResponse(
         profiles_created=created,
         profiles_updated=updated,
+        profiles_unchanged=len(adjuster_claims) - len(stale),
         errors=errors,
     )
 
@@ -556,6 +651,7 @@ async def _build_adjuster_profile(
         best_counter=ai_result.get("best_counter", ""),
         behavior_score=behavior_score,
         claims=claim_numbers,
+        ai_analyzed=ai_result.get("ai_ok", False),
     )
 
 
@@ -589,7 +685,7 @@ async def get_claim_recommendations(
 
     normalized = _normalize_adjuster_name(adjuster_name_raw)
     profile = await db.adjuster_profiles.find_one(
-        {"name": {"$regex": f"^{re.escape(normalized)}$", "$options": "i"}},
+        {"name": normalized},
         {"_id": 0},
     )
 
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from typing import Dict, Any, List
 from services.observability import MetricsCollector, get_logger
+from services.startup_profiler import startup_profiler
 from dependencies import require_role, get_db
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from datetime import datetime, timezone
@@ -34,6 +35,16 @@ async def get_system_metrics(
     logger.audit("view_metrics", current_user["email"], "system", {})
     return MetricsCollector.get_snapshot()
 
+@router.get("/startup-profile")
+async def get_startup_profile(
+    current_user: dict = Depends(require_role(["admin"]))
+):
+    """
+    Cold-start timings for this instance: lifespan steps, and per-module
+    import times when started with STARTUP_PROFILE=1.
+    """
+    return startup_profiler.summary()
+
 @router.get("/claims/{claim_id}/audit")
 async def get_claim_audit_trail(
     claim_id: str,
@@ -27,11 +27,9 @@ from routes.ai.shared import (
     extract_claim_reference,
     fetch_claim_context,
     format_claim_context_for_prompt,
-    get_relevant_expert_insights,
-    get_florida_statute_context,
-    get_deep_knowledge_context,
     _send_via_ai_gateway,
 )
+from eve_retrieval import assemble_eve_context
 
 logger = logging.getLogger(__name__)
 
@@ -111,26 +109,17 @@ async def chat_with_eve(
         # Use static FIRM_CONTEXT (Gamma DISABLED)
         firm_context = f"\n\n--- FIRM KNOWLEDGE BASE ---\n{FIRM_CONTEXT}\n--- END KNOWLEDGE BASE ---\n\n"
 
-        # Get relevant expert insights from knowledge base
-        expert_context = get_relevant_expert_insights(request.message)
-
-        # Get relevant Florida statute context from database (async)
-        florida_law_context = await get_florida_statute_context(request.message)
-
-        # Get deep knowledge context from eve_knowledge_base (async)
-        deep_knowledge = await get_deep_knowledge_context(request.message)
+        # Statutes, expert insights and deep knowledge, retrieved concurrently
+        # and packed into the context token budget
+        knowledge_context = await assemble_eve_context(request.message, current_user)
 
         # Build the full prompt with history
         full_prompt = ""
         if history_context:
             full_prompt = f"Previous conversation:\n{history_context}\n"
         full_prompt += firm_context
-        if expert_context:
-            full_prompt += expert_context
-        if florida_law_context:
-            full_prompt += florida_law_context
-        if deep_knowledge:
-            full_prompt += deep_knowledge
+        if knowledge_context.text:
+            full_prompt += knowledge_context.text
         if claim_context_str:
             full_prompt += claim_context_str
         full_prompt += f"User's current question: {request.message}"
@@ -16,7 +16,10 @@ from pydantic import BaseModel
 
 from dependencies import db
 from emergentintegrations.llm.chat import LlmChat, UserMessage
+from services.llm_cache import cache_key, is_cacheable, response_cache
+from services.retrieval_index import retrieval_index
 from routes.knowledge_base import INDUSTRY_EXPERTS, FLORIDA_PA_LAWS
+from eve_retrieval import DEEP_KNOWLEDGE_TRIGGERS, STATUTE_TRIGGERS
 from services.ai_routing_policy import (
     resolve_provider_order_for_task as resolve_policy_provider_order_for_task,
     sanitize_provider_order as sanitize_policy_provider_order,
@@ -181,14 +184,7 @@ async def get_florida_statute_context(query: str) -> str:
     """
     query_lower = query.lower()
 
-    florida_keywords = [
-        "florida", "fl ", "statute", "law", "regulation", "license", "fee", "contract",
-        "rescission", "bond", "apprentice", "conflict of interest", "ethics", "timeline",
-        "aob", "assignment of benefits", "appraisal", "627", "626", "emergency",
-        "disclosure", "public adjuster", "quote", "exact", "verbatim", "wording",
-    ]
-
-    if not any(kw in query_lower for kw in florida_keywords):
+    if not any(kw in query_lower for kw in STATUTE_TRIGGERS):
         return ""
 
     quote_mode = any(kw in query_lower for kw in ["quote", "exact", "verbatim", "word for word", "exact wording"])
@@ -307,30 +303,17 @@ async def get_deep_knowledge_context(query: str, max_results: int = 3) -> str:
     query_lower = query.lower()
 
     # Only query for topics that benefit from deeper context
-    deep_topic_triggers = [
-        "case law", "case", "ruling", "court", "decision", "precedent",
-        "merlin", "zalma", "senac", "voelpel", "perri", "quinn", "gurczak",
-        "specific", "detail", "explain", "how to", "step by step",
-        "appraisal process", "umpire", "supplement", "xactimate",
-        "bad faith", "crn", "civil remedy", "euo",
-        "iicrc", "s500", "s520", "s700", "building code", "25% rule",
-        "wind mitigation", "depreciation", "rcv", "acv",
-        "ho-3", "ho-6", "dp-3", "policy form",
-        "carrier tactic", "delay", "deny", "underpay",
-        "negotiate", "negotiation", "strategy",
-        "constructive total loss", "valued policy",
-        "matching", "o&p", "overhead", "code upgrade",
-        "doah", "arbitration",
-    ]
-
-    if not any(trigger in query_lower for trigger in deep_topic_triggers):
+    if not any(trigger in query_lower for trigger in DEEP_KNOWLEDGE_TRIGGERS):
         return ""
 
     try:
-        results = await db.eve_knowledge_base.find(
-            {"$text": {"$search": query}},
-            {"score": {"$meta": "textScore"}, "_id": 0, "title": 1, "content": 1, "source": 1, "category": 1},
-        ).sort([("score", {"$meta": "textScore"})]).limit(max_results).to_list(max_results)
+        if retrieval_index.is_ready("knowledge"):
+            results = [hit.payload for hit in retrieval_index.search("knowledge", query, max_results)]
+        else:
+            results = await db.eve_knowledge_base.find(
+                {"$text": {"$search": query}},
+                {"score": {"$meta": "textScore"}, "_id": 0, "title": 1, "content": 1, "source": 1, "category": 1},
+            ).sort([("score", {"$meta": "textScore"})]).limit(max_results).to_list(max_results)
 
         if not results:
             return ""
@@ -756,6 +739,47 @@ async def _send_via_ai_gateway(
                 "No AI provider configured. Set GEMINI_API_KEY (free at https://aistudio.google.com/apikey) in Render environment."
             )
 
+    upstream = dict(
+        user_id=user_id,
+        session_key=session_key,
+        system_message=system_message,
+        safe_prompt=safe_prompt,
+        task_type=task_type,
+        provider=provider,
+        model=model,
+        provider_order=provider_order,
+        fallback_enabled=fallback_enabled,
+    )
+    if not is_cacheable(task_type):
+        return await _call_gateway_provider(**upstream)
+
+    # Deterministic task: identical (provider, model, system, prompt) requests
+    # are answered from the response cache without an upstream call or usage log.
+    async def compute():
+        text, served_provider, served_model = await _call_gateway_provider(**upstream)
+        return {"text": text, "provider": served_provider, "model": served_model}
+
+    cached = await response_cache.get_or_compute(
+        cache_key(provider, model, system_message, safe_prompt),
+        compute,
+        task=task_type,
+        meta={"provider": provider, "model": model},
+    )
+    return cached["text"], cached["provider"], cached["model"]
+
+
+async def _call_gateway_provider(
+    *,
+    user_id: str,
+    session_key: str,
+    system_message: str,
+    safe_prompt: str,
+    task_type: str,
+    provider: str,
+    model: str,
+    provider_order: List[str],
+    fallback_enabled: bool,
+):
     try:
         # Direct Gemini API path (free, no emergentintegrations dependency)
         if provider == "gemini":
@@ -216,3 +216,24 @@ async def get_analytics(
     ]
     stats = await db.claimpilot_audit.aggregate(pipeline).to_list(100)
     return _envelope(stats, count=len(stats))
+
+
+# ---------------------------------------------------------------------------
+# 9. GET /predictions/open-book — manager+ (level >= 75)
+# ---------------------------------------------------------------------------
+
+@router.get("/predictions/open-book")
+async def get_open_book_predictions(
+    top: int = Query(100, ge=1, le=1000),
+    current_user: dict = Depends(get_current_active_user),
+):
+    """Score every open claim with the local settlement model (dashboard rollup)."""
+    _require_level(current_user, MIN_LEVEL_MANAGER, "Manager")
+
+    from services.claimpilot.settlement_model import get_settlement_model, score_open_book
+
+    model = get_settlement_model()
+    if model is None:
+        raise HTTPException(status_code=503, detail="Settlement model not trained")
+    book = await score_open_book(db, model, top=top)
+    return _envelope(book, count=len(book["claims"]))
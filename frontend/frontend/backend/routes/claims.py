@@ -1,10 +1,10 @@
 from fastapi import APIRouter, HTTPException, Depends, status, UploadFile, File
 from fastapi.responses import FileResponse
 from typing import List, Optional
-from models import ClaimCreate, ClaimUpdate, Claim, NoteCreate, Note, DocumentCreate, Document
+from models import ClaimCreate, ClaimUpdate, Claim, ClaimListPage, NoteCreate, Note, DocumentCreate, Document
 from dependencies import db, get_current_active_user, require_role, require_permission
 from services.claims_service import ClaimsService
-from utils.claim_aggregations import get_claim_with_related_counts, get_claims_list_optimized
+from services.claim_summary import get_claim_summary, refresh_claim_summary
 import logging
 import os
 import uuid
@@ -65,23 +65,6 @@ def _deadline_status(due_at: datetime) -> tuple[str, int]:
     return "on_track", days_remaining
 
 
-def _classify_document_bucket(doc_type: str, doc_name: str) -> str:
-    token = f"{(doc_type or '').lower()} {(doc_name or '').lower()}"
-    if "policy" in token or "declaration" in token:
-        return "policy"
-    if "estimate" in token or "xactimate" in token:
-        return "estimate"
-    if "carrier" in token or "correspondence" in token or "letter" in token:
-        return "carrier_correspondence"
-    if "weather" in token or "noaa" in token:
-        return "weather"
-    if "supplement" in token:
-        return "supplement_support"
-    if "contract" in token or "signnow" in token:
-        return "contract"
-    return "other"
-
-
 @router.get("/{claim_id}/florida-readiness")
 async def get_florida_claim_readiness(
     claim_id: str,
@@ -91,24 +74,15 @@ async def get_florida_claim_readiness(
     Florida PA operational readiness snapshot for a claim.
     This is an execution tracker and not legal advice.
 
-    OPTIMIZED: Uses aggregation pipeline to fetch all data in one query.
+    Reads the claim and its ``claim_summaries`` read model; no fan-out.
     """
-    # Use optimized aggregation to get claim with all related counts
-    result = await get_claim_with_related_counts(db, claim_id)
-
-    if not result:
-        raise HTTPException(status_code=404, detail="Claim not found")
-
-    claim = result["claim"]
-    if not _can_access_claim(current_user, claim):
-        raise HTTPException(status_code=403, detail="Access denied")
+    claim = await _get_claim_for_user_or_403(claim_id, current_user)
+    summary = await get_claim_summary(claim_id)
 
-    # Extract counts from aggregation result
-    docs = result["documents"]
-    docs_count = result["documents_count"]
-    notes_count = result["notes_count"]
-    photos_count = result["photos_count"]
-    supplements_submitted = result["supplements_submitted_count"]
+    docs_count = summary["documents_count"]
+    notes_count = summary["notes_count"]
+    photos_count = summary["photos_count"]
+    supplements_submitted = summary["supplements_submitted_count"]
 
     required_fields = [
         ("claim_number", "Claim number"),
@@ -138,8 +112,7 @@ async def get_florida_claim_readiness(
         }
     )
 
-    # Use latest submitted supplement from aggregation result
-    latest_submitted = result.get("latest_submitted_supplement")
+    latest_submitted = summary.get("latest_submitted_supplement")
     if latest_submitted:
         submitted_at = _parse_date(latest_submitted.get("submitted_at"))
         if submitted_at:
@@ -156,13 +129,10 @@ async def get_florida_claim_readiness(
                 }
             )
 
-    doc_tokens = [
-        f"{(d.get('type') or '').lower()} {(d.get('name') or '').lower()}".strip()
-        for d in docs
-    ]
-    has_policy = any("policy" in t or "declarations" in t for t in doc_tokens)
-    has_estimate = any("estimate" in t or "xactimate" in t for t in doc_tokens)
-    has_carrier_correspondence = any("carrier" in t or "letter" in t or "correspondence" in t for t in doc_tokens)
+    flags = summary["evidence_flags"]
+    has_policy = flags["has_policy"]
+    has_estimate = flags["has_estimate"]
+    has_carrier_correspondence = flags["has_carrier_correspondence"]
 
     evidence_checklist = [
         {"id": "policy_docs", "label": "Policy/Declarations uploaded", "complete": has_policy},
@@ -223,16 +193,13 @@ async def get_claim_demand_package_manifest(
     Build a carrier-demand package manifest showing included and missing artifacts.
     This is a packaging assistant and does not alter claim records.
     """
-    claim = await db.claims.find_one({"id": claim_id}, {"_id": 0})
-    if not claim:
-        raise HTTPException(status_code=404, detail="Claim not found")
-    if not _can_access_claim(current_user, claim):
-        raise HTTPException(status_code=403, detail="Access denied")
+    claim = await _get_claim_for_user_or_403(claim_id, current_user)
+    summary = await get_claim_summary(claim_id)
 
-    documents = await db.documents.find({"claim_id": claim_id}, {"_id": 0, "id": 1, "type": 1, "name": 1, "uploaded_at": 1}).to_list(500)
-    notes_count = await db.notes.count_documents({"claim_id": claim_id})
-    photos_count = await db.inspection_photos.count_documents({"claim_id": claim_id})
-    supplements_count = await db.supplements.count_documents({"claim_id": claim_id})
+    documents = summary["documents"]
+    notes_count = summary["notes_count"]
+    photos_count = summary["photos_count"]
+    supplements_count = summary["supplements_count"]
 
     grouped_docs: dict[str, list] = {
         "policy": [],
@@ -244,8 +211,7 @@ async def get_claim_demand_package_manifest(
         "other": [],
     }
     for doc in documents:
-        bucket = _classify_document_bucket(doc.get("type", ""), doc.get("name", ""))
-        grouped_docs[bucket].append(
+        grouped_docs[doc["bucket"]].append(
             {
                 "id": doc.get("id"),
                 "name": doc.get("name"),
@@ -308,7 +274,7 @@ async def get_claim_demand_package_manifest(
         "missing_sections": missing_sections,
         "recommended_order": recommended_order,
         "artifact_counts": {
-            "documents": len(documents),
+            "documents": summary["documents_count"],
             "photos": photos_count,
             "notes": notes_count,
             "supplements": supplements_count,
@@ -336,7 +302,7 @@ async def get_claim_demand_package_manifest(
         "section_status": section_status,
         "missing_sections": missing_sections,
         "counts": {
-            "documents": len(documents),
+            "documents": summary["documents_count"],
             "photos": photos_count,
             "notes": notes_count,
             "supplements": supplements_count,
@@ -367,6 +333,34 @@ async def get_claims(
     """Get all claims (filtered by role). Archived claims hidden by default."""
     return await service.get_claims(filter_status, include_archived, limit, current_user)
 
+@router.get("/list", response_model=ClaimListPage)
+async def list_claims(
+    status: Optional[str] = None,
+    assigned_to: Optional[str] = None,
+    carrier: Optional[str] = None,
+    include_archived: bool = False,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    current_user: dict = Depends(get_current_active_user),
+    service: ClaimsService = Depends(get_claims_service)
+):
+    """Cursor-paginated claim rows for table views.
+
+    ``fields`` is a preset (``list``, ``compact``) or comma-separated field
+    names; pass ``next_cursor`` back as ``cursor`` for the next page.
+    """
+    return await service.list_claims(
+        current_user,
+        status=status,
+        assigned_to=assigned_to,
+        carrier=carrier,
+        include_archived=include_archived,
+        fields=fields,
+        cursor=cursor,
+        limit=limit,
+    )
+
 @router.get("/{claim_id}", response_model=Claim)
 async def get_claim(
     claim_id: str,
@@ -423,6 +417,7 @@ async def add_note(
         
         note_obj = Note(**note_dict)
         await db.notes.insert_one(note_obj.model_dump())
+        await refresh_claim_summary(claim_id, "notes")
         
         logger.info(f"Note added to claim: {claim_id}")
         return note_obj
@@ -489,6 +484,7 @@ async def upload_document(
         
         doc_obj = Document(**doc_dict)
         await db.documents.insert_one(doc_obj.model_dump())
+        await refresh_claim_summary(claim_id, "documents")
         
         logger.info(f"Document uploaded to claim: {claim_id}")
         return doc_obj
@@ -568,6 +564,7 @@ async def update_note(
         return Note(**note)
     updates["edited_at"] = datetime.now(timezone.utc).isoformat()
     await db.notes.update_one({"id": note_id}, {"$set": updates})
+    await refresh_claim_summary(claim_id, "notes")
     updated = await db.notes.find_one({"id": note_id}, {"_id": 0})
     return Note(**updated)
 
@@ -586,9 +583,21 @@ async def delete_note(
     if note.get("author_id") != current_user["id"] and current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Only the author or admin can delete this note")
     await db.notes.delete_one({"id": note_id})
+    await refresh_claim_summary(claim_id, "notes")
     return {"message": "Note deleted"}
 
 
+@router.get("/{claim_id}/summary")
+async def get_claim_summary_view(
+    claim_id: str,
+    current_user: dict = Depends(get_current_active_user),
+):
+    """Related-record counts, latest items and evidence flags for claim detail"""
+    await _get_claim_for_user_or_403(claim_id, current_user)
+    summary = await get_claim_summary(claim_id)
+    return summary
+
+
 # ──────────────────────────────────────────────
 # Activity / Audit Log
 # ──────────────────────────────────────────────
@@ -2,15 +2,24 @@
 Communications Center - Twilio Conversations Endpoints
 Implements initWebchat-style flow and token refresh.
 """
+import asyncio
+import base64
 import uuid
 import os
 import re
+from collections import Counter
 from datetime import datetime, timezone
 from typing import Optional, Literal
 from fastapi import APIRouter, HTTPException, Depends, UploadFile, File
 from fastapi.responses import FileResponse
 from pydantic import BaseModel, Field
 from dependencies import db, get_current_active_user
+from services.message_search import (
+    CANDIDATE_LIMIT as SEARCH_CANDIDATE_LIMIT,
+    index_fields,
+    query_prefixes,
+    rank_results,
+)
 from services.twilio_conversations import (
     is_conversations_configured,
     create_access_token,
@@ -22,6 +31,9 @@ from services.twilio_conversations import (
 
 router = APIRouter(prefix="/api/comm", tags=["communications"])
 
+# Message reads never return the search index fields
+MESSAGE_PROJECTION = {"_id": 0, "search_terms": 0, "search_prefixes": 0}
+
 
 class InitConversationRequest(BaseModel):
     unique_name: str
@@ -180,6 +192,89 @@ async def _log_message_event(
     )
 
 
+async def _insert_message(message_doc: dict):
+    """Store a new message with its search index fields.
+
+    The fields go on a copy so ``message_doc`` (returned to the client and
+    snapshotted into the channel) stays free of them.
+    """
+    await db.comms_messages.insert_one({**message_doc, **index_fields(message_doc)})
+
+
+async def _record_channel_message(channel_id: str, message_doc: dict):
+    """Keep the inbox summary current for a newly posted message.
+
+    The channel carries a ``last_message`` snapshot and every other member's
+    ``comms_read_state`` gets its ``unread_count`` bumped, so ``get_inbox``
+    never has to query ``comms_messages`` per channel.
+    """
+    await db.comms_channels.update_one(
+        {"id": channel_id},
+        {"$set": {"updated_at": message_doc["created_at"], "last_message": dict(message_doc)}},
+    )
+    # Read states without a counter yet are backfilled by the inbox itself
+    await db.comms_read_state.update_many(
+        {"channel_id": channel_id, "user_id": {"$ne": message_doc.get("sender_user_id")}},
+        {"$inc": {"unread_count": 1}},
+    )
+
+
+async def _refresh_last_message(channel_id: str, message_id: str, fields: dict):
+    """Mirror an edit/delete into the channel's snapshot if it is the latest message."""
+    await db.comms_channels.update_one(
+        {"id": channel_id, "last_message.id": message_id},
+        {"$set": {f"last_message.{key}": value for key, value in fields.items()}},
+    )
+
+
+async def _backfill_inbox_summaries(
+    user_id: str,
+    channel_map: dict,
+    read_state_map: dict,
+):
+    """One-time fill for channels/read states created before summaries existed.
+
+    Runs the old per-channel queries only for documents missing a snapshot or
+    counter and persists the result, so later inbox loads skip it.
+    """
+    async def _last_message(channel_id: str):
+        last_message = await db.comms_messages.find_one(
+            {"channel_id": channel_id},
+            MESSAGE_PROJECTION,
+            sort=[("created_at", -1)],
+        )
+        channel_map[channel_id]["last_message"] = last_message
+        await db.comms_channels.update_one(
+            {"id": channel_id, "last_message": {"$exists": False}},
+            {"$set": {"last_message": last_message}},
+        )
+
+    async def _unread_count(channel_id: str):
+        read_state = read_state_map.get(channel_id) or {}
+        query = {"channel_id": channel_id, "sender_user_id": {"$ne": user_id}}
+        if read_state.get("last_read_at"):
+            query["created_at"] = {"$gt": read_state["last_read_at"]}
+        unread_count = await db.comms_messages.count_documents(query)
+        now = _utc_now()
+        await db.comms_read_state.update_one(
+            {"channel_id": channel_id, "user_id": user_id},
+            {
+                "$set": {"unread_count": unread_count, "updated_at": now},
+                "$setOnInsert": {"id": str(uuid.uuid4()), "created_at": now},
+            },
+            upsert=True,
+        )
+        read_state_map[channel_id] = {**read_state, "unread_count": unread_count}
+
+    tasks = [_last_message(cid) for cid, channel in channel_map.items() if "last_message" not in channel]
+    tasks += [
+        _unread_count(cid) for cid in channel_map
+        if "unread_count" not in (read_state_map.get(cid) or {})
+    ]
+    if tasks:
+        await asyncio.gather(*tasks)
+
+
 async def _maybe_create_twilio_channel_conversation(
     channel_id: str,
     friendly_name: str,
@@ -301,31 +396,17 @@ async def get_inbox(current_user: dict = Depends(get_current_active_user)):
     ).to_list(500)
     read_state_map = {s["channel_id"]: s for s in read_states if s.get("channel_id")}
 
+    await _backfill_inbox_summaries(user_id, channel_map, read_state_map)
+
     items = []
     for channel_id, channel in channel_map.items():
-        last_message = await db.comms_messages.find_one(
-            {"channel_id": channel_id},
-            {"_id": 0},
-            sort=[("created_at", -1)],
-        )
-        last_read_at = (read_state_map.get(channel_id) or {}).get("last_read_at")
-        unread_count = 0
-        if last_read_at:
-            unread_count = await db.comms_messages.count_documents(
-                {"channel_id": channel_id, "created_at": {"$gt": last_read_at}}
-            )
-        else:
-            unread_count = await db.comms_messages.count_documents({"channel_id": channel_id})
-
-        if last_message and last_message.get("sender_user_id") == user_id and unread_count > 0:
-            unread_count = max(unread_count - 1, 0)
-
+        last_message = channel.pop("last_message", None)
         items.append(
             {
                 "channel": channel,
                 "membership": membership_map.get(channel_id),
                 "last_message": last_message,
-                "unread_count": unread_count,
+                "unread_count": max((read_state_map.get(channel_id) or {}).get("unread_count", 0), 0),
             }
         )
 
@@ -402,6 +483,7 @@ async def create_channel(
         "updated_at": now,
         "is_archived": False,
         "twilio_conversation_sid": twilio_conversation_sid,
+        "last_message": None,
     }
     await db.comms_channels.insert_one(channel_doc)
 
@@ -540,48 +622,137 @@ async def delete_channel(
     return {"message": "Channel deleted"}
 
 
+MESSAGE_PAGE_MAX = 200
+
+
+def _encode_message_cursor(message: dict) -> str:
+    raw = f"{message.get('created_at', '')}|{message.get('id', '')}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_message_cursor(cursor: str) -> tuple[str, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, message_id = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8").split("|", 1)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid message cursor")
+    return created_at, message_id
+
+
+def _keyset_filter(cursor: str, direction: str) -> dict:
+    """Messages strictly before/after the cursor in (created_at, id) order."""
+    created_at, message_id = _decode_message_cursor(cursor)
+    op = "$lt" if direction == "before" else "$gt"
+    return {
+        "$or": [
+            {"created_at": {op: created_at}},
+            {"created_at": created_at, "id": {op: message_id}},
+        ]
+    }
+
+
+async def _fetch_by_ids(collection, ids, projection: dict, extra_filter: Optional[dict] = None, key: str = "id") -> dict:
+    """Resolve a set of referenced ids with a single ``$in`` query."""
+    ids = list({i for i in ids if i})
+    if not ids:
+        return {}
+    docs = await collection.find({key: {"$in": ids}, **(extra_filter or {})}, projection).to_list(len(ids))
+    return {doc[key]: doc for doc in docs}
+
+
+async def _hydrate_messages(channel_id: str, messages: list[dict], user_id: str) -> None:
+    """Attach reply previews and announcement ack state, one query per relation."""
+    replies = await _fetch_by_ids(
+        db.comms_messages,
+        (m.get("reply_to_message_id") for m in messages),
+        {"_id": 0, "id": 1, "sender_name": 1, "body": 1, "type": 1, "is_deleted": 1},
+        {"channel_id": channel_id},
+    )
+    announcement_ids = [m.get("id") for m in messages if m.get("type") == "announcement"]
+    my_acks = await _fetch_by_ids(
+        db.comms_announcement_acks,
+        announcement_ids,
+        {"_id": 0, "message_id": 1},
+        {"channel_id": channel_id, "user_id": user_id},
+        key="message_id",
+    )
+    await _backfill_ack_counts(channel_id, [m for m in messages if m.get("type") == "announcement" and "ack_count" not in m])
+
+    for msg in messages:
+        replied = replies.get(msg.get("reply_to_message_id"))
+        if replied:
+            msg["reply_to_message"] = {
+                "id": replied.get("id"),
+                "sender_name": replied.get("sender_name") or "Unknown",
+                "body": "[Deleted message]" if replied.get("is_deleted") else (replied.get("body") or ""),
+                "type": replied.get("type") or "message",
+            }
+        if msg.get("type") == "announcement":
+            msg["ack_count"] = msg.get("ack_count", 0)
+            msg["acked_by_me"] = msg.get("id") in my_acks
+
+
+async def _backfill_ack_counts(channel_id: str, announcements: list[dict]) -> None:
+    """Store ``ack_count`` on announcements posted before the counter existed."""
+    if not announcements:
+        return
+    ids = [m["id"] for m in announcements]
+    acks = await db.comms_announcement_acks.find(
+        {"channel_id": channel_id, "message_id": {"$in": ids}},
+        {"_id": 0, "message_id": 1},
+    ).to_list(None)
+    counts = Counter(ack["message_id"] for ack in acks)
+    for msg in announcements:
+        msg["ack_count"] = counts.get(msg["id"], 0)
+        await db.comms_messages.update_one(
+            {"id": msg["id"], "ack_count": {"$exists": False}},
+            {"$set": {"ack_count": msg["ack_count"]}},
+        )
+
+
 @router.get("/channels/{channel_id}/messages")
 async def get_channel_messages(
     channel_id: str,
     limit: int = 50,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
     current_user: dict = Depends(get_current_active_user),
 ):
+    """Page through a channel in chronological order.
+
+    Without a cursor returns the latest ``limit`` messages. ``before`` pages
+    back from a ``prev_cursor``; ``after`` catches up from a ``next_cursor``.
+    Cursors are opaque (created_at, id) keys, so deep pages cost the same as
+    the first one.
+    """
+    if before and after:
+        raise HTTPException(status_code=400, detail="Use either before or after, not both")
     await _ensure_channel_access(channel_id, current_user)
-    safe_limit = max(1, min(limit, 200))
-    messages = await db.comms_messages.find(
-        {"channel_id": channel_id},
-        {"_id": 0},
-    ).sort("created_at", -1).limit(safe_limit).to_list(safe_limit)
-    messages.reverse()
+    safe_limit = max(1, min(limit, MESSAGE_PAGE_MAX))
 
-    current_user_id = current_user.get("id")
-    for msg in messages:
-        if msg.get("reply_to_message_id"):
-            replied = await db.comms_messages.find_one(
-                {"id": msg.get("reply_to_message_id"), "channel_id": channel_id},
-                {"_id": 0, "id": 1, "sender_name": 1, "body": 1, "type": 1, "is_deleted": 1},
-            )
-            if replied:
-                msg["reply_to_message"] = {
-                    "id": replied.get("id"),
-                    "sender_name": replied.get("sender_name") or "Unknown",
-                    "body": "[Deleted message]" if replied.get("is_deleted") else (replied.get("body") or ""),
-                    "type": replied.get("type") or "message",
-                }
-
-        if msg.get("type") != "announcement":
-            continue
-        message_id = msg.get("id")
-        ack_query = {"channel_id": channel_id, "message_id": message_id}
-        ack_count = await db.comms_announcement_acks.count_documents(ack_query)
-        user_acked = await db.comms_announcement_acks.find_one(
-            {**ack_query, "user_id": current_user_id},
-            {"_id": 0, "id": 1},
-        )
-        msg["ack_count"] = ack_count
-        msg["acked_by_me"] = bool(user_acked)
+    query: dict = {"channel_id": channel_id}
+    if before or after:
+        query.update(_keyset_filter(before or after, "before" if before else "after"))
+    direction = 1 if after else -1
+    page = await db.comms_messages.find(
+        query,
+        MESSAGE_PROJECTION,
+    ).sort([("created_at", direction), ("id", direction)]).limit(safe_limit + 1).to_list(safe_limit + 1)
+
+    has_more = len(page) > safe_limit
+    messages = page[:safe_limit]
+    if direction == -1:
+        messages.reverse()
 
-    return {"messages": messages}
+    await _hydrate_messages(channel_id, messages, current_user.get("id"))
+
+    return {
+        "messages": messages,
+        "prev_cursor": _encode_message_cursor(messages[0]) if messages else before,
+        "next_cursor": _encode_message_cursor(messages[-1]) if messages else after,
+        "has_more_before": has_more if not after else True,
+        "has_more_after": has_more if after else bool(before),
+    }
 
 
 @router.post("/channels/{channel_id}/messages")
@@ -607,11 +778,8 @@ async def send_channel_message(
         "is_edited": False,
         "created_at": now,
     }
-    await db.comms_messages.insert_one(message_doc)
-    await db.comms_channels.update_one(
-        {"id": channel_id},
-        {"$set": {"updated_at": now}},
-    )
+    await _insert_message(message_doc)
+    await _record_channel_message(channel_id, message_doc)
 
     # Increment reply_count on parent message if this is a thread reply
     if payload.reply_to_message_id:
@@ -677,8 +845,8 @@ async def send_channel_gif_message(
         "is_edited": False,
         "created_at": now,
     }
-    await db.comms_messages.insert_one(message_doc)
-    await db.comms_channels.update_one({"id": channel_id}, {"$set": {"updated_at": now}})
+    await _insert_message(message_doc)
+    await _record_channel_message(channel_id, message_doc)
     await _log_message_event(
         channel_id=channel_id,
         message_id=message_doc["id"],
@@ -755,8 +923,8 @@ async def upload_channel_attachment(
         "is_edited": False,
         "created_at": now,
     }
-    await db.comms_messages.insert_one(message_doc)
-    await db.comms_channels.update_one({"id": channel_id}, {"$set": {"updated_at": now}})
+    await _insert_message(message_doc)
+    await _record_channel_message(channel_id, message_doc)
     await _log_message_event(
         channel_id=channel_id,
         message_id=message_doc["id"],
@@ -839,8 +1007,9 @@ async def update_channel_message(
     }
     await db.comms_messages.update_one(
         {"id": message_id, "channel_id": channel_id},
-        {"$set": update_fields},
+        {"$set": {**update_fields, **index_fields({**message, **update_fields})}},
     )
+    await _refresh_last_message(channel_id, message_id, update_fields)
     await _log_message_event(
         channel_id=channel_id,
         message_id=message_id,
@@ -850,7 +1019,7 @@ async def update_channel_message(
     )
     updated = await db.comms_messages.find_one(
         {"id": message_id, "channel_id": channel_id},
-        {"_id": 0},
+        MESSAGE_PROJECTION,
     )
     return {"message": updated}
 
@@ -876,17 +1045,17 @@ async def delete_channel_message(
         raise HTTPException(status_code=403, detail="Not allowed to delete this message")
 
     now = _utc_now()
+    deleted_fields = {
+        "is_deleted": True,
+        "deleted_at": now,
+        "deleted_by_user_id": current_user.get("id"),
+        "body": "[Message deleted]",
+    }
     await db.comms_messages.update_one(
         {"id": message_id, "channel_id": channel_id},
-        {
-            "$set": {
-                "is_deleted": True,
-                "deleted_at": now,
-                "deleted_by_user_id": current_user.get("id"),
-                "body": "[Message deleted]",
-            }
-        },
+        {"$set": {**deleted_fields, **index_fields(deleted_fields)}},
     )
+    await _refresh_last_message(channel_id, message_id, deleted_fields)
     await _log_message_event(
         channel_id=channel_id,
         message_id=message_id,
@@ -918,13 +1087,11 @@ async def post_channel_announcement(
         "title": payload.title.strip(),
         "body": payload.body.strip(),
         "type": "announcement",
+        "ack_count": 0,
         "created_at": now,
     }
-    await db.comms_messages.insert_one(message_doc)
-    await db.comms_channels.update_one(
-        {"id": channel_id},
-        {"$set": {"updated_at": now}},
-    )
+    await _insert_message(message_doc)
+    await _record_channel_message(channel_id, message_doc)
 
     if channel.get("twilio_conversation_sid") and is_conversations_configured():
         send_system_message(
@@ -953,6 +1120,7 @@ async def mark_channel_read(
         {
             "$set": {
                 "last_read_at": now,
+                "unread_count": 0,
                 "updated_at": now,
             },
             "$setOnInsert": {
@@ -983,7 +1151,7 @@ async def acknowledge_announcement(
         raise HTTPException(status_code=404, detail="Announcement not found")
 
     now = _utc_now()
-    await db.comms_announcement_acks.update_one(
+    result = await db.comms_announcement_acks.update_one(
         {
             "channel_id": channel_id,
             "message_id": message_id,
@@ -1002,6 +1170,11 @@ async def acknowledge_announcement(
         },
         upsert=True,
     )
+    if result.upserted_id is not None:
+        await db.comms_messages.update_one(
+            {"id": message_id, "channel_id": channel_id},
+            {"$inc": {"ack_count": 1}},
+        )
     return {"message": "Acknowledged"}
 
 
@@ -1070,14 +1243,14 @@ async def get_message_thread(
     await _ensure_channel_access(channel_id, current_user)
     parent = await db.comms_messages.find_one(
         {"id": message_id, "channel_id": channel_id},
-        {"_id": 0},
+        MESSAGE_PROJECTION,
     )
     if not parent:
         raise HTTPException(status_code=404, detail="Message not found")
 
     replies = await db.comms_messages.find(
         {"channel_id": channel_id, "reply_to_message_id": message_id},
-        {"_id": 0},
+        MESSAGE_PROJECTION,
     ).sort("created_at", 1).to_list(200)
 
     return {"parent": parent, "replies": replies, "reply_count": len(replies)}
@@ -1096,28 +1269,47 @@ async def search_messages(
     limit: int = 30,
     current_user: dict = Depends(get_current_active_user),
 ):
+    """Search messages in channels the user can read.
+
+    Query words match as prefixes of indexed words ("hail dam" finds "Hail
+    damage"), results are ranked by relevance with recency as tiebreak, and
+    each hit carries a snippet with highlight spans.
+    """
     user_id = current_user.get("id")
     if not q and not channel_id and not sender and not has_file:
         return {"results": []}
 
-    # Get channels the user has access to
+    query: dict = {"is_deleted": {"$ne": True}}
     if _can_manage_channels(current_user):
-        accessible_channel_ids = [c["id"] async for c in db.comms_channels.find(
-            {"is_archived": {"$ne": True}}, {"_id": 0, "id": 1}
+        # Admins see every live channel; exclude the (few) archived ones
+        # rather than listing every channel id.
+        archived_ids = [c["id"] async for c in db.comms_channels.find(
+            {"is_archived": True}, {"_id": 0, "id": 1}
         )]
+        if channel_id:
+            if channel_id in archived_ids:
+                return {"results": [], "count": 0}
+            query["channel_id"] = channel_id
+        elif archived_ids:
+            query["channel_id"] = {"$nin": archived_ids}
     else:
         accessible_channel_ids = [m["channel_id"] async for m in db.comms_channel_memberships.find(
             {"user_id": user_id, "is_active": True}, {"_id": 0, "channel_id": 1}
         )]
-
-    if not accessible_channel_ids:
-        return {"results": []}
-
-    query = {"channel_id": {"$in": accessible_channel_ids}, "is_deleted": {"$ne": True}}
-    if q:
+        if channel_id:
+            if channel_id not in accessible_channel_ids:
+                return {"results": [], "count": 0}
+            accessible_channel_ids = [channel_id]
+        if not accessible_channel_ids:
+            return {"results": [], "count": 0}
+        query["channel_id"] = {"$in": accessible_channel_ids}
+
+    prefixes = query_prefixes(q)
+    if prefixes:
+        query["search_prefixes"] = {"$all": prefixes}
+    elif q:
+        # Only one-character words; too short for the prefix index
         query["body"] = {"$regex": re.escape(q), "$options": "i"}
-    if channel_id:
-        query["channel_id"] = channel_id
     if sender:
         query["sender_name"] = {"$regex": re.escape(sender), "$options": "i"}
     if has_file:
@@ -1128,7 +1320,12 @@ async def search_messages(
         query.setdefault("created_at", {})["$lte"] = to_date
 
     safe_limit = max(1, min(limit, 50))
-    messages = await db.comms_messages.find(query, {"_id": 0}).sort("created_at", -1).limit(safe_limit).to_list(safe_limit)
+    # Rank among the newest matches; filter-only searches are plain recency
+    fetch_limit = SEARCH_CANDIDATE_LIMIT if prefixes else safe_limit
+    candidates = await db.comms_messages.find(
+        query, {"_id": 0, "search_prefixes": 0},
+    ).sort("created_at", -1).limit(fetch_limit).to_list(fetch_limit)
+    messages = rank_results(candidates, q, safe_limit)
 
     # Enrich with channel names
     channel_names = {}
@@ -1189,6 +1386,7 @@ async def create_or_find_dm(
                 "created_at": now,
                 "updated_at": now,
                 "is_archived": False,
+                "last_message": None,
             },
         },
         upsert=True,
@@ -1,21 +1,30 @@
 from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, Query
 from fastapi.responses import StreamingResponse
 from dependencies import db, get_current_active_user, require_role
-from models import Claim, ClaimCreate
+from models import Claim
+from services.claim_matcher import invalidate_claim_matcher
+from services.dashboard_snapshot import mark_claims_changed
 from datetime import datetime
-from typing import List
+from typing import AsyncIterator, BinaryIO, Iterable, Iterator, List, Optional
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
 import csv
 import io
 import json
 import logging
 import re
-import pandas as pd
+import shutil
+import tempfile
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/data", tags=["data"])
 SUPPORTED_DUPLICATE_STRATEGIES = ["skip", "auto_renumber", "update_blank_fields"]
 SUPPORTED_IMPORT_EXTENSIONS = [".csv", ".xlsx", ".xls"]
+# Rows are resolved, deduped and written in chunks of this size so a 100k-row
+# file costs ~100 round trips instead of ~200k, and memory stays bounded.
+IMPORT_CHUNK_SIZE = 1000
+IMPORT_REPORT_LIMIT = 1000
 
 FIELD_ALIASES = {
     "claim_number": ["claim_number", "claim number", "claim #", "claim id", "id", "file number"],
@@ -92,6 +101,32 @@ def _resolve_field_with_mapping(row: dict, field_name: str, import_mapping: dict
     return _resolve_field(row, field_name)
 
 
+def _build_field_lookup(headers: Iterable[str], import_mapping: dict | None = None) -> dict:
+    """Precompute, per canonical field, the source headers to try in order.
+
+    Equivalent to calling ``_resolve_field_with_mapping`` for every field, but
+    header normalization happens once per file instead of once per cell.
+    """
+    normalized_headers = {}
+    for header in headers:
+        normalized_headers[_norm_header(header)] = header
+
+    lookup = {}
+    for field_name, aliases in FIELD_ALIASES.items():
+        candidates = [
+            source_header
+            for source_header, mapped_field in (import_mapping or {}).items()
+            if mapped_field == field_name
+        ]
+        candidates.append(field_name)
+        for alias in aliases:
+            header = normalized_headers.get(_norm_header(alias))
+            if header is not None:
+                candidates.append(header)
+        lookup[field_name] = candidates
+    return lookup
+
+
 def _sanitize_import_mapping(raw_mapping: dict | None) -> dict:
     if not isinstance(raw_mapping, dict):
         return {}
@@ -106,17 +141,77 @@ def _sanitize_import_mapping(raw_mapping: dict | None) -> dict:
     return cleaned
 
 
-def _parse_import_rows(content: bytes, filename: str) -> List[dict]:
-    rows: List[dict] = []
+def _excel_cell_text(value) -> Optional[str]:
+    """Render an openpyxl cell the way ``pd.read_excel(dtype=str)`` would."""
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _iter_xlsx_rows(source: BinaryIO) -> Iterator[dict]:
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    try:
+        sheet_rows = workbook.active.iter_rows(values_only=True)
+        header_row = next(sheet_rows, None)
+        if header_row is None:
+            return
+        headers = [
+            str(header) if header is not None else f"Unnamed: {position}"
+            for position, header in enumerate(header_row)
+        ]
+        # Hold back blank rows until real data follows so trailing formatted
+        # but empty rows are dropped, matching pandas.
+        pending_blank = 0
+        for values in sheet_rows:
+            cells = [_excel_cell_text(value) for value in values]
+            if all(cell is None for cell in cells):
+                pending_blank += 1
+                continue
+            for _ in range(pending_blank):
+                yield dict.fromkeys(headers)
+            pending_blank = 0
+            cells += [None] * (len(headers) - len(cells))
+            yield dict(zip(headers, cells))
+    finally:
+        workbook.close()
+
+
+def _iter_import_rows(source: BinaryIO, filename: str) -> Iterator[dict]:
+    """Yield spreadsheet rows one at a time without materializing the file."""
     if filename.endswith(".csv"):
-        decoded = content.decode("utf-8-sig")
-        rows = list(csv.DictReader(io.StringIO(decoded)))
+        text = io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+        try:
+            yield from csv.DictReader(text)
+        finally:
+            text.detach()
+    elif filename.endswith(".xlsx"):
+        yield from _iter_xlsx_rows(source)
     else:
-        excel_engine = "openpyxl" if filename.endswith(".xlsx") else None
-        frame = pd.read_excel(io.BytesIO(content), dtype=str, engine=excel_engine)
+        # Legacy .xls has no streaming reader; the format caps out at 65k rows.
+        import pandas as pd
+
+        frame = pd.read_excel(source, dtype=str)
         frame = frame.where(pd.notnull(frame), None)
-        rows = frame.to_dict(orient="records")
-    return rows
+        yield from frame.to_dict(orient="records")
+
+
+def _parse_import_rows(content: bytes, filename: str) -> List[dict]:
+    return list(_iter_import_rows(io.BytesIO(content), filename))
+
+
+def _iter_row_chunks(rows: Iterable[dict], chunk_size: int = IMPORT_CHUNK_SIZE) -> Iterator[List[tuple]]:
+    chunk = []
+    for idx, row in enumerate(rows):
+        chunk.append((idx, row))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
 
 
 def _build_header_mapping(headers: List[str]) -> List[dict]:
@@ -167,11 +262,12 @@ def _build_duplicate_update_patch(existing: dict, candidate_values: dict) -> dic
     return patch
 
 
-async def _next_available_claim_number(base_claim_number: str) -> str:
+async def _next_available_claim_number(base_claim_number: str, taken: Optional[dict] = None) -> str:
     base = _clean_text(base_claim_number, "CLM-IMP").strip() or "CLM-IMP"
     candidate = base
     suffix = 1
-    while await db.claims.find_one({"claim_number": candidate}):
+    taken = taken or {}
+    while candidate in taken or await db.claims.find_one({"claim_number": candidate}):
         candidate = f"{base}-DUP-{suffix:03d}"
         suffix += 1
     return candidate
@@ -184,22 +280,23 @@ async def preview_claims_import(
 ):
     """Preview import header mapping and sample rows before full import."""
     try:
-        filename = (file.filename or "").lower()
-        if not (filename.endswith(".csv") or filename.endswith(".xlsx") or filename.endswith(".xls")):
-            raise HTTPException(status_code=400, detail="Only CSV, XLSX, or XLS files are supported")
-
-        content = await file.read()
-        rows = _parse_import_rows(content, filename)
-        headers = list(rows[0].keys()) if rows else []
+        filename = _validate_import_filename(file)
+        sample_rows = []
+        total_rows = 0
+        await file.seek(0)
+        for row in _iter_import_rows(file.file, filename):
+            if total_rows < 5:
+                sample_rows.append(row)
+            total_rows += 1
+        headers = list(sample_rows[0].keys()) if sample_rows else []
         header_mapping = _build_header_mapping(headers)
         unknown_headers = [m["source_header"] for m in header_mapping if not m.get("mapped_field")]
         mapped_headers = [m for m in header_mapping if m.get("mapped_field")]
-        sample_rows = rows[:5]
 
         return {
             "success": True,
             "filename": file.filename,
-            "total_rows": len(rows),
+            "total_rows": total_rows,
             "detected_headers": headers,
             "mapped_header_count": len(mapped_headers),
             "unknown_header_count": len(unknown_headers),
@@ -307,220 +404,399 @@ async def export_claims_json(
         logger.error(f"Export claims JSON error: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
-@router.post("/import/claims")
-async def import_claims_csv(
-    file: UploadFile = File(...),
-    import_mapping: str = Form(default=""),
-    duplicate_strategy: str = Form(default="skip"),
-    dry_run: bool = Form(default=False),
-    current_user: dict = Depends(require_role(["admin"]))
-):
-    """Import claims from CSV or XLSX file"""
-    try:
-        filename = (file.filename or "").lower()
-        if not (filename.endswith(".csv") or filename.endswith(".xlsx") or filename.endswith(".xls")):
-            raise HTTPException(status_code=400, detail="Only CSV, XLSX, or XLS files are supported")
-        
-        # Read file content
-        content = await file.read()
-        rows = _parse_import_rows(content, filename)
-        parsed_mapping = {}
-        if import_mapping:
+
+IMPORT_CANDIDATE_FIELDS = [
+    "client_name", "client_email", "property_address", "date_of_loss", "claim_type",
+    "policy_number", "estimated_value", "description", "status", "priority", "assigned_to",
+]
+_DUPLICATE_PREFETCH_PROJECTION = {
+    "_id": 0, "id": 1, "claim_number": 1, **{field_name: 1 for field_name in IMPORT_CANDIDATE_FIELDS}
+}
+
+
+def _validate_import_filename(file: UploadFile) -> str:
+    filename = (file.filename or "").lower()
+    if not any(filename.endswith(ext) for ext in SUPPORTED_IMPORT_EXTENSIONS):
+        raise HTTPException(status_code=400, detail="Only CSV, XLSX, or XLS files are supported")
+    return filename
+
+
+def _parse_import_options(import_mapping: str, duplicate_strategy: str) -> tuple:
+    parsed_mapping = {}
+    if import_mapping:
+        try:
+            parsed_mapping = _sanitize_import_mapping(json.loads(import_mapping))
+        except Exception:
+            parsed_mapping = {}
+
+    strategy = _clean_text(duplicate_strategy, "skip").lower()
+    if strategy not in set(SUPPORTED_DUPLICATE_STRATEGIES):
+        strategy = "skip"
+    return parsed_mapping, strategy
+
+
+class ClaimImportEngine:
+    """Chunked claims import.
+
+    Each chunk of rows is resolved in Python, deduped against a single
+    ``claim_number $in`` prefetch, and written with one unordered
+    ``bulk_write``. Claim numbers seen earlier in the same file are tracked so
+    in-file duplicates follow the same strategy as database duplicates.
+    """
+
+    def __init__(
+        self,
+        current_user: dict,
+        import_mapping: Optional[dict] = None,
+        duplicate_strategy: str = "skip",
+        dry_run: bool = False,
+        chunk_size: int = IMPORT_CHUNK_SIZE,
+    ):
+        self.current_user = current_user
+        self.import_mapping = import_mapping or {}
+        self.strategy = duplicate_strategy
+        self.dry_run = dry_run
+        self.chunk_size = chunk_size
+        self.imported = 0
+        self.updated = 0
+        self.would_import = 0
+        self.skipped = 0
+        self.processed = 0
+        self.errors: List[str] = []
+        self.warnings: List[str] = []
+        # claim_number -> slim claim doc (id + candidate fields)
+        self._known: dict = {}
+        # header tuple -> per-field source headers (see _build_field_lookup)
+        self._lookups: dict = {}
+
+    def summary(self) -> dict:
+        return {
+            "success": True,
+            "dry_run": self.dry_run,
+            "duplicate_strategy": self.strategy,
+            "processed": self.processed,
+            "imported": self.imported,
+            "updated": self.updated,
+            "would_import": self.would_import,
+            "skipped": self.skipped,
+            "errors": self.errors[:20],  # Limit errors shown
+            "warnings": self.warnings[:20],
+            "error_count": len(self.errors),
+            "warning_count": len(self.warnings),
+        }
+
+    async def run(self, rows: Iterable[dict]) -> AsyncIterator[List[dict]]:
+        """Import ``rows`` chunk by chunk, yielding each chunk's row report."""
+        for chunk in _iter_row_chunks(rows, self.chunk_size):
+            yield await self._process_chunk(chunk)
+
+    def _resolve_row(self, row: dict) -> dict:
+        headers = tuple(row.keys())
+        lookup = self._lookups.get(headers)
+        if lookup is None:
+            lookup = self._lookups[headers] = _build_field_lookup(headers, self.import_mapping)
+
+        def raw(name: str):
+            for header in lookup[name]:
+                value = row.get(header)
+                if value not in (None, ""):
+                    return value
+            return ""
+
+        def field(name: str, default: str = "") -> str:
+            return _clean_text(raw(name), default)
+
+        return {
+            "claim_number": field("claim_number"),
+            "client_name": field("client_name"),
+            "client_email": field("client_email"),
+            "property_address": field("property_address"),
+            "date_of_loss": field("date_of_loss"),
+            "claim_type": field("claim_type", "Other"),
+            "policy_number": field("policy_number"),
+            "estimated_value": _parse_numeric(raw("estimated_value"), 0.0),
+            "description": field("description"),
+            "status": field("status", "New"),
+            "priority": field("priority", "Medium"),
+            "assigned_to": field("assigned_to", self.current_user["full_name"]),
+        }
+
+    def _error(self, report: List[dict], idx: int, row: dict, error: Exception) -> None:
+        message = str(error)
+        self.errors.append(f"Row {idx + 2}: {message}")
+        report.append({
+            "row": idx + 2,
+            "status": "error",
+            "claim_number": _clean_text(_resolve_field(row, "claim_number")),
+            "message": message,
+        })
+
+    async def _prefetch_existing(self, claim_numbers: set) -> None:
+        missing = [number for number in claim_numbers if number not in self._known]
+        if not missing:
+            return
+        cursor = db.claims.find({"claim_number": {"$in": missing}}, _DUPLICATE_PREFETCH_PROJECTION)
+        async for existing in cursor:
+            self._known.setdefault(existing["claim_number"], existing)
+
+    async def _process_chunk(self, chunk: List[tuple]) -> List[dict]:
+        self.processed += len(chunk)
+        report: List[dict] = []
+        resolved = []
+        for idx, row in chunk:
             try:
-                parsed_mapping = _sanitize_import_mapping(json.loads(import_mapping))
-            except Exception:
-                parsed_mapping = {}
-        
-        strategy = _clean_text(duplicate_strategy, "skip").lower()
-        if strategy not in set(SUPPORTED_DUPLICATE_STRATEGIES):
-            strategy = "skip"
-
-        imported = 0
-        updated = 0
-        would_import = 0
-        skipped = 0
-        errors = []
-        warnings = []
-        row_report = []
-        
-        for idx, row in enumerate(rows):
+                values = self._resolve_row(row)
+            except Exception as row_error:
+                self._error(report, idx, row, row_error)
+                continue
+
+            # Skip rows that are effectively empty
+            if not any(values[name] for name in (
+                "claim_number", "client_name", "client_email", "property_address",
+                "date_of_loss", "claim_type", "policy_number", "description",
+            )):
+                self.skipped += 1
+                report.append({"row": idx + 2, "status": "skipped", "claim_number": "", "message": "Empty row"})
+                continue
+
+            # Generate stable claim number when missing
+            if not values["claim_number"]:
+                values["claim_number"] = f"CLM-IMP-{datetime.now().strftime('%Y%m%d')}-{idx + 1:05d}"
+                self.warnings.append(f"Row {idx + 2}: claim_number missing, generated {values['claim_number']}")
+                report.append({
+                    "row": idx + 2,
+                    "status": "warning",
+                    "claim_number": values["claim_number"],
+                    "message": "claim_number missing; generated automatically"
+                })
+            resolved.append((idx, row, values))
+
+        await self._prefetch_existing({values["claim_number"] for _, _, values in resolved})
+
+        operations = []
+        # Parallel to ``operations``: the report entries each write settles.
+        pending_reports: List[List[dict]] = []
+        pending_inserts: dict = {}
+        for idx, row, values in resolved:
             try:
-                claim_number = _clean_text(_resolve_field_with_mapping(row, "claim_number", parsed_mapping))
-                client_name = _clean_text(_resolve_field_with_mapping(row, "client_name", parsed_mapping))
-                client_email = _clean_text(_resolve_field_with_mapping(row, "client_email", parsed_mapping))
-                property_address = _clean_text(_resolve_field_with_mapping(row, "property_address", parsed_mapping))
-                date_of_loss = _clean_text(_resolve_field_with_mapping(row, "date_of_loss", parsed_mapping))
-                claim_type = _clean_text(_resolve_field_with_mapping(row, "claim_type", parsed_mapping), "Other")
-                policy_number = _clean_text(_resolve_field_with_mapping(row, "policy_number", parsed_mapping))
-                estimated_value = _parse_numeric(_resolve_field_with_mapping(row, "estimated_value", parsed_mapping), 0.0)
-                description = _clean_text(_resolve_field_with_mapping(row, "description", parsed_mapping))
-                status = _clean_text(_resolve_field_with_mapping(row, "status", parsed_mapping), "New")
-                priority = _clean_text(_resolve_field_with_mapping(row, "priority", parsed_mapping), "Medium")
-                assigned_to = _clean_text(_resolve_field_with_mapping(row, "assigned_to", parsed_mapping), current_user["full_name"])
-
-                # Skip rows that are effectively empty
-                if not any([
-                    claim_number, client_name, client_email, property_address, date_of_loss,
-                    claim_type, policy_number, description
-                ]):
-                    skipped += 1
-                    row_report.append({
+                await self._plan_row(idx, values, report, operations, pending_reports, pending_inserts)
+            except Exception as row_error:
+                self._error(report, idx, row, row_error)
+
+        if operations and not self.dry_run:
+            await self._flush(operations, pending_reports)
+
+        report.sort(key=lambda entry: entry["row"])
+        return report
+
+    async def _plan_row(
+        self,
+        idx: int,
+        values: dict,
+        report: List[dict],
+        operations: list,
+        pending_reports: List[List[dict]],
+        pending_inserts: dict,
+    ) -> None:
+        claim_number = values["claim_number"]
+        existing = self._known.get(claim_number)
+        if existing:
+            if self.strategy == "auto_renumber":
+                original_claim_number = claim_number
+                claim_number = await _next_available_claim_number(claim_number, self._known)
+                values["claim_number"] = claim_number
+                self.warnings.append(
+                    f"Row {idx + 2}: duplicate claim_number {original_claim_number}; generated {claim_number}"
+                )
+                report.append({
+                    "row": idx + 2,
+                    "status": "warning",
+                    "claim_number": claim_number,
+                    "message": f"Duplicate claim_number {original_claim_number}; generated {claim_number}"
+                })
+            elif self.strategy == "update_blank_fields":
+                candidate_values = {name: values[name] for name in IMPORT_CANDIDATE_FIELDS}
+                patch = _build_duplicate_update_patch(existing, candidate_values)
+                if not patch:
+                    self.skipped += 1
+                    report.append({
                         "row": idx + 2,
                         "status": "skipped",
-                        "claim_number": "",
-                        "message": "Empty row"
-                    })
-                    continue
-
-                # Generate stable claim number when missing
-                if not claim_number:
-                    claim_number = f"CLM-IMP-{datetime.now().strftime('%Y%m%d')}-{idx + 1:05d}"
-                    warnings.append(f"Row {idx + 2}: claim_number missing, generated {claim_number}")
-                    row_report.append({
-                        "row": idx + 2,
-                        "status": "warning",
                         "claim_number": claim_number,
-                        "message": "claim_number missing; generated automatically"
+                        "message": "Duplicate claim_number; no blank fields to update"
                     })
+                    return
 
-                # Check if claim already exists
-                existing = await db.claims.find_one({"claim_number": claim_number})
-                if existing:
-                    if strategy == "auto_renumber":
-                        original_claim_number = claim_number
-                        claim_number = await _next_available_claim_number(claim_number)
-                        warnings.append(
-                            f"Row {idx + 2}: duplicate claim_number {original_claim_number}; generated {claim_number}"
-                        )
-                        row_report.append({
-                            "row": idx + 2,
-                            "status": "warning",
-                            "claim_number": claim_number,
-                            "message": f"Duplicate claim_number {original_claim_number}; generated {claim_number}"
-                        })
-                        existing = None
-                    elif strategy == "update_blank_fields":
-                        candidate_values = {
-                            "client_name": client_name,
-                            "client_email": client_email,
-                            "property_address": property_address,
-                            "date_of_loss": date_of_loss,
-                            "claim_type": claim_type,
-                            "policy_number": policy_number,
-                            "estimated_value": estimated_value,
-                            "description": description,
-                            "status": status,
-                            "priority": priority,
-                            "assigned_to": assigned_to,
-                        }
-                        patch = _build_duplicate_update_patch(existing, candidate_values)
-
-                        if patch:
-                            patch["updated_at"] = datetime.utcnow()
-                            if dry_run:
-                                would_import += 1
-                                row_report.append({
-                                    "row": idx + 2,
-                                    "status": "would_update",
-                                    "claim_number": claim_number,
-                                    "message": f"Dry run: would update blank fields ({', '.join(sorted(patch.keys()))})"
-                                })
-                            else:
-                                await db.claims.update_one({"id": existing["id"]}, {"$set": patch})
-                                updated += 1
-                                row_report.append({
-                                    "row": idx + 2,
-                                    "status": "updated",
-                                    "claim_number": claim_number,
-                                    "message": f"Updated blank fields: {', '.join(sorted(patch.keys()))}"
-                                })
-                        else:
-                            skipped += 1
-                            row_report.append({
-                                "row": idx + 2,
-                                "status": "skipped",
-                                "claim_number": claim_number,
-                                "message": "Duplicate claim_number; no blank fields to update"
-                            })
-                        continue
-                    else:
-                        skipped += 1
-                        row_report.append({
-                            "row": idx + 2,
-                            "status": "skipped",
-                            "claim_number": claim_number,
-                            "message": "Duplicate claim_number already exists"
-                        })
-                        continue
-                
-                # Create claim object
-                claim_data = ClaimCreate(
-                    claim_number=claim_number,
-                    client_name=client_name or "",
-                    client_email=client_email or "",
-                    property_address=property_address or "",
-                    date_of_loss=date_of_loss or "",
-                    claim_type=claim_type or "Other",
-                    policy_number=policy_number or "",
-                    estimated_value=estimated_value,
-                    description=description or "",
-                    status=status or "New",
-                    priority=priority or "Medium"
-                )
-                
-                claim_obj = Claim(**claim_data.dict())
-                claim_obj.created_by = current_user["id"]
-                claim_obj.assigned_to = assigned_to
-
-                if dry_run:
-                    would_import += 1
-                    row_report.append({
+                patch["updated_at"] = datetime.utcnow()
+                existing.update(patch)
+                if self.dry_run:
+                    self.would_import += 1
+                    report.append({
                         "row": idx + 2,
-                        "status": "would_import",
+                        "status": "would_update",
                         "claim_number": claim_number,
-                        "message": "Dry run: row is valid and would be imported"
+                        "message": f"Dry run: would update blank fields ({', '.join(sorted(patch.keys()))})"
                     })
+                    return
+
+                entry = {
+                    "row": idx + 2,
+                    "status": "updated",
+                    "claim_number": claim_number,
+                    "message": f"Updated blank fields: {', '.join(sorted(patch.keys()))}"
+                }
+                report.append(entry)
+                pending_insert = pending_inserts.get(existing["id"])
+                if pending_insert is not None:
+                    # Target was created earlier in this chunk and is not written
+                    # yet; unordered bulk writes cannot sequence an update after
+                    # it, so fold the patch into the insert instead.
+                    insert_doc, position = pending_insert
+                    insert_doc.update(patch)
+                    pending_reports[position].append(entry)
                 else:
-                    await db.claims.insert_one(claim_obj.dict())
-                    imported += 1
-                    row_report.append({
-                        "row": idx + 2,
-                        "status": "imported",
-                        "claim_number": claim_number,
-                        "message": "Imported"
-                    })
-                
-            except Exception as row_error:
-                message = str(row_error)
-                errors.append(f"Row {idx + 2}: {message}")
-                row_report.append({
+                    operations.append(UpdateOne({"id": existing["id"]}, {"$set": patch}))
+                    pending_reports.append([entry])
+                return
+            else:
+                self.skipped += 1
+                report.append({
                     "row": idx + 2,
-                    "status": "error",
-                    "claim_number": _clean_text(_resolve_field(row, "claim_number")),
-                    "message": message
+                    "status": "skipped",
+                    "claim_number": claim_number,
+                    "message": "Duplicate claim_number already exists"
                 })
-        
-        return {
-            "success": True,
-            "dry_run": dry_run,
-            "duplicate_strategy": strategy,
-            "imported": imported,
-            "updated": updated,
-            "would_import": would_import,
-            "skipped": skipped,
-            "errors": errors[:20],  # Limit errors shown
-            "warnings": warnings[:20],
-            "error_count": len(errors),
-            "warning_count": len(warnings),
-            "row_report": row_report[:1000],
+                return
+
+        # Validate once straight into the stored model; ClaimCreate's fields
+        # are a subset of Claim's so a separate ClaimCreate pass is redundant.
+        claim_doc = Claim(
+            claim_number=claim_number,
+            client_name=values["client_name"] or "",
+            client_email=values["client_email"] or "",
+            property_address=values["property_address"] or "",
+            date_of_loss=values["date_of_loss"] or "",
+            claim_type=values["claim_type"] or "Other",
+            policy_number=values["policy_number"] or "",
+            estimated_value=values["estimated_value"],
+            description=values["description"] or "",
+            status=values["status"] or "New",
+            priority=values["priority"] or "Medium",
+            created_by=self.current_user["id"],
+            assigned_to=values["assigned_to"],
+        ).model_dump()
+        self._known[claim_number] = {
+            name: claim_doc.get(name) for name in _DUPLICATE_PREFETCH_PROJECTION if name != "_id"
         }
-        
+
+        if self.dry_run:
+            self.would_import += 1
+            report.append({
+                "row": idx + 2,
+                "status": "would_import",
+                "claim_number": claim_number,
+                "message": "Dry run: row is valid and would be imported"
+            })
+            return
+
+        entry = {"row": idx + 2, "status": "imported", "claim_number": claim_number, "message": "Imported"}
+        report.append(entry)
+        pending_inserts[claim_doc["id"]] = (claim_doc, len(operations))
+        operations.append(InsertOne(claim_doc))
+        pending_reports.append([entry])
+
+    async def _flush(self, operations: list, pending_reports: List[List[dict]]) -> None:
+        failed = {}
+        try:
+            await db.claims.bulk_write(operations, ordered=False)
+        except BulkWriteError as bulk_error:
+            for write_error in bulk_error.details.get("writeErrors", []):
+                failed[write_error["index"]] = write_error.get("errmsg", "Write failed")
+        invalidate_claim_matcher()
+        mark_claims_changed()
+
+        for position, entries in enumerate(pending_reports):
+            for entry in entries:
+                if position in failed:
+                    entry["status"] = "error"
+                    entry["message"] = failed[position]
+                    self.errors.append(f"Row {entry['row']}: {failed[position]}")
+                elif entry["status"] == "imported":
+                    self.imported += 1
+                else:
+                    self.updated += 1
+            if position in failed and isinstance(operations[position], InsertOne):
+                self._known.pop(entries[0]["claim_number"], None)
+
+
+@router.post("/import/claims")
+async def import_claims_csv(
+    file: UploadFile = File(...),
+    import_mapping: str = Form(default=""),
+    duplicate_strategy: str = Form(default="skip"),
+    dry_run: bool = Form(default=False),
+    current_user: dict = Depends(require_role(["admin"]))
+):
+    """Import claims from CSV or XLSX file"""
+    try:
+        filename = _validate_import_filename(file)
+        parsed_mapping, strategy = _parse_import_options(import_mapping, duplicate_strategy)
+        engine = ClaimImportEngine(current_user, parsed_mapping, strategy, dry_run)
+
+        row_report = []
+        await file.seek(0)
+        async for chunk_report in engine.run(_iter_import_rows(file.file, filename)):
+            remaining = IMPORT_REPORT_LIMIT - len(row_report)
+            if remaining > 0:
+                row_report.extend(chunk_report[:remaining])
+
+        return {**engine.summary(), "row_report": row_report}
+
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Import claims error: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+
+@router.post("/import/claims/stream")
+async def import_claims_stream(
+    file: UploadFile = File(...),
+    import_mapping: str = Form(default=""),
+    duplicate_strategy: str = Form(default="skip"),
+    dry_run: bool = Form(default=False),
+    current_user: dict = Depends(require_role(["admin"]))
+):
+    """Import claims and stream the row report back as NDJSON.
+
+    Emits one ``{"type": "progress"}`` line per chunk with that chunk's rows
+    and running totals, then a final ``{"type": "summary"}`` line.
+    """
+    filename = _validate_import_filename(file)
+    parsed_mapping, strategy = _parse_import_options(import_mapping, duplicate_strategy)
+    engine = ClaimImportEngine(current_user, parsed_mapping, strategy, dry_run)
+
+    # The form (and its spooled upload) is closed once this handler returns,
+    # before the response body is streamed, so keep our own disk-backed copy.
+    spool = tempfile.TemporaryFile()
+    await file.seek(0)
+    shutil.copyfileobj(file.file, spool)
+    spool.seek(0)
+
+    async def _events():
+        try:
+            async for chunk_report in engine.run(_iter_import_rows(spool, filename)):
+                progress = {"type": "progress", "rows": chunk_report, **engine.summary()}
+                yield json.dumps(progress, default=str) + "\n"
+            yield json.dumps({"type": "summary", **engine.summary()}, default=str) + "\n"
+        except Exception as e:
+            logger.error(f"Streamed import claims error: {e}")
+            yield json.dumps({"type": "error", "message": "Internal server error", **engine.summary()}) + "\n"
+        finally:
+            spool.close()
+
+    return StreamingResponse(_events(), media_type="application/x-ndjson")
+
 @router.get("/template/claims")
 async def get_import_template(
     current_user: dict = Depends(get_current_active_user)
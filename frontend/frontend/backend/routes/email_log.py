@@ -10,6 +10,8 @@ tab automatically.
 from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form
 from pydantic import BaseModel, Field
 from dependencies import db, get_current_active_user
+from services.claim_matcher import get_claim_matcher
+from services.claim_summary import refresh_claim_summary
 from typing import Optional, List, Dict, Any
 from datetime import datetime, timezone
 from pathlib import Path
@@ -154,6 +156,7 @@ async def _save_base64_attachment(
         "file_path": file_path,
     }
     await db.documents.insert_one(doc_record)
+    await refresh_claim_summary(claim_id, "documents")
 
     return {
         "filename": safe_name,
@@ -530,6 +533,7 @@ async def upload_attachment(
             "file_path": file_path,
         }
         await db.documents.insert_one(doc_record)
+        await refresh_claim_summary(claim_id, "documents")
 
         new_attachments.append({
             "filename": safe_name,
@@ -582,79 +586,19 @@ async def auto_match_emails(
     if not unlinked:
         return {"matched": 0, "unmatched": 0, "results": []}
 
-    # Pre-load claims for matching
-    claims = await db.claims.find(
-        {},
-        {
-            "_id": 0, "id": 1, "claim_number": 1,
-            "client_email": 1, "client_name": 1,
-            "carrier_adjuster_email": 1, "carrier_adjuster_name": 1,
-            "property_address": 1, "loss_address": 1,
-        },
-    ).to_list(5000)
-
-    # Build lookup indexes
-    claim_number_map: Dict[str, dict] = {}
-    email_map: Dict[str, dict] = {}
-    address_claims: List[tuple] = []  # (address_lower, claim)
-
-    for claim in claims:
-        cn = claim.get("claim_number", "").strip()
-        if cn:
-            claim_number_map[cn.lower()] = claim
-
-        for email_field in ("client_email", "carrier_adjuster_email"):
-            addr = (claim.get(email_field) or "").strip().lower()
-            if addr:
-                email_map[addr] = claim
-
-        for addr_field in ("property_address", "loss_address"):
-            addr = (claim.get(addr_field) or "").strip().lower()
-            if addr and len(addr) > 10:
-                address_claims.append((addr, claim))
+    matcher = await get_claim_matcher(db)
 
     results: List[dict] = []
     matched_count = 0
 
     for email_log in unlinked:
-        match_claim = None
-        match_method = None
-        subject = (email_log.get("subject") or "").lower()
-        body = (email_log.get("body_text") or "").lower()
-        combined_text = f"{subject} {body}"
-
-        # Strategy 1: claim number in subject or body
-        for cn_lower, claim in claim_number_map.items():
-            if cn_lower in combined_text:
-                match_claim = claim
-                match_method = "claim_number"
-                break
-
-        # Strategy 2: email address match
-        if not match_claim:
-            all_addresses = set()
-            all_addresses.add((email_log.get("from_address") or "").lower())
-            for addr in email_log.get("to_addresses", []):
-                all_addresses.add(addr.lower())
-            for addr in email_log.get("cc_addresses", []):
-                all_addresses.add(addr.lower())
-            all_addresses.discard("")
-
-            for addr in all_addresses:
-                if addr in email_map:
-                    match_claim = email_map[addr]
-                    match_method = "email_address"
-                    break
-
-        # Strategy 3: property address mention
-        if not match_claim:
-            for addr_lower, claim in address_claims:
-                # Use significant portion of address (first ~30 chars typically covers street)
-                addr_snippet = addr_lower[:40]
-                if addr_snippet in combined_text:
-                    match_claim = claim
-                    match_method = "property_address"
-                    break
+        participants = [email_log.get("from_address") or ""]
+        participants += email_log.get("to_addresses", []) + email_log.get("cc_addresses", [])
+        match_claim, match_method = matcher.match_email(
+            subject=email_log.get("subject") or "",
+            body=email_log.get("body_text") or "",
+            addresses=[addr for addr in participants if addr],
+        )
 
         if match_claim:
             await db.email_logs.update_one(
@@ -677,6 +621,7 @@ async def auto_match_emails(
                         {"id": {"$in": doc_ids}},
                         {"$set": {"claim_id": match_claim["id"]}},
                     )
+                    await refresh_claim_summary(match_claim["id"], "documents")
 
             matched_count += 1
             results.append({
@@ -24,6 +24,8 @@ from pydantic import BaseModel, Field
 
 from dependencies import db, get_current_active_user
 from routes.oauth import get_valid_token, refresh_google_token
+from services.claim_matcher import get_claim_matcher
+from services.claim_summary import refresh_claim_summary
 
 logger = logging.getLogger(__name__)
 
@@ -271,6 +273,7 @@ async def _download_and_store_attachment(
         "gmail_sender": email_sender,
     }
     await db.documents.insert_one(doc_record)
+    await refresh_claim_summary(doc_record["claim_id"], "documents")
 
     # Also create uploaded_files record for the uploads system
     uploaded_file_record = {
@@ -434,13 +437,11 @@ async def auto_sync(
     user_id = _get_user_id(current_user)
     uploaded_by = current_user.get("full_name", current_user.get("email", "system"))
 
-    # Load all active claims with claim numbers
-    claims = await db.claims.find(
-        {"claim_number": {"$exists": True, "$ne": ""}},
-        {"_id": 0, "id": 1, "claim_number": 1, "client_name": 1},
-    ).to_list(5000)
+    # Claim numbers and the matcher come from the shared cached automaton
+    matcher = await get_claim_matcher(db)
+    claim_numbers = matcher.claim_numbers
 
-    if not claims:
+    if not claim_numbers:
         return {
             "message": "No claims with claim numbers found",
             "total_synced": 0,
@@ -449,17 +450,9 @@ async def auto_sync(
             "claims_matched": 0,
         }
 
-    # Build claim number lookup
-    claim_map: Dict[str, dict] = {}
-    for c in claims:
-        cn = c.get("claim_number", "").strip()
-        if cn:
-            claim_map[cn.lower()] = c
-
     # Build Gmail search query: has attachment + mentions any claim number
     # Gmail search: "has:attachment (claim_number_1 OR claim_number_2 OR ...)"
     # To avoid query length limits, batch in groups of 20
-    claim_numbers = list(claim_map.keys())
     all_results: List[dict] = []
     total_synced = 0
     total_skipped = 0
@@ -513,13 +506,7 @@ async def auto_sync(
 
             # Determine which claim this email matches
             subject = headers.get("subject", "")
-            combined_text = f"{subject} {snippet}".lower()
-            matched_claim = None
-
-            for cn_lower, claim in claim_map.items():
-                if cn_lower in combined_text:
-                    matched_claim = claim
-                    break
+            matched_claim = matcher.match_claim_number(f"{subject} {snippet}")
 
             if not matched_claim:
                 continue
@@ -623,6 +610,9 @@ async def sync_status(
     ]
     docs_by_claim = await db.documents.aggregate(pipeline).to_list(20)
 
+    # Scheduled sync checkpoints (pending ids are only counted)
+    checkpoints = await db.gmail_sync_state.find({}).to_list(10)
+
     return {
         "google_connected": google_connected,
         "gmail_scope_available": google_connected,  # gmail.readonly is in OAuth scopes
@@ -632,6 +622,16 @@ async def sync_status(
             {"claim_id": d["_id"], "document_count": d["count"]}
             for d in docs_by_claim
         ],
+        "sync_checkpoints": [
+            {
+                "mailbox": c["_id"],
+                "history_id": c.get("history_id"),
+                "pending_messages": len(c.get("pending_message_ids", [])),
+                "updated_at": c.get("updated_at"),
+                "last_full_sync_at": c.get("last_full_sync_at"),
+            }
+            for c in checkpoints
+        ],
     }
 
 
@@ -880,6 +880,7 @@ async def categorize_synced_documents(
             "created_at": datetime.now(timezone.utc).isoformat(),
         }
         await db.notes.insert_one(note_record)
+        await refresh_claim_summary(cid, "notes", "documents")
         notes_added += 1
 
     return {
@@ -1014,6 +1015,7 @@ async def recategorize_documents(
                 "created_at": _now_iso(),
             }
             await db.notes.insert_one(note_record)
+            await refresh_claim_summary(cid, "notes", "documents")
             notes_added += 1
 
     return {
@@ -1120,3 +1122,34 @@ async def backfill_email_metadata(
         "updated": updated,
         "errors": errors,
     }
+
+
+# ---------------------------------------------------------------------------
+# 7. Reset the scheduled sync's historyId checkpoint (forces a full backfill)
+# ---------------------------------------------------------------------------
+
+class CheckpointResetRequest(BaseModel):
+    mailbox: Optional[str] = Field(None, description="Mailbox to reset; all mailboxes when omitted")
+
+
+@router.post("/sync-checkpoint/reset")
+async def reset_sync_checkpoint(
+    request: CheckpointResetRequest,
+    current_user: dict = Depends(get_current_active_user),
+):
+    """
+    Drop the scheduled worker's Gmail historyId checkpoint so its next run
+    re-searches every claim number instead of reading the history API.
+    """
+    if current_user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    from workers.gmail_sync_worker import reset_gmail_sync_checkpoint
+
+    removed = await reset_gmail_sync_checkpoint(request.mailbox, database=db)
+    logger.info("Gmail sync checkpoint reset by %s: mailbox=%s removed=%d",
+                current_user.get("email"), request.mailbox or "*", removed)
+    return {
+        "message": f"Reset {removed} sync checkpoint(s); the next scheduled run will backfill",
+        "removed": removed,
+    }
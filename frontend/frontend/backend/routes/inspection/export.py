@@ -1,6 +1,7 @@
 """
 Inspection Export - ZIP archive and PDF photo report generation
 """
+import asyncio
 import os
 import io
 import json
@@ -10,10 +11,11 @@ from datetime import datetime, timezone
 from typing import Optional
 
 from fastapi import APIRouter, HTTPException, Depends, Query
-from fastapi.responses import StreamingResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
 
 from dependencies import db, get_current_active_user, get_user_from_token_param
-from .helpers import logger, PHOTO_DIR
+from .helpers import logger, PHOTO_DIR, security, get_user_from_bearer_token
 
 router = APIRouter()
 
@@ -136,53 +138,138 @@ async def export_zip(
 
 
 # ========== PDF PHOTO REPORT ==========
-# PDF generation logic extracted to services/inspection_pdf_service.py
-# This endpoint is a thin wrapper that delegates to the service.
+# Reports render as background jobs (services/photo_report_jobs.py): a
+# process pool writes the PDF to disk and results are cached per photo set.
+
+from services.photo_report_jobs import (
+    get_photo_report_job,
+    serialize_job,
+    start_photo_report_job,
+    wait_for_photo_report_job,
+)
+
+PHOTO_REPORT_MODES = ("email_safe", "full_fidelity")
+# How long the direct-download endpoint waits for a build before answering 202
+PHOTO_REPORT_WAIT_SECONDS = 300
+
+
+async def _resolve_report_user(credentials, token: Optional[str]) -> dict:
+    """Bearer header first, then ``?token=`` so plain ``<a href>`` links work."""
+    user = await get_user_from_bearer_token(credentials)
+    if not user and token:
+        user = await get_user_from_token_param(token)
+    if not user:
+        raise HTTPException(status_code=401, detail="Unauthorized - valid token required")
+    return user
+
+
+async def _start_report(claim_id: str, mode: str, user: dict, include_ai: bool, include_gps: bool, rooms: Optional[str]) -> dict:
+    if mode not in PHOTO_REPORT_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of: {', '.join(PHOTO_REPORT_MODES)}")
+    try:
+        return await start_photo_report_job(
+            claim_id=claim_id,
+            mode=mode,
+            user=user,
+            photo_dir=PHOTO_DIR,
+            include_ai=include_ai,
+            include_gps=include_gps,
+            rooms=rooms,
+        )
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Resource not found")
+
 
-from services.inspection_pdf_service import generate_photo_report
+def _report_file_response(job: dict) -> FileResponse:
+    if not os.path.exists(job["path"]):
+        raise HTTPException(status_code=410, detail="Report file expired, please export again")
+    return FileResponse(
+        job["path"],
+        media_type=job["content_type"],
+        filename=job["filename"],
+    )
+
+
+@router.post("/claim/{claim_id}/photo-report-jobs", status_code=202)
+async def create_photo_report_job(
+    claim_id: str,
+    mode: str = Query("email_safe", description="email_safe or full_fidelity"),
+    include_ai: bool = Query(True, description="Include AI captions and damage assessments"),
+    include_gps: bool = Query(True, description="Include GPS coordinates and timestamps"),
+    rooms: Optional[str] = Query(None, description="Comma-separated room filter"),
+    current_user: dict = Depends(get_current_active_user),
+):
+    """
+    Queue a PDF photo report build. Returns immediately with the job; if the
+    claim's photos are unchanged since the last export the cached report is
+    returned already ``complete``.
+    """
+    job = await _start_report(claim_id, mode, current_user, include_ai, include_gps, rooms)
+    return serialize_job(job)
+
+
+@router.get("/photo-report-jobs/{job_id}")
+async def get_photo_report_job_status(
+    job_id: str,
+    current_user: dict = Depends(get_current_active_user),
+):
+    """Status and progress (photos rendered / total) of a report job."""
+    job = await get_photo_report_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    return serialize_job(job)
+
+
+@router.get("/photo-report-jobs/{job_id}/download")
+async def download_photo_report(
+    job_id: str,
+    token: Optional[str] = Query(None, description="Auth token for direct download links"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+):
+    """Stream a finished report from disk."""
+    await _resolve_report_user(credentials, token)
+    job = await get_photo_report_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    if job["status"] != "complete":
+        raise HTTPException(status_code=409, detail=f"Report is {job['status']}")
+    return _report_file_response(job)
 
 
 @router.get("/claim/{claim_id}/photo-report-pdf")
 @router.get("/claim/{claim_id}/export-pdf")
 async def export_photo_report_pdf(
     claim_id: str,
-    token: str = Query(..., description="Auth token for img src / direct download access"),
+    token: Optional[str] = Query(None, description="Auth token for img src / direct download access"),
     mode: str = Query("email_safe", description="email_safe or full_fidelity"),
     include_ai: bool = Query(True, description="Include AI captions and damage assessments"),
     include_gps: bool = Query(True, description="Include GPS coordinates and timestamps"),
     rooms: Optional[str] = Query(None, description="Comma-separated room filter"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
 ):
     """
-    Generate a professional PDF photo report for a claim.
+    Generate a professional PDF photo report for a claim and download it.
 
     Supports two modes:
       - email_safe: compressed images, target <=15 MB, auto-splits to ZIP if needed
       - full_fidelity: archive quality, original resolution
 
-    Auth is via the ``token`` query-param so the URL works in ``<a href>`` links.
+    Runs the same cached background job as ``POST .../photo-report-jobs`` and
+    waits for it. If the build outlasts the wait, answers 202 with the job so
+    the client can poll instead. Auth is via Bearer header or the ``token``
+    query-param so the URL works in ``<a href>`` links.
     """
-    user = await get_user_from_token_param(token)
-    if not user:
-        raise HTTPException(status_code=401, detail="Unauthorized - valid token required")
-
-    try:
-        buf, content_type, filename = await generate_photo_report(
-            claim_id=claim_id,
-            mode=mode,
-            user=user,
-            db=db,
-            photo_dir=PHOTO_DIR,
-            include_ai=include_ai,
-            include_gps=include_gps,
-            rooms=rooms,
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=404, detail="Resource not found")
-
-    return StreamingResponse(
-        buf,
-        media_type=content_type,
-        headers={
-            "Content-Disposition": f'attachment; filename="{filename}"'
-        },
-    )
+    user = await _resolve_report_user(credentials, token)
+    job = await _start_report(claim_id, mode, user, include_ai, include_gps, rooms)
+
+    if job["status"] in ("queued", "running"):
+        try:
+            job = await wait_for_photo_report_job(job["id"], timeout=PHOTO_REPORT_WAIT_SECONDS)
+        except asyncio.TimeoutError:
+            job = await get_photo_report_job(job["id"])
+
+    if job["status"] == "failed":
+        raise HTTPException(status_code=500, detail="Photo report generation failed")
+    if job["status"] != "complete":
+        return JSONResponse(status_code=202, content=serialize_job(job))
+    return _report_file_response(job)
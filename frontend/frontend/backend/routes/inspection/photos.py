@@ -8,12 +8,17 @@ import logging
 from datetime import datetime, timezone
 from typing import Optional, List
 
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, Query
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, Query, Request, BackgroundTasks
 from fastapi.responses import FileResponse, Response
 from fastapi.security import HTTPAuthorizationCredentials
 
-from dependencies import db, get_current_active_user, get_user_from_token_param
+from dependencies import db, get_current_active_user, get_user_from_token_param, require_role
 from auth import decode_access_token
+from services.claim_summary import refresh_claim_summary
+from services.photo_derivatives import (
+    DERIVATIVE_SPECS, DERIVATIVE_VERSION, derivative_etag, derivative_path,
+    generate_photo_derivatives, remove_photo_derivatives, backfill_photo_derivatives,
+)
 from .models import PhotoMetadata, PhotoAnnotation, BulkPhotoAction
 from .helpers import (
     logger, security, PHOTO_DIR, MAX_PHOTO_SIZE, MAX_BULK_PHOTO_IDS,
@@ -28,11 +33,16 @@ if HAS_PILLOW:
 
 router = APIRouter()
 
+# Photo bytes never change for a given id (ids are content hashes), so
+# browsers may cache originals and derivatives for a year without revalidating.
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
 
 # ========== PHOTO UPLOAD & MANAGEMENT ==========
 
 @router.post("/photos")
 async def upload_inspection_photo(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     claim_id: str = Form(...),  # REQUIRED - no orphan photos
     session_id: Optional[str] = Form(None),
@@ -191,6 +201,10 @@ async def upload_inspection_photo(
         await db.inspection_sessions.update_one({"id": session_id}, update_ops)
 
     await db.inspection_photos.insert_one(metadata_dict)
+    await refresh_claim_summary(metadata_dict.get("claim_id"), "photos")
+
+    # Resize in the process pool after the response is sent
+    background_tasks.add_task(generate_photo_derivatives, metadata_dict, PHOTO_DIR)
 
     # Build full image URL
     base_url = os.environ.get("BASE_URL", "")
@@ -215,6 +229,7 @@ async def upload_inspection_photo(
 @router.get("/photos/{photo_id}/image")
 async def get_photo_image(
     photo_id: str,
+    request: Request = None,
     token: Optional[str] = Query(None, description="Auth token for backward-compat img src access"),
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
 ):
@@ -262,16 +277,95 @@ async def get_photo_image(
     if not os.path.exists(file_path):
         raise HTTPException(status_code=404, detail="Photo file not found on disk")
 
-    return FileResponse(file_path, media_type=photo.get("mime_type", "image/jpeg"))
+    etag = f'"{photo.get("sha256_hash") or photo_id}"'
+    if request is not None and _etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL})
+    return FileResponse(
+        file_path,
+        media_type=photo.get("mime_type", "image/jpeg"),
+        headers={"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL},
+    )
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match", "")
+    return any(tag.strip() in (etag, "*") for tag in if_none_match.split(",")) if if_none_match else False
 
 
 @router.get("/photos/{photo_id}/thumbnail")
 async def get_photo_thumbnail(
     photo_id: str,
+    request: Request,
+    token: Optional[str] = Query(None, description="Auth token for backward-compat img src access"),
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
 ):
-    """Get photo thumbnail (for now, returns full image - can add resize later). Requires Bearer token."""
-    return await get_photo_image(photo_id, token=None, credentials=credentials)
+    """Get the 300px photo thumbnail. Requires Bearer token or ?token= query param."""
+    return await get_photo_derivative(photo_id, "thumb", request, token=token, credentials=credentials)
+
+
+@router.get("/photos/{photo_id}/derivative/{size}")
+async def get_photo_derivative(
+    photo_id: str,
+    size: str,
+    request: Request,
+    token: Optional[str] = Query(None, description="Auth token for backward-compat img src access"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
+):
+    """Serve a pre-rendered derivative (thumb, medium, web) with ETag caching.
+
+    Derivatives are normally produced at upload time. Photos that predate the
+    pipeline are rendered on first request in the worker pool (never on the
+    event loop), and fall back to the original if rendering fails.
+    """
+    if size not in DERIVATIVE_SPECS:
+        raise HTTPException(status_code=404, detail="Unknown derivative size")
+
+    user = None
+    if credentials:
+        try:
+            payload = decode_access_token(credentials.credentials)
+            if payload and payload.get("sub"):
+                user = await db.users.find_one({"id": payload["sub"]}, {"_id": 0})
+        except Exception:
+            pass
+    if not user and token:
+        user = await get_user_from_token_param(token)
+    if not user:
+        raise HTTPException(status_code=401, detail="Unauthorized - valid token required")
+
+    photo = await db.inspection_photos.find_one({"id": photo_id}, {"_id": 0})
+    if not photo:
+        raise HTTPException(status_code=404, detail="Photo not found")
+    await _check_photo_access(photo, user)
+
+    etag = derivative_etag(photo, size)
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    file_path = derivative_path(photo, size, PHOTO_DIR)
+    if not os.path.realpath(file_path).startswith(os.path.realpath(PHOTO_DIR)):
+        raise HTTPException(status_code=403, detail="Access denied")
+    if not os.path.exists(file_path):
+        await generate_photo_derivatives(photo, PHOTO_DIR)
+    if not os.path.exists(file_path):
+        return await get_photo_image(photo_id, request=request, token=token, credentials=credentials)
+
+    return FileResponse(file_path, media_type="image/jpeg", headers=headers)
+
+
+@router.post("/photos/derivatives/backfill")
+async def backfill_derivatives(
+    background_tasks: BackgroundTasks,
+    limit: int = Query(5000, ge=1, le=50000),
+    current_user: dict = Depends(require_role(["admin"]))
+):
+    """Queue derivative generation for photos missing current-version derivatives."""
+    pending = await db.inspection_photos.count_documents(
+        {"derivatives_version": {"$ne": DERIVATIVE_VERSION}}
+    )
+    background_tasks.add_task(backfill_photo_derivatives, PHOTO_DIR, limit)
+    return {"queued": min(pending, limit), "pending": pending}
 
 
 @router.get("/photos/{photo_id}/watermarked")
@@ -472,6 +566,7 @@ async def delete_photo(
 
     if os.path.exists(file_path):
         os.remove(file_path)
+    remove_photo_derivatives(photo, PHOTO_DIR)
 
     # Update session count if applicable
     if photo.get("session_id"):
@@ -481,6 +576,7 @@ async def delete_photo(
         )
 
     await db.inspection_photos.delete_one({"id": photo_id})
+    await refresh_claim_summary(photo.get("claim_id"), "photos")
 
     return {"message": "Photo deleted"}
 
@@ -507,6 +603,7 @@ async def bulk_photo_action(
     affected = 0
 
     if data.action == "delete":
+        touched_claims = set()
         for pid in data.photo_ids:
             photo = await db.inspection_photos.find_one({"id": pid})
             if not photo:
@@ -523,13 +620,17 @@ async def bulk_photo_action(
             thumb_fp = os.path.join(thumb_dir, photo["filename"])
             if os.path.exists(thumb_fp):
                 os.remove(thumb_fp)
+            remove_photo_derivatives(photo, PHOTO_DIR)
             # Update session count
             if photo.get("session_id"):
                 await db.inspection_sessions.update_one(
                     {"id": photo["session_id"]}, {"$inc": {"photo_count": -1}}
                 )
             await db.inspection_photos.delete_one({"id": pid})
+            touched_claims.add(photo.get("claim_id"))
             affected += 1
+        for claim_id in touched_claims:
+            await refresh_claim_summary(claim_id, "photos")
         return {"message": f"{affected} photos deleted", "affected": affected, "action": "delete"}
 
     elif data.action == "recategorize":
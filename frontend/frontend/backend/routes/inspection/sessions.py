@@ -10,6 +10,7 @@ from typing import Optional
 from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, Query
 
 from dependencies import db, get_current_active_user
+from services.claim_summary import refresh_claim_summary
 from .models import CreateInspectionSession, InspectionSession
 from .helpers import logger, PHOTO_DIR, AUDIO_DIR
 
@@ -414,6 +415,8 @@ async def delete_session(
 
         photo_result = await db.inspection_photos.delete_many({"session_id": session_id})
         deleted_photos = photo_result.deleted_count
+        for claim_id in {photo.get("claim_id") for photo in photos}:
+            await refresh_claim_summary(claim_id, "photos")
 
     # Delete the session itself
     await db.inspection_sessions.delete_one({"id": session_id})
@@ -462,6 +465,7 @@ async def delete_claim_inspections(
     photos_result = await db.inspection_photos.delete_many({"claim_id": claim_id})
     sessions_result = await db.inspection_sessions.delete_many({"claim_id": claim_id})
     reports_result = await db.inspection_reports.delete_many({"claim_id": claim_id})
+    await refresh_claim_summary(claim_id, "photos")
 
     return {
         "message": f"All inspection data deleted for claim {claim_id}",
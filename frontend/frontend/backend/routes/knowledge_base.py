@@ -5,6 +5,7 @@ Stores and serves expert profiles for Eve AI and Doctrine browsing
 
 from fastapi import APIRouter, HTTPException, Depends
 from dependencies import db, get_current_active_user
+from services.retrieval_index import retrieval_index, tokenize
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime, timezone
@@ -815,56 +816,43 @@ async def get_leadership_mentors():
     return {"mentors": INDUSTRY_EXPERTS["leadership_mentors"]}
 
 
+def _expert_matches(figure: dict, terms: List[str]) -> List[str]:
+    """Which fields of *figure* contain any of the matched query terms."""
+    wanted = set(terms)
+
+    def hit(text: str) -> bool:
+        return bool(wanted.intersection(tokenize(text)))
+
+    matches = []
+    if hit(figure["name"]) or hit(figure.get("alias") or ""):
+        matches.append("name")
+    if hit(figure["bio"]):
+        matches.append("bio")
+    matches += [f"expertise: {exp}" for exp in figure.get("expertise", []) if hit(exp)]
+    matches += [f"insight: {insight}" for insight in figure.get("key_insights", []) if hit(insight)]
+    matches += [
+        f"article: {article.get('title', '')}"
+        for article in figure.get("articles", [])
+        if hit(f"{article.get('title', '')} {article.get('excerpt', '')}")
+    ]
+    return matches
+
+
 @router.get("/search")
 async def search_knowledge_base(q: str):
-    """Search across all experts and their content"""
-    query = q.lower()
-    results = []
-    
-    for figure in INDUSTRY_EXPERTS["figures"]:
-        score = 0
-        matches = []
-        
-        # Check name
-        if query in figure["name"].lower():
-            score += 10
-            matches.append("name")
-        
-        # Check bio
-        if query in figure["bio"].lower():
-            score += 5
-            matches.append("bio")
-        
-        # Check expertise
-        for exp in figure.get("expertise", []):
-            if query in exp.lower():
-                score += 3
-                matches.append(f"expertise: {exp}")
-        
-        # Check key insights
-        for insight in figure.get("key_insights", []):
-            if query in insight.lower():
-                score += 2
-                matches.append(f"insight: {insight}")
-        
-        # Check articles
-        for article in figure.get("articles", []):
-            if query in article.get("title", "").lower() or query in article.get("excerpt", "").lower():
-                score += 2
-                matches.append(f"article: {article.get('title', '')}")
-        
-        if score > 0:
-            results.append({
-                "expert_id": figure["id"],
-                "name": figure["name"],
-                "category": figure["category"],
-                "score": score,
-                "matches": matches[:5]  # Top 5 matches
-            })
-    
-    # Sort by score descending
-    results.sort(key=lambda x: x["score"], reverse=True)
-    
+    """Search across all experts and their content (BM25 over the retrieval index)"""
+    hits = retrieval_index.search("experts", q, k=len(INDUSTRY_EXPERTS["figures"]) + len(INDUSTRY_EXPERTS["leadership_mentors"]))
+    results = [
+        {
+            "expert_id": hit.payload["id"],
+            "name": hit.payload["name"],
+            "category": hit.payload["category"],
+            "score": hit.score,
+            "matches": _expert_matches(hit.payload, hit.matched)[:5],  # Top 5 matches
+        }
+        for hit in hits
+        if hit.payload.get("kind") == "figure"
+    ]
     return {"results": results, "query": q}
 
 
@@ -10,7 +10,7 @@ from datetime import datetime, timezone
 import uuid
 import logging
 
-from dependencies import db, get_current_active_user
+from dependencies import db, get_current_active_user, require_role
 
 logger = logging.getLogger(__name__)
 
@@ -198,6 +198,22 @@ async def delete_notification(
     return {"message": "Notification deleted"}
 
 
+@router.get("/ws/stats")
+async def get_websocket_delivery_stats(
+    current_user: dict = Depends(require_role(["admin"]))
+):
+    """WebSocket outbound queue depth, drops and send latency for this worker."""
+    from websocket_manager import manager
+    from services.observability import MetricsCollector
+
+    snapshot = MetricsCollector.get_snapshot()
+    return {
+        "queues": manager.get_outbound_stats(),
+        "counters": {k: v for k, v in snapshot["counters"].items() if k.startswith("ws_")},
+        "timings": {k: v for k, v in snapshot["timings"].items() if k.startswith("ws_")},
+    }
+
+
 # ============================================
 # INTERNAL FUNCTIONS (used by bots)
 # ============================================
@@ -300,9 +316,12 @@ async def create_bulk_notifications(notifications: List[dict]) -> int:
             user_docs[uid].append(doc)
 
         async def _send_user_batch(uid: str, batch: list):
-            for doc in batch:
-                clean_doc = {k: v for k, v in doc.items() if k != "_id"}
-                await manager.send_to_user(uid, {"type": "notification", "data": clean_doc})
+            clean_docs = [{k: v for k, v in doc.items() if k != "_id"} for doc in batch]
+            # One message per user; each socket's writer coalesces further
+            if len(clean_docs) == 1:
+                await manager.send_to_user(uid, {"type": "notification", "data": clean_docs[0]})
+            else:
+                await manager.send_to_user(uid, {"type": "notification_batch", "data": clean_docs})
 
         await asyncio.gather(
             *(_send_user_batch(uid, batch) for uid, batch in user_docs.items()),
@@ -13,7 +13,6 @@ Endpoints:
 from __future__ import annotations
 
 import asyncio
-import io
 import json
 import logging
 import os
@@ -22,13 +21,13 @@ import uuid
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
-import fitz  # PyMuPDF
 from fastapi import APIRouter, Depends, HTTPException
 from motor.motor_asyncio import AsyncIOMotorGridFSBucket
 from pydantic import BaseModel, Field
 
 from dependencies import db, get_current_active_user
 from services.claimpilot.llm_router import LLMRouter
+from services.gridfs_stream import open_grid_out
 
 logger = logging.getLogger(__name__)
 
@@ -198,36 +197,20 @@ def _get_user_id(current_user: dict) -> str:
 
 async def _fetch_pdf_bytes_from_gridfs(doc_record: dict) -> bytes:
     """Download a PDF from GridFS using the document record metadata."""
-    from bson import ObjectId
-
     grid_id = doc_record.get("grid_id")
     storage_filename = doc_record.get("storage_filename")
     doc_id = doc_record.get("id", "unknown")
 
-    # Try grid_id first (with robust ObjectId handling)
-    if grid_id:
-        try:
-            stream = io.BytesIO()
-            oid = ObjectId(grid_id) if not isinstance(grid_id, ObjectId) else grid_id
-            await fs.download_to_stream(oid, stream)
-            stream.seek(0)
-            data = stream.read()
-            if data:
-                return data
-        except Exception as e:
-            logger.warning("GridFS download by grid_id failed for doc %s (grid_id=%s): %s", doc_id, grid_id, e)
-
-    # Fallback to storage_filename
-    if storage_filename:
-        try:
-            stream = io.BytesIO()
-            await fs.download_to_stream_by_name(storage_filename, stream)
-            stream.seek(0)
-            data = stream.read()
-            if data:
-                return data
-        except Exception as e:
-            logger.warning("GridFS download by filename failed for doc %s (filename=%s): %s", doc_id, storage_filename, e)
+    # grid_id first, then storage_filename
+    try:
+        grid_out = await open_grid_out(fs, grid_id, storage_filename)
+        data = await grid_out.read()
+        if data:
+            return data
+    except Exception as e:
+        logger.warning(
+            "GridFS download failed for doc %s (grid_id=%s, filename=%s): %s", doc_id, grid_id, storage_filename, e
+        )
 
     raise ValueError(
         f"Document {doc_id} could not be downloaded (grid_id={grid_id}, filename={storage_filename})"
@@ -239,6 +222,8 @@ def _pdf_pages_to_images(pdf_bytes: bytes, max_pages: int = MAX_PAGES_PER_PDF) -
 
     Returns list of (image_bytes, mime_type) tuples.
     """
+    import fitz  # PyMuPDF
+
     doc = fitz.open(stream=pdf_bytes, filetype="pdf")
     images: List[tuple[bytes, str]] = []
     page_count = min(len(doc), max_pages)
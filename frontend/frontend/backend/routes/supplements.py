@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException, Depends
 from dependencies import db, get_current_active_user, require_permission
+from services.claim_summary import refresh_claim_summary
 from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime, timezone
@@ -113,6 +114,7 @@ async def create_supplement(data: SupplementCreate, current_user: dict = Depends
     )
     
     await db.supplements.insert_one(supplement.dict())
+    await refresh_claim_summary(data.claim_id, "supplements")
     
     result = supplement.dict()
     result.pop("_id", None)
@@ -147,6 +149,8 @@ async def update_supplement(supplement_id: str, data: SupplementUpdate, current_
     
     if update_data:
         await db.supplements.update_one({"id": supplement_id}, {"$set": update_data})
+        if "status" in update_data:
+            await refresh_claim_summary(supplement.get("claim_id"), "supplements")
     
     updated = await db.supplements.find_one({"id": supplement_id}, {"_id": 0})
     return updated
@@ -192,6 +196,7 @@ async def submit_supplement(supplement_id: str, current_user: dict = Depends(get
             "submitted_at": datetime.now(timezone.utc).isoformat()
         }}
     )
+    await refresh_claim_summary(supplement.get("claim_id"), "supplements")
     
     return {"message": "Supplement submitted", "status": "submitted"}
 
@@ -206,6 +211,7 @@ async def delete_supplement(supplement_id: str, current_user: dict = Depends(get
         raise HTTPException(status_code=400, detail="Can only delete draft supplements")
     
     await db.supplements.delete_one({"id": supplement_id})
+    await refresh_claim_summary(supplement.get("claim_id"), "supplements")
     return {"message": "Supplement deleted"}
 
 @router.get("/stats/overview")
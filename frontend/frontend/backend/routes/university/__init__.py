@@ -5,6 +5,15 @@ Educational platform for insurance professionals.
 '''
 
 from .routes import router
-from .seed_data import seed_university_data
 
-__all__ = ["router", "seed_university_data"]
+# Bump when seed_data.py changes so the startup seed check runs again.
+# seed_data.py is ~4,700 lines, so it is only imported when a seed runs.
+UNIVERSITY_SEED_VERSION = "1"
+
+
+async def seed_university_data():
+    from .seed_data import seed_university_data as seed
+    await seed()
+
+
+__all__ = ["router", "seed_university_data", "UNIVERSITY_SEED_VERSION"]
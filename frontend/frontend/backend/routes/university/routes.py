@@ -9,17 +9,18 @@ from fastapi import APIRouter, HTTPException, Depends, Query
 from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import datetime, timezone
+import re
 import uuid
 import logging
 
 from dependencies import db, get_current_active_user
+from services.retrieval_index import refresh_retrieval_index, retrieval_index, university_doc
 
 logger = logging.getLogger(__name__)
 from .models import (
     QuizQuestion, Lesson, Course, Article,
     UserProgress, Certificate, QuizSubmission, LessonComplete
 )
-from .seed_data import seed_university_data
 
 router = APIRouter(prefix="/api/university", tags=["University"])
 
@@ -28,7 +29,9 @@ async def reseed_university(current_user: dict = Depends(get_current_active_user
     """Re-run university seed data (admin only)."""
     if current_user.get("role") != "admin":
         raise HTTPException(status_code=403, detail="Admin only")
+    from .seed_data import seed_university_data
     await seed_university_data()
+    await refresh_retrieval_index(db)
     count = await db.courses.count_documents({})
     return {"status": "ok", "courses_seeded": count}
 
@@ -114,21 +117,82 @@ async def get_article(article_id: str, current_user: dict = Depends(get_current_
         raise HTTPException(status_code=404, detail="Article not found")
     return article
 
-@router.get("/search")
-async def search_content(q: str = Query(..., min_length=2), current_user: dict = Depends(get_current_active_user)):
-    search_regex = {"$regex": q, "$options": "i"}
-    
+SEARCH_LIMIT = 20
+SUGGEST_LIMIT = 8
+
+# kind -> (collection, retrieval source)
+_SEARCHABLE = {
+    "course": ("courses", "university"),
+    "article": ("articles", "university"),
+    "document": ("custom_documents", "university_documents"),
+}
+
+
+async def _sync_search_index(kind: str, item_id: str) -> None:
+    """Re-index one course/article/document after a write on this instance.
+
+    Other workers pick the change up on their next scheduled refresh.
+    """
+    collection, source = _SEARCHABLE[kind]
+    try:
+        item = await getattr(db, collection).find_one({"id": item_id}, {"_id": 0, "quiz": 0})
+        if item and item.get("is_published"):
+            retrieval_index.upsert(source, university_doc(kind, item))
+        else:
+            retrieval_index.remove(source, f"{kind}:{item_id}")
+    except Exception as e:
+        logger.warning("University search index update failed for %s %s: %s", kind, item_id, e)
+
+
+async def _regex_search(q: str) -> dict:
+    # Until the index has loaded; the query is escaped so it is matched literally.
+    search_regex = {"$regex": re.escape(q), "$options": "i"}
+
     courses = await db.courses.find(
         {"$or": [{"title": search_regex}, {"description": search_regex}], "is_published": True},
         {"_id": 0, "lessons": 0, "quiz": 0}
-    ).to_list(20)
-    
+    ).to_list(SEARCH_LIMIT)
+
     articles = await db.articles.find(
         {"$or": [{"title": search_regex}, {"description": search_regex}, {"content": search_regex}, {"tags": search_regex}], "is_published": True},
         {"_id": 0, "content": 0}
-    ).to_list(20)
-    
-    return {"courses": courses, "articles": articles, "total": len(courses) + len(articles)}
+    ).to_list(SEARCH_LIMIT)
+
+    return {"courses": courses, "articles": articles, "documents": [], "total": len(courses) + len(articles)}
+
+
+@router.get("/search")
+async def search_content(q: str = Query(..., min_length=2), current_user: dict = Depends(get_current_active_user)):
+    """Ranked search over published courses, articles and documents; the last word may be partial."""
+    if not retrieval_index.is_ready("university"):
+        return await _regex_search(q)
+
+    results = {"course": [], "article": [], "document": []}
+    for hit in retrieval_index.search("university", q, 3 * SEARCH_LIMIT, prefix=True):
+        bucket = results[hit.payload["type"]]
+        if len(bucket) < SEARCH_LIMIT:
+            bucket.append({k: v for k, v in hit.payload.items() if k != "type"})
+
+    return {
+        "courses": results["course"],
+        "articles": results["article"],
+        "documents": results["document"],
+        "total": sum(len(bucket) for bucket in results.values()),
+    }
+
+
+@router.get("/search/suggest")
+async def suggest_content(q: str = Query(..., min_length=1), current_user: dict = Depends(get_current_active_user)):
+    """Title suggestions for a partially typed query."""
+    if not retrieval_index.is_ready("university"):
+        return {"suggestions": []}
+    hits = retrieval_index.search("university", q, SUGGEST_LIMIT, prefix=True)
+    return {
+        "suggestions": [
+            {"id": hit.payload.get("id"), "type": hit.payload["type"], "title": hit.payload.get("title", "")}
+            for hit in hits
+        ]
+    }
 
 @router.post("/progress/lesson")
 async def complete_lesson(data: LessonComplete, current_user: dict = Depends(get_current_active_user)):
@@ -390,6 +454,7 @@ async def create_custom_course(
     course_dict["created_at"] = datetime.now(timezone.utc).isoformat()
     
     await db.courses.insert_one(course_dict)
+    await _sync_search_index("course", course.id)
     
     return {"id": course.id, "message": "Custom course created successfully"}
 
@@ -413,6 +478,7 @@ async def update_custom_course(
     update_data["updated_by"] = current_user.get("email", "unknown")
     
     await db.courses.update_one({"id": course_id}, {"$set": update_data})
+    await _sync_search_index("course", course_id)
     return {"message": "Course updated successfully"}
 
 
@@ -428,6 +494,7 @@ async def delete_custom_course(
     result = await db.courses.delete_one({"id": course_id, "is_custom": True})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Custom course not found")
+    await _sync_search_index("course", course_id)
     
     return {"message": "Course deleted successfully"}
 
@@ -457,6 +524,7 @@ async def create_custom_article(
     article_dict["created_at"] = datetime.now(timezone.utc).isoformat()
     
     await db.articles.insert_one(article_dict)
+    await _sync_search_index("article", article.id)
     
     return {"id": article.id, "message": "Custom article created successfully"}
 
@@ -480,6 +548,7 @@ async def update_custom_article(
     update_data["updated_by"] = current_user.get("email", "unknown")
     
     await db.articles.update_one({"id": article_id}, {"$set": update_data})
+    await _sync_search_index("article", article_id)
     return {"message": "Article updated successfully"}
 
 
@@ -495,6 +564,7 @@ async def delete_custom_article(
     result = await db.articles.delete_one({"id": article_id, "is_custom": True})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Custom article not found")
+    await _sync_search_index("article", article_id)
     
     return {"message": "Article deleted successfully"}
 
@@ -523,6 +593,7 @@ async def create_custom_document(
     doc_dict["created_at"] = datetime.now(timezone.utc).isoformat()
     
     await db.custom_documents.insert_one(doc_dict)
+    await _sync_search_index("document", doc.id)
     
     return {"id": doc.id, "message": "Document created successfully"}
 
@@ -581,6 +652,7 @@ async def update_custom_document(
     update_data["updated_by"] = current_user.get("email", "unknown")
     
     await db.custom_documents.update_one({"id": doc_id}, {"$set": update_data})
+    await _sync_search_index("document", doc_id)
     return {"message": "Document updated successfully"}
 
 
@@ -596,6 +668,7 @@ async def delete_custom_document(
     result = await db.custom_documents.delete_one({"id": doc_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Document not found")
+    await _sync_search_index("document", doc_id)
     
     return {"message": "Document deleted successfully"}
 
@@ -8,11 +8,16 @@ import os
 import uuid
 from datetime import datetime, timezone
 from typing import Optional
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, HTTPException, Depends, Request, UploadFile, File, Form
 from dependencies import db, get_current_active_user
 from motor.motor_asyncio import AsyncIOMotorGridFSBucket
-import io
+from services.gridfs_stream import (
+    UploadRejected,
+    UploadTooLarge,
+    gridfs_response,
+    open_grid_out,
+    stream_upload_to_gridfs,
+)
 import logging
 
 logger = logging.getLogger(__name__)
@@ -101,6 +106,12 @@ def get_mime_type(extension: str) -> str:
     return mime_map.get(extension.lower(), "application/octet-stream")
 
 
+async def _gridfs_blob_exists(grid_id: str) -> bool:
+    from bson import ObjectId
+
+    return bool(await fs.find({"_id": ObjectId(grid_id)}, limit=1).to_list(1))
+
+
 @router.post("/file")
 async def upload_file(
     file: UploadFile = File(...),
@@ -108,7 +119,13 @@ async def upload_file(
     content_type: Optional[str] = Form(None),
     current_user: dict = Depends(get_current_active_user)
 ):
-    """Upload a file — stored in MongoDB GridFS for persistence"""
+    """Upload a file — stored in MongoDB GridFS for persistence.
+
+    The upload is streamed into GridFS chunk by chunk: magic bytes are
+    checked on the first chunk, size and SHA-256 as it goes. When a blob
+    with the same hash already exists, the new copy is dropped and only a
+    metadata record pointing at the existing blob is added.
+    """
 
     # Check user permissions
     if current_user.get("role") not in ["admin", "manager"]:
@@ -131,37 +148,35 @@ async def upload_file(
             detail=f"File type not allowed. Allowed: {', '.join([e for exts in ALLOWED_EXTENSIONS.values() for e in exts])}"
         )
 
-    # Read file content
-    content = await file.read()
+    # Generate unique ID
+    file_id = str(uuid.uuid4())
+    safe_filename = f"{file_id}{ext}"
+    mime_type = get_mime_type(ext)
 
-    # Check file size
-    if len(content) > MAX_FILE_SIZE:
+    # Stream into GridFS, validating as we go
+    try:
+        stored = await stream_upload_to_gridfs(
+            fs,
+            file,
+            safe_filename,
+            max_size=MAX_FILE_SIZE,
+            metadata={
+                "file_id": file_id,
+                "original_name": file.filename,
+                "mime_type": mime_type,
+                "file_type": file_type,
+            },
+            # Reject files that don't match their extension
+            check_header=lambda header: validate_magic_bytes(header, ext),
+        )
+    except UploadTooLarge:
         raise HTTPException(status_code=400, detail=f"File too large. Maximum size is {MAX_FILE_SIZE // (1024*1024)}MB")
-
-    # Validate magic bytes — reject files that don't match their extension
-    if not validate_magic_bytes(content, ext):
+    except UploadRejected:
         raise HTTPException(
             status_code=400,
             detail=f"File content does not match extension '{ext}'. Possible file type mismatch."
         )
 
-    # Generate unique ID
-    file_id = str(uuid.uuid4())
-    safe_filename = f"{file_id}{ext}"
-    mime_type = get_mime_type(ext)
-
-    # Store file in GridFS
-    grid_id = await fs.upload_from_stream(
-        safe_filename,
-        io.BytesIO(content),
-        metadata={
-            "file_id": file_id,
-            "original_name": file.filename,
-            "mime_type": mime_type,
-            "file_type": file_type,
-        }
-    )
-
     # Create metadata record
     metadata = {
         "id": file_id,
@@ -169,18 +184,45 @@ async def upload_file(
         "original_name": file.filename,
         "file_type": file_type,
         "mime_type": mime_type,
-        "size": len(content),
+        "size": stored.size,
+        "sha256_hash": stored.sha256,
         "uploaded_by": current_user.get("email", "unknown"),
         "uploaded_at": datetime.now(timezone.utc).isoformat(),
         "content_id": content_id,
         "content_type": content_type,
-        "grid_id": str(grid_id),
+        "grid_id": str(stored.grid_id),
         "storage": "gridfs",
     }
 
+    # Same bytes already stored? Point at that blob instead of ours.
+    duplicate = await db.uploaded_files.find_one(
+        {"sha256_hash": stored.sha256, "size": stored.size, "storage": "gridfs"},
+        {"_id": 0, "grid_id": 1, "filename": 1},
+    )
+    if duplicate and duplicate.get("grid_id"):
+        metadata.update(grid_id=duplicate["grid_id"], filename=duplicate["filename"])
+
     # Store metadata in database
     await db.uploaded_files.insert_one(metadata)
 
+    deduplicated = False
+    if metadata["grid_id"] != str(stored.grid_id):
+        # Our record now holds a reference, so delete_file keeps the shared
+        # blob from here on; it may still have gone before the insert.
+        if await _gridfs_blob_exists(metadata["grid_id"]):
+            deduplicated = True
+            try:
+                await fs.delete(stored.grid_id)
+            except Exception as e:
+                logger.warning("Could not drop duplicate blob for upload %s: %s", file_id, e)
+        else:
+            await db.uploaded_files.update_one(
+                {"id": file_id},
+                {"$set": {"grid_id": str(stored.grid_id), "filename": safe_filename}},
+            )
+            metadata.update(grid_id=str(stored.grid_id), filename=safe_filename)
+    grid_id, storage_filename = metadata["grid_id"], metadata["filename"]
+
     # Fire-and-forget: mirror to Google Drive (non-blocking)
     if content_id:
         import asyncio
@@ -188,7 +230,7 @@ async def upload_file(
             user_id=current_user.get("id", ""),
             claim_id=content_id,
             file_name=file.filename,
-            file_bytes=content,
+            grid_id=grid_id,
             mime_type=mime_type,
             category=content_type or "general",
         ))
@@ -202,10 +244,11 @@ async def upload_file(
 
     return {
         "id": file_id,
-        "filename": safe_filename,
+        "filename": storage_filename,
         "original_name": file.filename,
         "file_type": file_type,
-        "size": len(content),
+        "size": stored.size,
+        "deduplicated": deduplicated,
         "url": f"/api/uploads/file/{file_id}"
     }
 
@@ -214,13 +257,18 @@ async def _mirror_to_drive(
     user_id: str,
     claim_id: str,
     file_name: str,
-    file_bytes: bytes,
+    grid_id: str,
     mime_type: str,
     category: str,
 ):
     """Non-blocking Drive mirror. Errors are logged, never raised."""
     try:
-        from services.drive_mirror import get_drive_mirror
+        from services.drive_mirror import get_drive_mirror, MIRROR_ENABLED
+        if not MIRROR_ENABLED:
+            return
+        # Read back from GridFS so the request never held the whole file
+        grid_out = await open_grid_out(fs, grid_id)
+        file_bytes = await grid_out.read()
         mirror = get_drive_mirror()
         await mirror.mirror_claim_file(
             user_id=user_id,
@@ -236,8 +284,13 @@ async def _mirror_to_drive(
 
 
 @router.get("/file/{file_id}")
-async def get_file(file_id: str, current_user: dict = Depends(get_current_active_user)):
-    """Download/view a file from GridFS"""
+async def get_file(file_id: str, request: Request, current_user: dict = Depends(get_current_active_user)):
+    """Download/view a file from GridFS.
+
+    Streamed chunk by chunk, with Range (206) and If-None-Match /
+    If-Modified-Since (304) support. Gmail-synced attachments are served
+    here too, through their uploaded_files record.
+    """
 
     # Find file metadata
     file_meta = await db.uploaded_files.find_one({"id": file_id})
@@ -256,18 +309,18 @@ async def get_file(file_id: str, current_user: dict = Depends(get_current_active
 
     # Try GridFS first (new storage)
     try:
-        grid_stream = await fs.open_download_stream_by_name(file_meta["filename"])
-        file_bytes = await grid_stream.read()
+        grid_out = await open_grid_out(fs, file_meta.get("grid_id"), file_meta["filename"])
         # Sanitize filename for Content-Disposition header
         safe_name = original_name.replace('"', '_').replace('\n', '_').replace('\r', '_')
-        return StreamingResponse(
-            io.BytesIO(file_bytes),
+        return gridfs_response(
+            grid_out,
+            request.headers,
             media_type=mime_type,
             headers={
                 "Content-Disposition": f'inline; filename="{safe_name}"',
                 "Content-Security-Policy": "default-src 'none'; style-src 'unsafe-inline'",
                 "X-Content-Type-Options": "nosniff",
-            }
+            },
         )
     except Exception as e:
         logger.warning(f"GridFS retrieval failed for {file_id}, falling back to filesystem: {e}")
@@ -300,8 +353,13 @@ async def delete_file(file_id: str, current_user: dict = Depends(get_current_act
     if not file_meta:
         raise HTTPException(status_code=404, detail="File not found")
 
-    # Delete from GridFS
-    if file_meta.get("grid_id"):
+    # Drop the record before counting references: an upload reusing this
+    # blob inserts its record first and then checks the blob is still there.
+    await db.uploaded_files.delete_one({"id": file_id})
+    shared = file_meta.get("grid_id") and await db.uploaded_files.count_documents(
+        {"grid_id": file_meta["grid_id"]}
+    )
+    if file_meta.get("grid_id") and not shared:
         try:
             from bson import ObjectId
             await fs.delete(ObjectId(file_meta["grid_id"]))
@@ -316,9 +374,6 @@ async def delete_file(file_id: str, current_user: dict = Depends(get_current_act
     if os.path.exists(file_path):
         os.remove(file_path)
 
-    # Delete metadata
-    await db.uploaded_files.delete_one({"id": file_id})
-
     return {"message": "File deleted successfully"}
 
 
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Audit query plans for the app's hot query shapes.
+
+Runs ``explain`` for every entry in ``services.index_registry.QUERY_CATALOGUE``
+and reports winning plans with a COLLSCAN or an in-memory SORT. Exits 1 when
+anything is found, so it can gate a deploy.
+
+    cd backend
+    python scripts/audit_indexes.py                # audit the configured DB
+    python scripts/audit_indexes.py --apply        # create registry indexes first
+    python scripts/audit_indexes.py --static-only  # registry vs catalogue, no DB
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.index_registry import (  # noqa: E402
+    QUERY_CATALOGUE,
+    apply_index_registry,
+    audit_query_plans,
+    uncovered_shapes,
+)
+
+
+async def run(args) -> int:
+    status = 0
+    missing = uncovered_shapes()
+    for query in missing:
+        print(f"UNCOVERED  {query.collection:<28} {query.name} ({query.source})")
+    if missing:
+        status = 1
+    if args.static_only:
+        print(f"{len(QUERY_CATALOGUE) - len(missing)}/{len(QUERY_CATALOGUE)} shapes covered by the registry")
+        return status
+
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(args.mongo_url)
+    database = client[args.db]
+    try:
+        if args.apply:
+            report = await apply_index_registry(database)
+            print(f"indexes ensured: {report['ensured']}  conflicts: {len(report['conflicts'])}  failed: {len(report['failed'])}")
+            for line in report["conflicts"] + report["failed"]:
+                print(f"  {line}")
+        findings = await audit_query_plans(database)
+    finally:
+        client.close()
+
+    for finding in findings:
+        print(f"PLAN       {finding['collection']:<28} {finding['shape']}: {', '.join(finding['problems'])}")
+    print(f"{len(QUERY_CATALOGUE) - len(findings)}/{len(QUERY_CATALOGUE)} shapes use an index without an in-memory sort")
+    return 1 if findings else status
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--db", default=os.environ.get("DB_NAME", "eden_claims"))
+    parser.add_argument("--apply", action="store_true", help="create registry indexes before auditing")
+    parser.add_argument("--static-only", action="store_true", help="only check the registry covers the catalogue")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark email-to-claim matching: the old per-claim substring scan against
+the Aho–Corasick ``ClaimMatcher``, on synthetic claims and emails.
+
+    cd backend
+    python scripts/bench_claim_matcher.py --claims 10000 --emails 10000
+
+The naive scan is timed on a sample of emails and extrapolated, since the
+full 10k × 10k run takes minutes.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.claim_matcher import ClaimMatcher  # noqa: E402
+
+STREETS = ["Ocean Dr", "Palm Way", "Bayshore Blvd", "Coral Ave", "Sunset Ln", "Gulf Blvd"]
+FILLER = (
+    "Please find attached the updated estimate and photos for the roof. "
+    "Let us know if the carrier needs anything else before the reinspection."
+).split()
+
+
+def make_claims(n: int, rng: random.Random) -> list:
+    return [
+        {
+            "id": f"claim-{i}",
+            "claim_number": f"EC-{2020 + i % 6}-{i:06d}",
+            "client_email": f"client{i}@example.com",
+            "carrier_adjuster_email": f"adjuster{i % 400}@carrier{i % 25}.com",
+            "property_address": f"{rng.randint(100, 99999)} {rng.choice(STREETS)}, Unit {i}, Miami FL",
+        }
+        for i in range(n)
+    ]
+
+
+def make_emails(n: int, claims: list, rng: random.Random) -> list:
+    emails = []
+    for _ in range(n):
+        claim = rng.choice(claims)
+        body = " ".join(rng.choice(FILLER) for _ in range(120))
+        kind = rng.random()
+        subject = "Re: estimate"
+        if kind < 0.4:
+            subject = f"Re: {claim['claim_number']} estimate"
+        elif kind < 0.6:
+            body += " " + claim["property_address"]
+        emails.append({
+            "subject": subject,
+            "body_text": body,
+            "from_address": claim["client_email"] if kind > 0.8 else "someone@else.com",
+            "to_addresses": ["team@eden.com"],
+        })
+    return emails
+
+
+def naive_index(claims: list) -> tuple:
+    """Lookup tables built once per run by the pre-matcher auto_match_emails."""
+    claim_number_map, email_map, address_claims = {}, {}, []
+    for claim in claims:
+        claim_number_map[claim["claim_number"].lower()] = claim
+        email_map[claim["client_email"].lower()] = claim
+        email_map[claim["carrier_adjuster_email"].lower()] = claim
+        address_claims.append((claim["property_address"].lower(), claim))
+    return claim_number_map, email_map, address_claims
+
+
+def naive_match(email: dict, index: tuple):
+    """The pre-matcher per-email loop."""
+    claim_number_map, email_map, address_claims = index
+    text = f"{email['subject']} {email['body_text']}".lower()
+    for cn, claim in claim_number_map.items():
+        if cn in text:
+            return claim
+    for addr in [email["from_address"], *email["to_addresses"]]:
+        if addr.lower() in email_map:
+            return email_map[addr.lower()]
+    for addr, claim in address_claims:
+        if addr[:40] in text:
+            return claim
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--claims", type=int, default=10000)
+    parser.add_argument("--emails", type=int, default=10000)
+    parser.add_argument("--naive-sample", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    claims = make_claims(args.claims, rng)
+    emails = make_emails(args.emails, claims, rng)
+
+    t0 = time.perf_counter()
+    matcher = ClaimMatcher(claims)
+    build_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    matched = 0
+    for email in emails:
+        claim, _ = matcher.match_email(
+            email["subject"], email["body_text"], [email["from_address"], *email["to_addresses"]],
+        )
+        matched += claim is not None
+    match_s = time.perf_counter() - t0
+
+    sample = emails[: args.naive_sample]
+    index = naive_index(claims)
+    t0 = time.perf_counter()
+    for email in sample:
+        naive_match(email, index)
+    naive_s = (time.perf_counter() - t0) / max(len(sample), 1) * len(emails)
+
+    print(f"claims={args.claims} emails={args.emails} matched={matched}")
+    print(f"automaton build:   {build_s * 1000:9.1f} ms")
+    print(f"automaton match:   {match_s * 1000:9.1f} ms  ({match_s / len(emails) * 1e6:.1f} us/email)")
+    print(f"naive (estimated): {naive_s * 1000:9.1f} ms  ({naive_s / len(emails) * 1e6:.1f} us/email)")
+    print(f"speedup:           {naive_s / max(build_s + match_s, 1e-9):9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
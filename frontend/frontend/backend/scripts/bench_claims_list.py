@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark claim listing: the legacy ``GET /api/claims/`` path (1000 full
+documents validated through ``Claim``) against the keyset ``list_claims``
+page with the ``list`` projection, at several collection sizes.
+
+    cd backend
+    python scripts/bench_claims_list.py --mongo-url mongodb://localhost:27017 \\
+        --sizes 10000,100000,1000000
+
+Seeds synthetic claims into a scratch database (dropped first), creates the
+``CLAIM_LIST_INDEXES``, and reports p50/p95 latency per scenario. Deep pages
+are reached by walking cursors, so they measure what a client actually pays.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("JWT_SECRET_KEY", "bench")
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+
+from motor.motor_asyncio import AsyncIOMotorClient  # noqa: E402
+
+from services.claims_service import CLAIM_LIST_INDEXES, ClaimsService  # noqa: E402
+
+ADMIN = {"id": "bench-admin", "email": "admin@bench.local", "full_name": "Bench Admin", "role": "admin"}
+STATUSES = ["New", "In Progress", "Under Review", "Approved", "Completed", "Closed", "Denied"]
+CARRIERS = [f"Carrier {i}" for i in range(40)]
+ADJUSTERS = [f"Adjuster {i}" for i in range(60)]
+BATCH = 10000
+
+
+def make_claim(i: int, rng: random.Random, base: datetime) -> dict:
+    return {
+        "id": f"bench-{i:08d}",
+        "claim_number": f"BC-{i:08d}",
+        "client_name": f"Client {i}",
+        "client_email": f"client{i % 5000}@example.com",
+        "property_address": f"{rng.randint(100, 99999)} Ocean Dr, Miami FL",
+        "status": rng.choice(STATUSES),
+        "priority": rng.choice(["Low", "Medium", "High"]),
+        "assigned_to": rng.choice(ADJUSTERS),
+        "carrier_name": rng.choice(CARRIERS),
+        "claim_type": "Wind",
+        "estimated_value": rng.randint(1000, 250000),
+        "description": "Roof and interior water damage after the storm. " * 20,
+        "created_by": "bench",
+        "created_at": base - timedelta(seconds=i * 7),
+        "updated_at": base,
+        "is_archived": rng.random() < 0.05,
+    }
+
+
+async def seed(database, size: int) -> None:
+    await database.claims.drop()
+    rng = random.Random(size)
+    base = datetime.now(timezone.utc)
+    for start in range(0, size, BATCH):
+        await database.claims.insert_many(
+            [make_claim(i, rng, base) for i in range(start, min(start + BATCH, size))],
+            ordered=False,
+        )
+    for keys in CLAIM_LIST_INDEXES:
+        await database.claims.create_index(keys)
+
+
+async def timed(fn, runs: int) -> tuple:
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[max(0, int(len(samples) * 0.95) - 1)]
+
+
+async def bench_size(database, size: int, runs: int, deep_pages: int) -> None:
+    print(f"seeding {size} claims ...", flush=True)
+    await seed(database, size)
+    service = ClaimsService(database)
+
+    async def legacy():
+        await service.get_claims(None, False, 1000, ADMIN)
+
+    async def first_page():
+        await service.list_claims(ADMIN, fields="list")
+
+    async def filtered_page():
+        await service.list_claims(ADMIN, fields="list", status="In Progress", carrier="Carrier 7")
+
+    page = await service.list_claims(ADMIN, fields="list")
+    for _ in range(deep_pages):
+        if not page["next_cursor"]:
+            break
+        page = await service.list_claims(ADMIN, fields="list", cursor=page["next_cursor"])
+    deep_cursor = page["next_cursor"]
+
+    async def deep_page():
+        await service.list_claims(ADMIN, fields="list", cursor=deep_cursor)
+
+    scenarios = [
+        ("legacy get_claims (1000 rows)", legacy),
+        ("list first page", first_page),
+        ("list status+carrier filter", filtered_page),
+        (f"list page {deep_pages + 1} via cursor", deep_page),
+    ]
+    for label, fn in scenarios:
+        p50, p95 = await timed(fn, runs)
+        print(f"  {size:>8}  {label:<32} p50 {p50:8.1f} ms   p95 {p95:8.1f} ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL"))
+    parser.add_argument("--db", default="eden_bench_claims_list")
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--deep-pages", type=int, default=100)
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(args.mongo_url)
+    database = client[args.db]
+    try:
+        for size in (int(s) for s in args.sizes.split(",")):
+            await bench_size(database, size, args.runs, args.deep_pages)
+    finally:
+        await client.drop_database(args.db)
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
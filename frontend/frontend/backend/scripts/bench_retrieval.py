@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Evaluate and benchmark the BM25 retrieval index against the fixed query set
+in ``services.retrieval_eval``, next to the substring scoring the expert
+search used before.
+
+    cd backend
+    python scripts/bench_retrieval.py                      # static corpora only
+    python scripts/bench_retrieval.py --mongo-url mongodb://localhost:27017 --db eden_claims
+
+With a database it also times a cold build and an unchanged (incremental)
+refresh of the Mongo-backed corpora, and reports their sizes.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("JWT_SECRET_KEY", "bench")
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+
+from routes.knowledge_base import INDUSTRY_EXPERTS  # noqa: E402
+from services.retrieval_eval import EVAL_QUERIES, evaluate  # noqa: E402
+from services.retrieval_index import RetrievalIndex  # noqa: E402
+
+
+def legacy_expert_search(q: str) -> list:
+    """The pre-index ``/api/knowledge-base/search`` scoring: whole-query substring hits."""
+    query = q.lower()
+    results = []
+    for figure in INDUSTRY_EXPERTS["figures"]:
+        score = 10 * (query in figure["name"].lower()) + 5 * (query in figure["bio"].lower())
+        score += sum(3 for exp in figure.get("expertise", []) if query in exp.lower())
+        score += sum(2 for i in figure.get("key_insights", []) if query in i.lower())
+        if score:
+            results.append((score, f"experts:{figure['id']}"))
+    return [doc_id for _, doc_id in sorted(results, reverse=True)]
+
+
+def legacy_report(k: int) -> str:
+    queries = [(q, rel) for corpus, q, rel in EVAL_QUERIES if corpus == "experts"]
+    found = sum(any(d in rel for d in legacy_expert_search(q)[:k]) for q, rel in queries)
+    return f"legacy substring expert search: recall@{k} {found}/{len(queries)}"
+
+
+async def bench_mongo(args) -> None:
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(args.mongo_url)
+    try:
+        index = RetrievalIndex(snapshot_path=None)
+        started = time.perf_counter()
+        report = await index.refresh(client[args.db])
+        print(f"cold build: {(time.perf_counter() - started) * 1000:.0f}ms {report}")
+        started = time.perf_counter()
+        report = await index.refresh(client[args.db])
+        print(f"unchanged refresh: {(time.perf_counter() - started) * 1000:.0f}ms {report}")
+        for corpus, bm25 in index.corpora.items():
+            print(f"  {corpus:<11} {len(bm25):>6} docs {len(bm25.postings):>7} terms")
+        print(evaluate(index, k=args.k))
+    finally:
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--mongo-url", help="also build the Mongo-backed corpora from this server")
+    parser.add_argument("--db", default=os.environ.get("DB_NAME", "eden_claims"))
+    parser.add_argument("--k", type=int, default=3)
+    args = parser.parse_args()
+
+    print(legacy_report(args.k))
+    print(f"bm25 static corpora: {evaluate(RetrievalIndex(snapshot_path=None), k=args.k)}")
+    if args.mongo_url:
+        asyncio.run(bench_mongo(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Train the ClaimPilot settlement model from closed claims.
+
+Fits the quantile / logistic / ridge heads in
+``services.claimpilot.settlement_model`` on every closed claim with a
+``settlement_amount``, prints a holdout check, and stores the artifact in
+``claimpilot_models``. Running servers pick it up on their next restart.
+
+    cd backend
+    python scripts/train_settlement_model.py              # train and save
+    python scripts/train_settlement_model.py --dry-run    # report only
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.claimpilot.settlement_model import (  # noqa: E402
+    CLOSED_STATUSES,
+    save_settlement_model,
+    train_settlement_model,
+)
+
+TRAINING_FIELDS = (
+    "claim_type", "type", "carrier_name", "carrier", "insurance_company",
+    "estimated_value", "replacement_cost_value", "deductible", "mortgage_company",
+    "settlement_amount", "is_in_litigation", "created_at", "closed_at", "updated_at",
+)
+
+
+def holdout_report(claims: list, holdout: float, seed: int) -> None:
+    rng = random.Random(seed)
+    shuffled = claims[:]
+    rng.shuffle(shuffled)
+    cut = int(len(shuffled) * (1 - holdout))
+    train, test = shuffled[:cut], shuffled[cut:]
+    if not test:
+        return
+    model = train_settlement_model(train)
+    scores = model.score_matrix(model.encode_many(test))
+    actual = [float(c["settlement_amount"]) for c in test]
+    for column, label in enumerate(("p10", "p50", "p90")):
+        below = sum(a < s for a, s in zip(actual, scores[:, column])) / len(test)
+        print(f"holdout {label}: {below:.1%} of settlements below (target {label[1:]}%)")
+    errors = sorted(abs(a - s) / max(a, 1.0) for a, s in zip(actual, scores[:, 1]))
+    print(f"holdout p50 median abs error: {errors[len(errors) // 2]:.1%} over {len(test)} claims")
+
+
+async def run(args) -> int:
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(args.mongo_url)
+    database = client[args.db]
+    try:
+        claims = await database.claims.find(
+            {"status": {"$in": CLOSED_STATUSES}, "settlement_amount": {"$gt": 0}},
+            {"_id": 0, **{field: 1 for field in TRAINING_FIELDS}},
+        ).to_list(length=None)
+        print(f"{len(claims)} settled closed claims")
+        try:
+            holdout_report(claims, args.holdout, args.seed)
+            model = train_settlement_model(claims)
+        except ValueError as exc:
+            print(f"not trained: {exc}")
+            return 1
+        print(f"trained on {model.artifact['n_samples']} claims, {model.n_features} features")
+        if not args.dry_run:
+            await save_settlement_model(database, model)
+            print("saved to claimpilot_models")
+    finally:
+        client.close()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--db", default=os.environ.get("DB_NAME", "eden_claims"))
+    parser.add_argument("--holdout", type=float, default=0.2, help="fraction held out for the calibration report")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dry-run", action="store_true", help="train and report without saving")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -22,6 +22,10 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
+# Time route imports (STARTUP_PROFILE=1) and the lifespan steps
+from services.startup_profiler import startup_profiler
+startup_profiler.install_import_hook()
+
 # Import routes after loading env
 from integrations import integrations_router
 from integrations.google_client import router as google_router
@@ -31,7 +35,7 @@ from routes.claims import router as claims_router
 from routes.notifications import router as notifications_router
 from routes.email import router as email_router
 from routes.data import router as data_router
-from routes.university import router as university_router, seed_university_data
+from routes.university import router as university_router, seed_university_data, UNIVERSITY_SEED_VERSION
 from routes.workbooks import router as workbooks_router
 from routes.users import router as users_router
 from routes.supplements import router as supplements_router
@@ -57,6 +61,8 @@ from routes.cqil import router as cqil_router
 from routes.centurion import router as centurion_router
 from routes.regrid import router as regrid_router
 from services.ollama_config import get_ollama_api_key
+from services.index_registry import ensure_indexes
+from services.startup_tasks import content_stamp, run_once
 from routes.knowledge_base import router as knowledge_base_router
 from routes.florida_statutes import router as florida_statutes_router
 from routes.client_status import router as client_status_router
@@ -93,6 +99,8 @@ from feature_flags import feature_flags_router
 from websocket_manager import manager
 from auth import decode_access_token, get_password_hash
 
+startup_profiler.mark("routes imported")
+
 # ============================================
 # ENVIRONMENT VALIDATION
 # ============================================
@@ -113,92 +121,62 @@ from contextlib import asynccontextmanager
 
 @asynccontextmanager
 async def lifespan(app_instance: FastAPI):
-    """Startup: seed data, ensure admin, init gamification, create indexes, start scheduler."""
+    """Startup: seed data, ensure admin, init gamification, create indexes, start scheduler.
+
+    Seeding and index creation are independent and idempotent, so they run
+    concurrently; the version-stamped ones skip entirely once applied.
+    """
     await log_startup_config()
-    await seed_university_data()
-    await ensure_admin_user()
-    await ensure_workbooks_exist()
-    await initialize_harvest_gamification()
-    await initialize_background_scheduler()
-    await initialize_claimpilot()
-    await ensure_database_indexes()
+    await startup_profiler.gather(
+        ("university_seed", seed_university_once()),
+        ("admin_user", ensure_admin_user()),
+        ("workbooks", ensure_workbooks_exist()),
+        ("harvest_gamification", initialize_harvest_gamification()),
+        ("database_indexes", ensure_database_indexes()),
+    )
+    async with startup_profiler.step("scheduler"):
+        await initialize_background_scheduler()
+    async with startup_profiler.step("claimpilot"):
+        await initialize_claimpilot()
+    async with startup_profiler.step("websocket_backplane"):
+        await manager.start()
+    startup_profiler.mark_ready()
     yield
     # Shutdown: close DB client and stop scheduler
     logging.info("Eden server shutting down")
+    try:
+        await manager.stop()
+    except Exception as e:
+        logging.error(f"Failed to stop WebSocket backplane: {e}")
     client.close()
     try:
         from workers.scheduler import stop_scheduler
         stop_scheduler()
     except Exception as e:
         logging.error(f"Failed to stop scheduler: {e}")
+    try:
+        from services.photo_derivatives import shutdown_derivative_pool
+        from services.photo_report_jobs import shutdown_report_pool
+        shutdown_derivative_pool()
+        shutdown_report_pool()
+    except Exception as e:
+        logging.error(f"Failed to stop photo worker pools: {e}")
+
+
+async def seed_university_once():
+    """Seed University content once per ``UNIVERSITY_SEED_VERSION``."""
+    await run_once("university_seed", UNIVERSITY_SEED_VERSION, seed_university_data)
 
 
 async def ensure_database_indexes():
-    """Create all database indexes at startup (idempotent)."""
+    """Create all database indexes at startup (idempotent).
+
+    Indexes are declared in ``services/index_registry.py`` and skipped while
+    the registry is unchanged since the last successful run; set
+    ``INDEX_AUDIT=warn`` to log query shapes whose plans scan or sort in memory.
+    """
     try:
-        await db.inspection_photos.create_index(
-            [("claim_id", 1), ("sha256_hash", 1)],
-            background=True, sparse=True
-        )
-        await db.notifications.create_index(
-            [("user_id", 1), ("is_read", 1), ("created_at", -1)],
-            background=True
-        )
-        await db.notifications.create_index(
-            [("user_id", 1), ("created_at", -1)],
-            background=True
-        )
-        await db.contracts.create_index(
-            [("claim_id", 1), ("status", 1)],
-            background=True
-        )
-        await db.florida_statutes.create_index(
-            [("body_text", "text"), ("heading", "text"), ("section_number", "text")],
-            background=True
-        )
-        await db.claims.create_index(
-            [("assigned_to_id", 1), ("status", 1)],
-            background=True
-        )
-        await db.claims.create_index(
-            [("client_email", 1)],
-            background=True
-        )
-        # Token blacklist: TTL index auto-deletes expired entries after 24h buffer
-        await db.token_blacklist.create_index(
-            "blacklisted_at",
-            expireAfterSeconds=60 * 60 * 24 * 8,  # 8 days (refresh token lifetime + 1 day buffer)
-            background=True
-        )
-        await db.token_blacklist.create_index("jti", unique=True, background=True)
-        # ClaimPilot indexes
-        await db.claimpilot_insights.create_index([("claim_id", 1), ("created_at", -1)], background=True)
-        await db.claimpilot_pending.create_index([("status", 1), ("created_at", -1)], background=True)
-        await db.claimpilot_audit.create_index([("agent_name", 1), ("created_at", -1)], background=True)
-        # Calendar indexes
-        await db.calendar_events.create_index([("assigned_to_id", 1), ("start_time", 1)], background=True)
-        await db.calendar_events.create_index([("claim_id", 1), ("start_time", 1)], background=True)
-        await db.calendar_events.create_index([("start_time", 1), ("status", 1)], background=True)
-        await db.calendar_events.create_index([("parent_event_id", 1)], background=True, sparse=True)
-        # Compliance deadline indexes
-        await db.compliance_deadlines.create_index([("claim_id", 1), ("deadline_date", 1)], background=True)
-        await db.compliance_deadlines.create_index([("status", 1), ("deadline_date", 1)], background=True)
-        await db.compliance_deadlines.create_index([("deadline_type", 1)], background=True)
-        await db.compliance_alerts.create_index([("acknowledged", 1), ("created_at", -1)], background=True)
-        await db.compliance_alerts.create_index([("deadline_id", 1)], background=True)
-        # Intake submission indexes
-        await db.intake_submissions.create_index("submission_token", unique=True, background=True)
-        await db.intake_submissions.create_index([("status", 1), ("submitted_at", -1)], background=True)
-        await db.intake_submissions.create_index([("how_did_you_hear", 1)], background=True)
-        # Adjuster Intel indexes
-        await db.adjuster_profiles.create_index("name", unique=True, background=True)
-        await db.adjuster_profiles.create_index([("carrier", 1), ("behavior_score", 1)], background=True)
-        # Eve Orchestrator indexes
-        await db.eve_orchestrator_runs.create_index([("created_at", -1)], background=True)
-        await db.eve_orchestrator_runs.create_index([("user_id", 1), ("created_at", -1)], background=True)
-        await db.eve_orchestrator_drafts.create_index([("claim_id", 1), ("type", 1)], background=True)
-        await db.eve_orchestrator_reports.create_index([("claim_id", 1), ("created_at", -1)], background=True)
-        logging.info("Database indexes ensured successfully")
+        await ensure_indexes(db)
     except Exception as e:
         logging.warning(f"Could not create database indexes: {e}")
 
@@ -706,9 +684,10 @@ async def ensure_workbooks_exist():
 async def initialize_harvest_gamification():
     """Initialize Harvest v2 gamification - seed badges and Daily Blitz"""
     try:
-        from routes.harvest_scoring_engine import init_scoring_engine, initialize_harvest_gamification as init_gamification
+        from routes.harvest_scoring_engine import BADGES, init_scoring_engine, seed_badges, ensure_daily_blitz
         init_scoring_engine(db)
-        await init_gamification()
+        await run_once("harvest_badges", content_stamp(BADGES), seed_badges)
+        await ensure_daily_blitz()
         logging.info("Harvest gamification initialized: badges seeded, Daily Blitz created")
     except Exception as e:
         logging.error(f"Failed to initialize Harvest gamification: {e}")
@@ -718,7 +697,9 @@ async def initialize_claimpilot():
     """Initialize ClaimPilot AI agent orchestrator (non-critical)."""
     try:
         from services.claimpilot.orchestrator import init_orchestrator
+        from services.claimpilot.settlement_model import load_settlement_model
         init_orchestrator(db)
+        await load_settlement_model(db)
         logging.info("ClaimPilot AI agents initialized")
     except Exception as e:
         logging.warning("ClaimPilot initialization failed (non-critical): %s", e)
@@ -870,7 +851,7 @@ async def websocket_notifications(websocket: WebSocket, token: str = None):
         logger.error(f"WebSocket error: {e}")
     finally:
         if user_id:
-            manager.disconnect(websocket, user_id)
+            await manager.disconnect(websocket, user_id)
 
 logger = logging.getLogger(__name__)
 
@@ -0,0 +1,200 @@
+"""
+Claim matching for inbound email.
+
+Email auto-linking used to test every claim number and address against every
+email with ``in`` — O(emails × claims) substring searches. ``ClaimMatcher``
+compiles claim numbers and address snippets into one Aho–Corasick automaton,
+so each email is matched in a single pass over its text, and keys contact
+emails by normalized address for O(1) participant lookups.
+
+The matcher is built once per process and cached. ``ClaimsService`` calls
+``invalidate_claim_matcher()`` on claim changes; claims written elsewhere (or
+by another worker) are picked up when the cache expires.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from email.utils import parseaddr
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MATCHER_TTL_SECONDS = 300
+MAX_MATCHER_CLAIMS = 50000
+
+EMAIL_FIELDS = ("client_email", "carrier_adjuster_email")
+ADDRESS_FIELDS = ("property_address", "loss_address")
+# Addresses shorter than this are too generic to match on
+MIN_ADDRESS_LENGTH = 11
+# Leading part of an address that is matched (street number + street)
+ADDRESS_SNIPPET_CHARS = 40
+
+MATCHER_PROJECTION = {
+    "_id": 0, "id": 1, "claim_number": 1,
+    "client_email": 1, "client_name": 1,
+    "carrier_adjuster_email": 1, "carrier_adjuster_name": 1,
+    "property_address": 1, "loss_address": 1,
+}
+
+
+class KeywordAutomaton:
+    """Aho–Corasick automaton reporting every keyword occurrence in one pass."""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, Any]]] = [[]]
+        self._built = False
+
+    def add(self, keyword: str, value: Any) -> None:
+        if not keyword:
+            return
+        node = 0
+        for ch in keyword:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[node][ch] = nxt
+            node = nxt
+        self._out[node].append((len(keyword), value))
+        self._built = False
+
+    def build(self) -> "KeywordAutomaton":
+        goto, fail, out = self._goto, self._fail, self._out
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in goto[node].items():
+                queue.append(child)
+                state = fail[node]
+                while state and ch not in goto[state]:
+                    state = fail[state]
+                fail[child] = goto[state].get(ch, 0)
+                # Inherit matches of the longest proper suffix
+                out[child] = out[child] + out[fail[child]]
+        self._built = True
+        return self
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        """Yield ``(start, length, value)`` for each keyword occurrence."""
+        if not self._built:
+            self.build()
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for length, value in out[node]:
+                yield i - length + 1, length, value
+
+    def values_in(self, text: str) -> set:
+        """Distinct values whose keyword occurs in ``text``."""
+        return {value for _, _, value in self.iter_matches(text)}
+
+
+def normalize_email(value: str) -> str:
+    """``"Jane Doe <Jane@Example.com>"`` -> ``"jane@example.com"``."""
+    return parseaddr(value or "")[1].strip().lower()
+
+
+class ClaimMatcher:
+    """Finds the claim an email refers to.
+
+    Priority follows the original auto-match strategies: claim number in the
+    text, then a participant's email address, then a property address
+    mention. Among several text hits the longest keyword wins (so "CLM-10"
+    does not shadow "CLM-1001"), then the earliest.
+    """
+
+    def __init__(self, claims: Iterable[dict]):
+        self._automaton = KeywordAutomaton()
+        self._emails: Dict[str, dict] = {}
+        numbers: Dict[str, dict] = {}
+        addresses: Dict[str, dict] = {}
+        for claim in claims:
+            number = (claim.get("claim_number") or "").strip().lower()
+            if number:
+                numbers[number] = claim
+            for field in EMAIL_FIELDS:
+                address = normalize_email(claim.get(field) or "")
+                if address:
+                    self._emails[address] = claim
+            for field in ADDRESS_FIELDS:
+                address = (claim.get(field) or "").strip().lower()
+                if len(address) >= MIN_ADDRESS_LENGTH:
+                    addresses.setdefault(address[:ADDRESS_SNIPPET_CHARS], claim)
+
+        for number, claim in numbers.items():
+            self._automaton.add(number, ("claim_number", claim))
+        for snippet, claim in addresses.items():
+            self._automaton.add(snippet, ("property_address", claim))
+        self._automaton.build()
+        self.claim_numbers = list(numbers)
+
+    def _best_text_hits(self, text: str) -> Dict[str, dict]:
+        best: Dict[str, Tuple[int, int, dict]] = {}
+        for start, length, (method, claim) in self._automaton.iter_matches(text.lower()):
+            current = best.get(method)
+            if current is None or (length, -start) > (current[0], -current[1]):
+                best[method] = (length, start, claim)
+        return {method: hit[2] for method, hit in best.items()}
+
+    def match_claim_number(self, text: str) -> Optional[dict]:
+        return self._best_text_hits(text).get("claim_number")
+
+    def match_email(
+        self,
+        subject: str = "",
+        body: str = "",
+        addresses: Iterable[str] = (),
+    ) -> Tuple[Optional[dict], Optional[str]]:
+        """Return ``(claim, match_method)`` or ``(None, None)``."""
+        hits = self._best_text_hits(f"{subject or ''} {body or ''}")
+        if "claim_number" in hits:
+            return hits["claim_number"], "claim_number"
+        for address in addresses:
+            claim = self._emails.get(normalize_email(address))
+            if claim:
+                return claim, "email_address"
+        if "property_address" in hits:
+            return hits["property_address"], "property_address"
+        return None, None
+
+
+_matcher: Optional[ClaimMatcher] = None
+_built_at = 0.0
+# Bumped on invalidation so a build that raced a claim change is not cached
+_generation = 0
+_build_lock = asyncio.Lock()
+
+
+def invalidate_claim_matcher() -> None:
+    global _matcher, _generation
+    _matcher = None
+    _generation += 1
+
+
+async def get_claim_matcher(db) -> ClaimMatcher:
+    """Cached matcher over all claims, rebuilt after invalidation or TTL."""
+    global _matcher, _built_at
+    if _matcher is not None and time.monotonic() - _built_at < MATCHER_TTL_SECONDS:
+        return _matcher
+    async with _build_lock:
+        if _matcher is not None and time.monotonic() - _built_at < MATCHER_TTL_SECONDS:
+            return _matcher
+        generation = _generation
+        t0 = time.monotonic()
+        claims = await db.claims.find({}, MATCHER_PROJECTION).to_list(MAX_MATCHER_CLAIMS)
+        matcher = ClaimMatcher(claims)
+        logger.info(
+            "Claim matcher built: claims=%d duration_ms=%.1f",
+            len(claims), (time.monotonic() - t0) * 1000,
+        )
+        if generation == _generation:
+            _matcher, _built_at = matcher, time.monotonic()
+        return matcher
@@ -0,0 +1,220 @@
+"""
+Per-claim summary read model.
+
+``claim_summaries`` holds one document per claim with the related-record
+counts, latest items and evidence flags that the readiness and
+demand-package views need, so those become point reads instead of
+``$lookup`` fan-outs or a ``count_documents`` per collection.
+
+Write paths that add or remove notes, documents, photos or supplements call
+``refresh_claim_summary(claim_id, <section>)``, which recomputes just that
+section with indexed ``claim_id`` queries. Readers use
+``get_claim_summary``, which builds the full document on first access. A
+nightly job rebuilds every summary to heal writes made by paths that do not
+refresh (bulk imports, ad-hoc scripts).
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from dependencies import db as default_db
+from services.observability import MetricsCollector
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_VERSION = 1
+SUMMARY_SECTIONS = ("notes", "documents", "photos", "supplements")
+MAX_SUMMARY_DOCUMENTS = 500
+NOTE_EXCERPT_CHARS = 200
+SUBMITTED_SUPPLEMENT_STATUSES = ["submitted", "under_review", "approved", "partial_approved"]
+DOCUMENT_BUCKETS = ("policy", "estimate", "carrier_correspondence", "weather", "supplement_support", "contract", "other")
+REBUILD_CONCURRENCY = 8
+
+DOCUMENT_FIELDS = {"_id": 0, "id": 1, "type": 1, "name": 1, "uploaded_at": 1}
+
+
+def classify_document_bucket(doc_type: str, doc_name: str) -> str:
+    token = f"{(doc_type or '').lower()} {(doc_name or '').lower()}"
+    if "policy" in token or "declaration" in token:
+        return "policy"
+    if "estimate" in token or "xactimate" in token:
+        return "estimate"
+    if "carrier" in token or "correspondence" in token or "letter" in token:
+        return "carrier_correspondence"
+    if "weather" in token or "noaa" in token:
+        return "weather"
+    if "supplement" in token:
+        return "supplement_support"
+    if "contract" in token or "signnow" in token:
+        return "contract"
+    return "other"
+
+
+def evidence_flags(documents: list) -> dict:
+    """Readiness checklist flags; a document can satisfy several."""
+    tokens = [
+        f"{(d.get('type') or '').lower()} {(d.get('name') or '').lower()}".strip()
+        for d in documents
+    ]
+    return {
+        "has_policy": any("policy" in t or "declarations" in t for t in tokens),
+        "has_estimate": any("estimate" in t or "xactimate" in t for t in tokens),
+        "has_carrier_correspondence": any("carrier" in t or "letter" in t or "correspondence" in t for t in tokens),
+    }
+
+
+async def _notes_section(database, claim_id: str) -> dict:
+    count, latest = await asyncio.gather(
+        database.notes.count_documents({"claim_id": claim_id}),
+        database.notes.find(
+            {"claim_id": claim_id},
+            {"_id": 0, "id": 1, "author_name": 1, "content": 1, "created_at": 1},
+        ).sort("created_at", -1).limit(1).to_list(1),
+    )
+    latest_note = None
+    if latest:
+        note = latest[0]
+        latest_note = {
+            "id": note.get("id"),
+            "author_name": note.get("author_name"),
+            "created_at": note.get("created_at"),
+            "excerpt": (note.get("content") or "")[:NOTE_EXCERPT_CHARS],
+        }
+    return {"notes_count": count, "latest_note": latest_note}
+
+
+async def _documents_section(database, claim_id: str) -> dict:
+    count, documents = await asyncio.gather(
+        database.documents.count_documents({"claim_id": claim_id}),
+        database.documents.find({"claim_id": claim_id}, DOCUMENT_FIELDS)
+        .sort("uploaded_at", -1).limit(MAX_SUMMARY_DOCUMENTS).to_list(MAX_SUMMARY_DOCUMENTS),
+    )
+    buckets = {bucket: 0 for bucket in DOCUMENT_BUCKETS}
+    for doc in documents:
+        doc["bucket"] = classify_document_bucket(doc.get("type", ""), doc.get("name", ""))
+        buckets[doc["bucket"]] += 1
+    return {
+        "documents_count": count,
+        "documents": documents,
+        "document_buckets": buckets,
+        "latest_document": documents[0] if documents else None,
+        "evidence_flags": evidence_flags(documents),
+    }
+
+
+async def _photos_section(database, claim_id: str) -> dict:
+    count, latest = await asyncio.gather(
+        database.inspection_photos.count_documents({"claim_id": claim_id}),
+        database.inspection_photos.find(
+            {"claim_id": claim_id}, {"_id": 0, "id": 1, "captured_at": 1, "uploaded_at": 1},
+        ).sort("captured_at", -1).limit(1).to_list(1),
+    )
+    latest_photo_at = None
+    if latest:
+        latest_photo_at = latest[0].get("captured_at") or latest[0].get("uploaded_at")
+    return {"photos_count": count, "latest_photo_at": latest_photo_at}
+
+
+async def _supplements_section(database, claim_id: str) -> dict:
+    count, submitted, latest = await asyncio.gather(
+        database.supplements.count_documents({"claim_id": claim_id}),
+        database.supplements.count_documents({"claim_id": claim_id, "status": {"$in": SUBMITTED_SUPPLEMENT_STATUSES}}),
+        database.supplements.find(
+            {"claim_id": claim_id, "submitted_at": {"$ne": None}}, {"_id": 0, "id": 1, "submitted_at": 1},
+        ).sort("submitted_at", -1).limit(1).to_list(1),
+    )
+    return {
+        "supplements_count": count,
+        "supplements_submitted_count": submitted,
+        "latest_submitted_supplement": latest[0] if latest else None,
+    }
+
+
+_SECTION_BUILDERS = {
+    "notes": _notes_section,
+    "documents": _documents_section,
+    "photos": _photos_section,
+    "supplements": _supplements_section,
+}
+
+
+async def build_claim_summary(claim_id: str, database=None) -> dict:
+    """Compute every section and store the full summary document."""
+    database = database if database is not None else default_db
+    t0 = time.monotonic()
+    parts = await asyncio.gather(*(_SECTION_BUILDERS[s](database, claim_id) for s in SUMMARY_SECTIONS))
+    summary = {"claim_id": claim_id, "version": SUMMARY_VERSION}
+    for part in parts:
+        summary.update(part)
+    summary["refreshed_at"] = datetime.now(timezone.utc).isoformat()
+    await database.claim_summaries.update_one({"claim_id": claim_id}, {"$set": summary}, upsert=True)
+    MetricsCollector.record_timing("claim_summary_build_ms", round((time.monotonic() - t0) * 1000, 1))
+    return summary
+
+
+async def get_claim_summary(claim_id: str, database=None) -> dict:
+    """Stored summary for a claim, built on first read or after a schema bump."""
+    database = database if database is not None else default_db
+    summary = await database.claim_summaries.find_one({"claim_id": claim_id}, {"_id": 0})
+    if summary and summary.get("version") == SUMMARY_VERSION:
+        MetricsCollector.increment("claim_summary_hits_total")
+        return summary
+    MetricsCollector.increment("claim_summary_misses_total")
+    return await build_claim_summary(claim_id, database)
+
+
+async def refresh_claim_summary(claim_id: Optional[str], *sections: str, database=None) -> None:
+    """Recompute the given sections (all when none) after a related write.
+
+    A summary that has not been built yet is left for ``get_claim_summary``
+    to build in full. Failures are logged, never raised: the related write
+    has already succeeded and the nightly rebuild will catch up.
+    """
+    if not claim_id:
+        return
+    database = database if database is not None else default_db
+    try:
+        if not sections:
+            await build_claim_summary(claim_id, database)
+            return
+        parts = await asyncio.gather(*(_SECTION_BUILDERS[s](database, claim_id) for s in sections))
+        update = {"refreshed_at": datetime.now(timezone.utc).isoformat()}
+        for part in parts:
+            update.update(part)
+        await database.claim_summaries.update_one({"claim_id": claim_id}, {"$set": update})
+    except Exception as e:
+        logger.warning("Claim summary refresh failed for %s (%s): %s", claim_id, ",".join(sections) or "all", e)
+
+
+async def delete_claim_summary(claim_id: str, database=None) -> None:
+    database = database if database is not None else default_db
+    await database.claim_summaries.delete_one({"claim_id": claim_id})
+
+
+async def rebuild_claim_summaries(database=None) -> dict:
+    """Rebuild every claim's summary with bounded concurrency."""
+    database = database if database is not None else default_db
+    semaphore = asyncio.Semaphore(REBUILD_CONCURRENCY)
+    stats = {"rebuilt": 0, "failed": 0}
+
+    async def _one(claim_id: str):
+        async with semaphore:
+            try:
+                await build_claim_summary(claim_id, database)
+                stats["rebuilt"] += 1
+            except Exception as e:
+                stats["failed"] += 1
+                logger.warning("Claim summary rebuild failed for %s: %s", claim_id, e)
+
+    batch = []
+    async for claim in database.claims.find({}, {"_id": 0, "id": 1}):
+        batch.append(claim["id"])
+        if len(batch) >= REBUILD_CONCURRENCY * 25:
+            await asyncio.gather(*(_one(cid) for cid in batch))
+            batch = []
+    if batch:
+        await asyncio.gather(*(_one(cid) for cid in batch))
+    logger.info("Claim summaries rebuilt: %s", stats)
+    return stats
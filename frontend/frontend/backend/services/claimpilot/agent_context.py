@@ -24,10 +24,18 @@ _FETCH_SPECS = (
 
 COMM_MESSAGES_LIMIT = 30
 
+# Concurrent per-claim finds in build_many, shared across all collections
+BUILD_MANY_CONCURRENCY = 16
+
 
 @dataclass(frozen=True)
 class AgentContext:
-    """Immutable snapshot of all claim data an agent needs."""
+    """Immutable snapshot of all claim data an agent needs.
+
+    One snapshot is built per event and shared by every agent the
+    orchestrator runs concurrently for it, so agents must treat the claim
+    dict and lists as read-only.
+    """
 
     claim: dict
     recent_activity: list = field(default_factory=list)
@@ -39,6 +47,10 @@ class AgentContext:
     is_frozen: bool = False
 
 
+def _is_frozen(claim: dict) -> bool:
+    return claim.get("status") in FROZEN_STATUSES or claim.get("is_in_litigation") is True
+
+
 class AgentContextBuilder:
     """Fetches and assembles an AgentContext from MongoDB collections."""
 
@@ -57,23 +69,19 @@ class AgentContextBuilder:
         if claim is None:
             raise ValueError(f"Claim not found: {claim_id}")
 
-        is_frozen = (
-            claim.get("status") in FROZEN_STATUSES
-            or claim.get("is_in_litigation") is True
-        )
+        is_frozen = _is_frozen(claim)
 
         # Fetch all supporting collections concurrently
-        activity, evidence, notes, tasks, photos = await asyncio.gather(
+        activity, evidence, notes, tasks, photos, carrier_comms = await asyncio.gather(
             *(
                 self._fetch_sorted(coll, {fkey: claim_id}, limit)
                 for coll, fkey, limit in _FETCH_SPECS
-            )
-        )
-
-        carrier_comms = await self._fetch_sorted(
-            "comm_messages",
-            {"claim_id": claim_id, "channel": {"$in": CARRIER_CHANNELS}},
-            COMM_MESSAGES_LIMIT,
+            ),
+            self._fetch_sorted(
+                "comm_messages",
+                {"claim_id": claim_id, "channel": {"$in": CARRIER_CHANNELS}},
+                COMM_MESSAGES_LIMIT,
+            ),
         )
 
         return AgentContext(
@@ -95,3 +103,70 @@ class AgentContextBuilder:
         cursor = collection.find(query, {"_id": 0})
         cursor = cursor.sort("created_at", -1).limit(limit)
         return await cursor.to_list(length=limit)
+
+    async def build_many(self, claim_ids: list[str]) -> dict[str, AgentContext]:
+        """Build contexts for several claims with one ``$in`` lookup for the claims.
+
+        Returns contexts keyed by claim id; ids with no claim are omitted.
+        Each list holds the same newest-first slice ``build`` would return:
+        supporting collections are read with per-claim limited finds, at most
+        ``BUILD_MANY_CONCURRENCY`` in flight, so the limit stays on the server.
+        """
+        ids = list(dict.fromkeys(claim_ids))
+        if not ids:
+            return {}
+        claims = await self._db.claims.find(
+            {"id": {"$in": ids}}, {"_id": 0}
+        ).to_list(length=len(ids))
+        found = [c["id"] for c in claims]
+        if not found:
+            return {}
+        semaphore = asyncio.Semaphore(BUILD_MANY_CONCURRENCY)
+
+        activity, evidence, notes, tasks, photos, carrier_comms = await asyncio.gather(
+            *(
+                self._fetch_per_claim(coll, fkey, found, limit, semaphore)
+                for coll, fkey, limit in _FETCH_SPECS
+            ),
+            self._fetch_per_claim(
+                "comm_messages",
+                "claim_id",
+                found,
+                COMM_MESSAGES_LIMIT,
+                semaphore,
+                {"channel": {"$in": CARRIER_CHANNELS}},
+            ),
+        )
+
+        return {
+            claim["id"]: AgentContext(
+                claim=claim,
+                recent_activity=activity.get(claim["id"], []),
+                evidence=evidence.get(claim["id"], []),
+                notes=notes.get(claim["id"], []),
+                tasks=tasks.get(claim["id"], []),
+                photos=photos.get(claim["id"], []),
+                carrier_comms=carrier_comms.get(claim["id"], []),
+                is_frozen=_is_frozen(claim),
+            )
+            for claim in claims
+        }
+
+    async def _fetch_per_claim(
+        self,
+        collection_name: str,
+        filter_key: str,
+        claim_ids: list[str],
+        limit: int,
+        semaphore: asyncio.Semaphore,
+        extra: dict | None = None,
+    ) -> dict[str, list[dict]]:
+        """Run one limited, newest-first find per claim under *semaphore*."""
+
+        async def _one(claim_id: str) -> list[dict]:
+            async with semaphore:
+                query = {filter_key: claim_id, **(extra or {})}
+                return await self._fetch_sorted(collection_name, query, limit)
+
+        results = await asyncio.gather(*(_one(cid) for cid in claim_ids))
+        return dict(zip(claim_ids, results))
@@ -2,8 +2,10 @@
 PredictiveAnalytics Agent -- Predicts settlement ranges, litigation risk,
 and timeline for insurance claims.
 
-Uses LLM-based prediction with heuristic fallback. Read-only; does not
-require approval.
+When a trained settlement model is loaded (see ``settlement_model``), the
+numbers come from it locally and the LLM only writes the narrative
+(carrier behaviour and strategy). Without one, the LLM predicts everything,
+with a heuristic fallback. Read-only; does not require approval.
 """
 
 from __future__ import annotations
@@ -17,6 +19,7 @@ from models import AgentResult
 from services.claimpilot.agent_context import AgentContext
 from services.claimpilot.base_agent import BaseAgent
 from services.claimpilot.llm_router import LLMRouter
+from services.claimpilot.settlement_model import get_settlement_model
 
 logger = logging.getLogger(__name__)
 
@@ -79,6 +82,27 @@ _USER_PROMPT_TEMPLATE = (
     '"recommended_strategy": "<string>"}}'
 )
 
+_NARRATIVE_PROMPT_TEMPLATE = (
+    "Claim profile:\n"
+    "- Type: {claim_type}\n"
+    "- Carrier: {carrier}\n"
+    "- Damage severity: {damage_severity}\n"
+    "- Region: {region}\n"
+    "- Claim age (days): {age_days}\n\n"
+    "Model forecast: settlement ${p10:,.0f}-${p90:,.0f} (median ${p50:,.0f}), "
+    "litigation risk {litigation_probability:.0f}%, about {timeline_months} months.\n\n"
+    "Respond as JSON:\n"
+    '{{"carrier_behavior": "<fast_settler|normal|aggressive_denier|litigious>", '
+    '"recommended_strategy": "<string>"}}'
+)
+
+_DEFAULT_NARRATIVE: dict[str, str] = {
+    "carrier_behavior": "normal",
+    "recommended_strategy": (
+        "Gather complete documentation and submit a well-supported demand."
+    ),
+}
+
 _PREDICTION_CONFIDENCE = 0.6
 
 
@@ -103,15 +127,31 @@ class PredictiveAnalyticsAgent(BaseAgent):
 
         profile = self._extract_profile(claim, context)
 
-        try:
-            prediction = await self._predict_with_llm(claim, profile)
-        except Exception as exc:
-            logger.warning(
-                "LLM prediction failed for claim=%s: %s — using heuristic",
-                claim_id,
-                exc,
-            )
-            prediction = self._heuristic_prediction(claim)
+        model = get_settlement_model()
+        if model is not None:
+            prediction = model.predict(claim)
+            try:
+                prediction.update(await self._narrative_with_llm(profile, prediction))
+            except Exception as exc:
+                logger.warning(
+                    "LLM narrative failed for claim=%s: %s — using default",
+                    claim_id,
+                    exc,
+                )
+                prediction.update(_DEFAULT_NARRATIVE)
+            prediction["prediction_source"] = "model"
+        else:
+            try:
+                prediction = await self._predict_with_llm(claim, profile)
+                prediction["prediction_source"] = "llm"
+            except Exception as exc:
+                logger.warning(
+                    "LLM prediction failed for claim=%s: %s — using heuristic",
+                    claim_id,
+                    exc,
+                )
+                prediction = self._heuristic_prediction(claim)
+                prediction["prediction_source"] = "heuristic"
 
         sr = prediction["settlement_range"]
         lit = prediction["litigation_probability"]
@@ -190,17 +230,9 @@ class PredictiveAnalyticsAgent(BaseAgent):
             prompt=user_prompt,
             system_prompt=_SYSTEM_PROMPT,
             provider_override=self.llm_provider,
+            cache_task="claim_prediction",
         )
-
-        # Strip markdown fences if present
-        cleaned = raw.strip()
-        if cleaned.startswith("```"):
-            cleaned = cleaned.split("\n", 1)[-1]
-        if cleaned.endswith("```"):
-            cleaned = cleaned.rsplit("```", 1)[0]
-        cleaned = cleaned.strip()
-
-        parsed = json.loads(cleaned)
+        parsed = self._parse_json(raw)
 
         # Validate required keys
         required_keys = {
@@ -231,6 +263,40 @@ class PredictiveAnalyticsAgent(BaseAgent):
             "recommended_strategy": str(parsed["recommended_strategy"]),
         }
 
+    async def _narrative_with_llm(
+        self, profile: dict[str, Any], prediction: dict[str, Any]
+    ) -> dict[str, str]:
+        """Ask the LLM only for carrier behaviour and strategy around model numbers."""
+        user_prompt = _NARRATIVE_PROMPT_TEMPLATE.format(
+            **profile,
+            **prediction["settlement_range"],
+            litigation_probability=prediction["litigation_probability"],
+            timeline_months=prediction["timeline_months"],
+        )
+        raw = await self._llm.generate(
+            prompt=user_prompt,
+            system_prompt=_SYSTEM_PROMPT,
+            provider_override=self.llm_provider,
+            cache_task="claim_prediction",
+        )
+        parsed = self._parse_json(raw)
+        if "recommended_strategy" not in parsed:
+            raise ValueError("LLM response missing recommended_strategy")
+        return {
+            "carrier_behavior": str(parsed.get("carrier_behavior", "normal")),
+            "recommended_strategy": str(parsed["recommended_strategy"]),
+        }
+
+    @staticmethod
+    def _parse_json(raw: str) -> dict[str, Any]:
+        # Strip markdown fences if present
+        cleaned = raw.strip()
+        if cleaned.startswith("```"):
+            cleaned = cleaned.split("\n", 1)[-1]
+        if cleaned.endswith("```"):
+            cleaned = cleaned.rsplit("```", 1)[0]
+        return json.loads(cleaned.strip())
+
     # ------------------------------------------------------------------
     # Heuristic fallback
     # ------------------------------------------------------------------
@@ -245,10 +311,7 @@ class PredictiveAnalyticsAgent(BaseAgent):
             "settlement_range": dict(heuristic["settlement_range"]),
             "litigation_probability": heuristic["litigation_probability"],
             "timeline_months": heuristic["timeline_months"],
-            "carrier_behavior": "normal",
-            "recommended_strategy": (
-                "Gather complete documentation and submit a well-supported demand."
-            ),
+            **_DEFAULT_NARRATIVE,
         }
 
     # ------------------------------------------------------------------
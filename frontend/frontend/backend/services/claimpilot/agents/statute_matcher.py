@@ -267,6 +267,7 @@ class StatuteMatcherAgent(BaseAgent):
             provider_override=self.llm_provider,
             temperature=0.2,
             max_tokens=1000,
+            cache_task="statute_analysis",
         )
 
         return self._parse_llm_response(response, claim, deadlines)
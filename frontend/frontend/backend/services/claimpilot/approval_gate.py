@@ -48,6 +48,28 @@ class ApprovalGate:
         )
         return action.id
 
+    async def submit_many(self, actions: list[PendingAction]) -> list[str]:
+        """Persist several pending actions in one write and return their ids."""
+        if not actions:
+            return []
+        expires_at = _utc_now() + timedelta(hours=EXPIRY_HOURS)
+        docs = []
+        for action in actions:
+            doc = action.model_dump()
+            doc["expires_at"] = expires_at
+            doc["status"] = "pending"
+            docs.append(doc)
+
+        await self._collection.insert_many(docs)
+
+        logger.info(
+            "approval_gate | submitted %d actions claims=%s agents=%s",
+            len(docs),
+            sorted({a.claim_id for a in actions}),
+            sorted({a.agent_name for a in actions}),
+        )
+        return [action.id for action in actions]
+
     async def approve(self, action_id: str, reviewed_by: str) -> bool:
         """Mark an action as approved. Returns False if not found or not pending."""
         result = await self._collection.update_one(
@@ -66,3 +66,51 @@ class AuditLogger:
             duration_ms,
         )
         return audit_id
+
+    async def log_dispatch(
+        self,
+        *,
+        event_type: str,
+        claim_id: str,
+        agents: list[dict],
+        wall_ms: int,
+        pending_actions: int,
+    ) -> str:
+        """Record one orchestrator dispatch: wall time vs. the sum of agent time.
+
+        Stored under agent_name ``_orchestrator`` so analytics group it apart
+        from the agents themselves.
+        """
+        audit_id = uuid.uuid4().hex
+        agent_ms = sum(a["duration_ms"] for a in agents)
+        failed = [a["name"] for a in agents if a["status"] != "success"]
+        record = {
+            "audit_id": audit_id,
+            "agent_name": "_orchestrator",
+            "claim_id": claim_id,
+            "event_type": event_type,
+            "input_summary": f"{event_type} → {len(agents)} agents",
+            "output_summary": f"{len(agents) - len(failed)} succeeded, {pending_actions} actions pending approval",
+            "confidence": None,
+            "duration_ms": wall_ms,
+            "agent_duration_ms": agent_ms,
+            "agents": agents,
+            "pending_actions": pending_actions,
+            "status": "partial" if failed else "success",
+            "error_message": f"failed: {', '.join(failed)}" if failed else None,
+            "user_id": None,
+            "created_at": _utc_now(),
+        }
+
+        collection = getattr(self._db, self.COLLECTION_NAME)
+        await collection.insert_one(record)
+
+        logger.info(
+            "audit | orchestrator event=%s claim=%s agents=%d wall=%dms agent_sum=%dms",
+            event_type,
+            claim_id,
+            len(agents),
+            wall_ms,
+            agent_ms,
+        )
+        return audit_id
@@ -25,7 +25,8 @@ class BaseAgent(ABC):
     requires_approval: bool = False
     llm_provider: str = "gemini_flash"
     max_retries: int = 2
-    timeout_seconds: int = 30
+    # Budget for one orchestrated run(), retries and LLM fallbacks included
+    timeout_seconds: int = 90
 
     def __init__(self, db) -> None:
         self._db = db
@@ -12,6 +12,15 @@ Fallback chains:
     gemini_flash → groq → ollama
     groq         → gemini_flash → ollama
     ollama       → (no fallback — local only)
+
+Agents run concurrently, and each owns its own router, so calls in flight
+are capped per provider process-wide (``PROVIDER_CONCURRENCY``, overridable
+with ``CLAIMPILOT_PROVIDER_CONCURRENCY="groq=2,ollama=1"``). Waiting for a
+slot does not count against the per-call timeout.
+
+Deterministic callers can pass ``cache_task`` to ``generate``; tasks enabled
+in ``LLM_CACHE_TASKS`` are answered from the exact-match response cache
+(``services.llm_cache``) when the same prompt was sent before.
 """
 
 from __future__ import annotations
@@ -19,6 +28,7 @@ from __future__ import annotations
 import asyncio
 import logging
 import os
+import weakref
 from typing import Optional
 
 logger = logging.getLogger(__name__)
@@ -44,9 +54,52 @@ DEFAULT_TEMPERATURE = 0.3
 DEFAULT_MAX_TOKENS = 2000
 GEMINI_MODEL = "gemini-2.5-flash"
 GROQ_MODEL = "llama-3.3-70b-versatile"
+PROVIDER_MODELS: dict[str, str] = {
+    "gemini_flash": GEMINI_MODEL,
+    "groq": GROQ_MODEL,
+    "ollama": "ollama",
+}
 LLM_CALL_TIMEOUT_SECONDS = 30
 LLM_VISION_TIMEOUT_SECONDS = 60
 
+DEFAULT_PROVIDER_CONCURRENCY = 4
+PROVIDER_CONCURRENCY: dict[str, int] = {
+    "gemini_flash": 4,
+    "groq": 2,
+    "ollama": 1,
+}
+
+
+def _parse_provider_concurrency(raw: str) -> dict[str, int]:
+    limits: dict[str, int] = {}
+    for part in raw.split(","):
+        name, _, value = part.partition("=")
+        try:
+            limits[name.strip()] = max(1, int(value))
+        except ValueError:
+            continue
+    return limits
+
+
+PROVIDER_CONCURRENCY.update(
+    _parse_provider_concurrency(os.environ.get("CLAIMPILOT_PROVIDER_CONCURRENCY", ""))
+)
+
+# Semaphores bind to the loop they first block on, so keep one set per loop
+_provider_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def provider_slot(provider: str) -> asyncio.Semaphore:
+    """Return the process-wide concurrency slot for *provider*."""
+    slots = _provider_slots.setdefault(asyncio.get_running_loop(), {})
+    if provider not in slots:
+        slots[provider] = asyncio.Semaphore(
+            PROVIDER_CONCURRENCY.get(provider, DEFAULT_PROVIDER_CONCURRENCY)
+        )
+    return slots[provider]
+
 
 class LLMRouter:
     """Routes LLM calls to the best provider and handles fallback."""
@@ -81,20 +134,59 @@ class LLMRouter:
         provider_override: Optional[str] = None,
         temperature: float = DEFAULT_TEMPERATURE,
         max_tokens: int = DEFAULT_MAX_TOKENS,
+        cache_task: Optional[str] = None,
     ) -> str:
-        """Generate text with automatic fallback on failure."""
+        """Generate text with automatic fallback on failure.
+
+        With *cache_task* set (and enabled in ``LLM_CACHE_TASKS``), identical
+        requests are served from the response cache and concurrent duplicates
+        share one upstream call.
+        """
         provider = provider_override or self.select_provider(task_type)
+        if cache_task:
+            from services.llm_cache import cache_key, is_cacheable, response_cache
+
+            if is_cacheable(cache_task):
+                key = cache_key(
+                    provider, PROVIDER_MODELS.get(provider, provider),
+                    system_prompt, prompt, temperature, max_tokens,
+                )
+
+                async def compute() -> dict:
+                    text = await self._generate_with_fallback(
+                        provider, prompt, system_prompt, temperature, max_tokens
+                    )
+                    return {"text": text}
+
+                cached = await response_cache.get_or_compute(
+                    key, compute, task=cache_task, meta={"provider": provider}
+                )
+                return cached["text"]
+
+        return await self._generate_with_fallback(
+            provider, prompt, system_prompt, temperature, max_tokens
+        )
+
+    async def _generate_with_fallback(
+        self,
+        provider: str,
+        prompt: str,
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int,
+    ) -> str:
         chain = [provider] + FALLBACK_CHAINS.get(provider, [])
 
         last_error: Optional[Exception] = None
         for candidate in chain:
             try:
-                return await asyncio.wait_for(
-                    self._dispatch(
-                        candidate, prompt, system_prompt, temperature, max_tokens
-                    ),
-                    timeout=LLM_CALL_TIMEOUT_SECONDS,
-                )
+                async with provider_slot(candidate):
+                    return await asyncio.wait_for(
+                        self._dispatch(
+                            candidate, prompt, system_prompt, temperature, max_tokens
+                        ),
+                        timeout=LLM_CALL_TIMEOUT_SECONDS,
+                    )
             except Exception as exc:
                 logger.warning(
                     "Provider '%s' failed: %s — trying next", candidate, exc
@@ -116,10 +208,11 @@ class LLMRouter:
         Uses a longer timeout than text calls because PDF page images
         can be large and Gemini vision needs more processing time.
         """
-        return await asyncio.wait_for(
-            self._call_gemini_vision(prompt, image_bytes, mime_type),
-            timeout=LLM_VISION_TIMEOUT_SECONDS,
-        )
+        async with provider_slot("gemini_flash"):
+            return await asyncio.wait_for(
+                self._call_gemini_vision(prompt, image_bytes, mime_type),
+                timeout=LLM_VISION_TIMEOUT_SECONDS,
+            )
 
     # ------------------------------------------------------------------
     # Internal dispatch
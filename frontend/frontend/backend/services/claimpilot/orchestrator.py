@@ -3,14 +3,25 @@ Agent Orchestrator for ClaimPilot.
 
 Routes domain events to registered agents, manages the agent lifecycle,
 and submits actions requiring approval through the ApprovalGate.
+
+Agents mapped to an event share one AgentContext snapshot and run
+concurrently, each bounded by its ``timeout_seconds``; LLM calls are capped
+per provider in ``llm_router``. An agent listed in ``AGENT_DEPENDENCIES``
+waits for the agents it reads from when both are dispatched for the same
+event. Approval-gated actions are submitted in one batch per event, and each
+dispatch records its wall time against the sum of agent time in
+``claimpilot_audit``.
 """
 
+import asyncio
 import logging
+import time
 from typing import Optional
 
 from models import AgentResult, PendingAction
-from services.claimpilot.agent_context import AgentContextBuilder
+from services.claimpilot.agent_context import AgentContext, AgentContextBuilder
 from services.claimpilot.approval_gate import ApprovalGate
+from services.claimpilot.audit_logger import AuditLogger
 from services.claimpilot.base_agent import BaseAgent
 
 logger = logging.getLogger(__name__)
@@ -28,6 +39,12 @@ DEFAULT_EVENT_MAPPINGS = {
     "EstimateRequested": ["estimate_engine"],
 }
 
+# agent -> agents whose stored insights it reads; only enforced when both
+# are dispatched for the same event.
+AGENT_DEPENDENCIES: dict[str, set[str]] = {
+    "estimate_engine": {"vision_analyzer"},
+}
+
 
 class AgentOrchestrator:
     """Central router that dispatches domain events to registered agents."""
@@ -38,6 +55,7 @@ class AgentOrchestrator:
         self.event_map: dict[str, list[str]] = {}
         self.context_builder = AgentContextBuilder(db)
         self._approval_gate = ApprovalGate(db)
+        self._audit = AuditLogger(db)
 
     def register(self, name: str, agent: BaseAgent) -> None:
         """Register an agent instance by name."""
@@ -73,33 +91,111 @@ class AgentOrchestrator:
             )
             return []
 
-        results: list[AgentResult] = []
+        if context.is_frozen:
+            logger.info("orchestrator | claim frozen, skipping event=%s claim_id=%s", event_type, claim_id)
+            return []
+
+        dispatch: dict[str, BaseAgent] = {}
         for name in agent_names:
             agent = self.agents.get(name)
             if agent is None:
                 logger.warning("orchestrator | agent not registered name=%s", name)
                 continue
+            dispatch[name] = agent
+        if not dispatch:
+            return []
+
+        tasks: dict[str, asyncio.Task] = {}
+
+        async def run_after_dependencies(name: str, agent: BaseAgent):
+            upstream = [tasks[dep] for dep in AGENT_DEPENDENCIES.get(name, ()) if dep in tasks]
+            if upstream:
+                await asyncio.wait(upstream)
+            return await self._run_agent(agent, context)
 
-            result = await agent.run(context)
+        started = time.monotonic()
+        for name, agent in dispatch.items():
+            tasks[name] = asyncio.create_task(run_after_dependencies(name, agent))
+        outcomes = await asyncio.gather(*tasks.values())
+        wall_ms = int((time.monotonic() - started) * 1000)
+
+        results: list[AgentResult] = []
+        pending: list[PendingAction] = []
+        timings: list[dict] = []
+        for (name, agent), (result, status, duration_ms) in zip(dispatch.items(), outcomes):
+            timings.append({"name": name, "status": status, "duration_ms": duration_ms})
             if result is None:
                 continue
 
-            # Submit actions requiring approval through the gate
+            # Actions requiring approval go through the gate in one batch
             if agent.requires_approval and result.suggested_actions:
                 for action_desc in result.suggested_actions:
-                    pending = PendingAction(
+                    pending.append(PendingAction(
                         agent_name=agent.agent_name,
                         claim_id=claim_id,
                         action_type=action_desc,
                         confidence=result.confidence,
                         reasoning=result.summary,
-                    )
-                    await self._approval_gate.submit(pending)
+                    ))
 
             results.append(result)
 
+        if pending:
+            await self._approval_gate.submit_many(pending)
+
+        try:
+            await self._audit.log_dispatch(
+                event_type=event_type,
+                claim_id=claim_id,
+                agents=timings,
+                wall_ms=wall_ms,
+                pending_actions=len(pending),
+            )
+        except Exception:
+            logger.exception("orchestrator | dispatch audit failed event=%s claim_id=%s", event_type, claim_id)
+
         return results
 
+    async def _run_agent(self, agent: BaseAgent, context: AgentContext) -> tuple[Optional[AgentResult], str, int]:
+        """Run one agent within its time budget.
+
+        Never raises, so one slow or broken agent cannot sink the others.
+        Returns ``(result, status, duration_ms)``.
+        """
+        claim_id = context.claim.get("id", "unknown")
+        start = time.monotonic()
+        try:
+            result = await asyncio.wait_for(agent.run(context), timeout=agent.timeout_seconds)
+            status = "success" if result is not None else "no_result"
+        except asyncio.TimeoutError:
+            result, status = None, "timeout"
+            logger.warning(
+                "orchestrator | agent=%s claim=%s timed out after %ss",
+                agent.agent_name,
+                claim_id,
+                agent.timeout_seconds,
+            )
+        except Exception:
+            result, status = None, "error"
+            logger.exception("orchestrator | agent=%s claim=%s failed", agent.agent_name, claim_id)
+        duration_ms = int((time.monotonic() - start) * 1000)
+
+        if status == "timeout":
+            try:
+                await agent.audit.log_execution(
+                    agent_name=agent.agent_name,
+                    claim_id=claim_id,
+                    input_summary=f"context for {claim_id}",
+                    output_summary="",
+                    confidence=0.0,
+                    duration_ms=duration_ms,
+                    status="timeout",
+                    error_message=f"Exceeded {agent.timeout_seconds}s",
+                )
+            except Exception:
+                logger.exception("orchestrator | timeout audit failed agent=%s", agent.agent_name)
+        return result, status, duration_ms
+
     async def run_agent(self, agent_name: str, claim_id: str) -> Optional[AgentResult]:
         """Manually trigger a specific agent by name.
 
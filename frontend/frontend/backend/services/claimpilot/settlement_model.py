@@ -0,0 +1,361 @@
+"""
+Settlement Model — local tabular predictor for settlement percentiles,
+litigation probability, and timeline.
+
+Trained offline from closed claims (``scripts/train_settlement_model.py``)
+and stored as one JSON-able artifact in ``claimpilot_models``. The artifact is
+loaded once at startup; scoring is a feature encode plus one matrix product,
+so a single claim takes microseconds and the whole open book scores in one
+vectorised call.
+
+Outputs, all from linear models over standardised features:
+    p10 / p50 / p90      quantile regression on log1p(settlement_amount)
+    litigation           logistic regression on ``is_in_litigation``
+    timeline_months      ridge regression on log1p(months open)
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import re
+from datetime import datetime, timezone
+from typing import Any, Iterable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MODEL_ID = "settlement_predictor"
+MODEL_VERSION = 1
+MIN_TRAINING_CLAIMS = 50
+MAX_CARRIERS = 30
+MIN_CARRIER_CLAIMS = 5
+SCORE_BATCH_SIZE = 1000
+CLOSED_STATUSES = ["Closed", "Archived", "Completed"]
+QUANTILES = (0.1, 0.5, 0.9)
+OUTPUTS = ("p10", "p50", "p90", "litigation", "timeline")
+
+# Claim fields the encoder reads — also the projection for batch scoring.
+FEATURE_FIELDS = (
+    "id", "claim_number", "claim_type", "type", "carrier_name", "carrier",
+    "insurance_company", "estimated_value", "replacement_cost_value",
+    "deductible", "mortgage_company",
+)
+
+CLAIM_TYPE_KEYWORDS: tuple[tuple[str, str], ...] = (
+    ("hurricane", "hurricane"),
+    ("wind", "wind"),
+    ("hail", "hail"),
+    ("fire", "fire"),
+    ("smoke", "fire"),
+    ("flood", "water"),
+    ("water", "water"),
+    ("mold", "mold"),
+    ("roof", "roof"),
+)
+CLAIM_TYPES = ("hurricane", "wind", "hail", "fire", "water", "mold", "roof", "other")
+
+_MONTH_DAYS = 30.44
+
+
+def normalize_claim_type(raw: Any) -> str:
+    text = str(raw or "").lower()
+    for keyword, bucket in CLAIM_TYPE_KEYWORDS:
+        if keyword in text:
+            return bucket
+    return "other"
+
+
+def normalize_carrier(claim: dict) -> str:
+    raw = claim.get("carrier_name") or claim.get("carrier") or claim.get("insurance_company") or ""
+    return re.sub(r"\s+", " ", str(raw)).strip().lower()
+
+
+def _amount(value: Any) -> float:
+    try:
+        return max(float(value or 0), 0.0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _parse_dt(value: Any) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    if isinstance(value, str) and value:
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+    return None
+
+
+def months_open(claim: dict) -> Optional[float]:
+    """Created → closed (or last update) in months, for closed claims."""
+    opened = _parse_dt(claim.get("created_at"))
+    closed = _parse_dt(claim.get("closed_at") or claim.get("updated_at"))
+    if opened is None or closed is None or closed < opened:
+        return None
+    return (closed - opened).days / _MONTH_DAYS
+
+
+class SettlementModel:
+    """Fitted encoder + weight matrix; immutable once built."""
+
+    def __init__(self, artifact: dict[str, Any]) -> None:
+        self.artifact = artifact
+        self.carriers: list[str] = artifact["carriers"]
+        self.feature_names: list[str] = artifact["feature_names"]
+        self._carrier_index = {c: i for i, c in enumerate(self.carriers)}
+        self._type_index = {t: i for i, t in enumerate(CLAIM_TYPES)}
+        self._mean = np.asarray(artifact["mean"], dtype=np.float64)
+        self._scale = np.asarray(artifact["scale"], dtype=np.float64)
+        # (n_features + 1, len(OUTPUTS)); row 0 is the intercept
+        self._weights = np.asarray(artifact["weights"], dtype=np.float64)
+        self._numeric_offset = len(CLAIM_TYPES) + len(self.carriers)
+
+    @property
+    def n_features(self) -> int:
+        return len(self.feature_names)
+
+    # ------------------------------------------------------------------
+    # Encoding
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def numeric_features(claim: dict) -> tuple[float, float, float, float]:
+        return (
+            math.log1p(_amount(claim.get("estimated_value"))),
+            math.log1p(_amount(claim.get("replacement_cost_value"))),
+            math.log1p(_amount(claim.get("deductible"))),
+            1.0 if claim.get("mortgage_company") else 0.0,
+        )
+
+    def encode_many(self, claims: Iterable[dict]) -> np.ndarray:
+        claims = list(claims)
+        X = np.zeros((len(claims), self.n_features), dtype=np.float64)
+        for row, claim in enumerate(claims):
+            X[row, self._type_index[normalize_claim_type(claim.get("claim_type") or claim.get("type"))]] = 1.0
+            carrier = self._carrier_index.get(normalize_carrier(claim))
+            if carrier is not None:
+                X[row, len(CLAIM_TYPES) + carrier] = 1.0
+            X[row, self._numeric_offset:] = self.numeric_features(claim)
+        return X
+
+    def _design(self, X: np.ndarray) -> np.ndarray:
+        Z = (X - self._mean) / self._scale
+        return np.hstack([np.ones((Z.shape[0], 1)), Z])
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+
+    def score_matrix(self, X: np.ndarray) -> np.ndarray:
+        """Raw outputs per row: p10, p50, p90 ($), litigation (0-100), timeline (months)."""
+        raw = self._design(X) @ self._weights
+        out = np.empty_like(raw)
+        # Quantile heads are fitted independently; sort so they never cross.
+        out[:, :3] = np.expm1(np.sort(raw[:, :3], axis=1)).clip(min=0.0)
+        out[:, 3] = 100.0 / (1.0 + np.exp(-raw[:, 3]))
+        out[:, 4] = np.expm1(raw[:, 4]).clip(min=0.5)
+        return out
+
+    def predict_many(self, claims: list[dict]) -> list[dict[str, Any]]:
+        if not claims:
+            return []
+        scores = self.score_matrix(self.encode_many(claims))
+        return [self.to_prediction(row) for row in scores]
+
+    def predict(self, claim: dict) -> dict[str, Any]:
+        return self.predict_many([claim])[0]
+
+    @staticmethod
+    def to_prediction(row: np.ndarray) -> dict[str, Any]:
+        return {
+            "settlement_range": {
+                "p10": round(float(row[0]), 2),
+                "p50": round(float(row[1]), 2),
+                "p90": round(float(row[2]), 2),
+            },
+            "litigation_probability": round(float(row[3]), 1),
+            "timeline_months": max(int(round(float(row[4]))), 1),
+        }
+
+
+# ---------------------------------------------------------------------------
+# Offline training
+# ---------------------------------------------------------------------------
+
+def _fit_quantile(Z: np.ndarray, y: np.ndarray, tau: float, l2: float, iterations: int) -> np.ndarray:
+    """Linear quantile regression by full-batch subgradient descent on pinball loss."""
+    n = Z.shape[0]
+    w = np.zeros(Z.shape[1])
+    w[0] = np.quantile(y, tau)
+    for step in range(iterations):
+        residual = y - Z @ w
+        grad = -(Z.T @ np.where(residual > 0, tau, tau - 1.0)) / n + l2 * np.r_[0.0, w[1:]]
+        w -= (0.5 / math.sqrt(step + 1)) * grad
+    return w
+
+
+def _fit_logistic(Z: np.ndarray, y: np.ndarray, l2: float, iterations: int) -> np.ndarray:
+    n = Z.shape[0]
+    w = np.zeros(Z.shape[1])
+    rate = y.mean()
+    w[0] = math.log(max(rate, 1e-3) / max(1.0 - rate, 1e-3))
+    for _ in range(iterations):
+        p = 1.0 / (1.0 + np.exp(-(Z @ w)))
+        w -= 0.5 * ((Z.T @ (p - y)) / n + l2 * np.r_[0.0, w[1:]])
+    return w
+
+
+def _fit_ridge(Z: np.ndarray, y: np.ndarray, l2: float) -> np.ndarray:
+    penalty = l2 * len(y) * np.eye(Z.shape[1])
+    penalty[0, 0] = 0.0
+    return np.linalg.solve(Z.T @ Z + penalty, Z.T @ y)
+
+
+def train_settlement_model(
+    closed_claims: Iterable[dict],
+    *,
+    l2: float = 1e-3,
+    iterations: int = 3000,
+) -> SettlementModel:
+    """Fit all heads on closed claims that have a positive ``settlement_amount``."""
+    rows = [c for c in closed_claims if _amount(c.get("settlement_amount")) > 0]
+    if len(rows) < MIN_TRAINING_CLAIMS:
+        raise ValueError(f"Need at least {MIN_TRAINING_CLAIMS} settled claims, got {len(rows)}")
+
+    counts: dict[str, int] = {}
+    for claim in rows:
+        carrier = normalize_carrier(claim)
+        if carrier:
+            counts[carrier] = counts.get(carrier, 0) + 1
+    carriers = [
+        c for c, n in sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+        if n >= MIN_CARRIER_CLAIMS
+    ][:MAX_CARRIERS]
+    feature_names = (
+        [f"type:{t}" for t in CLAIM_TYPES]
+        + [f"carrier:{c}" for c in carriers]
+        + ["log_estimated_value", "log_replacement_cost", "log_deductible", "has_mortgage"]
+    )
+
+    placeholder = {
+        "carriers": carriers, "feature_names": feature_names,
+        "mean": [0.0] * len(feature_names), "scale": [1.0] * len(feature_names),
+        "weights": [[0.0] * len(OUTPUTS)] * (len(feature_names) + 1),
+    }
+    X = SettlementModel(placeholder).encode_many(rows)
+    mean = X.mean(axis=0)
+    scale = X.std(axis=0)
+    scale[scale < 1e-9] = 1.0
+    Z = np.hstack([np.ones((X.shape[0], 1)), (X - mean) / scale])
+
+    log_settlement = np.log1p(np.array([_amount(c["settlement_amount"]) for c in rows]))
+    litigated = np.array([1.0 if c.get("is_in_litigation") else 0.0 for c in rows])
+    months = np.array([months_open(c) for c in rows], dtype=object)
+    has_months = np.array([m is not None for m in months])
+
+    columns = [_fit_quantile(Z, log_settlement, tau, l2, iterations) for tau in QUANTILES]
+    columns.append(_fit_logistic(Z, litigated, l2, iterations))
+    if has_months.any():
+        columns.append(_fit_ridge(Z[has_months], np.log1p(months[has_months].astype(np.float64)), l2))
+    else:
+        columns.append(np.r_[math.log1p(4.0), np.zeros(Z.shape[1] - 1)])
+
+    return SettlementModel({
+        "_id": MODEL_ID,
+        "version": MODEL_VERSION,
+        "trained_at": datetime.now(timezone.utc).isoformat(),
+        "n_samples": len(rows),
+        "carriers": carriers,
+        "feature_names": feature_names,
+        "mean": mean.tolist(),
+        "scale": scale.tolist(),
+        "weights": np.column_stack(columns).tolist(),
+    })
+
+
+# ---------------------------------------------------------------------------
+# Process-wide instance
+# ---------------------------------------------------------------------------
+
+_model: Optional[SettlementModel] = None
+
+
+def get_settlement_model() -> Optional[SettlementModel]:
+    """The model loaded at startup, or None when none has been trained."""
+    return _model
+
+
+def set_settlement_model(model: Optional[SettlementModel]) -> None:
+    global _model  # noqa: PLW0603
+    _model = model
+
+
+async def save_settlement_model(db: Any, model: SettlementModel) -> None:
+    fields = {k: v for k, v in model.artifact.items() if k != "_id"}
+    await db.claimpilot_models.update_one({"_id": MODEL_ID}, {"$set": fields}, upsert=True)
+
+
+async def load_settlement_model(db: Any) -> Optional[SettlementModel]:
+    """Load the trained artifact once; a missing or stale one leaves the LLM path in place."""
+    artifact = await db.claimpilot_models.find_one({"_id": MODEL_ID})
+    if not artifact or artifact.get("version") != MODEL_VERSION:
+        logger.info("No settlement model v%d found; predictions use the LLM", MODEL_VERSION)
+        set_settlement_model(None)
+        return None
+    model = SettlementModel(artifact)
+    set_settlement_model(model)
+    logger.info(
+        "Settlement model loaded: %d samples, %d features, trained %s",
+        artifact.get("n_samples", 0), model.n_features, artifact.get("trained_at"),
+    )
+    return model
+
+
+async def score_open_book(db: Any, model: SettlementModel, top: int = 100) -> dict[str, Any]:
+    """Score every open claim in batches; totals over the book plus the *top* by p50."""
+    projection = {"_id": 0, **{field: 1 for field in FEATURE_FIELDS}}
+    cursor = db.claims.find(
+        {"status": {"$nin": CLOSED_STATUSES}, "is_archived": {"$ne": True}}, projection
+    )
+    totals = {"claims": 0, "p10": 0.0, "p50": 0.0, "p90": 0.0, "expected_litigations": 0.0}
+    ranked: list[dict[str, Any]] = []
+
+    async def flush(batch: list[dict]) -> None:
+        scores = model.score_matrix(model.encode_many(batch))
+        totals["claims"] += len(batch)
+        totals["p10"] += float(scores[:, 0].sum())
+        totals["p50"] += float(scores[:, 1].sum())
+        totals["p90"] += float(scores[:, 2].sum())
+        totals["expected_litigations"] += float(scores[:, 3].sum()) / 100.0
+        for k in np.argsort(-scores[:, 1])[:top]:
+            ranked.append({
+                "claim_id": batch[k].get("id"),
+                "claim_number": batch[k].get("claim_number"),
+                **model.to_prediction(scores[k]),
+            })
+
+    batch: list[dict] = []
+    async for claim in cursor:
+        batch.append(claim)
+        if len(batch) >= SCORE_BATCH_SIZE:
+            await flush(batch)
+            batch = []
+    if batch:
+        await flush(batch)
+
+    ranked.sort(key=lambda row: row["settlement_range"]["p50"], reverse=True)
+    for key in ("p10", "p50", "p90", "expected_litigations"):
+        totals[key] = round(totals[key], 2)
+    return {
+        "totals": totals,
+        "claims": ranked[:top],
+        "model": {
+            "trained_at": model.artifact.get("trained_at"),
+            "n_samples": model.artifact.get("n_samples"),
+        },
+    }
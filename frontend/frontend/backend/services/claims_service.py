@@ -1,5 +1,7 @@
+import base64
 import logging
 import os
+import time
 import uuid
 from datetime import datetime, timezone
 from typing import List, Optional, Dict, Any
@@ -7,6 +9,10 @@ from fastapi import HTTPException
 
 from models import ClaimCreate, ClaimUpdate, Claim
 from dependencies import db
+from services.claim_matcher import invalidate_claim_matcher
+from services.claim_summary import delete_claim_summary, refresh_claim_summary
+from services.dashboard_snapshot import mark_claims_changed
+from services.observability import MetricsCollector
 
 # Structured logging setup
 logger = logging.getLogger(__name__)
@@ -24,6 +30,95 @@ ALLOWED_TRANSITIONS = {
     "Archived": ["New", "In Progress"]  # Can be restored to active workflow
 }
 
+# --- Cursor listing for table views ---
+CLAIM_LIST_DEFAULT_LIMIT = 50
+CLAIM_LIST_MAX_LIMIT = 200
+CLAIM_LIST_SORT = [("created_at", -1), ("id", -1)]
+CLAIM_LIST_FIELD_PRESETS = {
+    "list": (
+        "id", "claim_number", "client_name", "status", "priority", "assigned_to",
+        "carrier_name", "claim_type", "property_address", "policy_number",
+        "date_of_loss", "estimated_value", "created_at", "updated_at",
+    ),
+    "compact": ("id", "claim_number", "client_name", "status", "created_at"),
+}
+CLAIM_LIST_SELECTABLE_FIELDS = frozenset(Claim.model_fields) | {"assigned_to_id", "is_archived"}
+# Equality filter first, then the keyset sort (ESR), one per list filter.
+CLAIM_LIST_INDEXES = [
+    [("created_at", -1), ("id", -1)],
+    [("status", 1), ("created_at", -1), ("id", -1)],
+    [("assigned_to", 1), ("created_at", -1), ("id", -1)],
+    [("carrier_name", 1), ("created_at", -1), ("id", -1)],
+    [("client_email", 1), ("created_at", -1), ("id", -1)],
+]
+
+
+def resolve_claim_list_fields(fields: Optional[str]) -> List[str]:
+    """Preset name or comma-separated field names -> projected fields.
+
+    ``id`` and ``created_at`` are always included since the cursor needs them.
+    """
+    if not fields:
+        fields = "list"
+    if fields in CLAIM_LIST_FIELD_PRESETS:
+        selected = list(CLAIM_LIST_FIELD_PRESETS[fields])
+    else:
+        selected = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = sorted(set(selected) - CLAIM_LIST_SELECTABLE_FIELDS)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown claim fields: {', '.join(unknown)}")
+    for required in ("created_at", "id"):
+        if required not in selected:
+            selected.insert(0, required)
+    return selected
+
+
+def encode_claim_cursor(claim: Dict[str, Any]) -> str:
+    """Opaque ``created_at|id`` cursor, tagged with the stored value's type.
+
+    Claims created through the API store ``created_at`` as a date while
+    imports store ISO strings, so the tag keeps the keyset comparison
+    type-correct on resume.
+    """
+    created_at = claim.get("created_at")
+    if isinstance(created_at, datetime):
+        raw = f"d|{created_at.isoformat()}|{claim.get('id', '')}"
+    elif created_at:
+        raw = f"s|{created_at}|{claim.get('id', '')}"
+    else:
+        raw = f"n||{claim.get('id', '')}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def claim_keyset_filter(cursor: str) -> Dict[str, Any]:
+    """Claims strictly after the cursor in ``CLAIM_LIST_SORT`` order.
+
+    Mongo sorts dates above strings above null, so a page boundary in the
+    dates continues into every string and missing ``created_at``.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        kind, value, claim_id = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8").split("|", 2)
+        if kind == "d":
+            created_at = datetime.fromisoformat(value)
+        elif kind == "s":
+            created_at = value
+        elif kind == "n":
+            created_at = None
+        else:
+            raise ValueError(kind)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid claims cursor")
+
+    clauses = [{"created_at": created_at, "id": {"$lt": claim_id}}]
+    if kind != "n":
+        clauses.insert(0, {"created_at": {"$lt": created_at}})
+        clauses.append({"created_at": None})
+    if kind == "d":
+        clauses.append({"created_at": {"$type": "string"}})
+    return {"$or": clauses}
+
+
 class ClaimsService:
     def __init__(self, database=db):
         self.db = database
@@ -146,6 +241,57 @@ class ClaimsService:
             logger.error(f"Get claims error: {e}")
             raise HTTPException(status_code=500, detail="Internal server error")
 
+    async def list_claims(
+        self,
+        current_user: Dict[str, Any],
+        *,
+        status: Optional[str] = None,
+        assigned_to: Optional[str] = None,
+        carrier: Optional[str] = None,
+        include_archived: bool = False,
+        fields: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = CLAIM_LIST_DEFAULT_LIMIT,
+    ) -> Dict[str, Any]:
+        """One keyset page of projected claim rows for list views.
+
+        Rows are returned as stored (projected, not validated through
+        ``Claim``); the cursor walks ``created_at``/``id`` newest first.
+        """
+        selected = resolve_claim_list_fields(fields)
+        query: Dict[str, Any] = {}
+        if not include_archived:
+            query["is_archived"] = {"$ne": True}
+        if current_user["role"] == "client":
+            query["client_email"] = current_user["email"]
+        if status and status != "All":
+            query["status"] = status
+        if assigned_to:
+            query["assigned_to"] = assigned_to
+        if carrier:
+            query["carrier_name"] = carrier
+        if cursor:
+            query.update(claim_keyset_filter(cursor))
+
+        page_size = max(1, min(limit, CLAIM_LIST_MAX_LIMIT))
+        projection = {"_id": 0, **{name: 1 for name in selected}}
+        t0 = time.monotonic()
+        try:
+            page = await self.db.claims.find(query, projection).sort(CLAIM_LIST_SORT).limit(page_size + 1).to_list(page_size + 1)
+        except Exception as e:
+            logger.error(f"List claims error: {e}")
+            raise HTTPException(status_code=500, detail="Internal server error")
+        MetricsCollector.record_timing("claims_list_ms", round((time.monotonic() - t0) * 1000, 1))
+
+        has_more = len(page) > page_size
+        rows = page[:page_size]
+        return {
+            "claims": rows,
+            "next_cursor": encode_claim_cursor(rows[-1]) if has_more else None,
+            "has_more": has_more,
+            "fields": selected,
+        }
+
     async def get_claim(self, claim_id: str, current_user: Dict[str, Any]) -> Claim:
         """Get specific claim by ID with permission check"""
         try:
@@ -179,6 +325,9 @@ class ClaimsService:
                 if result.deleted_count == 0:
                     raise HTTPException(status_code=404, detail="Claim not found")
                 logger.info(f"Claim permanently deleted: {claim_id}")
+                invalidate_claim_matcher()
+                mark_claims_changed()
+                await delete_claim_summary(claim_id, self.db)
                 return {"message": "Claim permanently deleted"}
             else:
                 # Soft delete - archive the claim
@@ -268,6 +417,10 @@ class ClaimsService:
         This keeps the core service logic clean.
         """
         logger.info(f"DOMAIN_EVENT: {event_type} for Claim {claim.id}")
+
+        # Derived read caches: email auto-matching and the Garden dashboard
+        invalidate_claim_matcher()
+        mark_claims_changed()
         
         # 1. Structured Logging (Audit Trail)
         self._log_claim_event(event_type, claim.id, user["email"], details)
@@ -277,6 +430,8 @@ class ClaimsService:
         # Here we just await the handlers directly.
         
         if event_type == "ClaimCreated":
+            # Seed the read model so the first detail view is a point read
+            await refresh_claim_summary(claim.id, database=self.db)
             await self._notify_claim_created(claim, user["full_name"])
             await self._email_claim_created(claim)
             try:
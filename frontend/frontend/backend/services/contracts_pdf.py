@@ -5,7 +5,6 @@ from datetime import datetime
 from typing import Any, Dict
 
 import httpx
-import fitz  # PyMuPDF
 
 logger = logging.getLogger(__name__)
 
@@ -68,6 +67,8 @@ async def build_contract_pdf_bytes(contract: Dict[str, Any], template_pdf_url: s
             raise RuntimeError("Failed to download template PDF")
         pdf_bytes = pdf_response.content
 
+    import fitz  # PyMuPDF
+
     doc = fitz.open(stream=pdf_bytes, filetype="pdf")
 
     field_positions = PA_AGREEMENT_FIELD_POSITIONS
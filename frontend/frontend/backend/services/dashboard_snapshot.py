@@ -0,0 +1,278 @@
+"""
+Garden operations dashboard snapshot.
+
+Every dashboard section comes from a single ``$facet`` pipeline over
+``claims`` (plus one over ``tasks``), with claim aging bucketed server-side
+by elapsed days instead of pulling active claims into Python.
+
+The snapshot is the same for every viewer, so it is cached in-process for
+``SNAPSHOT_TTL_SECONDS`` and computed single-flight: concurrent dashboard
+loads await one shared computation. Claim writes mark the snapshot stale and
+schedule a debounced background refresh, so a burst of edits costs one
+recompute and the next page load is usually served warm.
+"""
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from dependencies import db as default_db
+from services.observability import MetricsCollector
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_TTL_SECONDS = int(os.environ.get("DASHBOARD_SNAPSHOT_TTL_SECONDS", "30"))
+REFRESH_DEBOUNCE_SECONDS = 2.0
+
+CLOSED_STATUSES = ["Closed", "Archived", "Completed"]
+# (label, max days open) — anything older falls into "90+"
+AGING_BUCKETS = [("0-7", 7), ("8-14", 14), ("15-30", 30), ("31-60", 60), ("61-90", 90)]
+
+_snapshot: Optional[dict] = None
+_computed_at = 0.0
+_stale = False
+_inflight: Optional[asyncio.Task] = None
+_refresh_scheduled: Optional[asyncio.Task] = None
+
+
+# ISO string split into its local part (fraction dropped) and offset
+ISO_DATETIME_PARTS = r"^(\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2})?)?)(?:\.\d+)?(Z|[+-]\d{2}:?\d{2})?$"
+MS_PER_DAY = 24 * 60 * 60 * 1000
+
+
+def _created_at_as_date() -> dict:
+    """``created_at`` as a BSON date; stored values are ISO strings or dates.
+
+    Strings keep their UTC offset (naive ones are UTC, as before). Only the
+    fractional seconds are dropped: Mongo rejects Python's microsecond suffix.
+    """
+    parts = {"$regexFind": {"input": "$created_at", "regex": ISO_DATETIME_PARTS}}
+    offset = {"$arrayElemAt": ["$$iso.captures", 1]}
+    return {"$switch": {
+        "branches": [
+            {"case": {"$eq": [{"$type": "$created_at"}, "date"]}, "then": "$created_at"},
+            {"case": {"$eq": [{"$type": "$created_at"}, "string"]}, "then": {"$let": {
+                "vars": {"iso": parts},
+                "in": {"$dateFromString": {
+                    "dateString": {"$arrayElemAt": ["$$iso.captures", 0]},
+                    "timezone": {"$cond": [{"$in": [offset, [None, "Z"]]}, "UTC", offset]},
+                    "onError": None,
+                    "onNull": None,
+                }},
+            }}},
+        ],
+        "default": None,
+    }}
+
+
+def claims_facet_pipeline(now: datetime) -> list:
+    seven_days_ago = (now - timedelta(days=7)).isoformat()
+    fourteen_days_ago = (now - timedelta(days=14)).isoformat()
+    thirty_days_ago = (now - timedelta(days=30)).isoformat()
+    value = {"$ifNull": ["$estimated_value", 0]}
+
+    return [
+        {"$match": {"is_archived": {"$ne": True}}},
+        {"$facet": {
+            "pipeline": [
+                {"$group": {"_id": "$status", "count": {"$sum": 1}, "total_value": {"$sum": value}}},
+            ],
+            "financials": [
+                {"$group": {
+                    "_id": None,
+                    "total_estimated": {"$sum": value},
+                    "total_settlement": {"$sum": {"$ifNull": ["$settlement_amount", 0]}},
+                    "total_acv": {"$sum": {"$ifNull": ["$actual_cash_value", 0]}},
+                    "total_rcv": {"$sum": {"$ifNull": ["$replacement_cost_value", 0]}},
+                    "avg_claim_value": {"$avg": value},
+                }},
+            ],
+            "by_type": [
+                {"$group": {"_id": "$claim_type", "count": {"$sum": 1}, "value": {"$sum": value}}},
+                {"$sort": {"count": -1}},
+                {"$limit": 20},
+            ],
+            "by_priority": [
+                {"$group": {"_id": "$priority", "count": {"$sum": 1}}},
+            ],
+            "aging": [
+                {"$match": {"status": {"$nin": ["Closed", "Archived"]}}},
+                {"$project": {"created": _created_at_as_date()}},
+                {"$match": {"created": {"$ne": None}}},
+                # Elapsed whole days, like ``(now - created).days``; $dateDiff
+                # with unit "day" would count midnights crossed instead.
+                {"$project": {"days_open": {
+                    "$floor": {"$divide": [{"$subtract": [now, "$created"]}, MS_PER_DAY]},
+                }}},
+                {"$group": {
+                    "_id": {"$switch": {
+                        "branches": [
+                            {"case": {"$lte": ["$days_open", limit]}, "then": label}
+                            for label, limit in AGING_BUCKETS
+                        ],
+                        "default": "90+",
+                    }},
+                    "count": {"$sum": 1},
+                }},
+            ],
+            "adjuster_workload": [
+                {"$match": {"status": {"$nin": CLOSED_STATUSES}}},
+                {"$group": {"_id": "$assigned_to", "count": {"$sum": 1}, "value": {"$sum": value}}},
+                {"$sort": {"count": -1}},
+                {"$limit": 30},
+            ],
+            "stale_claims": [
+                {"$match": {"status": {"$nin": CLOSED_STATUSES}, "updated_at": {"$lt": fourteen_days_ago}}},
+                {"$sort": {"updated_at": 1}},
+                {"$limit": 20},
+                {"$project": {
+                    "_id": 0, "id": 1, "claim_number": 1, "client_name": 1,
+                    "status": 1, "updated_at": 1, "estimated_value": 1,
+                }},
+            ],
+            "recent_activity": [
+                {"$match": {"updated_at": {"$gte": seven_days_ago}}},
+                {"$sort": {"updated_at": -1}},
+                {"$limit": 10},
+                {"$project": {"_id": 0, "id": 1, "claim_number": 1, "client_name": 1, "status": 1, "updated_at": 1}},
+            ],
+            "new_last_30": [
+                {"$match": {"created_at": {"$gte": thirty_days_ago}}},
+                {"$count": "count"},
+            ],
+        }},
+    ]
+
+
+def tasks_facet_pipeline(today_str: str) -> list:
+    return [
+        {"$facet": {
+            "overdue": [
+                {"$match": {"status": {"$ne": "completed"}, "due_date": {"$lt": today_str, "$ne": None}}},
+                {"$count": "count"},
+            ],
+            "pending": [{"$match": {"status": "pending"}}, {"$count": "count"}],
+            "in_progress": [{"$match": {"status": "in_progress"}}, {"$count": "count"}],
+        }},
+    ]
+
+
+def _count(rows: list) -> int:
+    return rows[0]["count"] if rows else 0
+
+
+def shape_snapshot(claims: dict, tasks: dict, now: datetime) -> dict:
+    """Turn the two facet results into the dashboard response."""
+    pipeline = {}
+    total_claims = 0
+    total_value = 0
+    for row in claims.get("pipeline", []):
+        status = row["_id"] or "Unknown"
+        pipeline[status] = {"count": row["count"], "value": row["total_value"]}
+        total_claims += row["count"]
+        total_value += row["total_value"]
+
+    financials = dict(claims["financials"][0]) if claims.get("financials") else {
+        "total_estimated": 0, "total_settlement": 0, "total_acv": 0,
+        "total_rcv": 0, "avg_claim_value": 0,
+    }
+    financials.pop("_id", None)
+
+    aging = {label: 0 for label, _ in AGING_BUCKETS}
+    aging["90+"] = 0
+    for row in claims.get("aging", []):
+        aging[row["_id"]] = row["count"]
+
+    settled_count = pipeline.get("Completed", {}).get("count", 0) + pipeline.get("Closed", {}).get("count", 0)
+    total_resolved = settled_count + pipeline.get("Denied", {}).get("count", 0)
+
+    return {
+        "total_claims": total_claims,
+        "total_value": total_value,
+        "pipeline": pipeline,
+        "financials": financials,
+        "tasks": {
+            "overdue": _count(tasks.get("overdue", [])),
+            "pending": _count(tasks.get("pending", [])),
+            "in_progress": _count(tasks.get("in_progress", [])),
+        },
+        "stale_claims": claims.get("stale_claims", []),
+        "recent_activity": claims.get("recent_activity", []),
+        "claims_by_type": [
+            {"type": row["_id"] or "Unknown", "count": row["count"], "value": row["value"]}
+            for row in claims.get("by_type", [])
+        ],
+        "claims_by_priority": {row["_id"] or "Medium": row["count"] for row in claims.get("by_priority", [])},
+        "aging": aging,
+        "adjuster_workload": [
+            {"name": row["_id"] or "Unassigned", "claims": row["count"], "value": row["value"]}
+            for row in claims.get("adjuster_workload", [])
+        ],
+        "settlement_rate": round((settled_count / max(1, total_resolved)) * 100),
+        "new_last_30": _count(claims.get("new_last_30", [])),
+        "snapshot_at": now.isoformat(),
+    }
+
+
+async def compute_dashboard_snapshot(database=None, now: Optional[datetime] = None) -> dict:
+    database = database if database is not None else default_db
+    now = now or datetime.now(timezone.utc)
+    t0 = time.monotonic()
+    claims_rows, tasks_rows = await asyncio.gather(
+        database.claims.aggregate(claims_facet_pipeline(now)).to_list(1),
+        database.tasks.aggregate(tasks_facet_pipeline(now.strftime("%Y-%m-%d"))).to_list(1),
+    )
+    snapshot = shape_snapshot(claims_rows[0] if claims_rows else {}, tasks_rows[0] if tasks_rows else {}, now)
+    MetricsCollector.record_timing("garden_dashboard_snapshot_ms", round((time.monotonic() - t0) * 1000, 1))
+    return snapshot
+
+
+async def _refresh(database) -> dict:
+    global _stale, _inflight
+    if _inflight is None or _inflight.done():
+        _stale = False
+
+        async def _compute():
+            global _snapshot, _computed_at
+            result = await compute_dashboard_snapshot(database)
+            _snapshot, _computed_at = result, time.monotonic()
+            return result
+
+        _inflight = asyncio.create_task(_compute())
+    return await asyncio.shield(_inflight)
+
+
+async def get_dashboard_snapshot(database=None) -> dict:
+    """Cached snapshot; concurrent callers share one computation."""
+    if _snapshot is not None and not _stale and time.monotonic() - _computed_at < SNAPSHOT_TTL_SECONDS:
+        MetricsCollector.increment("garden_dashboard_snapshot_hits_total")
+        return _snapshot
+    return await _refresh(database)
+
+
+def mark_claims_changed(database=None) -> None:
+    """Flag the snapshot stale after a claim write and schedule a debounced refresh."""
+    global _stale, _refresh_scheduled
+    _stale = True
+    if _snapshot is None or (_refresh_scheduled is not None and not _refresh_scheduled.done()):
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+
+    async def _debounced():
+        await asyncio.sleep(REFRESH_DEBOUNCE_SECONDS)
+        try:
+            await _refresh(database)
+        except Exception as e:
+            logger.warning("Dashboard snapshot refresh failed: %s", e)
+
+    _refresh_scheduled = loop.create_task(_debounced())
+
+
+def reset_dashboard_snapshot() -> None:
+    global _snapshot, _computed_at, _stale
+    _snapshot, _computed_at, _stale = None, 0.0, False
@@ -4,7 +4,6 @@ Detects estimate page ranges and vendor formats within carrier PDF packages.
 Carrier PDFs often include cover letters, settlement letters, photos, and
 appendices before/after the actual estimate pages.
 """
-import fitz  # PyMuPDF
 import re
 import logging
 from typing import List, Optional, Tuple
@@ -99,6 +98,8 @@ class DocumentSegmenter:
 
     def segment(self, pdf_bytes: bytes) -> SegmentResult:
         """Analyse *pdf_bytes* and return segmentation metadata."""
+        import fitz  # PyMuPDF
+
         doc = fitz.open(stream=pdf_bytes, filetype="pdf")
         total_pages = len(doc)
 
@@ -1,6 +1,4 @@
 from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseUpload
 from googleapiclient.errors import HttpError
 import io
 import os
@@ -24,6 +22,9 @@ class DriveService:
     
     def get_service(self):
         """Build and return Drive API service"""
+        # discovery pulls in google.api_core; only pay for it when a client is built
+        from googleapiclient.discovery import build
+
         return build('drive', 'v3', credentials=self.credentials)
     
     async def create_folder(self, folder_name: str, parent_id: Optional[str] = None) -> str:
@@ -84,6 +85,8 @@ class DriveService:
             if folder_id:
                 file_metadata['parents'] = [folder_id]
             
+            from googleapiclient.http import MediaIoBaseUpload
+
             # Create file in memory
             fh = io.BytesIO(file_content)
             media = MediaIoBaseUpload(fh, mimetype=mime_type, resumable=True)
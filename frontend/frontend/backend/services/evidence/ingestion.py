@@ -8,9 +8,7 @@ import uuid
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Tuple
 
-import fitz
 import httpx
-from docx import Document
 
 from routes.oauth import get_valid_token, refresh_google_token
 from services.observability import MetricsCollector
@@ -1026,6 +1024,8 @@ class EvidenceIngestionService:
         lowered_type = (mime_type or "").lower()
 
         if lowered_name.endswith(".pdf") or "pdf" in lowered_type:
+            import fitz
+
             doc = fitz.open(stream=payload, filetype="pdf")
             try:
                 pages: List[str] = []
@@ -1036,6 +1036,8 @@ class EvidenceIngestionService:
                 doc.close()
 
         if lowered_name.endswith(".docx") or "officedocument.wordprocessingml.document" in lowered_type:
+            from docx import Document
+
             docx_doc = Document(io.BytesIO(payload))
             return "\n".join((p.text or "") for p in docx_doc.paragraphs).strip()
 
@@ -2,18 +2,12 @@
 from __future__ import annotations
 
 import re
+from functools import lru_cache
 from typing import Any, Dict, List, Tuple
 
-from .schemas import ClaimIdentityProfile
-
+from services.claim_matcher import KeywordAutomaton
 
-def _contains_any(haystack: str, needles: List[str]) -> bool:
-    lower = haystack.lower()
-    for needle in needles:
-        token = (needle or "").strip().lower()
-        if token and token in lower:
-            return True
-    return False
+from .schemas import ClaimIdentityProfile
 
 
 def _extract_carrier_domains(profile: ClaimIdentityProfile) -> List[str]:
@@ -30,6 +24,51 @@ def _extract_carrier_domains(profile: ClaimIdentityProfile) -> List[str]:
     return domains
 
 
+def _address_fragments(profile: ClaimIdentityProfile) -> List[str]:
+    fragments: List[str] = []
+    for addr in profile.addresses:
+        parts = [p.strip() for p in re.split(r"[,#]", addr) if p.strip()]
+        fragments.extend(parts[:2])
+    return fragments
+
+
+def _insured_last_names(profile: ClaimIdentityProfile) -> List[str]:
+    last_names: List[str] = []
+    for name in profile.policyholder_names:
+        pieces = [p for p in re.split(r"\s+", name.strip()) if p]
+        if pieces:
+            last_names.append(pieces[-1])
+    return last_names
+
+
+@lru_cache(maxsize=256)
+def _compile_groups(groups: Tuple[Tuple[str, Tuple[str, ...]], ...]) -> KeywordAutomaton:
+    automaton = KeywordAutomaton()
+    for group, needles in groups:
+        for needle in needles:
+            token = (needle or "").strip().lower()
+            if token:
+                automaton.add(token, group)
+    return automaton.build()
+
+
+def _profile_automaton(profile: ClaimIdentityProfile) -> KeywordAutomaton:
+    """One automaton over every identifier group, cached per profile content.
+
+    Ingestion scores every message of a run against the same profile, so the
+    automaton is compiled once and each text is scanned once for all groups.
+    """
+    groups = {
+        "claim_numbers": profile.claim_numbers,
+        "policy_numbers": profile.policy_numbers,
+        "address_fragments": _address_fragments(profile),
+        "insured_last_names": _insured_last_names(profile),
+        "adjuster_emails": profile.adjuster_emails,
+        "carrier_domains": _extract_carrier_domains(profile),
+    }
+    return _compile_groups(tuple((group, tuple(needles)) for group, needles in groups.items()))
+
+
 def score_email_relevance(
     *,
     profile: ClaimIdentityProfile,
@@ -66,34 +105,28 @@ def score_email_relevance(
             soft_score += points
         reasons.append(reason)
 
+    automaton = _profile_automaton(profile)
+    in_combined = automaton.values_in(combined.lower())
+    in_parties = automaton.values_in(parties.lower())
+
     # Hard matches.
-    if _contains_any(combined, profile.claim_numbers):
+    if "claim_numbers" in in_combined:
         add(40, "hard: claim number match", True)
 
-    if _contains_any(combined, profile.policy_numbers):
+    if "policy_numbers" in in_combined:
         add(35, "hard: policy number match", True)
 
-    address_fragments = []
-    for addr in profile.addresses:
-        parts = [p.strip() for p in re.split(r"[,#]", addr) if p.strip()]
-        address_fragments.extend(parts[:2])
-    if _contains_any(combined, address_fragments):
+    if "address_fragments" in in_combined:
         add(30, "hard: address fragment match", True)
 
-    insured_last_names: List[str] = []
-    for name in profile.policyholder_names:
-        pieces = [p for p in re.split(r"\s+", name.strip()) if p]
-        if pieces:
-            insured_last_names.append(pieces[-1])
-    if _contains_any(combined, insured_last_names) and _contains_any(combined, address_fragments):
+    if "insured_last_names" in in_combined and "address_fragments" in in_combined:
         add(30, "hard: insured last name + address match", True)
 
-    if _contains_any(parties, profile.adjuster_emails):
+    if "adjuster_emails" in in_parties:
         add(25, "hard: adjuster email match", True)
 
     # Soft matches.
-    carrier_domains = _extract_carrier_domains(profile)
-    if _contains_any(parties, carrier_domains) and _contains_any(combined, insured_last_names):
+    if "carrier_domains" in in_parties and "insured_last_names" in in_combined:
         add(10, "soft: carrier domain + insured last name", False)
 
     participants_blob = " ".join([
@@ -101,12 +134,12 @@ def score_email_relevance(
         str(headers.get("to") or ""),
         str(headers.get("cc") or ""),
     ])
-    if _contains_any(participants_blob, profile.adjuster_emails):
+    if "adjuster_emails" in automaton.values_in(participants_blob.lower()):
         add(10, "soft: thread participant overlap", False)
 
     attachment_names = " ".join(str(att.get("filename") or "") for att in attachments)
-    key_tokens = profile.claim_numbers + profile.policy_numbers + insured_last_names
-    if _contains_any(attachment_names, key_tokens):
+    in_attachments = automaton.values_in(attachment_names.lower())
+    if in_attachments & {"claim_numbers", "policy_numbers", "insured_last_names"}:
         add(10, "soft: attachment filename identifiers", False)
 
     score = max(0, min(100, score))
@@ -5,9 +5,6 @@ import os
 from dataclasses import dataclass
 from typing import Dict, Optional, Tuple
 
-import boto3
-from botocore.client import Config
-
 
 @dataclass
 class StorageSettings:
@@ -38,6 +35,9 @@ class ObjectStorageService:
             signed_url_ttl_seconds=ttl,
         )
 
+        import boto3
+        from botocore.client import Config
+
         session = boto3.session.Session()
         self.client = session.client(
             "s3",
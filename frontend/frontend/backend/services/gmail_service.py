@@ -1,5 +1,4 @@
 from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
@@ -30,6 +29,9 @@ class GmailService:
     
     def get_service(self):
         """Build and return Gmail API service"""
+        # discovery pulls in google.api_core; only pay for it when a client is built
+        from googleapiclient.discovery import build
+
         return build('gmail', 'v1', credentials=self.credentials)
     
     async def send_email(
@@ -0,0 +1,247 @@
+"""
+Chunked GridFS responses with byte ranges and conditional GETs.
+
+``gridfs_response`` serves a GridFS file without buffering it: chunks are
+read from Mongo as the client consumes them. It answers
+
+- ``Range: bytes=a-b`` (single range; ``If-Range`` honoured) with 206,
+  or 416 when the range is past the end of the file,
+- ``If-None-Match`` / ``If-Modified-Since`` with 304.
+
+The ETag is the file's stored md5 when GridFS has one (files written
+before PyMongo 4), otherwise a digest of its ``_id``, length and upload
+date, which never change for a stored GridFS file.
+
+``open_grid_out`` is the shared lookup (by ``grid_id``, falling back to
+the stored filename) used by the uploads download route, Gmail attachment
+downloads and the PDF extractor.
+
+``stream_upload_to_gridfs`` is the write side: it copies an upload into
+GridFS one read at a time, checking the first chunk's header, enforcing a
+running size cap and hashing (SHA-256) as it goes.
+"""
+import hashlib
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, AsyncIterator, Callable, Mapping, Optional, Tuple
+
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_READ_SIZE = 255 * 1024  # GridFS default chunk size
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class UploadRejected(Exception):
+    """The first chunk failed the caller's header check."""
+
+
+async def open_grid_out(bucket, grid_id=None, filename: Optional[str] = None):
+    """Open a GridFS file by ``grid_id``, falling back to its stored filename."""
+    from bson import ObjectId
+
+    if grid_id:
+        try:
+            oid = grid_id if isinstance(grid_id, ObjectId) else ObjectId(grid_id)
+            return await bucket.open_download_stream(oid)
+        except Exception as e:
+            if not filename:
+                raise
+            logger.warning("GridFS open by grid_id %s failed, trying filename %s: %s", grid_id, filename, e)
+    if filename:
+        return await bucket.open_download_stream_by_name(filename)
+    raise ValueError("grid_id or filename required")
+
+
+def _upload_date(grid_out) -> Optional[datetime]:
+    uploaded = getattr(grid_out, "upload_date", None)
+    if uploaded is not None and uploaded.tzinfo is None:
+        uploaded = uploaded.replace(tzinfo=timezone.utc)
+    return uploaded
+
+
+def etag_for(grid_out) -> str:
+    md5 = getattr(grid_out, "md5", None)
+    if md5:
+        return f'"{md5}"'
+    uploaded = _upload_date(grid_out)
+    basis = f"{grid_out._id}:{grid_out.length}:{uploaded.isoformat() if uploaded else ''}"
+    return f'"{hashlib.sha1(basis.encode()).hexdigest()}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def is_not_modified(headers: Mapping[str, str], etag: str, last_modified: Optional[datetime]) -> bool:
+    """True when a conditional GET can be answered with 304."""
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Inclusive ``(start, end)`` for a single ``bytes=`` range, or None to send the whole file.
+
+    Raises RangeNotSatisfiable for a well-formed range outside the file.
+    """
+    if not header or not header.startswith("bytes="):
+        return None
+    spec = header[len("bytes="):].strip()
+    if "," in spec:
+        return None  # multipart/byteranges is not worth it here; send the whole file
+    first, sep, last = spec.partition("-")
+    if not sep:
+        return None
+    try:
+        if first == "":
+            suffix = int(last)
+            if suffix <= 0:
+                raise RangeNotSatisfiable(header)
+            return max(0, size - suffix), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable(header)
+    if start > end:
+        return None
+    return start, min(end, size - 1)
+
+
+async def iter_grid_out(grid_out, start: int = 0, end: Optional[int] = None, read_size: Optional[int] = None) -> AsyncIterator[bytes]:
+    """Yield bytes ``start``..``end`` (inclusive) of *grid_out*, one read at a time."""
+    end = grid_out.length - 1 if end is None else end
+    read_size = read_size or getattr(grid_out, "chunk_size", None) or DEFAULT_READ_SIZE
+    if start:
+        grid_out.seek(start)
+    remaining = end - start + 1
+    while remaining > 0:
+        data = await grid_out.read(min(read_size, remaining))
+        if not data:
+            break
+        remaining -= len(data)
+        yield data
+
+
+def gridfs_response(
+    grid_out,
+    request_headers: Mapping[str, str],
+    media_type: str,
+    headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    """200/206/304/416 response for an open GridFS file, honouring Range and conditional headers."""
+    size = grid_out.length
+    etag = etag_for(grid_out)
+    last_modified = _upload_date(grid_out)
+    base_headers = {
+        **(headers or {}),
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Cache-Control": "private, no-cache",
+    }
+    if last_modified is not None:
+        base_headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+
+    if is_not_modified(request_headers, etag, last_modified):
+        return Response(status_code=304, headers=base_headers)
+
+    range_header = request_headers.get("range")
+    if_range = request_headers.get("if-range")
+    if range_header and if_range and if_range.strip() != etag:
+        range_header = None  # the client's partial copy is stale: send it all
+
+    try:
+        byte_range = parse_range(range_header, size)
+    except RangeNotSatisfiable:
+        return Response(status_code=416, headers={**base_headers, "Content-Range": f"bytes */{size}"})
+
+    if byte_range is None:
+        return StreamingResponse(
+            iter_grid_out(grid_out),
+            media_type=media_type,
+            headers={**base_headers, "Content-Length": str(size)},
+        )
+    start, end = byte_range
+    return StreamingResponse(
+        iter_grid_out(grid_out, start, end),
+        status_code=206,
+        media_type=media_type,
+        headers={
+            **base_headers,
+            "Content-Length": str(end - start + 1),
+            "Content-Range": f"bytes {start}-{end}/{size}",
+        },
+    )
+
+
+@dataclass
+class StoredUpload:
+    grid_id: Any
+    size: int
+    sha256: str
+
+
+async def stream_upload_to_gridfs(
+    bucket,
+    source,
+    filename: str,
+    *,
+    max_size: int,
+    metadata: Optional[dict] = None,
+    check_header: Optional[Callable[[bytes], bool]] = None,
+    read_size: int = DEFAULT_READ_SIZE,
+) -> StoredUpload:
+    """Copy *source* (anything with ``async read(n)``) into GridFS chunk by chunk.
+
+    Raises UploadRejected when *check_header* refuses the first chunk (before
+    anything is written) and UploadTooLarge as soon as the running size
+    passes *max_size*; a partly written file is aborted.
+    """
+    chunk = await source.read(read_size)
+    if check_header is not None and not check_header(chunk):
+        raise UploadRejected(filename)
+
+    grid_in = bucket.open_upload_stream(filename, metadata=metadata)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        while chunk:
+            size += len(chunk)
+            if size > max_size:
+                raise UploadTooLarge(size)
+            digest.update(chunk)
+            await grid_in.write(chunk)
+            chunk = await source.read(read_size)
+        await grid_in.close()
+    except BaseException:
+        try:
+            await grid_in.abort()
+        except Exception as e:
+            logger.warning("Could not abort partial GridFS upload %s: %s", filename, e)
+        raise
+    return StoredUpload(grid_in._id, size, digest.hexdigest())
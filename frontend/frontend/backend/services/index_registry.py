@@ -0,0 +1,378 @@
+"""
+Declarative MongoDB index registry and query-plan audit.
+
+``INDEX_REGISTRY`` lists every index the app relies on, per collection, and
+``apply_index_registry`` creates them at startup: collections in parallel,
+indexes within a collection one after another so a collection never has two
+builds racing. ``create_index`` is idempotent, and an index that already
+exists under another name (e.g. from ``scripts/create_indexes.py``) is
+reported as a conflict rather than failing the rest of the run. Startup skips
+the whole pass while ``registry_stamp`` matches the last successful run.
+
+``QUERY_CATALOGUE`` records the hot query shapes from ``routes/`` and
+``services/``. Two checks keep the two lists honest:
+
+- ``uncovered_shapes`` is a static ESR check (equality fields, then sort
+  keys) that runs in the unit tests with no database.
+- ``audit_query_plans`` runs ``explain`` for each shape against a live
+  database and reports winning plans that contain a ``COLLSCAN`` or an
+  in-memory ``SORT``. ``scripts/audit_indexes.py`` wraps it for CI, and
+  ``INDEX_AUDIT=warn`` logs the findings at startup.
+"""
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo.errors import OperationFailure
+
+from services.claims_service import CLAIM_LIST_INDEXES
+from services.observability import MetricsCollector
+from services.startup_tasks import content_stamp, run_once
+
+logger = logging.getLogger(__name__)
+
+INDEX_BUILD_CONCURRENCY = 4
+INDEX_AUDIT_MODE = os.environ.get("INDEX_AUDIT", "off").lower()
+# IndexOptionsConflict / IndexKeySpecsConflict: same keys under another name or options
+_CONFLICT_CODES = {85, 86}
+_PROBE = "__index_audit_probe__"
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    keys: Tuple[Tuple[str, Any], ...]
+    name: Optional[str] = None
+    unique: bool = False
+    sparse: bool = False
+    expire_after_seconds: Optional[int] = None
+
+    def options(self) -> dict:
+        opts: Dict[str, Any] = {"background": True}
+        if self.name:
+            opts["name"] = self.name
+        if self.unique:
+            opts["unique"] = True
+        if self.sparse:
+            opts["sparse"] = True
+        if self.expire_after_seconds is not None:
+            opts["expireAfterSeconds"] = self.expire_after_seconds
+        return opts
+
+
+def idx(*keys, **options) -> IndexSpec:
+    """``idx("jti", unique=True)`` or ``idx(("user_id", 1), ("created_at", -1))``."""
+    normalized = tuple((k, 1) if isinstance(k, str) else tuple(k) for k in keys)
+    return IndexSpec(keys=normalized, **options)
+
+
+@dataclass(frozen=True)
+class QueryShape:
+    name: str
+    collection: str
+    filter: Dict[str, Any]
+    sort: Tuple[Tuple[str, int], ...] = ()
+    source: str = ""
+
+
+def shape(name: str, collection: str, filter: dict, sort=(), source: str = "") -> QueryShape:
+    return QueryShape(name=name, collection=collection, filter=filter, sort=tuple(sort), source=source)
+
+
+INDEX_REGISTRY: Dict[str, List[IndexSpec]] = {
+    "users": [
+        idx("id"),
+        idx("email", unique=True, name="idx_users_email_unique"),
+    ],
+    "claims": [
+        idx("id"),
+        idx("assigned_to_id", "status"),
+        *[idx(*keys) for keys in CLAIM_LIST_INDEXES],
+    ],
+    "claim_summaries": [idx("claim_id", unique=True)],
+    "notes": [idx(("claim_id", 1), ("created_at", -1), name="idx_notes_claim_created")],
+    "documents": [idx(("claim_id", 1), ("uploaded_at", -1), name="idx_documents_claim_uploaded")],
+    # routes/uploads.upload_file: content-hash dedupe of GridFS blobs
+    "uploaded_files": [idx("sha256_hash", sparse=True), idx("grid_id")],
+    "supplements": [idx(("claim_id", 1), ("submitted_at", -1), name="idx_supplements_claim_submitted")],
+    "inspection_photos": [
+        idx("id"),
+        idx("claim_id", "sha256_hash", sparse=True),
+        idx(("claim_id", 1), ("captured_at", -1)),
+        idx(("claim_id", 1), ("created_at", -1)),
+    ],
+    "comms_channel_memberships": [idx("user_id", "is_active")],
+    "comms_read_state": [idx("channel_id", "user_id")],
+    "comms_messages": [
+        idx(("channel_id", 1), ("created_at", -1), ("id", -1)),
+        idx(("search_prefixes", 1), ("created_at", -1)),
+    ],
+    "photo_report_jobs": [
+        idx(("cache_key", 1), ("created_at", -1)),
+        idx("id", unique=True),
+    ],
+    "notifications": [
+        idx(("user_id", 1), ("is_read", 1), ("created_at", -1)),
+        idx(("user_id", 1), ("created_at", -1)),
+    ],
+    "contracts": [idx("claim_id", "status")],
+    "florida_statutes": [idx(("body_text", "text"), ("heading", "text"), ("section_number", "text"))],
+    "token_blacklist": [
+        # TTL: refresh token lifetime (7 days) + 1 day buffer
+        idx("blacklisted_at", expire_after_seconds=60 * 60 * 24 * 8),
+        idx("jti", unique=True),
+    ],
+    "claimpilot_insights": [idx(("claim_id", 1), ("created_at", -1))],
+    "claimpilot_pending": [idx(("status", 1), ("created_at", -1))],
+    "claimpilot_audit": [idx(("agent_name", 1), ("created_at", -1))],
+    "claimpilot_monitor_state": [idx("claim_id", unique=True)],
+    # services.llm_cache: lookups are by _id; documents expire at expires_at
+    "llm_response_cache": [idx("expires_at", expire_after_seconds=0)],
+    # AgentContextBuilder: per-claim newest-first slices, single or batched ($in)
+    "claim_activity": [idx(("claim_id", 1), ("created_at", -1))],
+    "evidence": [idx(("claim_id", 1), ("created_at", -1))],
+    "tasks": [idx(("claim_id", 1), ("created_at", -1))],
+    "comm_messages": [idx(("claim_id", 1), ("channel", 1), ("created_at", -1))],
+    "calendar_events": [
+        idx("assigned_to_id", "start_time"),
+        idx("claim_id", "start_time"),
+        idx("start_time", "status"),
+        idx("parent_event_id", sparse=True),
+    ],
+    "compliance_deadlines": [
+        idx("claim_id", "deadline_date"),
+        idx("status", "deadline_date"),
+        idx("deadline_type"),
+    ],
+    "compliance_alerts": [
+        idx(("acknowledged", 1), ("created_at", -1)),
+        idx("deadline_id"),
+    ],
+    "intake_submissions": [
+        idx("submission_token", unique=True),
+        idx(("status", 1), ("submitted_at", -1)),
+        idx("how_did_you_hear"),
+    ],
+    "adjuster_profiles": [
+        idx("name", unique=True),
+        idx("carrier", "behavior_score"),
+    ],
+    "incentive_participants": [
+        idx(("competition_id", 1), ("current_value", -1)),
+        idx("competition_id", "user_id"),
+        idx("user_id"),
+    ],
+    "eve_orchestrator_runs": [
+        idx(("created_at", -1)),
+        idx(("user_id", 1), ("created_at", -1)),
+    ],
+    "eve_orchestrator_drafts": [idx("claim_id", "type")],
+    "eve_orchestrator_reports": [idx(("claim_id", 1), ("created_at", -1))],
+}
+
+_NEWEST_FIRST = (("created_at", -1), ("id", -1))
+_NOT_ARCHIVED = {"is_archived": {"$ne": True}}
+_NOT_EXPIRED = {"$or": [
+    {"expires_at": None},
+    {"expires_at": {"$exists": False}},
+    {"expires_at": {"$gt": "2000-01-01T00:00:00+00:00"}},
+]}
+
+QUERY_CATALOGUE: List[QueryShape] = [
+    shape("user by id", "users", {"id": _PROBE}, source="dependencies.get_current_user"),
+    shape("user by email", "users", {"email": _PROBE}, source="routes/auth.login"),
+    shape("token blacklist", "token_blacklist", {"jti": _PROBE}, source="dependencies.get_current_user"),
+    shape("claim by id", "claims", {"id": _PROBE}, source="routes/claims.get_claim"),
+    shape("claim list", "claims", dict(_NOT_ARCHIVED), _NEWEST_FIRST, "services/claims_service.list_claims"),
+    shape("claim list by status", "claims", {**_NOT_ARCHIVED, "status": _PROBE}, _NEWEST_FIRST, "services/claims_service.list_claims"),
+    shape("claim list by assignee", "claims", {**_NOT_ARCHIVED, "assigned_to": _PROBE}, _NEWEST_FIRST, "services/claims_service.list_claims"),
+    shape("claim list by carrier", "claims", {**_NOT_ARCHIVED, "carrier_name": _PROBE}, _NEWEST_FIRST, "services/claims_service.list_claims"),
+    shape("client claim list", "claims", {**_NOT_ARCHIVED, "client_email": _PROBE}, _NEWEST_FIRST, "services/claims_service.list_claims"),
+    shape("claim summary", "claim_summaries", {"claim_id": _PROBE}, source="services/claim_summary.get_claim_summary"),
+    shape("claim notes", "notes", {"claim_id": _PROBE}, [("created_at", -1)], "routes/claims.get_notes"),
+    shape("claim documents", "documents", {"claim_id": _PROBE}, [("uploaded_at", -1)], "routes/claims.get_documents"),
+    shape("latest submitted supplement", "supplements", {"claim_id": _PROBE}, [("submitted_at", -1)], "services/claim_summary"),
+    shape("claim photos", "inspection_photos", {"claim_id": _PROBE}, [("captured_at", -1)], "services/claim_summary"),
+    shape("photo by id", "inspection_photos", {"id": _PROBE}, source="routes/inspection/photos"),
+    shape("notifications", "notifications", {"user_id": _PROBE, **_NOT_EXPIRED}, [("created_at", -1)], "routes/notifications"),
+    shape("unread notifications", "notifications", {"user_id": _PROBE, "is_read": False, **_NOT_EXPIRED}, [("created_at", -1)], "routes/notifications"),
+    shape("channel history", "comms_messages", {"channel_id": _PROBE}, _NEWEST_FIRST, "routes/comm_conversations.get_channel_messages"),
+    shape("message search", "comms_messages", {"search_prefixes": {"$all": [_PROBE]}}, [("created_at", -1)], "routes/comm_conversations.search_messages"),
+    shape("user memberships", "comms_channel_memberships", {"user_id": _PROBE, "is_active": True}, source="routes/comm_conversations"),
+    shape("read state", "comms_read_state", {"channel_id": _PROBE, "user_id": _PROBE}, source="routes/comm_conversations"),
+    shape("competition leaderboard", "incentive_participants", {"competition_id": _PROBE}, [("current_value", -1)], "routes/incentives_engine"),
+    shape("competition participant", "incentive_participants", {"competition_id": _PROBE, "user_id": _PROBE}, source="routes/incentives_engine"),
+    shape("my calendar", "calendar_events", {"assigned_to_id": _PROBE}, [("start_time", 1)], "routes/calendar"),
+    shape("claim deadlines", "compliance_deadlines", {"claim_id": _PROBE}, [("deadline_date", 1)], "routes/compliance"),
+    shape("orchestrator runs", "eve_orchestrator_runs", {}, [("created_at", -1)], "routes/eve_orchestrator"),
+    shape("report job cache", "photo_report_jobs", {"cache_key": _PROBE, "status": {"$in": ["queued", "running", "complete"]}},
+          [("created_at", -1)], "services/photo_report_jobs"),
+    shape("adjuster profile", "adjuster_profiles", {"name": _PROBE}, source="routes/adjuster_intel"),
+    shape("intake by token", "intake_submissions", {"submission_token": _PROBE}, source="routes/intake"),
+]
+
+
+# --- Apply ---
+
+async def _apply_collection(database, collection: str, specs: List[IndexSpec], report: dict) -> None:
+    coll = database[collection]
+    for spec in specs:
+        try:
+            await coll.create_index(list(spec.keys), **spec.options())
+            report["ensured"] += 1
+        except OperationFailure as e:
+            if e.code in _CONFLICT_CODES:
+                report["conflicts"].append(f"{collection}{list(spec.keys)}: {e}")
+            else:
+                report["failed"].append(f"{collection}{list(spec.keys)}: {e}")
+        except Exception as e:
+            report["failed"].append(f"{collection}{list(spec.keys)}: {e}")
+
+
+async def apply_index_registry(database, registry: Optional[Dict[str, List[IndexSpec]]] = None) -> dict:
+    """Create every registered index; returns ensured/conflicts/failed."""
+    registry = registry if registry is not None else INDEX_REGISTRY
+    report: Dict[str, Any] = {"ensured": 0, "conflicts": [], "failed": []}
+    semaphore = asyncio.Semaphore(INDEX_BUILD_CONCURRENCY)
+    t0 = time.monotonic()
+
+    async def _bounded(collection, specs):
+        async with semaphore:
+            await _apply_collection(database, collection, specs, report)
+
+    await asyncio.gather(*(_bounded(c, specs) for c, specs in registry.items()))
+    MetricsCollector.record_timing("index_registry_apply_ms", round((time.monotonic() - t0) * 1000, 1))
+    for line in report["conflicts"]:
+        logger.info("Index already present under another name/options: %s", line)
+    for line in report["failed"]:
+        logger.warning("Index creation failed: %s", line)
+    return report
+
+
+# --- Static coverage ---
+
+def _equality_fields(filter_doc: dict) -> set:
+    fields = set()
+    for key, value in filter_doc.items():
+        if key.startswith("$"):
+            continue
+        # $in is left out: over several values it behaves like a range for sorting
+        if not isinstance(value, dict) or set(value) <= {"$eq", "$all"}:
+            fields.add(key)
+    return fields
+
+
+def _index_serves(keys: Tuple[Tuple[str, Any], ...], equality: set, sort: Tuple[Tuple[str, int], ...]) -> bool:
+    if any(not isinstance(direction, int) for _, direction in keys):
+        return False  # text / geo indexes are not planned for these shapes
+    n = len(equality)
+    if n and {name for name, _ in keys[:n]} != equality:
+        return False
+    if not sort:
+        return bool(n)
+    tail = keys[n:n + len(sort)]
+    if len(tail) < len(sort) or [name for name, _ in tail] != [name for name, _ in sort]:
+        return False
+    forward = all(d == s for (_, d), (_, s) in zip(tail, sort))
+    backward = all(d == -s for (_, d), (_, s) in zip(tail, sort))
+    return forward or backward
+
+
+def uncovered_shapes(catalogue: Optional[List[QueryShape]] = None,
+                     registry: Optional[Dict[str, List[IndexSpec]]] = None) -> List[QueryShape]:
+    """Shapes with no registered index serving their equality fields then their sort."""
+    catalogue = catalogue if catalogue is not None else QUERY_CATALOGUE
+    registry = registry if registry is not None else INDEX_REGISTRY
+    missing = []
+    for query in catalogue:
+        equality = _equality_fields(query.filter)
+        if not any(_index_serves(spec.keys, equality, query.sort) for spec in registry.get(query.collection, [])):
+            missing.append(query)
+    return missing
+
+
+# --- Explain audit ---
+
+def plan_stages(plan: Any) -> List[str]:
+    """Every stage name in an explain plan tree (classic and SBE layouts)."""
+    stages: List[str] = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for key in ("inputStage", "queryPlan", "winningPlan", "outerStage", "innerStage"):
+            if key in plan:
+                stages.extend(plan_stages(plan[key]))
+        for key in ("inputStages", "shards"):
+            for child in plan.get(key, []):
+                stages.extend(plan_stages(child))
+    return stages
+
+
+def plan_problems(explain: dict) -> List[str]:
+    stages = plan_stages(explain.get("queryPlanner", {}).get("winningPlan", {}))
+    problems = []
+    if "COLLSCAN" in stages:
+        problems.append("COLLSCAN")
+    if "SORT" in stages:
+        problems.append("in-memory SORT")
+    return problems
+
+
+async def audit_query_plans(database, catalogue: Optional[List[QueryShape]] = None) -> List[dict]:
+    """``explain`` each catalogued shape; one finding per shape with a bad plan.
+
+    Collections that do not exist yet are skipped (the planner returns EOF).
+    """
+    catalogue = catalogue if catalogue is not None else QUERY_CATALOGUE
+    findings = []
+    for query in catalogue:
+        command = {"find": query.collection, "filter": query.filter, "limit": 50}
+        if query.sort:
+            command["sort"] = dict(query.sort)
+        try:
+            explain = await database.command({"explain": command, "verbosity": "queryPlanner"})
+        except Exception as e:
+            findings.append({"shape": query.name, "collection": query.collection, "problems": [f"explain failed: {e}"]})
+            continue
+        problems = plan_problems(explain)
+        if problems:
+            findings.append({
+                "shape": query.name,
+                "collection": query.collection,
+                "source": query.source,
+                "problems": problems,
+            })
+    return findings
+
+
+def registry_stamp(registry: Optional[Dict[str, List[IndexSpec]]] = None) -> str:
+    """Version of the registry contents; any index change yields a new stamp."""
+    return content_stamp(registry or INDEX_REGISTRY)
+
+
+async def ensure_indexes(database) -> Optional[dict]:
+    """
+    Startup entry point: apply the registry unless this version of it was
+    already applied (see ``services/startup_tasks.py``), then audit when
+    ``INDEX_AUDIT=warn``. Returns the apply report, or None when skipped.
+    """
+    report = None
+
+    async def apply() -> bool:
+        nonlocal report
+        report = await apply_index_registry(database)
+        logger.info(
+            "Database indexes ensured: %d ok, %d conflicts, %d failed",
+            report["ensured"], len(report["conflicts"]), len(report["failed"]),
+        )
+        # Conflicts are stable name mismatches; failures are worth a retry
+        return not report["failed"]
+
+    await run_once("index_registry", registry_stamp(), apply, database=database)
+    if INDEX_AUDIT_MODE == "warn":
+        for finding in await audit_query_plans(database):
+            logger.warning("Index audit: %s on %s (%s): %s", finding["shape"], finding["collection"],
+                           finding.get("source", ""), ", ".join(finding["problems"]))
+    return report
@@ -5,19 +5,21 @@ Supports two export modes:
   - EMAIL_SAFE:     JPEG quality 65, max 1200px, target ≤15 MB, auto-split → ZIP
   - FULL_FIDELITY:  JPEG quality 95, original resolution, archive quality
 
-Provides concurrency protection (one build per claim+mode at a time),
-image preparation/compression, deduplication, preflight checks,
-page numbers, and structured logging.
+Provides image preparation/compression, deduplication, preflight checks,
+page numbers, and structured logging. ``render_photo_report`` is the
+process-pool entry point used by ``services.photo_report_jobs``; it writes
+the report to disk one room at a time and publishes progress as it goes.
 """
 
-import asyncio
 import io
+import json
 import os
 import re
+import shutil
 import time
 import zipfile
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Callable, Optional
 
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.units import inch
@@ -34,7 +36,8 @@ try:
 except ImportError:
     HAS_PIL = False
 
-from services.observability import get_logger, MetricsCollector
+from services.observability import get_logger
+from services.photo_derivatives import derivative_path
 
 logger = get_logger("inspection_pdf_service")
 
@@ -47,17 +50,6 @@ EMAIL_SAFE_TARGET_SIZE = 15 * 1024 * 1024  # 15 MB
 
 FULL_FIDELITY_JPEG_QUALITY = 95
 
-# ── concurrency locks ────────────────────────────────────────────────────────
-_generation_locks: dict[str, asyncio.Lock] = {}
-
-
-def _get_lock(claim_id: str, mode: str) -> asyncio.Lock:
-    key = f"{claim_id}_{mode}"
-    if key not in _generation_locks:
-        _generation_locks[key] = asyncio.Lock()
-    return _generation_locks[key]
-
-
 # ── photo path resolution ────────────────────────────────────────────────────
 
 def _resolve_photo_path(photo_dir: str, claim_id: str, filename: str) -> Optional[str]:
@@ -99,6 +91,19 @@ def _resolve_photo_path(photo_dir: str, claim_id: str, filename: str) -> Optiona
     return None
 
 
+def _resolve_report_image(photo: dict, photo_dir: str, claim_id: str, mode: str) -> Optional[str]:
+    """
+    Pick the file to embed for a photo. Email-safe reports use the 1200px
+    ``medium`` derivative when it exists so a 12MP original is never decoded;
+    full-fidelity reports always use the original.
+    """
+    if mode == "email_safe" and photo.get("id") and (photo.get("derivatives") or {}).get("medium"):
+        medium = derivative_path({**photo, "claim_id": claim_id}, "medium", photo_dir)
+        if os.path.exists(medium):
+            return medium
+    return _resolve_photo_path(photo_dir, claim_id, photo.get("filename", ""))
+
+
 # ── image preparation ────────────────────────────────────────────────────────
 
 def prepare_image(file_path: str, mode: str = "email_safe") -> io.BytesIO:
@@ -327,26 +332,20 @@ def _add_page_number(canvas, doc):
 
 # ── story builder ────────────────────────────────────────────────────────────
 
-def build_pdf_story(
+PAGE_WIDTH = letter[0] - 1.5 * inch  # usable width
+
+
+def _front_story(
     photos_by_room: dict[str, list],
     all_photos: list[dict],
     claim: dict,
     user: dict,
-    mode: str,
-    photo_dir: str,
-    claim_id: str,
-    include_ai: bool = True,
-    include_gps: bool = True,
+    styles,
     part_info: Optional[str] = None,
 ) -> list:
-    """
-    Build the ReportLab 'story' (list of Flowables) for the photo report.
-    If part_info is provided (e.g. "Part 1 of 3"), it is shown on the cover.
-    """
-    styles = _build_pdf_styles()
+    """Cover page and table of contents."""
     story: list = []
-
-    page_width = letter[0] - 1.5 * inch  # usable width
+    page_width = PAGE_WIDTH
 
     # ── cover page ───────────────────────────────────────────────────────
     story.append(Spacer(1, 1.2 * inch))
@@ -425,189 +424,205 @@ def build_pdf_story(
         ("ALIGN", (1, 0), (1, -1), "CENTER"),
     ]))
     story.append(toc_table)
-    story.append(PageBreak())
+    return story
 
-    # ── per-room photo pages ─────────────────────────────────────────────
+
+def _room_story(
+    room_name: str,
+    room_photos: list[dict],
+    all_photos: list[dict],
+    mode: str,
+    photo_dir: str,
+    claim_id: str,
+    styles,
+    include_ai: bool = True,
+    include_gps: bool = True,
+    on_photo: Optional[Callable[[], None]] = None,
+) -> list:
+    """Photo pages for one room. ``all_photos`` is searched for before/after pairs."""
+    story: list = []
+    page_width = PAGE_WIDTH
     max_img_width = 6 * inch
     max_img_height = 4 * inch
     pair_img_width = 2.9 * inch
     pair_img_height = 2.2 * inch
 
-    for room_name in sorted(photos_by_room.keys()):
-        room_photos = photos_by_room[room_name]
-
-        # Room header bar
-        room_header_data = [[f"  {room_name}   ({len(room_photos)} photo{'s' if len(room_photos) != 1 else ''})"]]
-        room_header_table = Table(room_header_data, colWidths=[page_width], rowHeights=[32])
-        room_header_table.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, -1), colors.HexColor("#1a1a2e")),
-            ("TEXTCOLOR", (0, 0), (-1, -1), colors.white),
-            ("FONTNAME", (0, 0), (-1, -1), "Helvetica-Bold"),
-            ("FONTSIZE", (0, 0), (-1, -1), 13),
-            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-            ("LEFTPADDING", (0, 0), (-1, -1), 10),
-        ]))
-        story.append(room_header_table)
-        story.append(Spacer(1, 0.15 * inch))
-
-        rendered_ids: set = set()
+    # Room header bar
+    room_header_data = [[f"  {room_name}   ({len(room_photos)} photo{'s' if len(room_photos) != 1 else ''})"]]
+    room_header_table = Table(room_header_data, colWidths=[page_width], rowHeights=[32])
+    room_header_table.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (-1, -1), colors.HexColor("#1a1a2e")),
+        ("TEXTCOLOR", (0, 0), (-1, -1), colors.white),
+        ("FONTNAME", (0, 0), (-1, -1), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, -1), 13),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ("LEFTPADDING", (0, 0), (-1, -1), 10),
+    ]))
+    story.append(room_header_table)
+    story.append(Spacer(1, 0.15 * inch))
 
-        for photo in room_photos:
-            pid = photo.get("id", "")
-            if pid in rendered_ids:
-                continue
+    rendered_ids: set = set()
 
-            # Before/after pair detection
-            is_pair = False
-            paired_photo = None
-            if photo.get("is_before") and photo.get("paired_photo_id"):
-                paired_photo = next(
-                    (p for p in all_photos if p.get("id") == photo["paired_photo_id"]),
-                    None,
-                )
-                if paired_photo:
-                    is_pair = True
+    for photo in room_photos:
+        if on_photo:
+            on_photo()
+        pid = photo.get("id", "")
+        if pid in rendered_ids:
+            continue
 
-            if is_pair and paired_photo:
-                # ── side-by-side before / after ──────────────────────
-                rendered_ids.add(pid)
-                rendered_ids.add(paired_photo.get("id", ""))
+        # Before/after pair detection
+        is_pair = False
+        paired_photo = None
+        if photo.get("is_before") and photo.get("paired_photo_id"):
+            paired_photo = next(
+                (p for p in all_photos if p.get("id") == photo["paired_photo_id"]),
+                None,
+            )
+            if paired_photo:
+                is_pair = True
 
-                before_path = _resolve_photo_path(photo_dir, claim_id, photo.get("filename", ""))
-                after_path = _resolve_photo_path(photo_dir, claim_id, paired_photo.get("filename", ""))
+        if is_pair and paired_photo:
+            # ── side-by-side before / after ──────────────────────
+            rendered_ids.add(pid)
+            rendered_ids.add(paired_photo.get("id", ""))
 
-                # Skip pair entirely if neither file exists
-                if not before_path and not after_path:
-                    continue
+            before_path = _resolve_report_image(photo, photo_dir, claim_id, mode)
+            after_path = _resolve_report_image(paired_photo, photo_dir, claim_id, mode)
 
-                pair_cells = []
-                for label, p_path, p_data in [("BEFORE", before_path, photo), ("AFTER", after_path, paired_photo)]:
-                    cell_items = []
-                    lbl_color = "#d97706" if label == "BEFORE" else "#16a34a"
-                    cell_items.append(Paragraph(
-                        f'<font color="{lbl_color}"><b>{label}</b></font>',
-                        styles["PhotoCaption"],
-                    ))
-                    cell_items.append(Spacer(1, 4))
-                    if p_path:
-                        try:
-                            img_buf = prepare_image(p_path, mode)
-                            img = RLImage(img_buf, width=pair_img_width, height=pair_img_height, kind="proportional")
-                            cell_items.append(img)
-                        except Exception:
-                            cell_items.append(Paragraph("<i>[image unavailable]</i>", styles["PhotoCaption"]))
-                    else:
-                        cell_items.append(Paragraph("<i>[image unavailable]</i>", styles["PhotoCaption"]))
-                    cell_items.append(Spacer(1, 4))
-                    ts = p_data.get("captured_at", "")[:19].replace("T", " ") if p_data.get("captured_at") else ""
-                    if ts:
-                        cell_items.append(Paragraph(f"Taken: {ts}", styles["GpsText"]))
-                    pair_cells.append(cell_items)
-
-                pair_table = Table(
-                    [[pair_cells[0], pair_cells[1]]],
-                    colWidths=[page_width / 2, page_width / 2],
-                )
-                pair_table.setStyle(TableStyle([
-                    ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                    ("LEFTPADDING", (0, 0), (-1, -1), 4),
-                    ("RIGHTPADDING", (0, 0), (-1, -1), 4),
-                    ("BOX", (0, 0), (-1, -1), 0.5, colors.HexColor("#d1d5db")),
-                ]))
-                story.append(pair_table)
-                story.append(Spacer(1, 0.2 * inch))
-
-            else:
-                # ── standalone photo ─────────────────────────────────
-                rendered_ids.add(pid)
+            # Skip pair entirely if neither file exists
+            if not before_path and not after_path:
+                continue
 
-                resolved_path = _resolve_photo_path(photo_dir, claim_id, photo.get("filename", ""))
-                if resolved_path:
+            pair_cells = []
+            for label, p_path, p_data in [("BEFORE", before_path, photo), ("AFTER", after_path, paired_photo)]:
+                cell_items = []
+                lbl_color = "#d97706" if label == "BEFORE" else "#16a34a"
+                cell_items.append(Paragraph(
+                    f'<font color="{lbl_color}"><b>{label}</b></font>',
+                    styles["PhotoCaption"],
+                ))
+                cell_items.append(Spacer(1, 4))
+                if p_path:
                     try:
-                        img_buf = prepare_image(resolved_path, mode)
-                        img = RLImage(img_buf, width=max_img_width, height=max_img_height, kind="proportional")
-                        story.append(img)
+                        img_buf = prepare_image(p_path, mode)
+                        img = RLImage(img_buf, width=pair_img_width, height=pair_img_height, kind="proportional")
+                        cell_items.append(img)
                     except Exception:
-                        # Skip unrenderable images — don't litter report
-                        continue
+                        cell_items.append(Paragraph("<i>[image unavailable]</i>", styles["PhotoCaption"]))
                 else:
-                    # Skip photos without files — don't show "not found" to carriers
-                    continue
+                    cell_items.append(Paragraph("<i>[image unavailable]</i>", styles["PhotoCaption"]))
+                cell_items.append(Spacer(1, 4))
+                ts = p_data.get("captured_at", "")[:19].replace("T", " ") if p_data.get("captured_at") else ""
+                if ts:
+                    cell_items.append(Paragraph(f"Taken: {ts}", styles["GpsText"]))
+                pair_cells.append(cell_items)
 
-                story.append(Spacer(1, 4))
+            pair_table = Table(
+                [[pair_cells[0], pair_cells[1]]],
+                colWidths=[page_width / 2, page_width / 2],
+            )
+            pair_table.setStyle(TableStyle([
+                ("VALIGN", (0, 0), (-1, -1), "TOP"),
+                ("LEFTPADDING", (0, 0), (-1, -1), 4),
+                ("RIGHTPADDING", (0, 0), (-1, -1), 4),
+                ("BOX", (0, 0), (-1, -1), 0.5, colors.HexColor("#d1d5db")),
+            ]))
+            story.append(pair_table)
+            story.append(Spacer(1, 0.2 * inch))
 
-                # Caption bar
-                caption_rows: list[list] = []
+        else:
+            # ── standalone photo ─────────────────────────────────
+            rendered_ids.add(pid)
+
+            resolved_path = _resolve_report_image(photo, photo_dir, claim_id, mode)
+            if resolved_path:
+                try:
+                    img_buf = prepare_image(resolved_path, mode)
+                    img = RLImage(img_buf, width=max_img_width, height=max_img_height, kind="proportional")
+                    story.append(img)
+                except Exception:
+                    # Skip unrenderable images — don't litter report
+                    continue
+            else:
+                # Skip photos without files — don't show "not found" to carriers
+                continue
 
-                if include_ai and photo.get("ai_caption"):
+            story.append(Spacer(1, 4))
+
+            # Caption bar
+            caption_rows: list[list] = []
+
+            if include_ai and photo.get("ai_caption"):
+                caption_rows.append([
+                    Paragraph("<b>AI Caption:</b>", styles["PhotoCaption"]),
+                    Paragraph(str(photo["ai_caption"])[:300], styles["PhotoCaption"]),
+                ])
+
+            if include_ai and photo.get("ai_damage_assessment"):
+                assessment = photo["ai_damage_assessment"]
+                if isinstance(assessment, dict):
+                    severity = assessment.get("severity", "N/A")
+                    damage_type = assessment.get("damage_type") or assessment.get("type", "N/A")
+                    sev_color = _severity_color(severity)
+                    badge_text = (
+                        f'<font color="{sev_color.hexval()}">[{severity.upper()}]</font> {damage_type}'
+                    )
                     caption_rows.append([
-                        Paragraph("<b>AI Caption:</b>", styles["PhotoCaption"]),
-                        Paragraph(str(photo["ai_caption"])[:300], styles["PhotoCaption"]),
+                        Paragraph("<b>Damage:</b>", styles["PhotoCaption"]),
+                        Paragraph(badge_text, styles["DamageBadge"]),
                     ])
-
-                if include_ai and photo.get("ai_damage_assessment"):
-                    assessment = photo["ai_damage_assessment"]
-                    if isinstance(assessment, dict):
-                        severity = assessment.get("severity", "N/A")
-                        damage_type = assessment.get("damage_type") or assessment.get("type", "N/A")
-                        sev_color = _severity_color(severity)
-                        badge_text = (
-                            f'<font color="{sev_color.hexval()}">[{severity.upper()}]</font> {damage_type}'
-                        )
-                        caption_rows.append([
-                            Paragraph("<b>Damage:</b>", styles["PhotoCaption"]),
-                            Paragraph(badge_text, styles["DamageBadge"]),
-                        ])
-                    elif isinstance(assessment, str):
-                        caption_rows.append([
-                            Paragraph("<b>Damage:</b>", styles["PhotoCaption"]),
-                            Paragraph(str(assessment)[:300], styles["DamageBadge"]),
-                        ])
-
-                if include_gps and photo.get("latitude") and photo.get("longitude"):
+                elif isinstance(assessment, str):
                     caption_rows.append([
-                        Paragraph("<b>GPS:</b>", styles["GpsText"]),
-                        Paragraph(
-                            f'{photo["latitude"]:.6f}, {photo["longitude"]:.6f}',
-                            styles["GpsText"],
-                        ),
+                        Paragraph("<b>Damage:</b>", styles["PhotoCaption"]),
+                        Paragraph(str(assessment)[:300], styles["DamageBadge"]),
                     ])
 
-                ts = photo.get("captured_at", "")[:19].replace("T", " ") if photo.get("captured_at") else ""
-                if ts:
-                    caption_rows.append([
-                        Paragraph("<b>Taken:</b>", styles["PhotoCaption"]),
-                        Paragraph(ts, styles["PhotoCaption"]),
-                    ])
+            if include_gps and photo.get("latitude") and photo.get("longitude"):
+                caption_rows.append([
+                    Paragraph("<b>GPS:</b>", styles["GpsText"]),
+                    Paragraph(
+                        f'{photo["latitude"]:.6f}, {photo["longitude"]:.6f}',
+                        styles["GpsText"],
+                    ),
+                ])
+
+            ts = photo.get("captured_at", "")[:19].replace("T", " ") if photo.get("captured_at") else ""
+            if ts:
+                caption_rows.append([
+                    Paragraph("<b>Taken:</b>", styles["PhotoCaption"]),
+                    Paragraph(ts, styles["PhotoCaption"]),
+                ])
+
+            if photo.get("voice_snippet"):
+                snippet = str(photo["voice_snippet"])[:200]
+                if len(str(photo["voice_snippet"])) > 200:
+                    snippet += "..."
+                caption_rows.append([
+                    Paragraph("<b>Voice:</b>", styles["VoiceNote"]),
+                    Paragraph(f'"{snippet}"', styles["VoiceNote"]),
+                ])
+
+            if caption_rows:
+                cap_table = Table(caption_rows, colWidths=[1.0 * inch, page_width - 1.0 * inch])
+                cap_table.setStyle(TableStyle([
+                    ("BACKGROUND", (0, 0), (-1, -1), colors.HexColor("#f9fafb")),
+                    ("BOX", (0, 0), (-1, -1), 0.5, colors.HexColor("#d1d5db")),
+                    ("TOPPADDING", (0, 0), (-1, -1), 3),
+                    ("BOTTOMPADDING", (0, 0), (-1, -1), 3),
+                    ("LEFTPADDING", (0, 0), (-1, -1), 6),
+                    ("RIGHTPADDING", (0, 0), (-1, -1), 6),
+                    ("VALIGN", (0, 0), (-1, -1), "TOP"),
+                ]))
+                story.append(cap_table)
 
-                if photo.get("voice_snippet"):
-                    snippet = str(photo["voice_snippet"])[:200]
-                    if len(str(photo["voice_snippet"])) > 200:
-                        snippet += "..."
-                    caption_rows.append([
-                        Paragraph("<b>Voice:</b>", styles["VoiceNote"]),
-                        Paragraph(f'"{snippet}"', styles["VoiceNote"]),
-                    ])
+            story.append(Spacer(1, 0.25 * inch))
 
-                if caption_rows:
-                    cap_table = Table(caption_rows, colWidths=[1.0 * inch, page_width - 1.0 * inch])
-                    cap_table.setStyle(TableStyle([
-                        ("BACKGROUND", (0, 0), (-1, -1), colors.HexColor("#f9fafb")),
-                        ("BOX", (0, 0), (-1, -1), 0.5, colors.HexColor("#d1d5db")),
-                        ("TOPPADDING", (0, 0), (-1, -1), 3),
-                        ("BOTTOMPADDING", (0, 0), (-1, -1), 3),
-                        ("LEFTPADDING", (0, 0), (-1, -1), 6),
-                        ("RIGHTPADDING", (0, 0), (-1, -1), 6),
-                        ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                    ]))
-                    story.append(cap_table)
-
-                story.append(Spacer(1, 0.25 * inch))
+    return story
 
-        # Page break after each room section
-        story.append(PageBreak())
 
-    # ── summary page ─────────────────────────────────────────────────────
+def _summary_story(photos_by_room: dict[str, list], all_photos: list[dict], claim: dict, styles) -> list:
+    """Damage summary table and overall statistics."""
+    story: list = []
     story.append(Paragraph("Summary", styles["SummaryHeading"]))
     story.append(Spacer(1, 0.15 * inch))
 
@@ -706,11 +721,49 @@ def build_pdf_story(
     return story
 
 
+def build_pdf_story(
+    photos_by_room: dict[str, list],
+    all_photos: list[dict],
+    claim: dict,
+    user: dict,
+    mode: str,
+    photo_dir: str,
+    claim_id: str,
+    include_ai: bool = True,
+    include_gps: bool = True,
+    part_info: Optional[str] = None,
+    on_photo: Optional[Callable[[], None]] = None,
+) -> list:
+    """
+    Build the ReportLab 'story' (list of Flowables) for the photo report.
+    If part_info is provided (e.g. "Part 1 of 3"), it is shown on the cover.
+    ``on_photo`` is called once per photo visited, for progress reporting.
+    """
+    styles = _build_pdf_styles()
+    story = _front_story(photos_by_room, all_photos, claim, user, styles, part_info)
+    story.append(PageBreak())
+    for room_name in sorted(photos_by_room.keys()):
+        story.extend(_room_story(
+            room_name, photos_by_room[room_name], all_photos, mode, photo_dir, claim_id, styles,
+            include_ai=include_ai, include_gps=include_gps, on_photo=on_photo,
+        ))
+        # Page break after each room section
+        story.append(PageBreak())
+    story.extend(_summary_story(photos_by_room, all_photos, claim, styles))
+    return story
+
+
 # ── single PDF builder ───────────────────────────────────────────────────────
 
-def build_single_pdf(story: list) -> io.BytesIO:
-    """Render a story into a PDF buffer with page numbers."""
-    buf = io.BytesIO()
+def build_single_pdf(story: list, output=None, page_numbers: bool = True):
+    """
+    Render a story into a PDF, with page numbers unless ``page_numbers`` is
+    False (sections numbered later by ``_merge_sections``).
+
+    Writes to ``output`` (a path or binary file) when given and returns it;
+    otherwise renders into a new buffer.
+    """
+    buf = output if output is not None else io.BytesIO()
     doc = SimpleDocTemplate(
         buf,
         pagesize=letter,
@@ -719,48 +772,27 @@ def build_single_pdf(story: list) -> io.BytesIO:
         leftMargin=0.75 * inch,
         rightMargin=0.75 * inch,
     )
-    doc.build(story, onFirstPage=_add_page_number, onLaterPages=_add_page_number)
-    buf.seek(0)
+    if page_numbers:
+        doc.build(story, onFirstPage=_add_page_number, onLaterPages=_add_page_number)
+    else:
+        doc.build(story)
+    if output is None:
+        buf.seek(0)
     return buf
 
 
 # ── email-safe output (auto-split → ZIP if > 15 MB) ─────────────────────────
 
-def generate_email_safe_output(
+def _split_rooms_into_parts(
     photos_by_room: dict[str, list],
-    all_photos: list[dict],
-    claim: dict,
-    user: dict,
-    photo_dir: str,
-    claim_id: str,
-    include_ai: bool = True,
-    include_gps: bool = True,
-) -> tuple[io.BytesIO, str]:
+    room_sizes: Optional[dict[str, int]] = None,
+) -> list[list[str]]:
     """
-    Build an email-safe PDF. If the result exceeds EMAIL_SAFE_TARGET_SIZE,
-    auto-split by room groups into a ZIP of smaller PDFs.
+    Group rooms into parts that should each fit under the email-safe target.
 
-    Returns (buffer, content_type) where content_type is
-    "application/pdf" or "application/zip".
+    ``room_sizes`` are the rendered room sections in bytes; without them a
+    per-photo estimate is used.
     """
-    # Try single PDF first
-    story = build_pdf_story(
-        photos_by_room, all_photos, claim, user,
-        mode="email_safe", photo_dir=photo_dir, claim_id=claim_id,
-        include_ai=include_ai, include_gps=include_gps,
-    )
-    pdf_buf = build_single_pdf(story)
-    pdf_size = pdf_buf.getbuffer().nbytes
-
-    if pdf_size <= EMAIL_SAFE_TARGET_SIZE:
-        return pdf_buf, "application/pdf"
-
-    # Auto-split: group rooms into parts that fit under the target
-    logger.info(
-        "PDF exceeds email-safe limit, splitting",
-        claim_id=claim_id, pdf_size_mb=round(pdf_size / (1024 * 1024), 2),
-    )
-
     sorted_rooms = sorted(photos_by_room.keys())
     parts: list[list[str]] = []
     current_part: list[str] = []
@@ -770,8 +802,10 @@ def generate_email_safe_output(
     current_estimate = 0
 
     for room in sorted_rooms:
-        room_photo_count = len(photos_by_room[room])
-        room_estimate = room_photo_count * bytes_per_photo_estimate
+        if room_sizes is not None:
+            room_estimate = room_sizes[room]
+        else:
+            room_estimate = len(photos_by_room[room]) * bytes_per_photo_estimate
 
         if current_part and (current_estimate + room_estimate) > EMAIL_SAFE_TARGET_SIZE * 0.85:
             parts.append(current_part)
@@ -783,55 +817,171 @@ def generate_email_safe_output(
 
     if current_part:
         parts.append(current_part)
+    return parts
 
-    # Build each part
-    zip_buf = io.BytesIO()
-    claim_number = claim.get("claim_number") or claim.get("id", "unknown")
-    safe_claim = re.sub(r"[^a-zA-Z0-9_-]", "_", str(claim_number))
-
-    with zipfile.ZipFile(zip_buf, "w", zipfile.ZIP_DEFLATED) as zf:
-        for i, room_list in enumerate(parts, 1):
-            part_rooms = {r: photos_by_room[r] for r in room_list}
-            part_photos = [p for r in room_list for p in photos_by_room[r]]
-            part_info = f"Part {i} of {len(parts)}"
-
-            part_story = build_pdf_story(
-                part_rooms, part_photos, claim, user,
-                mode="email_safe", photo_dir=photo_dir, claim_id=claim_id,
-                include_ai=include_ai, include_gps=include_gps,
-                part_info=part_info,
-            )
-            part_pdf = build_single_pdf(part_story)
-            zf.writestr(
-                f"photo_report_{safe_claim}_part{i}.pdf",
-                part_pdf.getvalue(),
+
+def _safe_claim_number(claim: dict, default: str) -> str:
+    claim_number = claim.get("claim_number") or claim.get("id", default)
+    return re.sub(r"[^a-zA-Z0-9_-]", "_", str(claim_number))
+
+
+# ── on-disk renderer (process-pool entry point) ─────────────────────────────
+
+class _ProgressFile:
+    """Publishes build progress as a small JSON sidecar the API can poll."""
+
+    def __init__(self, path: Optional[str], total: int):
+        self.path = path
+        self.total = total
+        self.done = 0
+        self.phase = "rendering"
+        self._last_write = 0.0
+
+    def set_phase(self, phase: str, total: Optional[int] = None):
+        self.phase = phase
+        if total is not None:
+            self.total = total
+            self.done = 0
+        self.write(force=True)
+
+    def tick(self):
+        self.done += 1
+        self.write()
+
+    def write(self, force: bool = False):
+        if not self.path:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_write < 0.5 and self.done < self.total:
+            return
+        self._last_write = now
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"phase": self.phase, "done": self.done, "total": self.total}, f)
+        os.replace(tmp_path, self.path)
+
+
+def _merge_sections(section_paths: list[str], output_path: str) -> None:
+    """Concatenate section PDFs into ``output_path`` and number its pages."""
+    import fitz  # PyMuPDF
+
+    merged = fitz.open()
+    try:
+        for path in section_paths:
+            with fitz.open(path) as section:
+                merged.insert_pdf(section)
+        # Same footer as _add_page_number, drawn once the final order is known
+        grey = tuple(c / 255 for c in (0x9C, 0xA3, 0xAF))
+        for number, page in enumerate(merged, 1):
+            text = f"Page {number}"
+            width = fitz.get_text_length(text, fontname="helv", fontsize=8)
+            page.insert_text(
+                ((page.rect.width - width) / 2, page.rect.height - 0.4 * inch),
+                text, fontname="helv", fontsize=8, color=grey,
             )
+        merged.save(output_path, garbage=1, deflate=True)
+    finally:
+        merged.close()
 
-    zip_buf.seek(0)
-    return zip_buf, "application/zip"
 
+def render_photo_report(
+    photos_by_room: dict[str, list],
+    all_photos: list[dict],
+    claim: dict,
+    user: dict,
+    mode: str,
+    photo_dir: str,
+    claim_id: str,
+    output_path: str,
+    include_ai: bool = True,
+    include_gps: bool = True,
+    progress_path: Optional[str] = None,
+) -> str:
+    """
+    Build the report straight to ``output_path`` and return its content type.
 
-# ── orchestrator ─────────────────────────────────────────────────────────────
+    Runs inside a worker process, so it only touches the filesystem. Each
+    room is rendered to its own section file and dropped before the next,
+    so only one room's images are in memory at a time; the sections are
+    then merged and numbered. When an email-safe report is over the target
+    the same room sections are regrouped into parts and streamed into a ZIP.
+    """
+    progress = _ProgressFile(progress_path, len(all_photos))
+    progress.write(force=True)
+    styles = _build_pdf_styles()
+    sections_dir = f"{output_path}.sections"
+    os.makedirs(sections_dir, exist_ok=True)
 
-async def generate_photo_report(
+    def _write_section(name: str, story: list) -> str:
+        path = os.path.join(sections_dir, f"{name}.pdf")
+        build_single_pdf(story, path, page_numbers=False)
+        return path
+
+    try:
+        room_files: dict[str, str] = {}
+        for i, room_name in enumerate(sorted(photos_by_room.keys())):
+            room_files[room_name] = _write_section(f"room{i}", _room_story(
+                room_name, photos_by_room[room_name], all_photos, mode, photo_dir, claim_id, styles,
+                include_ai=include_ai, include_gps=include_gps, on_photo=progress.tick,
+            ))
+
+        progress.set_phase("writing")
+        front = _write_section("front", _front_story(photos_by_room, all_photos, claim, user, styles))
+        summary = _write_section("summary", _summary_story(photos_by_room, all_photos, claim, styles))
+        _merge_sections([front, *room_files.values(), summary], output_path)
+
+        pdf_size = os.path.getsize(output_path)
+        if mode != "email_safe" or pdf_size <= EMAIL_SAFE_TARGET_SIZE:
+            progress.set_phase("complete")
+            return "application/pdf"
+
+        logger.info(
+            "PDF exceeds email-safe limit, splitting",
+            claim_id=claim_id, pdf_size_mb=round(pdf_size / (1024 * 1024), 2),
+        )
+        parts = _split_rooms_into_parts(
+            photos_by_room, {room: os.path.getsize(path) for room, path in room_files.items()},
+        )
+        safe_claim = _safe_claim_number(claim, "unknown")
+        part_path = f"{output_path}.part"
+        progress.set_phase("splitting", total=len(parts))
+
+        with zipfile.ZipFile(output_path + ".zip", "w", zipfile.ZIP_DEFLATED) as zf:
+            for i, room_list in enumerate(parts, 1):
+                part_rooms = {r: photos_by_room[r] for r in room_list}
+                part_photos = [p for r in room_list for p in photos_by_room[r]]
+                part_info = f"Part {i} of {len(parts)}"
+                part_front = _write_section(
+                    f"front{i}", _front_story(part_rooms, part_photos, claim, user, styles, part_info),
+                )
+                part_summary = _write_section(f"summary{i}", _summary_story(part_rooms, part_photos, claim, styles))
+                _merge_sections([part_front, *(room_files[r] for r in room_list), part_summary], part_path)
+                zf.write(part_path, f"photo_report_{safe_claim}_part{i}.pdf")
+                os.remove(part_path)
+                progress.tick()
+
+        os.replace(output_path + ".zip", output_path)
+        progress.set_phase("complete")
+        return "application/zip"
+    finally:
+        shutil.rmtree(sections_dir, ignore_errors=True)
+
+
+# ── report inputs ────────────────────────────────────────────────────────────
+
+async def load_report_inputs(
     claim_id: str,
     mode: str,
-    user: dict,
     db,
     photo_dir: str,
-    include_ai: bool = True,
-    include_gps: bool = True,
     rooms: Optional[str] = None,
-) -> tuple[io.BytesIO, str, str]:
+) -> tuple[dict, list[dict], dict[str, list]]:
     """
-    Main orchestrator. Fetches data, deduplicates, runs preflight,
-    acquires a concurrency lock, and dispatches to the correct mode.
+    Fetch the claim and its photos, deduplicate, run preflight and group
+    by room. Returns (claim, photos, photos_by_room).
 
-    Returns (buffer, content_type, filename).
+    Raises ValueError when the claim or its photos cannot be reported on.
     """
-    t0 = time.time()
-
-    # ── fetch data ───────────────────────────────────────────────────────
     photo_query: dict = {"claim_id": claim_id}
     room_filter_list: list | None = None
     if rooms:
@@ -867,49 +1017,12 @@ async def generate_photo_report(
         room_name = photo.get("room") or UNCATEGORIZED_LABEL
         by_room.setdefault(room_name, []).append(photo)
 
-    # ── acquire lock & build ─────────────────────────────────────────────
-    lock = _get_lock(claim_id, mode)
-    async with lock:
-        if mode == "email_safe":
-            buf, content_type = generate_email_safe_output(
-                by_room, all_photos, claim, user,
-                photo_dir=photo_dir, claim_id=claim_id,
-                include_ai=include_ai, include_gps=include_gps,
-            )
-        else:
-            # Full fidelity — single PDF, no compression
-            story = build_pdf_story(
-                by_room, all_photos, claim, user,
-                mode="full_fidelity", photo_dir=photo_dir, claim_id=claim_id,
-                include_ai=include_ai, include_gps=include_gps,
-            )
-            buf = build_single_pdf(story)
-            content_type = "application/pdf"
-
-    # ── filename ─────────────────────────────────────────────────────────
-    claim_number = claim.get("claim_number") or claim.get("id", "N/A")
-    safe_claim = re.sub(r"[^a-zA-Z0-9_-]", "_", str(claim_number))
-    date_str = datetime.now().strftime("%Y%m%d")
+    return claim, all_photos, by_room
 
-    if content_type == "application/zip":
-        filename = f"photo_report_{safe_claim}_{date_str}.zip"
-    else:
-        filename = f"photo_report_{safe_claim}_{date_str}.pdf"
-
-    # ── metrics ──────────────────────────────────────────────────────────
-    duration_ms = round((time.time() - t0) * 1000, 1)
-    output_size = buf.getbuffer().nbytes
-    MetricsCollector.increment("pdf_generation_total", {"mode": mode})
-    MetricsCollector.record_timing("pdf_generation_ms", duration_ms, {"mode": mode})
-    logger.info(
-        "PDF generation complete",
-        claim_id=claim_id,
-        mode=mode,
-        photo_count=len(all_photos),
-        rooms=len(by_room),
-        output_size_mb=round(output_size / (1024 * 1024), 2),
-        duration_ms=duration_ms,
-        content_type=content_type,
-    )
 
-    return buf, content_type, filename
+def report_filename(claim: dict, content_type: str) -> str:
+    """Download filename for a report, e.g. ``photo_report_CLM-1_20250101.pdf``."""
+    safe_claim = _safe_claim_number(claim, "N/A")
+    date_str = datetime.now().strftime("%Y%m%d")
+    extension = "zip" if content_type == "application/zip" else "pdf"
+    return f"photo_report_{safe_claim}_{date_str}.{extension}"
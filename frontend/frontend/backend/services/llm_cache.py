@@ -0,0 +1,182 @@
+"""
+Exact-match LLM response cache.
+
+Deterministic prompts (claim predictions from ``_USER_PROMPT_TEMPLATE``,
+statute analyses and copilot plans for unchanged claim facts) are often
+re-sent within seconds or hours of each other, both through
+``LLMRouter.generate`` and the AI gateway (``_send_via_ai_gateway``). Responses are cached by
+``(provider, model, system prompt hash, prompt hash, temperature, max_tokens)``:
+
+- an in-process LRU answers repeats on the same instance,
+- ``llm_response_cache`` in Mongo (TTL on ``expires_at``) shares them across
+  instances and restarts,
+- identical requests already in flight are coalesced onto one upstream call.
+
+Caching is opt-in per task: callers pass a task name and only tasks listed in
+``LLM_CACHE_TASKS`` (default ``claim_prediction,statute_analysis,
+claims_copilot``) are cached. Failures and empty responses are never stored, and a cache outage
+falls through to the upstream call.
+
+Metrics: ``llm_cache_requests_total{task,result}`` with result one of
+``memory_hit``, ``mongo_hit``, ``coalesced``, ``miss``; and
+``llm_cache_latency_saved_ms{task}``, the upstream latency each hit avoided.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from dependencies import db as default_db
+from services.observability import MetricsCollector
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_TASKS = "claim_prediction,statute_analysis,claims_copilot"
+LLM_CACHE_TTL_SECONDS = int(os.environ.get("LLM_CACHE_TTL_SECONDS", str(24 * 60 * 60)))
+LLM_CACHE_LRU_SIZE = int(os.environ.get("LLM_CACHE_LRU_SIZE", "512"))
+CACHE_TASKS = frozenset(
+    task.strip()
+    for task in os.environ.get("LLM_CACHE_TASKS", DEFAULT_CACHE_TASKS).split(",")
+    if task.strip()
+)
+
+
+def _digest(text: Optional[str]) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def cache_key(
+    provider: str,
+    model: str,
+    system_prompt: Optional[str],
+    prompt: str,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+) -> str:
+    """Content address for one deterministic request."""
+    parts = [provider, model, _digest(system_prompt), _digest(prompt), repr(temperature), repr(max_tokens)]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def is_cacheable(task: Optional[str]) -> bool:
+    return bool(task) and task in CACHE_TASKS
+
+
+class LLMResponseCache:
+    """LRU in front of a Mongo TTL collection, with single-flight misses."""
+
+    def __init__(self, database=None, maxsize: int = LLM_CACHE_LRU_SIZE, ttl_seconds: int = LLM_CACHE_TTL_SECONDS):
+        self._database = database
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        # key -> (monotonic expiry, value, upstream latency ms)
+        self._lru: "OrderedDict[str, Tuple[float, Dict[str, Any], float]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    @property
+    def _collection(self):
+        database = self._database if self._database is not None else default_db
+        return database.llm_response_cache
+
+    def _remember(self, key: str, value: Dict[str, Any], latency_ms: float, ttl_seconds: float) -> None:
+        self._lru[key] = (time.monotonic() + ttl_seconds, value, latency_ms)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.maxsize:
+            self._lru.popitem(last=False)
+
+    def _recall(self, key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        entry = self._lru.get(key)
+        if entry is None:
+            return None
+        expires, value, latency_ms = entry
+        if expires < time.monotonic():
+            del self._lru[key]
+            return None
+        self._lru.move_to_end(key)
+        return value, latency_ms
+
+    @staticmethod
+    def _count(task: str, result: str, saved_ms: float = 0.0) -> None:
+        MetricsCollector.increment("llm_cache_requests_total", {"task": task, "result": result})
+        if saved_ms:
+            MetricsCollector.record_timing("llm_cache_latency_saved_ms", saved_ms, {"task": task})
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Dict[str, Any]]],
+        *,
+        task: str,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Return the cached value for *key*, or await *compute* once and cache it."""
+        recalled = self._recall(key)
+        if recalled is not None:
+            self._count(task, "memory_hit", recalled[1])
+            return recalled[0]
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            value, latency_ms = await asyncio.shield(pending)
+            self._count(task, "coalesced", latency_ms)
+            return value
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value, latency_ms, source = await self._load_or_compute(key, compute, task, meta or {})
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()  # mark retrieved when nobody else is waiting
+            raise
+        else:
+            future.set_result((value, latency_ms))
+            self._count(task, source, latency_ms if source == "mongo_hit" else 0.0)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _load_or_compute(self, key, compute, task, meta) -> Tuple[Dict[str, Any], float, str]:
+        now = datetime.now(timezone.utc)
+        try:
+            doc = await self._collection.find_one({"_id": key, "expires_at": {"$gt": now}})
+        except Exception as exc:
+            logger.warning("LLM cache read failed: %s", exc)
+            doc = None
+        if doc is not None:
+            remaining = (doc["expires_at"].replace(tzinfo=doc["expires_at"].tzinfo or timezone.utc) - now).total_seconds()
+            self._remember(key, doc["value"], doc.get("latency_ms", 0.0), remaining)
+            return doc["value"], doc.get("latency_ms", 0.0), "mongo_hit"
+
+        started = time.perf_counter()
+        value = await compute()
+        latency_ms = round((time.perf_counter() - started) * 1000, 1)
+        if value.get("text"):
+            self._remember(key, value, latency_ms, self.ttl_seconds)
+            try:
+                await self._collection.update_one(
+                    {"_id": key},
+                    {"$set": {
+                        "value": value,
+                        "task": task,
+                        "latency_ms": latency_ms,
+                        "created_at": now,
+                        "expires_at": now + timedelta(seconds=self.ttl_seconds),
+                        **meta,
+                    }},
+                    upsert=True,
+                )
+            except Exception as exc:
+                logger.warning("LLM cache write failed: %s", exc)
+        return value, latency_ms, "miss"
+
+    def clear(self) -> None:
+        """Drop the in-process tier (tests, or after a prompt change)."""
+        self._lru.clear()
+
+
+response_cache = LLMResponseCache()
@@ -0,0 +1,158 @@
+"""
+Team message search.
+
+Messages carry two index fields maintained on write:
+
+- ``search_terms``    — normalized whole tokens (used for ranking)
+- ``search_prefixes`` — every 2..12 character prefix of those tokens
+
+A multikey index on ``search_prefixes`` lets ``$all`` answer "every query
+word is a prefix of some word in the message" without scanning bodies, so
+typing "hail dam" finds "Hail damage on north slope". Candidates are ranked
+in Python (exact-word hits, title hits, recency) and returned with highlight
+spans for the UI.
+"""
+import logging
+import re
+import unicodedata
+from datetime import datetime, timezone
+from typing import Optional
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+MIN_PREFIX = 2
+MAX_PREFIX = 12
+MAX_TERMS_PER_MESSAGE = 300
+# Newest matching messages considered for ranking
+CANDIDATE_LIMIT = 500
+SNIPPET_CHARS = 160
+BACKFILL_BATCH = 500
+
+SEARCH_FIELDS = ("search_terms", "search_prefixes")
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _normalize(text: str) -> str:
+    # Strip accents so "café" matches "cafe"
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(_normalize(text))
+
+
+def _searchable_text(message: dict) -> str:
+    if message.get("is_deleted"):
+        return ""
+    parts = [message.get("title"), message.get("body"), message.get("attachment_name")]
+    return " ".join(p for p in parts if p)
+
+
+def index_fields(message: dict) -> dict:
+    """Search fields to store on a message document."""
+    terms = sorted(set(tokenize(_searchable_text(message))))[:MAX_TERMS_PER_MESSAGE]
+    prefixes = {
+        term[:length]
+        for term in terms
+        for length in range(MIN_PREFIX, min(len(term), MAX_PREFIX) + 1)
+    }
+    return {"search_terms": terms, "search_prefixes": sorted(prefixes)}
+
+
+def query_prefixes(q: str) -> list[str]:
+    """Distinct query words usable as prefix filters (1-char words are dropped)."""
+    return sorted({token[:MAX_PREFIX] for token in tokenize(q) if len(token) >= MIN_PREFIX})
+
+
+def _score(message: dict, query_tokens: list[str], now: datetime) -> float:
+    terms = set(message.get("search_terms") or [])
+    title_terms = set(tokenize(message.get("title") or ""))
+    score = 0.0
+    for token in query_tokens:
+        if token in terms:
+            score += 3.0
+        elif any(term.startswith(token) for term in terms):
+            score += 1.0
+        if any(term.startswith(token) for term in title_terms):
+            score += 1.0
+    try:
+        age_days = (now - datetime.fromisoformat(message.get("created_at", ""))).total_seconds() / 86400
+    except (TypeError, ValueError):
+        age_days = 365
+    # Recency only breaks ties between similarly relevant messages
+    return score + 1.0 / (1.0 + max(age_days, 0) / 30)
+
+
+def highlight(text: str, query_tokens: list[str]) -> dict:
+    """Snippet around the first hit plus ``[start, end)`` spans of matching words."""
+    text = text or ""
+    normalized = _normalize(text)
+    # NFKD can change lengths; only trust offsets when it did not
+    source = normalized if len(normalized) == len(text) else text.lower()
+    spans = []
+    for match in _TOKEN_RE.finditer(source):
+        word = match.group()
+        for token in query_tokens:
+            if word.startswith(token):
+                spans.append((match.start(), match.start() + len(token)))
+                break
+
+    start = 0
+    if spans and len(text) > SNIPPET_CHARS:
+        start = max(0, min(spans[0][0] - SNIPPET_CHARS // 4, len(text) - SNIPPET_CHARS))
+    end = start + SNIPPET_CHARS
+    snippet = text[start:end]
+    return {
+        "snippet": ("…" if start > 0 else "") + snippet + ("…" if end < len(text) else ""),
+        "highlights": [
+            {"start": s - start + (1 if start > 0 else 0), "end": e - start + (1 if start > 0 else 0)}
+            for s, e in spans if s >= start and e <= end
+        ],
+    }
+
+
+def rank_results(messages: list[dict], q: str, limit: int, now: Optional[datetime] = None) -> list[dict]:
+    """Order candidates by relevance, attach highlights and drop index fields."""
+    now = now or datetime.now(timezone.utc)
+    query_tokens = query_prefixes(q)
+    if query_tokens:
+        scored = sorted(
+            messages,
+            key=lambda m: (_score(m, query_tokens, now), m.get("created_at", "")),
+            reverse=True,
+        )
+    else:
+        scored = messages
+
+    results = []
+    for message in scored[:limit]:
+        result = {k: v for k, v in message.items() if k not in SEARCH_FIELDS}
+        if query_tokens:
+            result.update(highlight(message.get("body") or message.get("title") or "", query_tokens))
+            result["score"] = round(_score(message, query_tokens, now), 3)
+        results.append(result)
+    return results
+
+
+async def backfill_message_search_index(db, batch_size: int = BACKFILL_BATCH, max_batches: int = 20) -> int:
+    """Index messages written before search fields existed. Returns the count."""
+    indexed = 0
+    for _ in range(max_batches):
+        messages = await db.comms_messages.find(
+            {"search_prefixes": {"$exists": False}},
+            {"_id": 0, "id": 1, "title": 1, "body": 1, "attachment_name": 1, "is_deleted": 1},
+        ).limit(batch_size).to_list(batch_size)
+        if not messages:
+            break
+        await db.comms_messages.bulk_write(
+            [UpdateOne({"id": m["id"]}, {"$set": index_fields(m)}) for m in messages],
+            ordered=False,
+        )
+        indexed += len(messages)
+    if indexed:
+        logger.info("Message search backfill indexed %d messages", indexed)
+    return indexed
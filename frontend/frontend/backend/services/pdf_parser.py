@@ -3,7 +3,6 @@ PDF Parser Service
 Extracts line items from insurance estimate PDFs.
 Supports Xactimate (primary), Symbility, and Simsol formats.
 """
-import fitz  # PyMuPDF
 import re
 import io
 from abc import ABC, abstractmethod
@@ -162,6 +161,8 @@ class XactimateParser(BaseParser):
         extraction.  Header info is still searched across all pages.
         """
         try:
+            import fitz  # PyMuPDF
+
             doc = fitz.open(stream=pdf_bytes, filetype="pdf")
 
             all_page_texts = []
@@ -0,0 +1,182 @@
+"""
+Inspection photo derivatives.
+
+Resized copies of each inspection photo are produced once, at upload time,
+in a process pool so Pillow's resampling never runs on the event loop:
+
+- ``thumb``  — 300px, gallery grids
+- ``medium`` — 1200px, embedded in PDF reports
+- ``web``    — 2048px progressive JPEG, full-screen viewing
+
+EXIF orientation is applied before resizing so phone photos are upright.
+Derivative files live next to the original under ``derivatives/`` and are
+recorded on the photo document. Photos are content-addressed (the id is a
+SHA-256 prefix), so derivatives never change and can be cached immutably.
+"""
+import asyncio
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from dependencies import db
+
+logger = logging.getLogger(__name__)
+
+# Bump when specs change so the backfill regenerates existing derivatives.
+DERIVATIVE_VERSION = 1
+
+DERIVATIVE_SPECS = {
+    "thumb": {"max_px": 300, "quality": 80, "progressive": False},
+    "medium": {"max_px": 1200, "quality": 82, "progressive": False},
+    "web": {"max_px": 2048, "quality": 85, "progressive": True},
+}
+
+DERIVATIVE_WORKERS = int(os.environ.get("PHOTO_DERIVATIVE_WORKERS", "2"))
+BACKFILL_CONCURRENCY = DERIVATIVE_WORKERS * 2
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=DERIVATIVE_WORKERS)
+    return _pool
+
+
+def shutdown_derivative_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def photo_base_dir(photo: dict, photo_dir: str) -> str:
+    if photo.get("claim_id"):
+        return os.path.join(photo_dir, photo["claim_id"])
+    return photo_dir
+
+
+def derivative_path(photo: dict, size: str, photo_dir: str) -> str:
+    return os.path.join(photo_base_dir(photo, photo_dir), "derivatives", f"{photo['id']}_{size}.jpg")
+
+
+def derivative_etag(photo: dict, size: str) -> str:
+    content_key = photo.get("sha256_hash") or photo["id"]
+    return f'"{content_key[:16]}-{size}-v{DERIVATIVE_VERSION}"'
+
+
+def render_derivatives(original_path: str, output_paths: Dict[str, str]) -> Dict[str, dict]:
+    """Decode once, fix orientation, and write every derivative.
+
+    Runs inside the process pool, so it only touches the filesystem.
+    """
+    from PIL import Image, ImageOps
+
+    results = {}
+    largest = max(DERIVATIVE_SPECS[size]["max_px"] for size in output_paths)
+    with Image.open(original_path) as source:
+        # JPEG can decode at a reduced scale directly — much cheaper than a
+        # full decode of a 12MP phone photo followed by a downscale.
+        source.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(source)
+        if image.mode in ("RGBA", "LA", "P"):
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        elif image.mode != "RGB":
+            image = image.convert("RGB")
+
+        # Largest first so each smaller size resamples from a smaller image.
+        for size in sorted(output_paths, key=lambda s: DERIVATIVE_SPECS[s]["max_px"], reverse=True):
+            spec = DERIVATIVE_SPECS[size]
+            image.thumbnail((spec["max_px"], spec["max_px"]), Image.LANCZOS)
+            path = output_paths[size]
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            image.save(tmp_path, format="JPEG", quality=spec["quality"], optimize=True, progressive=spec["progressive"])
+            os.replace(tmp_path, path)
+            results[size] = {
+                "filename": os.path.basename(path),
+                "width": image.width,
+                "height": image.height,
+                "bytes": os.path.getsize(path),
+            }
+    return results
+
+
+async def generate_photo_derivatives(photo: dict, photo_dir: str) -> Optional[Dict[str, dict]]:
+    """Render all derivatives for ``photo`` off-loop and record them on the doc."""
+    original_path = os.path.join(photo_base_dir(photo, photo_dir), photo["filename"])
+    if not os.path.exists(original_path):
+        logger.warning("Derivatives skipped for %s: original missing", photo.get("id"))
+        # Stamp the version so the backfill stops re-selecting it every night
+        await db.inspection_photos.update_one(
+            {"id": photo["id"]},
+            {"$set": {"derivatives_error": "original missing", "derivatives_version": DERIVATIVE_VERSION}},
+        )
+        return None
+
+    output_paths = {size: derivative_path(photo, size, photo_dir) for size in DERIVATIVE_SPECS}
+    loop = asyncio.get_running_loop()
+    try:
+        derivatives = await loop.run_in_executor(_get_pool(), render_derivatives, original_path, output_paths)
+    except Exception as e:
+        logger.warning("Derivative generation failed for %s: %s", photo.get("id"), e)
+        await db.inspection_photos.update_one(
+            {"id": photo["id"]},
+            {"$set": {"derivatives_error": str(e)[:200], "derivatives_version": DERIVATIVE_VERSION}},
+        )
+        return None
+
+    await db.inspection_photos.update_one(
+        {"id": photo["id"]},
+        {
+            "$set": {
+                "derivatives": derivatives,
+                "derivatives_version": DERIVATIVE_VERSION,
+                "derivatives_generated_at": datetime.now(timezone.utc).isoformat(),
+            },
+            "$unset": {"derivatives_error": ""},
+        },
+    )
+    return derivatives
+
+
+def remove_photo_derivatives(photo: dict, photo_dir: str) -> None:
+    for size in DERIVATIVE_SPECS:
+        path = derivative_path(photo, size, photo_dir)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+async def backfill_photo_derivatives(photo_dir: str, limit: int = 5000) -> dict:
+    """Generate derivatives for photos uploaded before the pipeline existed
+    (or rendered with an older ``DERIVATIVE_VERSION``)."""
+    stats = {"processed": 0, "generated": 0, "failed": 0}
+    cursor = db.inspection_photos.find(
+        {"derivatives_version": {"$ne": DERIVATIVE_VERSION}},
+        {"_id": 0, "id": 1, "claim_id": 1, "filename": 1, "sha256_hash": 1},
+    ).limit(limit)
+    semaphore = asyncio.Semaphore(BACKFILL_CONCURRENCY)
+
+    async def _one(photo: dict):
+        async with semaphore:
+            result = await generate_photo_derivatives(photo, photo_dir)
+        stats["processed"] += 1
+        stats["generated" if result else "failed"] += 1
+
+    batch = []
+    async for photo in cursor:
+        batch.append(_one(photo))
+        if len(batch) >= 100:
+            await asyncio.gather(*batch)
+            batch = []
+    if batch:
+        await asyncio.gather(*batch)
+
+    logger.info("Photo derivative backfill: %s", stats)
+    return stats
@@ -0,0 +1,294 @@
+"""
+Photo report export jobs.
+
+Building a carrier photo report decodes and re-encodes every photo, which for
+a 500-photo claim takes tens of seconds and hundreds of MB. Exports therefore
+run as jobs: ReportLab renders in a process pool (``render_photo_report``),
+writing the PDF/ZIP straight to disk next to the claim's photos, while the
+API polls ``photo_report_jobs`` for status and progress.
+
+Results are cached by a hash of everything that appears in the report — the
+photo set (ids, content hashes, rooms, captions, GPS...), the claim header
+fields, the inspector name and the export options. Re-exporting an unchanged
+claim returns the existing file instantly; any edit produces a new key.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from dependencies import db
+from services.observability import MetricsCollector
+
+logger = logging.getLogger(__name__)
+
+# Bump when the report layout changes so cached reports are rebuilt.
+REPORT_FORMAT_VERSION = 1
+
+REPORT_WORKERS = int(os.environ.get("PHOTO_REPORT_WORKERS", "1"))
+# A running job that has not finished in this long is assumed dead (worker
+# restarted mid-build) and a new request starts over.
+JOB_STALE_SECONDS = 15 * 60
+WAIT_POLL_SECONDS = 0.5
+# Cached reports kept per claim; older variants are pruned after each build.
+REPORTS_KEPT_PER_CLAIM = 4
+
+# Photo fields that affect the rendered report
+REPORT_PHOTO_FIELDS = (
+    "id", "sha256_hash", "filename", "room", "captured_at", "latitude", "longitude",
+    "ai_caption", "ai_damage_assessment", "voice_snippet", "is_before",
+    "paired_photo_id", "derivatives_version",
+)
+REPORT_CLAIM_FIELDS = ("id", "claim_number", "client_name", "insured_name", "property_address", "loss_location")
+
+_pool: Optional[ProcessPoolExecutor] = None
+# Jobs rendering in this process, so a waiting request can await the task
+# instead of polling the database.
+_running: Dict[str, asyncio.Task] = {}
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=REPORT_WORKERS)
+    return _pool
+
+
+def shutdown_report_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def report_cache_key(photos: list, claim: dict, user: dict, options: dict) -> str:
+    """SHA-256 over the report's inputs, in a stable order."""
+    payload = {
+        "v": REPORT_FORMAT_VERSION,
+        "options": options,
+        "inspector": user.get("name") or "",
+        "claim": {field: claim.get(field) for field in REPORT_CLAIM_FIELDS},
+        "photos": [[photo.get(field) for field in REPORT_PHOTO_FIELDS] for photo in photos],
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def report_path(photo_dir: str, claim_id: str, cache_key: str) -> str:
+    return os.path.join(photo_dir, os.path.basename(claim_id), "reports", f"{cache_key}.report")
+
+
+def _progress_path(output_path: str) -> str:
+    return f"{output_path}.progress.json"
+
+
+def _read_progress(output_path: str) -> Optional[dict]:
+    try:
+        with open(_progress_path(output_path)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _is_stale(job: dict) -> bool:
+    started = job.get("started_at") or job.get("created_at")
+    if not started:
+        return False
+    try:
+        started_at = datetime.fromisoformat(started)
+    except ValueError:
+        return False
+    return datetime.now(timezone.utc) - started_at > timedelta(seconds=JOB_STALE_SECONDS)
+
+
+def serialize_job(job: dict) -> dict:
+    """Public view of a job document, with live progress while rendering."""
+    progress = job.get("progress") or {"phase": job.get("status"), "done": 0, "total": job.get("photo_count", 0)}
+    if job.get("status") == "running":
+        progress = _read_progress(job["path"]) or progress
+    return {
+        "id": job["id"],
+        "claim_id": job["claim_id"],
+        "status": job["status"],
+        "mode": job.get("mode"),
+        "photo_count": job.get("photo_count", 0),
+        "progress": progress,
+        "content_type": job.get("content_type"),
+        "filename": job.get("filename"),
+        "size_bytes": job.get("size_bytes"),
+        "cached": job.get("cached", False),
+        "error": job.get("error"),
+        "created_at": job.get("created_at"),
+        "completed_at": job.get("completed_at"),
+        "download_url": f"/api/inspections/photo-report-jobs/{job['id']}/download"
+        if job["status"] == "complete" else None,
+    }
+
+
+async def _find_reusable_job(cache_key: str) -> Optional[dict]:
+    """Latest job for ``cache_key`` that is done (file still on disk) or still live."""
+    jobs = await db.photo_report_jobs.find(
+        {"cache_key": cache_key, "status": {"$in": ["queued", "running", "complete"]}},
+        {"_id": 0},
+    ).sort("created_at", -1).to_list(5)
+    for job in jobs:
+        if job["status"] == "complete" and os.path.exists(job["path"]):
+            return job
+        if job["status"] in ("queued", "running") and (job["id"] in _running or not _is_stale(job)):
+            return job
+    return None
+
+
+async def start_photo_report_job(
+    claim_id: str,
+    mode: str,
+    user: dict,
+    photo_dir: str,
+    include_ai: bool = True,
+    include_gps: bool = True,
+    rooms: Optional[str] = None,
+) -> dict:
+    """
+    Return the job for this export, reusing a cached or in-flight one when
+    the inputs are unchanged, otherwise queueing a new render.
+
+    Raises ValueError when the claim or its photos cannot be reported on.
+    """
+    # ReportLab is only needed once someone exports; keep it off the import path
+    from services.inspection_pdf_service import load_report_inputs
+
+    claim, photos, by_room = await load_report_inputs(claim_id, mode, db, photo_dir, rooms)
+    options = {"mode": mode, "include_ai": include_ai, "include_gps": include_gps, "rooms": sorted(by_room)}
+    cache_key = report_cache_key(photos, claim, user, options)
+
+    existing = await _find_reusable_job(cache_key)
+    if existing:
+        if existing["status"] == "complete":
+            MetricsCollector.increment("pdf_report_cache_hits_total", {"mode": mode})
+            existing["cached"] = True
+        return existing
+
+    now = datetime.now(timezone.utc).isoformat()
+    job = {
+        "id": str(uuid.uuid4()),
+        "claim_id": claim_id,
+        "cache_key": cache_key,
+        "status": "queued",
+        "mode": mode,
+        "options": options,
+        "photo_count": len(photos),
+        "path": report_path(photo_dir, claim_id, cache_key),
+        "content_type": None,
+        "filename": None,
+        "size_bytes": None,
+        "error": None,
+        "requested_by": user.get("id"),
+        "created_at": now,
+        "started_at": None,
+        "completed_at": None,
+    }
+    await db.photo_report_jobs.insert_one(dict(job))
+    MetricsCollector.increment("pdf_report_jobs_total", {"mode": mode})
+
+    task = asyncio.create_task(_run_job(job, claim, photos, by_room, user, photo_dir))
+    _running[job["id"]] = task
+    task.add_done_callback(lambda _: _running.pop(job["id"], None))
+    return job
+
+
+async def _run_job(job: dict, claim: dict, photos: list, by_room: dict, user: dict, photo_dir: str) -> None:
+    from services.inspection_pdf_service import render_photo_report, report_filename
+
+    output_path = job["path"]
+    tmp_path = f"{output_path}.{job['id'][:8]}.tmp"
+    t0 = time.time()
+    await _update_job(job["id"], {"status": "running", "started_at": datetime.now(timezone.utc).isoformat()})
+
+    try:
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        loop = asyncio.get_running_loop()
+        content_type = await loop.run_in_executor(
+            _get_pool(),
+            render_photo_report,
+            by_room, photos, claim, {"name": user.get("name")}, job["mode"], photo_dir, job["claim_id"],
+            tmp_path, job["options"]["include_ai"], job["options"]["include_gps"], _progress_path(output_path),
+        )
+        os.replace(tmp_path, output_path)
+    except Exception as e:
+        logger.error("Photo report job %s failed for claim %s: %s", job["id"], job["claim_id"], e)
+        MetricsCollector.increment("pdf_report_jobs_failed_total", {"mode": job["mode"]})
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        await _update_job(job["id"], {
+            "status": "failed",
+            "error": str(e)[:500],
+            "completed_at": datetime.now(timezone.utc).isoformat(),
+        })
+        return
+
+    size_bytes = os.path.getsize(output_path)
+    duration_ms = round((time.time() - t0) * 1000, 1)
+    await _update_job(job["id"], {
+        "status": "complete",
+        "content_type": content_type,
+        "filename": report_filename(claim, content_type),
+        "size_bytes": size_bytes,
+        "progress": _read_progress(output_path),
+        "completed_at": datetime.now(timezone.utc).isoformat(),
+    })
+    _cleanup_report_dir(output_path)
+    MetricsCollector.increment("pdf_generation_total", {"mode": job["mode"]})
+    MetricsCollector.record_timing("pdf_generation_ms", duration_ms, {"mode": job["mode"]})
+    logger.info(
+        "Photo report %s complete: claim=%s photos=%d size_mb=%.2f duration_ms=%s",
+        job["id"], job["claim_id"], len(photos), size_bytes / (1024 * 1024), duration_ms,
+    )
+
+
+def _cleanup_report_dir(output_path: str) -> None:
+    """Drop the progress sidecar and prune old report variants for the claim."""
+    try:
+        os.remove(_progress_path(output_path))
+    except OSError:
+        pass
+    reports_dir = os.path.dirname(output_path)
+    reports = sorted(
+        (os.path.join(reports_dir, name) for name in os.listdir(reports_dir) if name.endswith(".report")),
+        key=os.path.getmtime,
+        reverse=True,
+    )
+    for stale in reports[REPORTS_KEPT_PER_CLAIM:]:
+        try:
+            os.remove(stale)
+        except OSError:
+            pass
+
+
+async def _update_job(job_id: str, fields: dict) -> None:
+    await db.photo_report_jobs.update_one({"id": job_id}, {"$set": fields})
+
+
+async def get_photo_report_job(job_id: str) -> Optional[dict]:
+    return await db.photo_report_jobs.find_one({"id": job_id}, {"_id": 0})
+
+
+async def wait_for_photo_report_job(job_id: str, timeout: float = 600) -> Optional[dict]:
+    """Block until the job leaves queued/running (or ``timeout`` elapses)."""
+    task = _running.get(job_id)
+    if task:
+        await asyncio.wait_for(asyncio.shield(task), timeout)
+        return await get_photo_report_job(job_id)
+
+    # Rendering in another worker — poll the job document
+    deadline = time.monotonic() + timeout
+    while True:
+        job = await get_photo_report_job(job_id)
+        if not job or job["status"] not in ("queued", "running") or time.monotonic() >= deadline:
+            return job
+        await asyncio.sleep(WAIT_POLL_SECONDS)
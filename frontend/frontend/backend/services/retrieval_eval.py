@@ -0,0 +1,76 @@
+"""
+Fixed relevance set for the retrieval index.
+
+Each query names the corpus it runs against and the document ids a good
+answer must rank. ``evaluate`` reports recall@k, MRR and per-query latency;
+``scripts/bench_retrieval.py`` prints it, and the test suite holds the
+static corpora to a recall floor.
+"""
+import statistics
+import time
+from typing import Dict, List, Sequence, Tuple
+
+from services.retrieval_index import RetrievalIndex
+
+# (corpus, query, relevant doc ids)
+EVAL_QUERIES: List[Tuple[str, str, Sequence[str]]] = [
+    ("statutes", "public adjuster contract rescission period", ["pa_laws:626.8796"]),
+    ("statutes", "surety bond and licensing exam requirements", ["pa_laws:626.865"]),
+    ("statutes", "how many apprentices can a supervisor have", ["pa_laws:626.8651"]),
+    ("statutes", "conflict of interest with contractors doing repairs", ["pa_laws:626.8795"]),
+    ("statutes", "maximum fee percentage after a declared emergency", ["pa_laws:fee-structures"]),
+    ("statutes", "code of ethics for public adjusters", ["pa_laws:69B-220.201"]),
+    ("statutes", "days for the insurer to pay or deny a claim", ["pa_laws:claims-timelines"]),
+    ("statutes", "assignment of benefits reforms", ["pa_laws:aob-reforms"]),
+    ("statutes", "appraisal umpire dispute", ["pa_laws:appraisal"]),
+    ("statutes", "626.854 solicitation hours", ["pa_laws:626.854"]),
+    ("experts", "hail damaged shingles documentation", ["experts:john-senac"]),
+    ("experts", "bad faith carrier delays", ["experts:chip-merlin"]),
+    ("experts", "ambiguous policy language coverage disputes", ["experts:bill-wilson"]),
+    ("experts", "appraisal umpire windstorm", ["experts:john-voelpel"]),
+    ("experts", "AI for adjusting workflows", ["experts:lynette-young"]),
+    ("experts", "burden of proof on the policyholder", ["experts:matthew-mulholland"]),
+    ("experts", "grow a public adjusting business metrics", ["experts:vince-perri"]),
+    ("experts", "start with why", ["experts:simon-sinek"]),
+    ("experts", "extreme ownership discipline", ["experts:jocko-willink"]),
+]
+
+
+def evaluate(
+    index: RetrievalIndex,
+    queries: Sequence[Tuple[str, str, Sequence[str]]] = EVAL_QUERIES,
+    k: int = 5,
+    repeats: int = 50,
+) -> Dict[str, object]:
+    """Recall@k, MRR and search latency (µs) for *queries* on *index*."""
+    hits_at_k = 0
+    reciprocal_ranks: List[float] = []
+    latencies_us: List[float] = []
+    misses: List[str] = []
+
+    for corpus, query, relevant in queries:
+        ranked = [hit.doc_id for hit in index.search(corpus, query, k)]
+        rank = next((i + 1 for i, doc_id in enumerate(ranked) if doc_id in relevant), None)
+        if rank is None:
+            misses.append(query)
+            reciprocal_ranks.append(0.0)
+        else:
+            hits_at_k += 1
+            reciprocal_ranks.append(1.0 / rank)
+        for _ in range(repeats):
+            started = time.perf_counter()
+            index.search(corpus, query, k)
+            latencies_us.append((time.perf_counter() - started) * 1e6)
+
+    latencies_us.sort()
+    return {
+        "queries": len(queries),
+        f"recall@{k}": round(hits_at_k / len(queries), 3),
+        "mrr": round(statistics.fmean(reciprocal_ranks), 3),
+        "latency_us": {
+            "p50": round(latencies_us[len(latencies_us) // 2], 1),
+            "p95": round(latencies_us[int(len(latencies_us) * 0.95)], 1),
+            "max": round(latencies_us[-1], 1),
+        },
+        "misses": misses,
+    }
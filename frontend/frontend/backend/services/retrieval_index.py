@@ -0,0 +1,561 @@
+"""
+In-memory BM25 retrieval for Eve and the knowledge base.
+
+One ``BM25Index`` per corpus, all held by the process-wide ``retrieval_index``:
+
+    statutes    ``florida_statutes`` plus the static ``FLORIDA_PA_LAWS`` summaries
+    experts     ``INDUSTRY_EXPERTS`` figures and leadership mentors
+    knowledge   ``eve_knowledge_base`` sections
+    university  published ``courses``, ``articles`` and ``custom_documents``
+
+Static sources are indexed on first use. Mongo-backed sources are loaded by
+``refresh()``: at startup from the gzip snapshot at ``RETRIEVAL_SNAPSHOT_PATH``
+when one exists, then every ``RETRIEVAL_REFRESH_MINUTES`` from the
+collections. Each document carries a content stamp, so a refresh only
+re-tokenizes documents that changed and drops ones that disappeared.
+
+Queries walk the postings of their terms only. Per-term impact lists are
+cached until the corpus next changes, so a top-k query over a few thousand
+documents takes tens of microseconds. ``search(..., prefix=True)`` also
+expands the last query word to the indexed words it begins (matched
+before stemming, so "roofin" finds "roofing"), for search-as-you-type boxes.
+"""
+import asyncio
+import bisect
+import gzip
+import hashlib
+import heapq
+import json
+import logging
+import math
+import os
+import re
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from services.observability import MetricsCollector
+
+logger = logging.getLogger(__name__)
+
+K1 = 1.2
+B = 0.75
+TITLE_WEIGHT = 3
+MAX_PREFIX_EXPANSIONS = 12
+SNAPSHOT_FORMAT = 2
+TOKENIZER_VERSION = 1
+RETRIEVAL_SNAPSHOT_PATH = os.environ.get(
+    "RETRIEVAL_SNAPSHOT_PATH", os.path.join(tempfile.gettempdir(), "eden_retrieval_snapshot.json.gz")
+)
+RETRIEVAL_REFRESH_MINUTES = int(os.environ.get("RETRIEVAL_REFRESH_MINUTES", "10"))
+
+_TOKEN_RE = re.compile(r"\d+(?:[.\-]\d+)+|[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from has have how i if in is it its me my "
+    "of on or our that the their them they this to was what when where which who why will "
+    "with you your about tell please should would could".split()
+)
+
+
+def _stem(token: str) -> str:
+    """Light suffix stripping so "claims"/"claim" and "denied"/"deny" meet."""
+    if token[0].isdigit() or len(token) <= 4:
+        return token
+    for suffix, replacement in (("ies", "y"), ("ied", "y"), ("ing", ""), ("ed", ""), ("es", ""), ("s", "")):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[: -len(suffix)] + replacement
+    return token
+
+
+def _words(text: Optional[str]) -> List[str]:
+    """Lowercased tokens before stemming, stopwords dropped."""
+    return [t for t in _TOKEN_RE.findall((text or "").lower()) if t not in STOPWORDS]
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return [_stem(t) for t in _words(text)]
+
+
+def _stamp(*parts: Any) -> str:
+    return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+@dataclass
+class SourceDoc:
+    """A document as a source yields it, before tokenization."""
+    doc_id: str
+    title: str
+    body: str
+    payload: Dict[str, Any]
+
+
+@dataclass
+class IndexedDoc:
+    doc_id: str
+    source: str
+    stamp: str
+    payload: Dict[str, Any]
+    terms: Dict[str, int]
+    length: int
+    # unstemmed words, for prefix completion of partly typed words
+    surfaces: List[str] = field(default_factory=list)
+
+
+@dataclass
+class Hit:
+    doc_id: str
+    score: float
+    payload: Dict[str, Any]
+    matched: List[str] = field(default_factory=list)
+
+
+def doc_stamp(doc: SourceDoc) -> str:
+    return _stamp(doc.title, doc.body, doc.payload)
+
+
+def prepare(source: str, doc: SourceDoc, stamp: str) -> IndexedDoc:
+    """Tokenize *doc* (title terms weighted ``TITLE_WEIGHT``); touches no index state."""
+    terms: Dict[str, int] = {}
+    surfaces: Dict[str, None] = {}
+    for weight, text in ((TITLE_WEIGHT, doc.title), (1, doc.body)):
+        for word in _words(text):
+            token = _stem(word)
+            terms[token] = terms.get(token, 0) + weight
+            surfaces[word] = None
+    return IndexedDoc(doc.doc_id, source, stamp, doc.payload, terms, sum(terms.values()), list(surfaces))
+
+
+class BM25Index:
+    """Inverted index with incremental upsert/remove and cached term impacts."""
+
+    def __init__(self) -> None:
+        self.docs: Dict[str, IndexedDoc] = {}
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self._total_length = 0
+        # term -> [(doc_id, bm25 contribution)]; cleared whenever the corpus changes
+        self._impacts: Dict[str, List[Tuple[str, float]]] = {}
+        # unstemmed word -> number of docs using it; prefixes are matched
+        # against these ("roofin" never prefixes the stem "roof")
+        self._surface_df: Dict[str, int] = {}
+        # sorted surface vocabulary for prefix expansion; rebuilt lazily after a change
+        self._vocab: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def is_current(self, doc_id: str, stamp: str) -> bool:
+        current = self.docs.get(doc_id)
+        return current is not None and current.stamp == stamp
+
+    def upsert(self, source: str, doc: SourceDoc) -> bool:
+        """Index *doc*; returns False when the stored copy is already current."""
+        stamp = doc_stamp(doc)
+        if self.is_current(doc.doc_id, stamp):
+            return False
+        self._add(prepare(source, doc, stamp))
+        return True
+
+    def _add(self, doc: IndexedDoc) -> None:
+        self.remove(doc.doc_id)
+        self.docs[doc.doc_id] = doc
+        for term, tf in doc.terms.items():
+            self.postings.setdefault(term, {})[doc.doc_id] = tf
+        for word in doc.surfaces:
+            self._surface_df[word] = self._surface_df.get(word, 0) + 1
+        self._total_length += doc.length
+        self._impacts.clear()
+        self._vocab = None
+
+    def remove(self, doc_id: str) -> bool:
+        doc = self.docs.pop(doc_id, None)
+        if doc is None:
+            return False
+        for term in doc.terms:
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self.postings[term]
+        for word in doc.surfaces:
+            remaining = self._surface_df.get(word, 0) - 1
+            if remaining > 0:
+                self._surface_df[word] = remaining
+            else:
+                self._surface_df.pop(word, None)
+        self._total_length -= doc.length
+        self._impacts.clear()
+        self._vocab = None
+        return True
+
+    def _term_impacts(self, term: str) -> List[Tuple[str, float]]:
+        cached = self._impacts.get(term)
+        if cached is not None:
+            return cached
+        posting = self.postings.get(term)
+        if not posting:
+            return []
+        n = len(self.docs)
+        avgdl = self._total_length / n if n else 1.0
+        idf = math.log(1.0 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+        impacts = []
+        for doc_id, tf in posting.items():
+            norm = K1 * (1.0 - B + B * self.docs[doc_id].length / avgdl)
+            impacts.append((doc_id, idf * tf * (K1 + 1.0) / (tf + norm)))
+        self._impacts[term] = impacts
+        return impacts
+
+    def expand_prefix(self, prefix: str, limit: int = MAX_PREFIX_EXPANSIONS) -> List[str]:
+        """Indexed terms whose unstemmed word begins with *prefix*, most common first."""
+        if self._vocab is None:
+            self._vocab = sorted(self._surface_df)
+        start = bisect.bisect_left(self._vocab, prefix)
+        end = bisect.bisect_left(self._vocab, prefix + "\uffff")
+        terms = [t for t in dict.fromkeys(_stem(w) for w in self._vocab[start:end]) if t in self.postings]
+        if len(terms) > limit:
+            terms = heapq.nlargest(limit, terms, key=lambda t: len(self.postings[t]))
+        return terms
+
+    def search(self, query: str, k: int = 5, prefix: bool = False) -> List[Hit]:
+        """Top-*k* documents for *query*.
+
+        With *prefix*, the last word may be incomplete: it matches every
+        indexed term it begins (a document scores its best such term once).
+        """
+        groups = [[term] for term in dict.fromkeys(tokenize(query))]
+        words = _TOKEN_RE.findall(query.lower()) if prefix else []
+        expansions = self.expand_prefix(words[-1]) if words else []
+        if expansions:
+            last = tokenize(words[-1])
+            if last and groups and groups[-1] == last:
+                groups.pop()
+            groups.append(list(dict.fromkeys(last + expansions)))
+        scores: Dict[str, float] = {}
+        matched: Dict[str, List[str]] = {}
+        for group in groups:
+            best: Dict[str, Tuple[float, str]] = {}
+            for term in group:
+                for doc_id, impact in self._term_impacts(term):
+                    if impact > best.get(doc_id, (0.0, ""))[0]:
+                        best[doc_id] = (impact, term)
+            for doc_id, (impact, term) in best.items():
+                scores[doc_id] = scores.get(doc_id, 0.0) + impact
+                matched.setdefault(doc_id, []).append(term)
+        top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [Hit(doc_id, round(score, 4), self.docs[doc_id].payload, matched[doc_id]) for doc_id, score in top]
+
+
+# ---------------------------------------------------------------------------
+# Sources
+# ---------------------------------------------------------------------------
+
+@dataclass
+class RetrievalSource:
+    name: str
+    corpus: str
+    static: Optional[Callable[[], Iterable[SourceDoc]]] = None
+    load: Optional[Callable[[Any], Awaitable[List[SourceDoc]]]] = None
+
+
+def _join(*parts: Any) -> str:
+    out: List[str] = []
+    for part in parts:
+        if isinstance(part, (list, tuple)):
+            out.extend(str(p) for p in part if p)
+        elif part:
+            out.append(str(part))
+    return "\n".join(out)
+
+
+def _pa_law_docs() -> Iterable[SourceDoc]:
+    from routes.knowledge_base import FLORIDA_PA_LAWS
+
+    for statute in FLORIDA_PA_LAWS["key_statutes"]:
+        payload = {
+            "section_number": statute["id"],
+            "heading": statute["statute"],
+            "summary": statute.get("summary", ""),
+            "body_text": statute.get("details", ""),
+            "source_url": statute.get("source_url", ""),
+        }
+        yield SourceDoc(f"pa_laws:{statute['id']}", statute["statute"], _join(statute.get("summary"), statute.get("details")), payload)
+
+
+def _expert_docs() -> Iterable[SourceDoc]:
+    from routes.knowledge_base import INDUSTRY_EXPERTS
+
+    for kind, people in (("figure", INDUSTRY_EXPERTS["figures"]), ("mentor", INDUSTRY_EXPERTS["leadership_mentors"])):
+        for person in people:
+            body = _join(
+                person.get("bio"),
+                person.get("relevance"),
+                person.get("expertise", []),
+                person.get("key_insights", []),
+                [f"{a.get('title', '')} {a.get('excerpt', '')}" for a in person.get("articles", [])],
+                [b.get("title", "") if isinstance(b, dict) else b for b in person.get("books", [])],
+            )
+            title = _join(person["name"], person.get("alias"), person.get("category"))
+            yield SourceDoc(f"experts:{person['id']}", title, body, {**person, "kind": kind})
+
+
+async def _load_florida_statutes(database) -> List[SourceDoc]:
+    docs = await database.florida_statutes.find(
+        {}, {"_id": 0, "section_number": 1, "heading": 1, "body_text": 1, "year": 1, "source_url": 1}
+    ).to_list(length=None)
+    return [
+        SourceDoc(
+            f"florida_statutes:{d.get('section_number')}:{d.get('year')}",
+            _join(d.get("section_number"), d.get("heading")),
+            d.get("body_text", ""),
+            d,
+        )
+        for d in docs if d.get("section_number")
+    ]
+
+
+async def _load_knowledge(database) -> List[SourceDoc]:
+    docs = await database.eve_knowledge_base.find(
+        {}, {"_id": 0, "content_hash": 1, "title": 1, "content": 1, "keywords": 1, "source": 1, "category": 1}
+    ).to_list(length=None)
+    return [
+        SourceDoc(
+            f"knowledge:{d.get('content_hash') or _stamp(d.get('title'), d.get('content'))}",
+            d.get("title", ""),
+            _join(d.get("content"), d.get("keywords", [])),
+            {k: d.get(k) for k in ("title", "content", "source", "category")},
+        )
+        for d in docs
+    ]
+
+
+def university_doc(kind: str, item: Dict[str, Any]) -> SourceDoc:
+    """Index entry for one university ``course``, ``article`` or ``document``."""
+    payload = {k: v for k, v in item.items() if k not in ("_id", "lessons", "quiz", "content")}
+    payload["type"] = kind
+    body_parts: List[Any] = [
+        item.get("description"), item.get("category"), item.get("doc_type"), item.get("tags", []),
+    ]
+    if kind == "course":
+        body_parts += [
+            item.get("why_this_matters"), item.get("outcomes", []),
+            [f"{l.get('title', '')} {l.get('description', '')} {l.get('content', '')}" for l in item.get("lessons") or []],
+        ]
+    else:
+        body_parts.append(item.get("content", ""))
+    return SourceDoc(f"{kind}:{item.get('id')}", item.get("title", ""), _join(*body_parts), payload)
+
+
+async def _load_university(database) -> List[SourceDoc]:
+    courses = await database.courses.find(
+        {"is_published": True}, {"_id": 0, "quiz": 0}
+    ).to_list(length=None)
+    articles = await database.articles.find({"is_published": True}, {"_id": 0}).to_list(length=None)
+    return [university_doc("course", c) for c in courses] + [university_doc("article", a) for a in articles]
+
+
+async def _load_university_documents(database) -> List[SourceDoc]:
+    docs = await database.custom_documents.find({"is_published": True}, {"_id": 0}).to_list(length=None)
+    return [university_doc("document", d) for d in docs]
+
+
+DEFAULT_SOURCES: Tuple[RetrievalSource, ...] = (
+    RetrievalSource("pa_laws", "statutes", static=_pa_law_docs),
+    RetrievalSource("experts", "experts", static=_expert_docs),
+    RetrievalSource("florida_statutes", "statutes", load=_load_florida_statutes),
+    RetrievalSource("knowledge", "knowledge", load=_load_knowledge),
+    RetrievalSource("university", "university", load=_load_university),
+    RetrievalSource("university_documents", "university", load=_load_university_documents),
+)
+
+
+# ---------------------------------------------------------------------------
+# Registry
+# ---------------------------------------------------------------------------
+
+class RetrievalIndex:
+    """All corpora, their sources, refresh and snapshot persistence."""
+
+    def __init__(self, sources: Iterable[RetrievalSource] = DEFAULT_SOURCES, snapshot_path: Optional[str] = RETRIEVAL_SNAPSHOT_PATH):
+        self.sources = list(sources)
+        self.snapshot_path = snapshot_path
+        self.corpora: Dict[str, BM25Index] = {s.corpus: BM25Index() for s in self.sources}
+        self.loaded_sources: set = set()
+        self._static_done = False
+        self._refreshing: Optional[asyncio.Future] = None
+
+    def _ensure_static(self) -> None:
+        if self._static_done:
+            return
+        self._static_done = True
+        for source in self.sources:
+            if source.static is not None:
+                self._sync_source(source, list(source.static()))
+
+    def is_ready(self, corpus: str) -> bool:
+        """True once every source feeding *corpus* has been loaded at least once."""
+        self._ensure_static()
+        return all(s.name in self.loaded_sources for s in self.sources if s.corpus == corpus)
+
+    def search(self, corpus: str, query: str, k: int = 5, prefix: bool = False) -> List[Hit]:
+        self._ensure_static()
+        index = self.corpora.get(corpus)
+        return index.search(query, k, prefix) if index is not None else []
+
+    def get(self, corpus: str, doc_id: str) -> Optional[Dict[str, Any]]:
+        self._ensure_static()
+        doc = self.corpora[corpus].docs.get(doc_id)
+        return doc.payload if doc else None
+
+    def upsert(self, source_name: str, doc: SourceDoc) -> bool:
+        """Push one changed document without waiting for the next refresh."""
+        source = next(s for s in self.sources if s.name == source_name)
+        return self.corpora[source.corpus].upsert(source.name, doc)
+
+    def remove(self, source_name: str, doc_id: str) -> bool:
+        source = next(s for s in self.sources if s.name == source_name)
+        return self.corpora[source.corpus].remove(doc_id)
+
+    def _plan(self, source: RetrievalSource, docs: List[SourceDoc]):
+        index = self.corpora[source.corpus]
+        changed = []
+        seen = set()
+        for doc in docs:
+            seen.add(doc.doc_id)
+            stamp = doc_stamp(doc)
+            if not index.is_current(doc.doc_id, stamp):
+                changed.append((doc, stamp))
+        removed = [d.doc_id for d in index.docs.values() if d.source == source.name and d.doc_id not in seen]
+        return changed, removed, len(docs) - len(changed)
+
+    def _apply(self, source: RetrievalSource, prepared: List[IndexedDoc], removed: List[str], unchanged: int) -> Dict[str, int]:
+        index = self.corpora[source.corpus]
+        for doc in prepared:
+            index._add(doc)
+        for doc_id in removed:
+            index.remove(doc_id)
+        self.loaded_sources.add(source.name)
+        return {"changed": len(prepared), "unchanged": unchanged, "removed": len(removed)}
+
+    def _sync_source(self, source: RetrievalSource, docs: List[SourceDoc]) -> Dict[str, int]:
+        changed, removed, unchanged = self._plan(source, docs)
+        return self._apply(source, [prepare(source.name, d, st) for d, st in changed], removed, unchanged)
+
+    async def _sync_source_async(self, source: RetrievalSource, docs: List[SourceDoc]) -> Dict[str, int]:
+        # Tokenizing is CPU-bound, so it runs off the loop; the index itself
+        # is only mutated on the loop, where searches read it.
+        changed, removed, unchanged = self._plan(source, docs)
+        prepared = await asyncio.to_thread(lambda: [prepare(source.name, d, st) for d, st in changed]) if changed else []
+        return self._apply(source, prepared, removed, unchanged)
+
+    async def refresh(self, database) -> Dict[str, Dict[str, int]]:
+        """Reload Mongo-backed sources, re-indexing only changed documents.
+
+        Concurrent callers share one refresh. The first refresh starts from the
+        snapshot, and the snapshot is rewritten whenever something changed.
+        """
+        if self._refreshing is not None:
+            return await asyncio.shield(self._refreshing)
+        self._refreshing = asyncio.get_running_loop().create_future()
+        try:
+            report = await self._refresh(database)
+        except BaseException as exc:
+            self._refreshing.set_exception(exc)
+            self._refreshing.exception()
+            raise
+        else:
+            self._refreshing.set_result(report)
+            return report
+        finally:
+            self._refreshing = None
+
+    async def _refresh(self, database) -> Dict[str, Dict[str, int]]:
+        started = time.perf_counter()
+        self._ensure_static()
+        if not any(s.name in self.loaded_sources for s in self.sources if s.load):
+            self.load_snapshot()
+
+        report: Dict[str, Dict[str, int]] = {}
+        for source in self.sources:
+            if source.load is None:
+                continue
+            try:
+                docs = await source.load(database)
+            except Exception as exc:
+                logger.warning("Retrieval source %s failed to load: %s", source.name, exc)
+                continue
+            report[source.name] = await self._sync_source_async(source, docs)
+
+        if any(c["changed"] or c["removed"] for c in report.values()):
+            snapshot = self._snapshot_payload()
+            await asyncio.to_thread(self._write_snapshot, snapshot)
+        duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        MetricsCollector.record_timing("retrieval_refresh_ms", duration_ms)
+        logger.info("Retrieval index refreshed in %.0fms: %s", duration_ms, report)
+        return report
+
+    # ---- snapshot --------------------------------------------------------
+
+    def _snapshot_key(self) -> str:
+        return _stamp(SNAPSHOT_FORMAT, TOKENIZER_VERSION, TITLE_WEIGHT, [s.name for s in self.sources])
+
+    def _snapshot_payload(self) -> Dict[str, Any]:
+        dynamic = {s.name for s in self.sources if s.load is not None}
+        return {
+            "key": self._snapshot_key(),
+            "saved_at": time.time(),
+            "docs": [
+                {"corpus": corpus, "doc_id": d.doc_id, "source": d.source, "stamp": d.stamp,
+                 "payload": d.payload, "terms": d.terms, "length": d.length, "surfaces": d.surfaces}
+                for corpus, index in self.corpora.items()
+                for d in index.docs.values() if d.source in dynamic
+            ],
+        }
+
+    def _write_snapshot(self, payload: Dict[str, Any]) -> None:
+        if not self.snapshot_path:
+            return
+        tmp = f"{self.snapshot_path}.tmp"
+        try:
+            with gzip.open(tmp, "wt", encoding="utf-8") as fh:
+                json.dump(payload, fh, default=str)
+            os.replace(tmp, self.snapshot_path)
+        except OSError as exc:
+            logger.warning("Could not write retrieval snapshot %s: %s", self.snapshot_path, exc)
+
+    def save_snapshot(self) -> None:
+        self._write_snapshot(self._snapshot_payload())
+
+    def load_snapshot(self) -> int:
+        """Load Mongo-backed documents from the snapshot; returns how many."""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return 0
+        try:
+            with gzip.open(self.snapshot_path, "rt", encoding="utf-8") as fh:
+                payload = json.load(fh)
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring unreadable retrieval snapshot %s: %s", self.snapshot_path, exc)
+            return 0
+        if payload.get("key") != self._snapshot_key():
+            return 0
+        loaded = 0
+        for doc in payload["docs"]:
+            index = self.corpora.get(doc["corpus"])
+            if index is None:
+                continue
+            index._add(IndexedDoc(
+                doc["doc_id"], doc["source"], doc["stamp"], doc["payload"], doc["terms"], doc["length"],
+                doc.get("surfaces", []),
+            ))
+            self.loaded_sources.add(doc["source"])
+            loaded += 1
+        logger.info("Retrieval index loaded %d documents from snapshot", loaded)
+        return loaded
+
+
+retrieval_index = RetrievalIndex()
+
+
+async def refresh_retrieval_index(database=None) -> Dict[str, Dict[str, int]]:
+    if database is None:
+        from dependencies import db as database
+    return await retrieval_index.refresh(database)
@@ -2,7 +2,6 @@
 Simsol PDF Parser Service
 Extracts line items from Simsol estimating software PDFs.
 """
-import fitz
 import re
 import logging
 from typing import List, Optional
@@ -55,6 +54,8 @@ class SimsolParser(BaseParser):
         end_page: Optional[int] = None,
     ) -> EstimateData:
         try:
+            import fitz  # PyMuPDF
+
             doc = fitz.open(stream=pdf_bytes, filetype="pdf")
             all_page_texts = [page.get_text() for page in doc]
             doc.close()
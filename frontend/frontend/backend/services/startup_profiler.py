@@ -0,0 +1,195 @@
+"""
+Cold-start profiler.
+
+Two kinds of timing, both kept on the process-wide ``startup_profiler``:
+
+- **Init steps** (always on): ``step()`` / ``gather()`` wrap the lifespan
+  tasks so their durations and start offsets are logged once the app is ready,
+  recorded as ``startup_step_duration_ms`` metrics, and served by
+  ``GET /api/admin/startup-profile``.
+- **Imports** (``STARTUP_PROFILE=1`` only): a ``sys.meta_path`` finder times
+  ``exec_module`` for every module loaded from a file, like
+  ``python -X importtime`` but inside the running app, with inclusive and
+  self time per module plus self time per top-level package.
+"""
+import asyncio
+import importlib.machinery
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Awaitable, Dict, List, Optional, Tuple
+
+from services.observability import MetricsCollector
+
+logger = logging.getLogger(__name__)
+
+PROFILE_IMPORTS = os.environ.get("STARTUP_PROFILE", "").lower() in ("1", "true", "yes")
+REPORT_TOP_IMPORTS = 25
+
+# Loaders that are created per module, so timing their exec_module in place
+# never touches another module (builtin/frozen loaders are shared classes).
+_PER_MODULE_LOADERS = (
+    importlib.machinery.SourceFileLoader,
+    importlib.machinery.SourcelessFileLoader,
+    importlib.machinery.ExtensionFileLoader,
+)
+
+
+class _ImportTimer:
+    """Meta path finder that defers to the real finders and times the load."""
+
+    def __init__(self, profiler: "StartupProfiler"):
+        self._profiler = profiler
+
+    def find_spec(self, fullname, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if isinstance(spec.loader, _PER_MODULE_LOADERS):
+                self._wrap(spec.loader, fullname)
+            return spec
+        return None
+
+    def _wrap(self, loader, fullname: str) -> None:
+        exec_module = loader.exec_module
+        profiler = self._profiler
+
+        def timed_exec_module(module):
+            profiler._enter_import()
+            t0 = time.perf_counter()
+            try:
+                exec_module(module)
+            finally:
+                profiler._exit_import(fullname, (time.perf_counter() - t0) * 1000)
+
+        loader.exec_module = timed_exec_module
+
+
+class StartupProfiler:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.ready_ms: Optional[float] = None
+        self.marks: Dict[str, float] = {}
+        self.steps: List[dict] = []
+        self.imports: Dict[str, Tuple[float, float]] = {}
+        # Per-thread stack of child import time, for self-time accounting
+        self._local = threading.local()
+        self._hook: Optional[_ImportTimer] = None
+
+    def _elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self.started) * 1000, 1)
+
+    # ---- imports -------------------------------------------------------
+
+    def install_import_hook(self, force: bool = False) -> bool:
+        """Start timing imports (no-op unless ``STARTUP_PROFILE`` is set)."""
+        if self._hook is not None or not (force or PROFILE_IMPORTS):
+            return False
+        self._hook = _ImportTimer(self)
+        sys.meta_path.insert(0, self._hook)
+        return True
+
+    def remove_import_hook(self) -> None:
+        if self._hook is not None and self._hook in sys.meta_path:
+            sys.meta_path.remove(self._hook)
+        self._hook = None
+
+    def _stack(self) -> List[float]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def _enter_import(self) -> None:
+        self._stack().append(0.0)
+
+    def _exit_import(self, fullname: str, inclusive_ms: float) -> None:
+        stack = self._stack()
+        self_ms = inclusive_ms - stack.pop()
+        if stack:
+            stack[-1] += inclusive_ms
+        self.imports[fullname] = (round(inclusive_ms, 2), round(self_ms, 2))
+
+    # ---- init steps ----------------------------------------------------
+
+    def mark(self, label: str) -> None:
+        """Record how far into startup (ms since this module loaded) ``label`` was reached."""
+        self.marks[label] = self._elapsed_ms()
+
+    @asynccontextmanager
+    async def step(self, name: str):
+        offset = self._elapsed_ms()
+        t0 = time.perf_counter()
+        status = "ok"
+        try:
+            yield
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            duration_ms = round((time.perf_counter() - t0) * 1000, 1)
+            self.steps.append({"name": name, "start_ms": offset, "duration_ms": duration_ms, "status": status})
+            MetricsCollector.record_timing("startup_step_duration_ms", duration_ms, {"step": name})
+
+    async def gather(self, *named: Tuple[str, Awaitable]) -> None:
+        """
+        Run independent ``(name, awaitable)`` steps concurrently. Every step
+        runs to completion; the first failure is re-raised afterwards.
+        """
+        async def run(name, awaitable):
+            async with self.step(name):
+                return await awaitable
+
+        results = await asyncio.gather(*(run(name, aw) for name, aw in named), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    # ---- reporting -----------------------------------------------------
+
+    def mark_ready(self) -> None:
+        self.ready_ms = self._elapsed_ms()
+        self.remove_import_hook()
+        self.log_summary()
+
+    def summary(self, top: int = REPORT_TOP_IMPORTS) -> dict:
+        packages: Dict[str, float] = {}
+        for fullname, (_, self_ms) in self.imports.items():
+            root = fullname.split(".")[0]
+            packages[root] = packages.get(root, 0.0) + self_ms
+        slowest = sorted(self.imports.items(), key=lambda item: item[1][0], reverse=True)[:top]
+        return {
+            "ready_ms": self.ready_ms,
+            "marks": dict(self.marks),
+            "steps": sorted(self.steps, key=lambda s: s["start_ms"]),
+            "imports_profiled": bool(self.imports),
+            "imports": [
+                {"module": name, "inclusive_ms": inclusive, "self_ms": self_ms}
+                for name, (inclusive, self_ms) in slowest
+            ],
+            "packages": [
+                {"package": name, "self_ms": round(ms, 1)}
+                for name, ms in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+            ],
+        }
+
+    def log_summary(self) -> None:
+        report = self.summary()
+        steps = ", ".join(f"{s['name']}={s['duration_ms']:.0f}ms" for s in report["steps"])
+        marks = ", ".join(f"{label}@{ms:.0f}ms" for label, ms in report["marks"].items())
+        logger.info("Startup ready in %.0fms (%s); steps: %s", self.ready_ms or 0, marks, steps)
+        for entry in report["imports"]:
+            logger.info("  import %-50s %8.1fms inclusive %8.1fms self",
+                        entry["module"], entry["inclusive_ms"], entry["self_ms"])
+        if report["packages"]:
+            logger.info("  slowest packages: %s", ", ".join(
+                f"{p['package']}={p['self_ms']:.0f}ms" for p in report["packages"][:10]
+            ))
+
+
+startup_profiler = StartupProfiler()
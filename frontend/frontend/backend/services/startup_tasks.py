@@ -0,0 +1,78 @@
+"""
+Version-stamped startup tasks.
+
+Seeding and index creation are idempotent, but on every cold start they still
+cost round trips (and, for the University seed, importing a 4,700-line module)
+just to find out there is nothing to do. ``run_once`` records
+``{_id: name, version, applied_at, duration_ms}`` in ``startup_stamps`` after a
+task completes and skips the task on later boots while the version matches.
+
+Versions are either hand-bumped constants (``UNIVERSITY_SEED_VERSION``) or
+derived from the task's inputs with ``content_stamp`` so editing e.g. the index
+registry re-runs it automatically. ``STARTUP_FORCE_TASKS=1`` ignores stamps for
+one boot; deleting a stamp document re-runs that task on the next boot.
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Optional
+
+from dependencies import db as default_db
+
+logger = logging.getLogger(__name__)
+
+
+def _force_enabled() -> bool:
+    return os.environ.get("STARTUP_FORCE_TASKS", "").lower() in ("1", "true", "yes")
+
+
+def content_stamp(value: Any) -> str:
+    """Short, stable digest of a task's inputs, for use as its version."""
+    encoded = json.dumps(value, sort_keys=True, default=repr).encode()
+    return hashlib.sha1(encoded).hexdigest()[:12]
+
+
+async def run_once(
+    name: str,
+    version: str,
+    task: Callable[[], Awaitable[Optional[bool]]],
+    *,
+    database=None,
+    force: Optional[bool] = None,
+) -> bool:
+    """
+    Await ``task()`` unless ``name`` is already stamped at ``version``.
+
+    The stamp is written only when the task returns without raising and does
+    not return ``False`` — a task that partly failed returns ``False`` so the
+    next boot retries it. Returns True when the task ran.
+    """
+    database = database if database is not None else default_db
+    force = _force_enabled() if force is None else force
+    if not force:
+        stamp = await database.startup_stamps.find_one({"_id": name})
+        if stamp and stamp.get("version") == version:
+            logger.info("Startup task %s already applied (version %s) — skipping", name, version)
+            return False
+
+    t0 = time.perf_counter()
+    complete = await task()
+    duration_ms = round((time.perf_counter() - t0) * 1000, 1)
+    if complete is False:
+        logger.warning("Startup task %s did not complete; it will run again on next boot", name)
+        return True
+
+    await database.startup_stamps.update_one(
+        {"_id": name},
+        {"$set": {
+            "version": version,
+            "applied_at": datetime.now(timezone.utc).isoformat(),
+            "duration_ms": duration_ms,
+        }},
+        upsert=True,
+    )
+    logger.info("Startup task %s applied (version %s) in %.0fms", name, version, duration_ms)
+    return True
@@ -2,7 +2,6 @@
 Symbility PDF Parser Service
 Extracts line items from Symbility / CoreLogic ClaimXperience estimate PDFs.
 """
-import fitz
 import re
 import logging
 from typing import List, Optional
@@ -57,6 +56,8 @@ class SymbilityParser(BaseParser):
         end_page: Optional[int] = None,
     ) -> EstimateData:
         try:
+            import fitz  # PyMuPDF
+
             doc = fitz.open(stream=pdf_bytes, filetype="pdf")
             all_page_texts = [page.get_text() for page in doc]
             doc.close()
@@ -17,13 +17,15 @@ class MockCursor:
     def __init__(self, docs: list[dict]):
         self._docs = docs
 
-    def sort(self, key: str, direction: int = 1):
-        reverse = direction == -1
-        self._docs = sorted(
-            self._docs,
-            key=lambda d: d.get(key, ""),
-            reverse=reverse,
-        )
+    def sort(self, key, direction: int = 1):
+        keys = key if isinstance(key, list) else [(key, direction)]
+        # Stable sorts applied last-key-first give a compound ordering
+        for sort_key, sort_direction in reversed(keys):
+            self._docs = sorted(
+                self._docs,
+                key=lambda d: d.get(sort_key, ""),
+                reverse=sort_direction == -1,
+            )
         return self
 
     def limit(self, n: int):
@@ -74,9 +76,12 @@ class MockCollection:
 
         return Result()
 
-    async def find_one(self, filter_dict: dict = None, projection: dict = None) -> Optional[dict]:
+    async def find_one(self, filter_dict: dict = None, projection: dict = None, sort: list = None) -> Optional[dict]:
         filter_dict = filter_dict or {}
-        for doc in self._docs:
+        docs = self._docs
+        for key, direction in reversed(sort or []):
+            docs = sorted(docs, key=lambda d: d.get(key, ""), reverse=direction == -1)
+        for doc in docs:
             if self._matches(doc, filter_dict):
                 return self._project(doc, projection)
         return None
@@ -90,27 +95,53 @@ class MockCollection:
         ]
         return MockCursor(matching)
 
-    async def update_one(self, filter_dict: dict, update: dict):
+    async def update_one(self, filter_dict: dict, update: dict, upsert: bool = False):
         for doc in self._docs:
             if self._matches(doc, filter_dict):
-                if "$set" in update:
-                    doc.update(update["$set"])
-                if "$inc" in update:
-                    for k, v in update["$inc"].items():
-                        doc[k] = doc.get(k, 0) + v
+                self._apply_update(doc, update)
 
                 class Result:
                     matched_count = 1
                     modified_count = 1
+                    upserted_id = None
 
                 return Result()
 
+        if upsert:
+            doc = {k: v for k, v in filter_dict.items() if not isinstance(v, dict)}
+            doc.update(update.get("$setOnInsert", {}))
+            self._apply_update(doc, update)
+            self._docs.append(doc)
+
         class NoResult:
             matched_count = 0
             modified_count = 0
+            upserted_id = "upserted" if upsert else None
 
         return NoResult()
 
+    async def update_many(self, filter_dict: dict, update: dict):
+        matched = [doc for doc in self._docs if self._matches(doc, filter_dict)]
+        for doc in matched:
+            self._apply_update(doc, update)
+
+        class Result:
+            matched_count = len(matched)
+            modified_count = len(matched)
+
+        return Result()
+
+    @staticmethod
+    def _apply_update(doc: dict, update: dict):
+        for k, v in update.get("$set", {}).items():
+            target = doc
+            *parents, leaf = k.split(".")
+            for part in parents:
+                target = target.setdefault(part, {})
+            target[leaf] = v
+        for k, v in update.get("$inc", {}).items():
+            doc[k] = doc.get(k, 0) + v
+
     async def delete_one(self, filter_dict: dict):
         for i, doc in enumerate(self._docs):
             if self._matches(doc, filter_dict):
@@ -136,26 +167,104 @@ class MockCollection:
 
         return Result()
 
+    async def bulk_write(self, requests: list, ordered: bool = True):
+        """Apply pymongo InsertOne/UpdateOne requests in order."""
+        inserted = modified = upserted = 0
+        for request in requests:
+            if request.__class__.__name__ == "InsertOne":
+                await self.insert_one(request._doc)
+                inserted += 1
+            elif request.__class__.__name__ == "UpdateOne":
+                result = await self.update_one(request._filter, request._doc, upsert=bool(request._upsert))
+                modified += result.modified_count
+                upserted += 1 if result.upserted_id else 0
+
+        class Result:
+            inserted_count = inserted
+            modified_count = modified
+            upserted_count = upserted
+
+        return Result()
+
     async def count_documents(self, filter_dict: dict = None) -> int:
         filter_dict = filter_dict or {}
         return sum(1 for d in self._docs if self._matches(d, filter_dict))
 
+    def aggregate(self, pipeline: list) -> MockCursor:
+        """Supports $match, $group ($sum/$max/$min), $sort and $limit."""
+        docs = [dict(d) for d in self._docs]
+        for stage in pipeline:
+            (op, spec), = stage.items()
+            if op == "$match":
+                docs = [d for d in docs if self._matches(d, spec)]
+            elif op == "$group":
+                docs = self._group(docs, spec)
+            elif op == "$sort":
+                docs = MockCursor(docs).sort(list(spec.items()))._docs
+            elif op == "$limit":
+                docs = docs[:spec]
+            else:
+                raise NotImplementedError(op)
+        return MockCursor(docs)
+
+    @staticmethod
+    def _group(docs: list, spec: dict) -> list:
+        def value(doc, expr):
+            return doc.get(expr[1:]) if isinstance(expr, str) and expr.startswith("$") else expr
+
+        groups: dict = {}
+        for doc in docs:
+            key = value(doc, spec["_id"])
+            row = groups.setdefault(key, {"_id": key})
+            for field, acc in spec.items():
+                if field == "_id":
+                    continue
+                (op, expr), = acc.items()
+                v = value(doc, expr)
+                if op == "$sum":
+                    row[field] = row.get(field, 0) + (v or 0)
+                elif v is not None and op in ("$max", "$min"):
+                    current = row.get(field)
+                    if current is None or (v > current if op == "$max" else v < current):
+                        row[field] = v
+                else:
+                    row.setdefault(field, None)
+        return list(groups.values())
+
     async def create_index(self, keys, **kwargs):
         pass  # no-op for tests
 
     def _matches(self, doc: dict, filter_dict: dict) -> bool:
         for key, value in filter_dict.items():
-            doc_val = doc.get(key)
+            if key == "$or":
+                if not any(self._matches(doc, clause) for clause in value):
+                    return False
+                continue
+            doc_val = doc
+            for part in key.split("."):
+                doc_val = doc_val.get(part) if isinstance(doc_val, dict) else None
             if isinstance(value, dict):
-                if "$in" in value:
+                if "$exists" in value:
+                    if self._has_path(doc, key) != bool(value["$exists"]):
+                        return False
+                elif "$in" in value:
                     if doc_val not in value["$in"]:
                         return False
+                elif "$nin" in value:
+                    if doc_val in value["$nin"]:
+                        return False
+                elif "$all" in value:
+                    if not isinstance(doc_val, list) or not all(v in doc_val for v in value["$all"]):
+                        return False
                 elif "$ne" in value:
                     if doc_val == value["$ne"]:
                         return False
                 elif "$gt" in value:
                     if doc_val is None or doc_val <= value["$gt"]:
                         return False
+                elif "$lt" in value:
+                    if doc_val is None or doc_val >= value["$lt"]:
+                        return False
                 else:
                     if doc_val != value:
                         return False
@@ -164,9 +273,24 @@ class MockCollection:
                     return False
         return True
 
+    @staticmethod
+    def _has_path(doc: dict, key: str) -> bool:
+        target = doc
+        for part in key.split("."):
+            if not isinstance(target, dict) or part not in target:
+                return False
+            target = target[part]
+        return True
+
     def _project(self, doc: dict, projection: dict = None) -> dict:
         if not projection:
             return dict(doc)
+        excluded = {k for k, v in projection.items() if v == 0 and k != "_id"}
+        if excluded and not any(v == 1 for v in projection.values()):
+            return {
+                k: v for k, v in doc.items()
+                if k not in excluded and not (k == "_id" and projection.get("_id", 1) == 0)
+            }
         result = {}
         exclude_id = projection.get("_id", 1) == 0
         for key, val in doc.items():
@@ -136,3 +136,38 @@ async def test_context_fetches_carrier_comms(mock_db):
 
     assert len(ctx.carrier_comms) == 1
     assert ctx.carrier_comms[0]["channel"] == "carrier"
+
+
+@pytest.mark.asyncio
+async def test_build_many_matches_per_claim_build(mock_db, monkeypatch):
+    """Batched contexts hold the same newest-first slices as build()."""
+    for claim_id in ("claim-a", "claim-b"):
+        await mock_db.claims.insert_one({"id": claim_id, "status": "Open"})
+    for i in range(25):
+        await mock_db.notes.insert_one({"id": f"a-{i}", "claim_id": "claim-a", "created_at": f"2025-01-{i + 1:02d}"})
+    await mock_db.notes.insert_one({"id": "b-0", "claim_id": "claim-b", "created_at": "2025-02-01"})
+    await mock_db.comm_messages.insert_one({"claim_id": "claim-b", "channel": "email", "created_at": "2025-02-02"})
+    await mock_db.comm_messages.insert_one({"claim_id": "claim-b", "channel": "sms", "created_at": "2025-02-03"})
+
+    limits = []
+    find = type(mock_db.notes).find
+
+    def limited_find(self, *args, **kwargs):
+        cursor = find(self, *args, **kwargs)
+        limit = cursor.limit
+        cursor.limit = lambda n: limits.append((args[0]["claim_id"], n)) or limit(n)
+        return cursor
+
+    monkeypatch.setattr(type(mock_db.notes), "find", limited_find)
+    builder = AgentContextBuilder(mock_db)
+    contexts = await builder.build_many(["claim-a", "claim-b", "claim-missing", "claim-a"])
+    # One server-side limited find per claim and supporting collection
+    assert sorted(limits).count(("claim-a", 20)) == 3 and ("claim-b", 30) in limits
+    assert len(limits) == 12
+
+    assert sorted(contexts) == ["claim-a", "claim-b"]
+    for claim_id, ctx in contexts.items():
+        assert ctx == await builder.build(claim_id)
+    assert len(contexts["claim-a"].notes) == 20
+    assert contexts["claim-a"].notes[0]["id"] == "a-24"
+    assert [m["channel"] for m in contexts["claim-b"].carrier_comms] == ["email"]
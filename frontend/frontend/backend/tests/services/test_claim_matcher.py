@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+from services.claim_matcher import ClaimMatcher, KeywordAutomaton, get_claim_matcher, invalidate_claim_matcher
+
+CLAIMS = [
+    {"id": "c1", "claim_number": "CLM-10", "client_email": "Jane@Example.com",
+     "property_address": "12 Palm Way, Miami FL"},
+    {"id": "c2", "claim_number": "CLM-1001", "carrier_adjuster_email": "Adj <adj@carrier.com>",
+     "loss_address": "4500 Ocean Drive Unit 7, Naples FL"},
+    {"id": "c3", "claim_number": "", "property_address": "short st"},
+]
+
+
+def test_automaton_reports_overlapping_keywords():
+    automaton = KeywordAutomaton()
+    for word in ("he", "she", "his", "hers"):
+        automaton.add(word, word)
+
+    hits = sorted((start, value) for start, _, value in automaton.iter_matches("ushers"))
+
+    assert hits == [(1, "she"), (2, "he"), (2, "hers")]
+    assert automaton.values_in("this") == {"his"}
+
+
+def test_match_priority_and_longest_claim_number():
+    matcher = ClaimMatcher(CLAIMS)
+
+    claim, method = matcher.match_email(subject="Re: clm-1001 supplement")
+    assert (claim["id"], method) == ("c2", "claim_number")
+
+    claim, method = matcher.match_email(body="no ids here", addresses=["Jane Doe <jane@example.com>"])
+    assert (claim["id"], method) == ("c1", "email_address")
+
+    claim, method = matcher.match_email(body="Photos from 4500 ocean drive unit 7, naples fl attached")
+    assert (claim["id"], method) == ("c2", "property_address")
+
+    # Claim number beats an address mention of another claim
+    claim, method = matcher.match_email(subject="CLM-10", body="12 palm way, miami fl")
+    assert (claim["id"], method) == ("c1", "claim_number")
+
+    assert matcher.match_email(subject="short st", addresses=["nobody@x.com"]) == (None, None)
+    assert sorted(matcher.claim_numbers) == ["clm-10", "clm-1001"]
+
+
+def test_claim_number_matches_agree_with_substring_scan():
+    rng = random.Random(7)
+    claims = [{"id": f"c{i}", "claim_number": f"EC-{rng.randint(10000, 99999)}"} for i in range(300)]
+    matcher = ClaimMatcher(claims)
+    numbers = {c["claim_number"].lower(): c for c in claims}
+
+    for _ in range(200):
+        text = " ".join(rng.choice(["roof", "hail", rng.choice(claims)["claim_number"], "EC-1"]) for _ in range(6))
+        expected = {cn for cn in numbers if cn in text.lower()}
+        found = matcher.match_claim_number(text)
+        assert (found is None) == (not expected)
+        if found:
+            assert found["claim_number"].lower() in expected
+
+
+@pytest.mark.asyncio
+async def test_cached_matcher_rebuilds_after_invalidation(mock_db):
+    invalidate_claim_matcher()
+    await mock_db.claims.insert_one(dict(CLAIMS[0]))
+    first = await get_claim_matcher(mock_db)
+    assert await get_claim_matcher(mock_db) is first
+
+    await mock_db.claims.insert_one({"id": "new", "claim_number": "CLM-77"})
+    assert (await get_claim_matcher(mock_db)).match_claim_number("clm-77") is None
+
+    invalidate_claim_matcher()
+    rebuilt = await get_claim_matcher(mock_db)
+    assert rebuilt.match_claim_number("clm-77")["id"] == "new"
+    invalidate_claim_matcher()
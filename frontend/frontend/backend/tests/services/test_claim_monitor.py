@@ -187,3 +187,51 @@ async def test_monitor_frozen_claim_skipped():
 
     result = await agent.run(context)
     assert result is None
+
+
+# ------------------------------------------------------------------
+# Scheduled sweep (workers/claimpilot_monitor.py)
+# ------------------------------------------------------------------
+
+
+@pytest.mark.asyncio
+async def test_monitor_sweep_skips_claims_whose_inputs_are_unchanged(monkeypatch):
+    """Only new or changed stalled claims are re-analyzed; notifications are bulk-written."""
+    import workers.claimpilot_monitor as monitor
+
+    db = MockDB()
+    for i in range(3):
+        claim = _make_claim(claim_id=f"sweep-{i}", claim_number=f"CLM-S{i}", days_ago=8)
+        claim["assigned_to_id"] = f"user-{i}"
+        await db.claims.insert_one(claim)
+    monitor.init_claimpilot_monitor(db)
+    monkeypatch.setattr(monitor, "MONITOR_BATCH_SIZE", 2)
+
+    analyzed: list[str] = []
+
+    async def fake_analysis(self, claim, days_idle, context):
+        analyzed.append(claim["id"])
+        return {"summary": f"{claim['claim_number']} idle {days_idle}d", "suggested_actions": [], "risk_level": "high"}
+
+    monkeypatch.setattr(ClaimMonitorAgent, "_analyze_with_llm", fake_analysis)
+    with patch(
+        "services.claimpilot.base_agent.strip_legal_promises",
+        side_effect=lambda text: (text, []),
+    ), patch(
+        "services.claimpilot.base_agent.flag_sensitive_content",
+        return_value=[],
+    ):
+        first = await monitor.run_monitor_check()
+        second = await monitor.run_monitor_check()
+        await db.notes.insert_one({"id": "n-1", "claim_id": "sweep-1", "created_at": _utc_now().isoformat()})
+        third = await monitor.run_monitor_check()
+
+    assert first == {"skipped": 0, "analyzed": 3, "failed": 0, "notified": 3}
+    assert second == {"skipped": 3, "analyzed": 0, "failed": 0, "notified": 0}
+    assert third == {"skipped": 2, "analyzed": 1, "failed": 0, "notified": 1}
+    assert sorted(analyzed) == ["sweep-0", "sweep-1", "sweep-1", "sweep-2"]
+
+    notifications = await db.notifications.find({"claim_id": "sweep-0"}).to_list(10)
+    assert len(notifications) == 1
+    assert notifications[0]["user_id"] == "user-0"
+    assert notifications[0]["title"] == "Stalled: CLM-S0"
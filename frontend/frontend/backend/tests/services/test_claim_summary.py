@@ -0,0 +1,109 @@
+import pytest
+from fastapi import HTTPException
+
+import routes.claims as claims_routes
+import services.claim_summary as claim_summary
+from services.claim_summary import (
+    SUMMARY_VERSION,
+    build_claim_summary,
+    get_claim_summary,
+    rebuild_claim_summaries,
+    refresh_claim_summary,
+)
+
+ADMIN = {"id": "adm-1", "email": "adm@eden.com", "full_name": "Avery Admin", "role": "admin"}
+OUTSIDER = {"id": "adj-9", "email": "adj9@eden.com", "full_name": "Other Adjuster", "role": "adjuster"}
+
+
+@pytest.fixture
+def summary_db(mock_db, monkeypatch):
+    monkeypatch.setattr(claim_summary, "default_db", mock_db)
+    monkeypatch.setattr(claims_routes, "db", mock_db)
+    return mock_db
+
+
+async def _seed(mock_db):
+    await mock_db.claims.insert_one({
+        "id": "c1", "claim_number": "CLM-1", "client_name": "Pat", "property_address": "1 Palm Way",
+        "date_of_loss": "2025-01-02", "policy_number": "P-1", "created_at": "2025-01-05T00:00:00",
+    })
+    for i, (doc_type, name) in enumerate([
+        ("General", "Policy declarations.pdf"),
+        ("Estimate", "roof xactimate.pdf"),
+        ("General", "photo.jpg"),
+    ]):
+        await mock_db.documents.insert_one({
+            "id": f"d{i}", "claim_id": "c1", "type": doc_type, "name": name, "uploaded_at": f"2025-01-0{i + 1}",
+        })
+    await mock_db.notes.insert_one({"id": "n1", "claim_id": "c1", "content": "Called carrier", "author_name": "Avery", "created_at": "2025-01-03"})
+    await mock_db.notes.insert_one({"id": "n2", "claim_id": "c2", "content": "other claim", "created_at": "2025-01-04"})
+    await mock_db.supplements.insert_one({"id": "s1", "claim_id": "c1", "status": "submitted", "submitted_at": "2025-01-06"})
+    await mock_db.supplements.insert_one({"id": "s2", "claim_id": "c1", "status": "draft", "submitted_at": None})
+
+
+@pytest.mark.asyncio
+async def test_build_counts_latest_items_and_flags(summary_db):
+    await _seed(summary_db)
+
+    summary = await build_claim_summary("c1")
+
+    assert summary["version"] == SUMMARY_VERSION
+    assert (summary["notes_count"], summary["documents_count"], summary["photos_count"]) == (1, 3, 0)
+    assert (summary["supplements_count"], summary["supplements_submitted_count"]) == (2, 1)
+    assert summary["latest_note"]["excerpt"] == "Called carrier"
+    assert summary["latest_document"]["id"] == "d2"
+    assert summary["latest_submitted_supplement"]["submitted_at"] == "2025-01-06"
+    assert summary["document_buckets"]["policy"] == 1 and summary["document_buckets"]["estimate"] == 1
+    assert summary["evidence_flags"] == {"has_policy": True, "has_estimate": True, "has_carrier_correspondence": False}
+    assert await summary_db.claim_summaries.count_documents({}) == 1
+
+
+@pytest.mark.asyncio
+async def test_section_refresh_updates_only_existing_summaries(summary_db):
+    await _seed(summary_db)
+    await refresh_claim_summary("c1", "notes")
+    assert await summary_db.claim_summaries.find_one({"claim_id": "c1"}) is None
+
+    first = await get_claim_summary("c1")
+    await summary_db.notes.insert_one({"id": "n3", "claim_id": "c1", "content": "Reinspection booked", "created_at": "2025-02-01"})
+    await summary_db.inspection_photos.insert_one({"id": "p1", "claim_id": "c1", "captured_at": "2025-02-02"})
+    await refresh_claim_summary("c1", "notes")
+
+    stored = await get_claim_summary("c1")
+    assert stored["notes_count"] == 2
+    assert stored["latest_note"]["id"] == "n3"
+    assert stored["photos_count"] == first["photos_count"] == 0  # photos section not refreshed
+
+    await rebuild_claim_summaries()
+    assert (await get_claim_summary("c1"))["photos_count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_readiness_and_manifest_read_the_summary(summary_db):
+    await _seed(summary_db)
+
+    readiness = await claims_routes.get_florida_claim_readiness("c1", current_user=ADMIN)
+    assert readiness["evidence"] == {"documents": 3, "notes": 1, "photos": 0, "supplements_submitted": 1}
+    checklist = {item["id"]: item["complete"] for item in readiness["evidence_checklist"]}
+    assert checklist["policy_docs"] and checklist["estimate_docs"] and not checklist["carrier_correspondence"]
+    assert any(d["id"] == "supplement_follow_up" for d in readiness["deadlines"])
+
+    manifest = await claims_routes.get_claim_demand_package_manifest("c1", current_user=ADMIN)
+    assert manifest["counts"] == {"documents": 3, "photos": 0, "notes": 1, "supplements": 2}
+    assert [d["id"] for d in manifest["documents_by_bucket"]["policy"]] == ["d0"]
+    assert len(manifest["documents_by_bucket"]["other"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_summary_views_check_access_before_touching_the_summary(summary_db):
+    await _seed(summary_db)
+
+    for view in (
+        claims_routes.get_florida_claim_readiness,
+        claims_routes.get_claim_demand_package_manifest,
+        claims_routes.get_claim_summary_view,
+    ):
+        with pytest.raises(HTTPException) as exc:
+            await view("c1", current_user=OUTSIDER)
+        assert exc.value.status_code == 403
+    assert await summary_db.claim_summaries.find_one({"claim_id": "c1"}) is None
@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from services.claims_service import ClaimsService, claim_keyset_filter, encode_claim_cursor
+
+ADMIN = {"id": "adm-1", "email": "adm@eden.com", "full_name": "Avery Admin", "role": "admin"}
+CLIENT = {"id": "cli-1", "email": "pat@example.com", "full_name": "Pat Client", "role": "client"}
+BASE = datetime(2025, 3, 1, tzinfo=timezone.utc)
+
+
+async def _seed(mock_db, n=7):
+    for i in range(n):
+        await mock_db.claims.insert_one({
+            "id": f"c{i:02d}",
+            "claim_number": f"CLM-{i}",
+            "client_name": f"Client {i}",
+            "client_email": "pat@example.com" if i % 2 else "other@example.com",
+            "status": "New" if i % 3 else "In Progress",
+            "assigned_to": "Avery Admin",
+            "carrier_name": "Acme Mutual" if i < 4 else "Gulf Casualty",
+            "description": "long narrative " * 50,
+            # c03 and c04 share a timestamp so the id tiebreak is exercised
+            "created_at": BASE + timedelta(days=3 if i == 4 else i),
+            "is_archived": i == 6,
+        })
+
+
+def _walk_ids(result_pages):
+    return [row["id"] for page in result_pages for row in page["claims"]]
+
+
+@pytest.mark.asyncio
+async def test_cursor_walk_covers_every_claim_once_in_keyset_order(mock_db):
+    await _seed(mock_db)
+    service = ClaimsService(mock_db)
+
+    pages, cursor = [], None
+    while True:
+        page = await service.list_claims(ADMIN, cursor=cursor, limit=2)
+        pages.append(page)
+        if not page["has_more"]:
+            break
+        cursor = page["next_cursor"]
+
+    expected = sorted(
+        [d for d in mock_db.claims._docs if not d["is_archived"]],
+        key=lambda d: (d["created_at"], d["id"]),
+        reverse=True,
+    )
+    assert _walk_ids(pages) == [d["id"] for d in expected]
+    assert pages[-1]["next_cursor"] is None
+    assert len(pages) == 3
+
+
+@pytest.mark.asyncio
+async def test_projection_filters_and_client_isolation(mock_db):
+    await _seed(mock_db)
+    service = ClaimsService(mock_db)
+
+    page = await service.list_claims(ADMIN, fields="compact", carrier="Acme Mutual", status="New")
+    assert [row["id"] for row in page["claims"]] == ["c02", "c01"]
+    assert set(page["claims"][0]) == {"id", "claim_number", "client_name", "status", "created_at"}
+
+    page = await service.list_claims(ADMIN, fields="claim_number,description")
+    assert page["fields"] == ["id", "created_at", "claim_number", "description"]
+
+    page = await service.list_claims(CLIENT, fields="list")
+    assert {row["id"] for row in page["claims"]} == {"c01", "c03", "c05"}
+    assert "description" not in page["claims"][0]
+
+    with pytest.raises(HTTPException) as exc:
+        await service.list_claims(ADMIN, fields="id,password_hash")
+    assert exc.value.status_code == 400
+
+
+def test_cursor_keeps_created_at_type_and_rejects_garbage():
+    dated = claim_keyset_filter(encode_claim_cursor({"id": "c1", "created_at": BASE}))["$or"]
+    assert dated[0] == {"created_at": {"$lt": BASE}}
+    assert {"created_at": {"$type": "string"}} in dated
+
+    text = claim_keyset_filter(encode_claim_cursor({"id": "c2", "created_at": "2024-01-01T00:00:00"}))["$or"]
+    assert text[0] == {"created_at": {"$lt": "2024-01-01T00:00:00"}}
+    assert {"created_at": None} in text and len(text) == 3
+
+    missing = claim_keyset_filter(encode_claim_cursor({"id": "c3"}))["$or"]
+    assert missing == [{"created_at": None, "id": {"$lt": "c3"}}]
+
+    with pytest.raises(HTTPException) as exc:
+        claim_keyset_filter("not-a-cursor")
+    assert exc.value.status_code == 400
@@ -0,0 +1,126 @@
+import asyncio
+import re
+from datetime import datetime, timezone
+
+import pytest
+
+import services.dashboard_snapshot as dashboard_snapshot
+from services.dashboard_snapshot import (
+    claims_facet_pipeline,
+    get_dashboard_snapshot,
+    mark_claims_changed,
+    reset_dashboard_snapshot,
+    shape_snapshot,
+)
+
+NOW = datetime(2025, 6, 1, tzinfo=timezone.utc)
+
+CLAIM_FACETS = {
+    "pipeline": [
+        {"_id": "New", "count": 3, "total_value": 3000},
+        {"_id": "Completed", "count": 3, "total_value": 9000},
+        {"_id": "Denied", "count": 1, "total_value": 500},
+        {"_id": None, "count": 1, "total_value": 0},
+    ],
+    "financials": [{"_id": None, "total_estimated": 12500, "total_settlement": 8000,
+                    "total_acv": 0, "total_rcv": 0, "avg_claim_value": 1562.5}],
+    "by_type": [{"_id": "Wind", "count": 5, "value": 10000}, {"_id": None, "count": 3, "value": 2500}],
+    "by_priority": [{"_id": "High", "count": 2}, {"_id": None, "count": 6}],
+    "aging": [{"_id": "0-7", "count": 2}, {"_id": "90+", "count": 1}],
+    "adjuster_workload": [{"_id": None, "count": 4, "value": 3000}],
+    "stale_claims": [{"id": "c1"}],
+    "recent_activity": [{"id": "c2"}],
+    "new_last_30": [{"count": 4}],
+}
+TASK_FACETS = {"overdue": [{"count": 2}], "pending": [], "in_progress": [{"count": 5}]}
+
+
+class _Cursor:
+    def __init__(self, rows, calls):
+        self._rows = rows
+        self._calls = calls
+
+    async def to_list(self, length):
+        self._calls["n"] += 1
+        await asyncio.sleep(0.01)
+        return self._rows
+
+
+class _Collection:
+    def __init__(self, rows, calls):
+        self._rows = rows
+        self._calls = calls
+
+    def aggregate(self, pipeline):
+        return _Cursor(self._rows, self._calls)
+
+
+class _FakeDB:
+    def __init__(self):
+        self.calls = {"n": 0}
+        self.claims = _Collection([CLAIM_FACETS], self.calls)
+        self.tasks = _Collection([TASK_FACETS], self.calls)
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    reset_dashboard_snapshot()
+    monkeypatch.setattr(dashboard_snapshot, "REFRESH_DEBOUNCE_SECONDS", 0)
+    yield _FakeDB()
+    reset_dashboard_snapshot()
+
+
+def test_facet_pipeline_covers_every_section_in_one_stage():
+    pipeline = claims_facet_pipeline(NOW)
+
+    assert [next(iter(stage)) for stage in pipeline] == ["$match", "$facet"]
+    facets = pipeline[1]["$facet"]
+    assert set(facets) == set(CLAIM_FACETS)
+    days_open = facets["aging"][3]["$project"]["days_open"]["$floor"]["$divide"]
+    assert days_open == [{"$subtract": [NOW, "$created"]}, dashboard_snapshot.MS_PER_DAY]
+
+
+def test_created_at_strings_keep_their_offset():
+    pattern = re.compile(dashboard_snapshot.ISO_DATETIME_PARTS)
+    assert pattern.match("2026-03-01T23:30:00.123456-05:00").groups() == ("2026-03-01T23:30:00", "-05:00")
+    assert pattern.match("2026-03-01T12:00:00Z").groups() == ("2026-03-01T12:00:00", "Z")
+    assert pattern.match("2026-03-01").groups() == ("2026-03-01", None)
+
+
+def test_shape_snapshot_matches_dashboard_contract():
+    snapshot = shape_snapshot(CLAIM_FACETS, TASK_FACETS, NOW)
+
+    assert snapshot["total_claims"] == 8
+    assert snapshot["pipeline"]["Unknown"] == {"count": 1, "value": 0}
+    assert snapshot["settlement_rate"] == 75
+    assert snapshot["aging"] == {"0-7": 2, "8-14": 0, "15-30": 0, "31-60": 0, "61-90": 0, "90+": 1}
+    assert snapshot["tasks"] == {"overdue": 2, "pending": 0, "in_progress": 5}
+    assert snapshot["claims_by_type"][1]["type"] == "Unknown"
+    assert snapshot["claims_by_priority"] == {"High": 2, "Medium": 6}
+    assert snapshot["adjuster_workload"][0]["name"] == "Unassigned"
+    assert "_id" not in snapshot["financials"]
+    assert snapshot["new_last_30"] == 4
+
+
+@pytest.mark.asyncio
+async def test_concurrent_loads_share_one_computation(fake_db):
+    results = await asyncio.gather(*(get_dashboard_snapshot(fake_db) for _ in range(10)))
+
+    assert fake_db.calls["n"] == 2  # one claims + one tasks aggregate
+    assert all(r is results[0] for r in results)
+
+    await get_dashboard_snapshot(fake_db)
+    assert fake_db.calls["n"] == 2
+
+
+@pytest.mark.asyncio
+async def test_claim_writes_trigger_one_debounced_refresh(fake_db):
+    await get_dashboard_snapshot(fake_db)
+
+    for _ in range(5):
+        mark_claims_changed(fake_db)
+    await dashboard_snapshot._refresh_scheduled
+
+    assert fake_db.calls["n"] == 4
+    await get_dashboard_snapshot(fake_db)
+    assert fake_db.calls["n"] == 4
@@ -0,0 +1,188 @@
+import io
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from starlette.datastructures import UploadFile
+
+import routes.uploads as uploads
+from services.gridfs_stream import (
+    RangeNotSatisfiable,
+    UploadTooLarge,
+    etag_for,
+    gridfs_response,
+    parse_range,
+    stream_upload_to_gridfs,
+)
+
+
+class FakeGridOut:
+    """Just enough of AsyncIOMotorGridOut: properties, seek and read."""
+
+    def __init__(self, data: bytes, chunk_size: int = 4):
+        self._id = "65f0c0ffee"
+        self.length = len(data)
+        self.chunk_size = chunk_size
+        self.upload_date = datetime(2026, 3, 1, 12, 30, 15, 250000)
+        self.md5 = None
+        self._data = data
+        self._pos = 0
+        self.reads = []
+
+    def seek(self, pos):
+        self._pos = pos
+
+    async def read(self, size=-1):
+        end = len(self._data) if size < 0 else self._pos + size
+        chunk = self._data[self._pos:end]
+        self._pos += len(chunk)
+        self.reads.append(len(chunk))
+        return chunk
+
+
+async def _body(response) -> bytes:
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+
+def test_parse_range_forms():
+    assert parse_range("bytes=0-9", 100) == (0, 9)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=50-500", 100) == (50, 99)
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    assert parse_range("items=0-1", 100) is None
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range("bytes=100-", 100)
+
+
+@pytest.mark.asyncio
+async def test_full_and_partial_responses_stream_in_chunks():
+    data = bytes(range(26))
+    grid_out = FakeGridOut(data)
+    full = gridfs_response(grid_out, {}, "application/pdf", {"Content-Disposition": "inline"})
+    assert full.status_code == 200
+    assert full.headers["content-length"] == "26" and full.headers["accept-ranges"] == "bytes"
+    assert full.headers["last-modified"] == "Sun, 01 Mar 2026 12:30:15 GMT"
+    assert await _body(full) == data
+    assert max(grid_out.reads) == 4  # never the whole file at once
+
+    grid_out = FakeGridOut(data)
+    partial = gridfs_response(grid_out, {"range": "bytes=10-15"}, "application/pdf")
+    assert partial.status_code == 206
+    assert partial.headers["content-range"] == "bytes 10-15/26"
+    assert await _body(partial) == data[10:16]
+
+    stale = gridfs_response(FakeGridOut(data), {"range": "bytes=10-15", "if-range": '"old"'}, "application/pdf")
+    assert stale.status_code == 200
+
+    unsatisfiable = gridfs_response(FakeGridOut(data), {"range": "bytes=30-"}, "application/pdf")
+    assert unsatisfiable.status_code == 416 and unsatisfiable.headers["content-range"] == "bytes */26"
+
+
+def test_conditional_get_returns_304():
+    grid_out = FakeGridOut(b"pdf bytes")
+    etag = etag_for(grid_out)
+    assert gridfs_response(grid_out, {"if-none-match": f'W/{etag}, "other"'}, "application/pdf").status_code == 304
+    assert gridfs_response(grid_out, {"if-none-match": '"other"'}, "application/pdf").status_code == 200
+    since = {"if-modified-since": "Sun, 01 Mar 2026 12:30:15 GMT"}
+    assert gridfs_response(grid_out, since, "application/pdf").status_code == 304
+
+    grid_out.md5 = "abc123"
+    assert etag_for(grid_out) == '"abc123"'
+
+
+class FakeGridIn:
+    def __init__(self, bucket, filename):
+        self._id = ObjectId()
+        self.bucket, self.filename, self.parts = bucket, filename, []
+
+    async def write(self, data):
+        self.parts.append(data)
+
+    async def close(self):
+        self.bucket.files[self._id] = b"".join(self.parts)
+
+    async def abort(self):
+        self.bucket.aborted.append(self._id)
+
+
+class FakeBucket:
+    def __init__(self):
+        self.files, self.aborted, self.writes = {}, [], []
+
+    def open_upload_stream(self, filename, metadata=None):
+        grid_in = FakeGridIn(self, filename)
+        self.writes.append(grid_in)
+        return grid_in
+
+    async def delete(self, grid_id):
+        del self.files[grid_id]
+
+    def find(self, filter, limit=0):
+        return FakeCursor([{"_id": grid_id} for grid_id in self.files if grid_id == filter["_id"]])
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length):
+        return self.docs[:length]
+
+
+PDF = b"%PDF-1.7\n" + b"x" * 40
+
+
+@pytest.mark.asyncio
+async def test_stream_upload_hashes_in_chunks_and_aborts_past_the_cap():
+    bucket = FakeBucket()
+    stored = await stream_upload_to_gridfs(bucket, UploadFile(io.BytesIO(PDF), filename="a.pdf"), "a.pdf",
+                                           max_size=1024, read_size=8)
+    assert bucket.files[stored.grid_id] == PDF and stored.size == len(PDF)
+    assert max(len(part) for part in bucket.writes[0].parts) == 8
+
+    with pytest.raises(UploadTooLarge):
+        await stream_upload_to_gridfs(bucket, UploadFile(io.BytesIO(PDF), filename="b.pdf"), "b.pdf",
+                                      max_size=16, read_size=8)
+    assert len(bucket.files) == 1 and len(bucket.aborted) == 1
+
+
+@pytest.mark.asyncio
+async def test_identical_uploads_share_one_blob(mock_db, monkeypatch):
+    bucket = FakeBucket()
+    monkeypatch.setattr(uploads, "fs", bucket)
+    monkeypatch.setattr(uploads, "db", mock_db)
+    admin = {"id": "adm-1", "email": "adm@eden.com", "role": "admin"}
+
+    first = await uploads.upload_file(UploadFile(io.BytesIO(PDF), filename="estimate.pdf"), None, None, admin)
+    second = await uploads.upload_file(UploadFile(io.BytesIO(PDF), filename="copy.pdf"), None, None, admin)
+    assert (first["deduplicated"], second["deduplicated"]) == (False, True)
+    assert len(bucket.files) == 1
+    records = await mock_db.uploaded_files.find({}).to_list(None)
+    assert len({r["grid_id"] for r in records}) == 1 and len(records) == 2
+
+    with pytest.raises(uploads.HTTPException) as exc:
+        await uploads.upload_file(UploadFile(io.BytesIO(b"not a pdf"), filename="fake.pdf"), None, None, admin)
+    assert exc.value.status_code == 400 and not bucket.aborted and len(bucket.writes) == 2
+
+    # The blob outlives the first record while the second still points at it.
+    await uploads.delete_file(first["id"], admin)
+    assert len(bucket.files) == 1
+
+
+@pytest.mark.asyncio
+async def test_duplicate_of_a_blob_deleted_concurrently_keeps_its_own(mock_db, monkeypatch):
+    bucket = FakeBucket()
+    monkeypatch.setattr(uploads, "fs", bucket)
+    monkeypatch.setattr(uploads, "db", mock_db)
+    admin = {"id": "adm-1", "email": "adm@eden.com", "role": "admin"}
+
+    first = await uploads.upload_file(UploadFile(io.BytesIO(PDF), filename="estimate.pdf"), None, None, admin)
+    # The first record's delete has removed its blob but not yet its record
+    bucket.files.clear()
+
+    second = await uploads.upload_file(UploadFile(io.BytesIO(PDF), filename="copy.pdf"), None, None, admin)
+    assert second["deduplicated"] is False
+    record = await mock_db.uploaded_files.find_one({"id": second["id"]})
+    assert ObjectId(record["grid_id"]) in bucket.files and record["filename"] == second["filename"]
+    assert record["grid_id"] != (await mock_db.uploaded_files.find_one({"id": first["id"]}))["grid_id"]
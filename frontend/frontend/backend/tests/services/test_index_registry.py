@@ -0,0 +1,102 @@
+import pytest
+from pymongo.errors import OperationFailure
+
+from services.index_registry import (
+    INDEX_REGISTRY,
+    QUERY_CATALOGUE,
+    apply_index_registry,
+    audit_query_plans,
+    idx,
+    plan_problems,
+    shape,
+    uncovered_shapes,
+)
+
+CLASSIC_SORTED_SCAN = {"queryPlanner": {"winningPlan": {
+    "stage": "SORT", "inputStage": {"stage": "COLLSCAN"},
+}}}
+SBE_INDEXED = {"queryPlanner": {"winningPlan": {"queryPlan": {
+    "stage": "LIMIT", "inputStage": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}},
+}}}}
+OR_PLAN = {"queryPlanner": {"winningPlan": {
+    "stage": "FETCH", "inputStage": {"stage": "OR", "inputStages": [{"stage": "IXSCAN"}, {"stage": "COLLSCAN"}]},
+}}}
+
+
+class _FakeCollection:
+    def __init__(self, name, log, fail):
+        self._name, self._log, self._fail = name, log, fail
+
+    async def create_index(self, keys, **options):
+        if (self._name, tuple(keys)) in self._fail:
+            raise self._fail[(self._name, tuple(keys))]
+        self._log.append((self._name, tuple(keys), options))
+
+
+class _FakeDB:
+    def __init__(self, fail=None, plans=None):
+        self.created, self.explained = [], []
+        self._fail = fail or {}
+        self._plans = plans or {}
+
+    def __getitem__(self, name):
+        return _FakeCollection(name, self.created, self._fail)
+
+    async def command(self, cmd):
+        self.explained.append(cmd)
+        return self._plans.get(cmd["explain"]["find"], SBE_INDEXED)
+
+
+def test_registry_covers_every_catalogued_query_shape():
+    assert uncovered_shapes() == []
+
+    registry = {"notes": [idx("claim_id")]}
+    shapes = [
+        shape("sorted notes", "notes", {"claim_id": "x"}, [("created_at", -1)]),
+        shape("note by claim", "notes", {"claim_id": "x"}),
+        shape("leaderboard", "incentive_participants", {"competition_id": "x"}, [("current_value", -1)]),
+    ]
+    assert [s.name for s in uncovered_shapes(shapes, registry)] == ["sorted notes", "leaderboard"]
+
+    # Reverse traversal of the index serves the opposite sort
+    reverse = [shape("oldest first", "claims", {"status": "New"}, [("created_at", 1), ("id", 1)])]
+    assert uncovered_shapes(reverse) == []
+
+
+def test_plan_problems_walks_classic_and_sbe_plans():
+    assert plan_problems(CLASSIC_SORTED_SCAN) == ["COLLSCAN", "in-memory SORT"]
+    assert plan_problems(SBE_INDEXED) == []
+    assert plan_problems(OR_PLAN) == ["COLLSCAN"]
+
+
+@pytest.mark.asyncio
+async def test_apply_reports_conflicts_and_keeps_going():
+    conflict = OperationFailure("Index already exists with a different name", code=85)
+    broken = OperationFailure("boom", code=2)
+    db = _FakeDB(fail={
+        ("users", (("email", 1),)): conflict,
+        ("notes", (("claim_id", 1), ("created_at", -1))): broken,
+    })
+
+    report = await apply_index_registry(db)
+
+    total = sum(len(specs) for specs in INDEX_REGISTRY.values())
+    assert report["ensured"] == total - 2
+    assert len(report["conflicts"]) == 1 and "users" in report["conflicts"][0]
+    assert len(report["failed"]) == 1 and "notes" in report["failed"][0]
+    ttl = next(opts for name, keys, opts in db.created if name == "token_blacklist" and keys == (("blacklisted_at", 1),))
+    assert ttl["expireAfterSeconds"] == 60 * 60 * 24 * 8
+
+
+@pytest.mark.asyncio
+async def test_audit_explains_each_shape_and_flags_bad_plans():
+    db = _FakeDB(plans={"notifications": CLASSIC_SORTED_SCAN})
+
+    findings = await audit_query_plans(db)
+
+    assert len(db.explained) == len(QUERY_CATALOGUE)
+    assert {f["collection"] for f in findings} == {"notifications"}
+    assert all(f["problems"] == ["COLLSCAN", "in-memory SORT"] for f in findings)
+    history = next(c for c in db.explained if c["explain"]["find"] == "comms_messages")
+    assert history["verbosity"] == "queryPlanner"
+    assert list(history["explain"]["sort"].items()) == [("created_at", -1), ("id", -1)]
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+import services.llm_cache as llm_cache
+from services.claimpilot.llm_router import LLMRouter
+from services.llm_cache import LLMResponseCache, cache_key
+from services.observability import MetricsCollector
+
+
+def _count(result: str, task: str = "claim_prediction") -> int:
+    key = MetricsCollector._build_key("llm_cache_requests_total", {"task": task, "result": result})
+    return MetricsCollector._counters.get(key, 0)
+
+
+@pytest.mark.asyncio
+async def test_identical_requests_share_one_upstream_call_and_persist(mock_db):
+    cache = LLMResponseCache(database=mock_db, maxsize=8, ttl_seconds=600)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return {"text": "answer"}
+
+    key = cache_key("gemini_flash", "m", "sys", "prompt", 0.3, 2000)
+    before = {r: _count(r) for r in ("miss", "coalesced", "memory_hit", "mongo_hit")}
+
+    results = await asyncio.gather(*(cache.get_or_compute(key, compute, task="claim_prediction") for _ in range(3)))
+    assert [r["text"] for r in results] == ["answer"] * 3
+    assert await cache.get_or_compute(key, compute, task="claim_prediction") == {"text": "answer"}
+    assert len(calls) == 1
+
+    # A fresh instance (another worker, or after a restart) reads Mongo.
+    other = LLMResponseCache(database=mock_db, maxsize=8, ttl_seconds=600)
+    assert (await other.get_or_compute(key, compute, task="claim_prediction"))["text"] == "answer"
+    assert len(calls) == 1
+
+    assert _count("miss") - before["miss"] == 1
+    assert _count("coalesced") - before["coalesced"] == 2
+    assert _count("memory_hit") - before["memory_hit"] == 1
+    assert _count("mongo_hit") - before["mongo_hit"] == 1
+    doc = await mock_db.llm_response_cache.find_one({"_id": key})
+    assert doc["task"] == "claim_prediction" and doc["latency_ms"] >= 15
+
+    assert cache_key("gemini_flash", "m", "sys", "prompt", 0.7, 2000) != key
+    assert cache_key("groq", "m", "sys", "prompt", 0.3, 2000) != key
+
+
+@pytest.mark.asyncio
+async def test_failures_and_empty_responses_are_not_cached(mock_db):
+    cache = LLMResponseCache(database=mock_db, maxsize=8, ttl_seconds=600)
+    outcomes = [RuntimeError("quota"), {"text": ""}, {"text": "ok"}]
+
+    async def compute():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    key = cache_key("groq", "m", None, "p")
+    with pytest.raises(RuntimeError):
+        await cache.get_or_compute(key, compute, task="statute_analysis")
+    assert (await cache.get_or_compute(key, compute, task="statute_analysis"))["text"] == ""
+    assert (await cache.get_or_compute(key, compute, task="statute_analysis"))["text"] == "ok"
+    assert await mock_db.llm_response_cache.count_documents({}) == 1
+
+
+@pytest.mark.asyncio
+async def test_router_caches_only_opted_in_tasks(mock_db, monkeypatch):
+    monkeypatch.setattr(llm_cache, "response_cache", LLMResponseCache(database=mock_db))
+    router = LLMRouter()
+    dispatched = []
+
+    async def fake_dispatch(provider, prompt, system_prompt, temperature, max_tokens):
+        dispatched.append(provider)
+        return f"reply to {prompt}"
+
+    monkeypatch.setattr(router, "_dispatch", fake_dispatch)
+
+    for _ in range(2):
+        assert await router.generate("p", "s", cache_task="claim_prediction") == "reply to p"
+    assert dispatched == ["gemini_flash"]
+
+    for _ in range(2):
+        await router.generate("p", "s", cache_task="negotiation")
+        await router.generate("p", "s")
+    assert len(dispatched) == 5
@@ -1,8 +1,11 @@
 """Tests for the ClaimPilot LLM Router — all LLM calls are mocked."""
 
+import asyncio
+
 import pytest
 from unittest.mock import AsyncMock, patch
 
+import services.claimpilot.llm_router as llm_router
 from services.claimpilot.llm_router import LLMRouter
 
 
@@ -167,3 +170,40 @@ async def test_llm_router_generate_vision(router: LLMRouter):
 
     assert result == "damage detected"
     mock_vision.assert_awaited_once_with("Describe damage", b"\x89PNG", "image/png")
+
+
+# ---------------------------------------------------------------------------
+# Provider concurrency
+# ---------------------------------------------------------------------------
+
+@pytest.mark.asyncio
+async def test_llm_router_caps_calls_in_flight_per_provider(monkeypatch):
+    """Routers share one slot pool per provider, across instances."""
+    monkeypatch.setitem(llm_router.PROVIDER_CONCURRENCY, "groq", 2)
+    in_flight = peak = 0
+
+    async def slow_groq(*args):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return "ok"
+
+    routers = [LLMRouter() for _ in range(5)]
+    for r in routers:
+        monkeypatch.setattr(r, "_call_groq", slow_groq)
+
+    results = await asyncio.gather(
+        *(r.generate(prompt="p", provider_override="groq") for r in routers)
+    )
+
+    assert results == ["ok"] * 5
+    assert peak == 2
+
+
+def test_provider_concurrency_env_override():
+    assert llm_router._parse_provider_concurrency("groq=6, ollama=0,bad,gemini_flash=x") == {
+        "groq": 6,
+        "ollama": 1,
+    }
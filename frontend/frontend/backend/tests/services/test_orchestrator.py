@@ -1,5 +1,6 @@
 """Tests for the ClaimPilot AgentOrchestrator."""
 
+import asyncio
 import os
 
 os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
@@ -110,6 +111,93 @@ class TestOrchestratorRouting:
         assert results == []
 
 
+class SlowAgent(SpyAgent):
+    """Agent with a configurable delay and suggested actions."""
+
+    requires_approval: bool = True
+
+    def __init__(self, db, name: str, delay: float, log: list) -> None:
+        super().__init__(db)
+        self.agent_name = name
+        self.delay = delay
+        self.log = log
+
+    async def execute(self, context: AgentContext) -> AgentResult:
+        self.calls.append(context)
+        self.log.append(("start", self.agent_name))
+        await asyncio.sleep(self.delay)
+        self.log.append(("end", self.agent_name))
+        return AgentResult(
+            agent_name=self.agent_name,
+            claim_id=context.claim["id"],
+            insight_type="test_insight",
+            summary=f"{self.agent_name} done.",
+            confidence=0.9,
+            suggested_actions=[f"{self.agent_name}: follow up"],
+        )
+
+
+class TestConcurrentDispatch:
+    @pytest.mark.asyncio
+    async def test_agents_share_context_and_run_concurrently(self, mock_db):
+        await _seed_claim(mock_db)
+        log: list = []
+        orchestrator = AgentOrchestrator(mock_db)
+        agents = [SlowAgent(mock_db, f"agent_{i}", 0.05, log) for i in range(3)]
+        for agent in agents:
+            orchestrator.register(agent.agent_name, agent)
+        orchestrator.add_event_mapping("ClaimCreated", [a.agent_name for a in agents])
+
+        results = await orchestrator.handle_event("ClaimCreated", "claim-abc-123")
+
+        assert [r.agent_name for r in results] == ["agent_0", "agent_1", "agent_2"]
+        assert [kind for kind, _ in log[:3]] == ["start"] * 3
+        assert len({id(a.calls[0]) for a in agents}) == 1  # one shared snapshot
+
+        pending = await mock_db.claimpilot_pending.find({}).to_list(10)
+        assert sorted(p["action_type"] for p in pending) == [f"agent_{i}: follow up" for i in range(3)]
+
+        dispatch = await mock_db.claimpilot_audit.find_one({"agent_name": "_orchestrator"})
+        assert dispatch["event_type"] == "ClaimCreated"
+        assert dispatch["pending_actions"] == 3
+        assert dispatch["agent_duration_ms"] >= 150
+        assert dispatch["duration_ms"] < dispatch["agent_duration_ms"]
+
+    @pytest.mark.asyncio
+    async def test_slow_agent_times_out_without_blocking_others(self, mock_db):
+        await _seed_claim(mock_db)
+        log: list = []
+        orchestrator = AgentOrchestrator(mock_db)
+        slow = SlowAgent(mock_db, "slow", 1.0, log)
+        slow.timeout_seconds = 0.05
+        fast = SlowAgent(mock_db, "fast", 0.0, log)
+        orchestrator.register("slow", slow)
+        orchestrator.register("fast", fast)
+        orchestrator.add_event_mapping("ClaimUpdated", ["slow", "fast"])
+
+        results = await orchestrator.handle_event("ClaimUpdated", "claim-abc-123")
+
+        assert [r.agent_name for r in results] == ["fast"]
+        timeout = await mock_db.claimpilot_audit.find_one({"agent_name": "slow"})
+        assert timeout["status"] == "timeout"
+        dispatch = await mock_db.claimpilot_audit.find_one({"agent_name": "_orchestrator"})
+        assert dispatch["status"] == "partial"
+        assert {a["name"]: a["status"] for a in dispatch["agents"]} == {"slow": "timeout", "fast": "success"}
+
+    @pytest.mark.asyncio
+    async def test_dependent_agent_waits_for_upstream(self, mock_db):
+        await _seed_claim(mock_db)
+        log: list = []
+        orchestrator = AgentOrchestrator(mock_db)
+        orchestrator.register("estimate_engine", SlowAgent(mock_db, "estimate_engine", 0.0, log))
+        orchestrator.register("vision_analyzer", SlowAgent(mock_db, "vision_analyzer", 0.02, log))
+        orchestrator.add_event_mapping("PhotoUploaded", ["estimate_engine", "vision_analyzer"])
+
+        await orchestrator.handle_event("PhotoUploaded", "claim-abc-123")
+
+        assert log.index(("end", "vision_analyzer")) < log.index(("start", "estimate_engine"))
+
+
 class TestOrchestratorRunAgent:
     @pytest.mark.asyncio
     async def test_run_agent_raises_for_unknown(self, mock_db):
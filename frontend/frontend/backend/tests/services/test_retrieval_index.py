@@ -0,0 +1,78 @@
+import pytest
+
+from services.retrieval_eval import evaluate
+from services.retrieval_index import (
+    BM25Index,
+    RetrievalIndex,
+    RetrievalSource,
+    SourceDoc,
+    tokenize,
+)
+
+
+def test_tokenizer_keeps_statute_numbers_and_stems():
+    assert tokenize("What does 626.854 say about Claims being denied?") == ["626.854", "say", "claim", "being", "deny"]
+
+
+def test_static_corpora_meet_the_eval_set():
+    report = evaluate(RetrievalIndex(snapshot_path=None), k=3, repeats=5)
+    assert report["recall@3"] >= 0.9, report["misses"]
+    assert report["latency_us"]["p50"] < 1000
+
+
+def test_bm25_upsert_and_remove_update_rankings():
+    index = BM25Index()
+    index.upsert("s", SourceDoc("a", "Roof hail damage", "shingles granules", {"id": "a"}))
+    index.upsert("s", SourceDoc("b", "Water loss", "pipe burst mold", {"id": "b"}))
+    assert [h.doc_id for h in index.search("hail shingles")] == ["a"]
+    assert index.upsert("s", SourceDoc("a", "Roof hail damage", "shingles granules", {"id": "a"})) is False
+
+    index.upsert("s", SourceDoc("b", "Water loss", "hail through skylight", {"id": "b"}))
+    assert {h.doc_id for h in index.search("hail")} == {"a", "b"}
+    index.remove("a")
+    assert [h.doc_id for h in index.search("hail shingles")] == ["b"]
+    assert "shingl" not in index.postings and "shingle" not in index.postings
+
+
+def test_prefix_search_completes_partly_typed_words_against_unstemmed_forms():
+    index = BM25Index()
+    index.upsert("s", SourceDoc("a", "Roofing estimates", "tear-off and underlayment", {"id": "a"}))
+    index.upsert("s", SourceDoc("b", "Water mitigation", "drying equipment", {"id": "b"}))
+    assert index.expand_prefix("roofin") == ["roof"]
+    assert [h.doc_id for h in index.search("roofin", prefix=True)] == ["a"]
+
+    index.remove("a")
+    assert index.expand_prefix("roofin") == []
+
+
+@pytest.mark.asyncio
+async def test_refresh_is_incremental_and_restores_from_snapshot(mock_db, tmp_path):
+    calls = []
+
+    async def load(database):
+        docs = await database.eve_knowledge_base.find({}, {"_id": 0}).to_list(length=None)
+        calls.append(len(docs))
+        return [SourceDoc(f"k:{d['id']}", d["title"], d["content"], d) for d in docs]
+
+    sources = [RetrievalSource("kb", "knowledge", load=load)]
+    path = str(tmp_path / "snapshot.json.gz")
+    await mock_db.eve_knowledge_base.insert_many([
+        {"id": "1", "title": "Appraisal strategy", "content": "umpire selection and timing"},
+        {"id": "2", "title": "Depreciation", "content": "recoverable depreciation holdback"},
+    ])
+
+    index = RetrievalIndex(sources, snapshot_path=path)
+    assert not index.is_ready("knowledge")
+    assert (await index.refresh(mock_db))["kb"] == {"changed": 2, "unchanged": 0, "removed": 0}
+    assert index.is_ready("knowledge")
+
+    await mock_db.eve_knowledge_base.update_one({"id": "2"}, {"$set": {"content": "ACV versus RCV holdback"}})
+    await mock_db.eve_knowledge_base.delete_one({"id": "1"})
+    assert (await index.refresh(mock_db))["kb"] == {"changed": 1, "unchanged": 0, "removed": 1}
+    assert [h.doc_id for h in index.search("knowledge", "rcv holdback")] == ["k:2"]
+    assert index.search("knowledge", "umpire") == []
+
+    restored = RetrievalIndex(sources, snapshot_path=path)
+    assert restored.search("knowledge", "rcv") == []
+    assert (await restored.refresh(mock_db))["kb"] == {"changed": 0, "unchanged": 1, "removed": 0}
+    assert [h.doc_id for h in restored.search("knowledge", "rcv holdback")] == ["k:2"]
@@ -0,0 +1,93 @@
+import random
+
+import pytest
+
+from services.claimpilot.settlement_model import (
+    SettlementModel,
+    get_settlement_model,
+    load_settlement_model,
+    save_settlement_model,
+    score_open_book,
+    set_settlement_model,
+    train_settlement_model,
+)
+
+TYPE_MULTIPLIER = {"Fire": 1.5, "Water Damage": 0.8, "Hail": 0.5, "Wind": 1.0}
+
+
+def _closed_claims(n: int = 600, seed: int = 7) -> list[dict]:
+    rng = random.Random(seed)
+    claims = []
+    for i in range(n):
+        claim_type = rng.choice(list(TYPE_MULTIPLIER))
+        carrier = rng.choice(["Citizens", "Heritage", "Universal"])
+        estimate = rng.uniform(5_000, 200_000)
+        claims.append({
+            "id": f"closed-{i}",
+            "status": "Closed",
+            "claim_type": claim_type,
+            "carrier_name": carrier,
+            "estimated_value": estimate,
+            "settlement_amount": estimate * TYPE_MULTIPLIER[claim_type] * rng.lognormvariate(0, 0.3),
+            "is_in_litigation": rng.random() < (0.6 if carrier == "Heritage" else 0.1),
+            "created_at": "2024-01-01T00:00:00+00:00",
+            "closed_at": f"2024-0{rng.randint(3, 7)}-01T00:00:00+00:00",
+        })
+    return claims
+
+
+def test_trained_model_learns_type_carrier_and_calibrated_quantiles():
+    claims = _closed_claims()
+    model = train_settlement_model(claims, iterations=1500)
+
+    fire = model.predict({"claim_type": "Fire loss", "carrier_name": "Citizens", "estimated_value": 50_000})
+    hail = model.predict({"claim_type": "hail", "carrier_name": "citizens ", "estimated_value": 50_000})
+    litigious = model.predict({"claim_type": "Fire", "carrier_name": "Heritage", "estimated_value": 50_000})
+
+    assert fire["settlement_range"]["p50"] > 2 * hail["settlement_range"]["p50"]
+    sr = fire["settlement_range"]
+    assert sr["p10"] < sr["p50"] < sr["p90"]
+    assert litigious["litigation_probability"] > 3 * fire["litigation_probability"]
+    assert 2 <= fire["timeline_months"] <= 6
+
+    scores = model.score_matrix(model.encode_many(claims))
+    actual = [c["settlement_amount"] for c in claims]
+    for column, tau in enumerate((0.1, 0.5, 0.9)):
+        below = sum(a < s for a, s in zip(actual, scores[:, column])) / len(claims)
+        assert abs(below - tau) < 0.06
+
+    # Unknown carriers and missing amounts still score.
+    assert model.predict({"claim_type": None, "carrier_name": "Nobody"})["timeline_months"] >= 1
+
+    with pytest.raises(ValueError):
+        train_settlement_model(claims[:10])
+
+
+@pytest.mark.asyncio
+async def test_artifact_round_trip_and_open_book_scoring(mock_db):
+    model = train_settlement_model(_closed_claims(), iterations=500)
+    await save_settlement_model(mock_db, model)
+
+    try:
+        loaded = await load_settlement_model(mock_db)
+        assert isinstance(loaded, SettlementModel) and get_settlement_model() is loaded
+        probe = {"claim_type": "Wind", "carrier_name": "Universal", "estimated_value": 80_000}
+        assert loaded.predict(probe) == model.predict(probe)
+    finally:
+        set_settlement_model(None)
+
+    await mock_db.claims.insert_many([
+        {"id": "open-1", "claim_number": "C-1", "status": "In Progress", "claim_type": "Fire", "estimated_value": 150_000},
+        {"id": "open-2", "claim_number": "C-2", "status": "New", "claim_type": "Hail", "estimated_value": 10_000},
+        {"id": "done", "claim_number": "C-3", "status": "Closed", "claim_type": "Fire", "estimated_value": 900_000},
+        {"id": "old", "claim_number": "C-4", "status": "New", "is_archived": True, "estimated_value": 900_000},
+    ])
+    book = await score_open_book(mock_db, loaded, top=1)
+
+    assert book["totals"]["claims"] == 2
+    assert [row["claim_id"] for row in book["claims"]] == ["open-1"]
+    expected = sum(loaded.predict(c)["settlement_range"]["p50"] for c in [
+        {"claim_type": "Fire", "estimated_value": 150_000},
+        {"claim_type": "Hail", "estimated_value": 10_000},
+    ])
+    assert book["totals"]["p50"] == pytest.approx(expected, abs=0.1)
@@ -0,0 +1,110 @@
+import asyncio
+import sys
+
+import pytest
+
+import services.index_registry as index_registry
+from services.startup_profiler import StartupProfiler
+from services.startup_tasks import content_stamp, run_once
+
+
+@pytest.mark.asyncio
+async def test_run_once_skips_stamped_tasks_until_version_changes(mock_db):
+    calls = []
+
+    async def seed():
+        calls.append("seed")
+
+    assert await run_once("seed", "v1", seed, database=mock_db, force=False) is True
+    assert await run_once("seed", "v1", seed, database=mock_db, force=False) is False
+    assert await run_once("seed", "v2", seed, database=mock_db, force=False) is True
+    assert await run_once("seed", "v2", seed, database=mock_db, force=True) is True
+    assert calls == ["seed"] * 3
+    stamp = await mock_db.startup_stamps.find_one({"_id": "seed"})
+    assert stamp["version"] == "v2" and "applied_at" in stamp
+
+    async def partial():
+        calls.append("partial")
+        return False
+
+    async def broken():
+        raise RuntimeError("boom")
+
+    await run_once("partial", "v1", partial, database=mock_db, force=False)
+    await run_once("partial", "v1", partial, database=mock_db, force=False)
+    with pytest.raises(RuntimeError):
+        await run_once("broken", "v1", broken, database=mock_db, force=False)
+    assert calls.count("partial") == 2
+    assert await mock_db.startup_stamps.count_documents({}) == 1
+
+    assert content_stamp({"b": 1, "a": [1, 2]}) == content_stamp({"a": [1, 2], "b": 1})
+    assert content_stamp({"a": 1}) != content_stamp({"a": 2})
+
+
+@pytest.mark.asyncio
+async def test_ensure_indexes_skips_apply_while_registry_unchanged(mock_db, monkeypatch):
+    applied = []
+
+    async def fake_apply(database):
+        applied.append(database)
+        return {"ensured": 3, "conflicts": [], "failed": []}
+
+    monkeypatch.setattr(index_registry, "apply_index_registry", fake_apply)
+    monkeypatch.delenv("STARTUP_FORCE_TASKS", raising=False)
+
+    assert (await index_registry.ensure_indexes(mock_db))["ensured"] == 3
+    assert await index_registry.ensure_indexes(mock_db) is None
+    assert len(applied) == 1
+
+    await mock_db.startup_stamps.update_one({"_id": "index_registry"}, {"$set": {"version": "stale"}})
+    await index_registry.ensure_indexes(mock_db)
+    assert len(applied) == 2
+
+
+@pytest.mark.asyncio
+async def test_gather_runs_steps_concurrently_and_reraises_after_all_finish():
+    profiler = StartupProfiler()
+    finished = []
+
+    async def slow(name):
+        await asyncio.sleep(0.05)
+        finished.append(name)
+
+    async def fail():
+        raise ValueError("seed failed")
+
+    t0 = asyncio.get_running_loop().time()
+    await profiler.gather(("a", slow("a")), ("b", slow("b")))
+    assert asyncio.get_running_loop().time() - t0 < 0.09
+
+    with pytest.raises(ValueError):
+        await profiler.gather(("bad", fail()), ("c", slow("c")))
+    assert finished == ["a", "b", "c"]
+
+    steps = {s["name"]: s for s in profiler.summary()["steps"]}
+    assert steps["bad"]["status"] == "error" and steps["c"]["status"] == "ok"
+    assert steps["a"]["duration_ms"] >= 40
+
+
+def test_import_hook_records_inclusive_and_self_time(tmp_path, monkeypatch):
+    pkg = tmp_path / "startup_probe_pkg"
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text("import time\ntime.sleep(0.01)\nfrom . import heavy\n")
+    (pkg / "heavy.py").write_text("import time\ntime.sleep(0.03)\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    profiler = StartupProfiler()
+    assert profiler.install_import_hook(force=True)
+    try:
+        import startup_probe_pkg  # noqa: F401
+    finally:
+        profiler.remove_import_hook()
+        for name in ("startup_probe_pkg", "startup_probe_pkg.heavy"):
+            sys.modules.pop(name, None)
+
+    parent_inclusive, parent_self = profiler.imports["startup_probe_pkg"]
+    heavy_inclusive, _ = profiler.imports["startup_probe_pkg.heavy"]
+    assert heavy_inclusive >= 25
+    assert parent_inclusive >= heavy_inclusive + 5
+    assert parent_self < parent_inclusive - 20
+    assert profiler.summary()["packages"][0]["package"] == "startup_probe_pkg"
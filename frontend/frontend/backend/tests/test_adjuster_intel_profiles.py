@@ -0,0 +1,142 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+
+import routes.adjuster_intel as adjuster_intel
+
+GEMINI_TACTICS = adjuster_intel._call_gemini_for_tactics
+ADMIN = {"id": "adm-1", "email": "adm@eden.com", "full_name": "Avery Admin", "role": "admin"}
+
+
+async def _gemini_ok(adjuster_name, carrier, notes_text):
+    return {"tactics": ["Delays inspections"], "best_counter": "Set deadlines", "behavior_score": "B", "ai_ok": True}
+
+
+@pytest.fixture
+def intel_db(mock_db, monkeypatch):
+    monkeypatch.setattr(adjuster_intel, "db", mock_db)
+    monkeypatch.setattr(adjuster_intel, "_call_gemini_for_tactics", _gemini_ok)
+    return mock_db
+
+
+async def _seed(mock_db):
+    claims = [
+        ("c1", "CLM-1", "jane smith", 5000),
+        ("c2", "CLM-2", "Jane  Smith", 0),
+        ("c3", "CLM-3", "Bob Jones", 8000),
+        ("c4", "CLM-4", "Cara Diaz", 0),
+    ]
+    for claim_id, number, adjuster, settlement in claims:
+        await mock_db.claims.insert_one({
+            "id": claim_id, "claim_number": number, "carrier_adjuster_name": adjuster,
+            "carrier_name": "Acme Mutual", "settlement_amount": settlement,
+            "estimated_value": 10000, "status": "In Progress", "created_at": f"2025-01-0{claim_id[1]}",
+        })
+    await mock_db.notes.insert_one({"id": "n1", "claim_id": "c3", "content": "LOR ack 6 days", "created_at": "2025-02-01"})
+
+
+def _track_builds(monkeypatch) -> dict:
+    state = {"built": [], "active": 0, "peak": 0}
+    original = adjuster_intel._build_adjuster_profile
+
+    async def tracked(name, claims):
+        state["built"].append(name)
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        await asyncio.sleep(0.01)
+        try:
+            return await original(name, claims)
+        finally:
+            state["active"] -= 1
+
+    monkeypatch.setattr(adjuster_intel, "_build_adjuster_profile", tracked)
+    return state
+
+
+@pytest.mark.asyncio
+async def test_first_run_builds_all_concurrently_and_keys_by_normalized_name(intel_db, monkeypatch):
+    await _seed(intel_db)
+    monkeypatch.setattr(adjuster_intel, "PROFILE_BUILD_CONCURRENCY", 2)
+    state = _track_builds(monkeypatch)
+
+    result = await adjuster_intel.generate_adjuster_profiles(current_user=ADMIN)
+
+    assert (result.profiles_created, result.profiles_updated, result.profiles_unchanged) == (3, 0, 0)
+    assert sorted(state["built"]) == ["Bob Jones", "Cara Diaz", "Jane Smith"]
+    assert state["peak"] == 2
+    jane = await adjuster_intel.get_adjuster_profile("JANE   smith", current_user=ADMIN)
+    assert jane["claims_handled"] == 2
+    assert jane["input_fingerprint"]
+
+
+@pytest.mark.asyncio
+async def test_rerun_rebuilds_only_changed_adjusters(intel_db, monkeypatch):
+    await _seed(intel_db)
+    await adjuster_intel.generate_adjuster_profiles(current_user=ADMIN)
+    first_id = (await intel_db.adjuster_profiles.find_one({"name": "Bob Jones"}))["id"]
+    state = _track_builds(monkeypatch)
+
+    unchanged = await adjuster_intel.generate_adjuster_profiles(current_user=ADMIN)
+    assert state["built"] == []
+    assert unchanged.profiles_unchanged == 3
+
+    await intel_db.notes.insert_one({"id": "n2", "claim_id": "c3", "content": "responded in 9 days", "created_at": "2025-03-01"})
+    await intel_db.claims.update_one({"id": "c4"}, {"$set": {"settlement_amount": 4000}})
+    result = await adjuster_intel.generate_adjuster_profiles(current_user=ADMIN)
+
+    assert sorted(state["built"]) == ["Bob Jones", "Cara Diaz"]
+    assert (result.profiles_created, result.profiles_updated, result.profiles_unchanged) == (0, 2, 1)
+    bob = await intel_db.adjuster_profiles.find_one({"name": "Bob Jones"})
+    assert bob["id"] == first_id
+    assert bob["avg_response_days"] == 7.5
+
+    forced = await adjuster_intel.generate_adjuster_profiles(force=True, current_user=ADMIN)
+    assert forced.profiles_updated == 3
+
+
+@pytest.mark.asyncio
+async def test_profiles_without_ai_analysis_are_retried_only_after_a_real_failure(intel_db, monkeypatch):
+    import google.generativeai as genai
+
+    await _seed(intel_db)
+    monkeypatch.setattr(adjuster_intel, "_call_gemini_for_tactics", GEMINI_TACTICS)
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    monkeypatch.delenv("GOOGLE_AI_API_KEY", raising=False)
+
+    # No key configured: the deterministic profile is final until inputs change
+    await adjuster_intel.generate_adjuster_profiles(current_user=ADMIN)
+    bob = await intel_db.adjuster_profiles.find_one({"name": "Bob Jones"})
+    assert bob["ai_analyzed"] is False and bob["input_fingerprint"]
+    state = _track_builds(monkeypatch)
+    assert (await adjuster_intel.generate_adjuster_profiles(current_user=ADMIN)).profiles_unchanged == 3
+    assert state["built"] == []
+
+    # Key configured but Gemini fails: rebuilt (the key changes the
+    # fingerprint), stored without a fingerprint, and tried again next run
+    def unavailable(**kwargs):
+        raise RuntimeError("503 Service Unavailable")
+
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(genai, "configure", lambda **kwargs: None)
+    monkeypatch.setattr(genai, "GenerativeModel", unavailable)
+    await adjuster_intel.generate_adjuster_profiles(current_user=ADMIN)
+    bob = await intel_db.adjuster_profiles.find_one({"name": "Bob Jones"})
+    assert bob["ai_analyzed"] is False and bob["input_fingerprint"] == ""
+    assert sorted(state["built"]) == ["Bob Jones", "Cara Diaz", "Jane Smith"]
+
+    monkeypatch.setattr(adjuster_intel, "_call_gemini_for_tactics", _gemini_ok)
+    state["built"].clear()
+    result = await adjuster_intel.generate_adjuster_profiles(current_user=ADMIN)
+    assert sorted(state["built"]) == ["Bob Jones", "Cara Diaz", "Jane Smith"]
+    assert result.profiles_updated == 3
+    bob = await intel_db.adjuster_profiles.find_one({"name": "Bob Jones"})
+    assert bob["ai_analyzed"] is True and bob["input_fingerprint"] and bob["behavior_score"] == "B"
@@ -0,0 +1,130 @@
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+
+import routes.comm_conversations as comm
+from routes.comm_conversations import (
+    CreateChannelRequest,
+    SendChannelMessageRequest,
+    UpdateChannelMessageRequest,
+)
+
+MANAGER = {"id": "mgr-1", "email": "mgr@eden.com", "full_name": "Morgan Manager", "role": "manager"}
+FIELD = {"id": "adj-1", "email": "adj@eden.com", "full_name": "Alex Adjuster", "role": "adjuster"}
+
+
+@pytest.fixture
+def comm_db(mock_db, monkeypatch):
+    monkeypatch.setattr(comm, "db", mock_db)
+    return mock_db
+
+
+async def _channel(name: str) -> str:
+    result = await comm.create_channel(
+        CreateChannelRequest(name=name, type="internal_public", member_user_ids=[FIELD["id"]]),
+        current_user=MANAGER,
+    )
+    return result["channel"]["id"]
+
+
+async def _send(channel_id: str, body: str, user: dict = MANAGER) -> dict:
+    result = await comm.send_channel_message(channel_id, SendChannelMessageRequest(body=body), current_user=user)
+    return result["message"]
+
+
+def _count_message_queries(collection, monkeypatch) -> dict:
+    calls = {"n": 0}
+    for name in ("find_one", "count_documents"):
+        original = getattr(collection, name)
+
+        async def counted(*args, _original=original, **kwargs):
+            calls["n"] += 1
+            return await _original(*args, **kwargs)
+
+        monkeypatch.setattr(collection, name, counted)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_inbox_uses_snapshots_and_counters(comm_db, monkeypatch):
+    channel_ids = [await _channel(f"Channel {i}") for i in range(5)]
+    for channel_id in channel_ids:
+        await _send(channel_id, "first")
+        await _send(channel_id, "second")
+
+    # First load backfills missing counters once
+    inbox = await comm.get_inbox(current_user=FIELD)
+    assert [item["unread_count"] for item in inbox["items"]] == [2] * 5
+
+    await _send(channel_ids[2], "newest")
+    calls = _count_message_queries(comm_db.comms_messages, monkeypatch)
+    inbox = await comm.get_inbox(current_user=FIELD)
+
+    assert calls["n"] == 0
+    top = inbox["items"][0]
+    assert top["channel"]["id"] == channel_ids[2]
+    assert "last_message" not in top["channel"]
+    assert top["last_message"]["body"] == "newest"
+    assert top["unread_count"] == 3
+
+
+@pytest.mark.asyncio
+async def test_mark_read_resets_and_own_messages_do_not_count(comm_db):
+    channel_id = await _channel("Ops")
+    await _send(channel_id, "hello")
+    await comm.get_inbox(current_user=FIELD)
+
+    await comm.mark_channel_read(channel_id, current_user=FIELD)
+    await _send(channel_id, "reply from field", user=FIELD)
+
+    field_inbox = await comm.get_inbox(current_user=FIELD)
+    manager_inbox = await comm.get_inbox(current_user=MANAGER)
+    assert field_inbox["items"][0]["unread_count"] == 0
+    assert manager_inbox["items"][0]["unread_count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_edit_and_delete_update_last_message_snapshot(comm_db):
+    channel_id = await _channel("Ops")
+    older = await _send(channel_id, "older")
+    latest = await _send(channel_id, "typo")
+
+    await comm.update_channel_message(
+        channel_id, latest["id"], UpdateChannelMessageRequest(body="fixed"), current_user=MANAGER,
+    )
+    # Editing an older message leaves the snapshot alone
+    await comm.update_channel_message(
+        channel_id, older["id"], UpdateChannelMessageRequest(body="older edited"), current_user=MANAGER,
+    )
+    channel = await comm_db.comms_channels.find_one({"id": channel_id})
+    assert channel["last_message"]["body"] == "fixed"
+    assert channel["last_message"]["is_edited"] is True
+
+    await comm.delete_channel_message(channel_id, latest["id"], current_user=MANAGER)
+    inbox = await comm.get_inbox(current_user=FIELD)
+    assert inbox["items"][0]["last_message"]["body"] == "[Message deleted]"
+    assert inbox["items"][0]["last_message"]["is_deleted"] is True
+
+
+@pytest.mark.asyncio
+async def test_inbox_backfills_legacy_channel_snapshot(comm_db):
+    await comm_db.comms_channels.insert_one({"id": "legacy", "name": "Legacy", "type": "internal_public"})
+    await comm_db.comms_channel_memberships.insert_one({"channel_id": "legacy", "user_id": FIELD["id"], "is_active": True})
+    await comm_db.comms_messages.insert_one({
+        "id": "m1", "channel_id": "legacy", "sender_user_id": MANAGER["id"], "body": "old", "created_at": "2024-01-01T00:00:00",
+    })
+
+    inbox = await comm.get_inbox(current_user=FIELD)
+
+    assert inbox["items"][0]["last_message"]["id"] == "m1"
+    assert inbox["items"][0]["unread_count"] == 1
+    stored = await comm_db.comms_channels.find_one({"id": "legacy"})
+    assert stored["last_message"]["id"] == "m1"
@@ -0,0 +1,130 @@
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+
+from fastapi import HTTPException
+
+import routes.comm_conversations as comm
+
+MANAGER = {"id": "mgr-1", "email": "mgr@eden.com", "full_name": "Morgan Manager", "role": "manager"}
+MEMBER = {"id": "adj-1", "email": "adj@eden.com", "full_name": "Alex Adjuster", "role": "adjuster"}
+
+
+@pytest.fixture
+def channel_db(mock_db, monkeypatch):
+    monkeypatch.setattr(comm, "db", mock_db)
+    return mock_db
+
+
+async def _seed(mock_db):
+    await mock_db.comms_channels.insert_one({"id": "ch", "name": "Ops", "type": "announcement_only"})
+    await mock_db.comms_channel_memberships.insert_one({"channel_id": "ch", "user_id": MEMBER["id"], "is_active": True})
+    # 25 messages; pairs share a timestamp so the id tiebreak is exercised
+    for i in range(25):
+        await mock_db.comms_messages.insert_one({
+            "id": f"m{i:02d}",
+            "channel_id": "ch",
+            "body": f"message {i}",
+            "type": "message",
+            "created_at": f"2025-01-01T00:00:{i // 2:02d}",
+        })
+
+
+def _ids(page):
+    return [m["id"] for m in page["messages"]]
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages_walk_back_without_gaps_or_repeats(channel_db):
+    await _seed(channel_db)
+    latest = await comm.get_channel_messages("ch", limit=10, current_user=MEMBER)
+    assert _ids(latest) == [f"m{i:02d}" for i in range(15, 25)]
+    assert latest["has_more_before"] is True
+    assert latest["has_more_after"] is False
+
+    seen = _ids(latest)
+    cursor = latest["prev_cursor"]
+    while True:
+        page = await comm.get_channel_messages("ch", limit=10, before=cursor, current_user=MEMBER)
+        seen = _ids(page) + seen
+        cursor = page["prev_cursor"]
+        if not page["has_more_before"]:
+            break
+
+    assert seen == [f"m{i:02d}" for i in range(25)]
+
+
+@pytest.mark.asyncio
+async def test_after_cursor_catches_up_new_messages(channel_db):
+    await _seed(channel_db)
+    latest = await comm.get_channel_messages("ch", limit=5, current_user=MEMBER)
+    await channel_db.comms_messages.insert_one({
+        "id": "m99", "channel_id": "ch", "body": "new", "type": "message", "created_at": "2025-01-01T00:01:00",
+    })
+
+    newer = await comm.get_channel_messages("ch", limit=5, after=latest["next_cursor"], current_user=MEMBER)
+    assert _ids(newer) == ["m99"]
+    assert newer["has_more_after"] is False
+
+    with pytest.raises(HTTPException):
+        await comm.get_channel_messages("ch", before="not-a-cursor!", current_user=MEMBER)
+
+
+@pytest.mark.asyncio
+async def test_replies_and_acks_hydrated_with_one_query_per_relation(channel_db, monkeypatch):
+    await _seed(channel_db)
+    await channel_db.comms_messages.insert_one({
+        "id": "r1", "channel_id": "ch", "body": "re", "type": "message",
+        "reply_to_message_id": "m24", "created_at": "2025-01-01T00:02:00",
+    })
+    announcement = await comm.post_channel_announcement(
+        "ch", comm.PostAnnouncementRequest(title="Storm", body="Stay safe"), current_user=MANAGER,
+    )
+    announcement_id = announcement["message"]["id"]
+    await comm.acknowledge_announcement("ch", announcement_id, current_user=MEMBER)
+    await comm.acknowledge_announcement("ch", announcement_id, current_user=MEMBER)  # idempotent
+    await comm.acknowledge_announcement("ch", announcement_id, current_user=MANAGER)
+
+    calls = {"find_one": 0, "count_documents": 0}
+    for collection in (channel_db.comms_messages, channel_db.comms_announcement_acks):
+        for name in calls:
+            original = getattr(collection, name)
+
+            async def counted(*args, _name=name, _original=original, **kwargs):
+                calls[_name] += 1
+                return await _original(*args, **kwargs)
+
+            monkeypatch.setattr(collection, name, counted)
+
+    page = await comm.get_channel_messages("ch", limit=5, current_user=MEMBER)
+    by_id = {m["id"]: m for m in page["messages"]}
+
+    assert calls == {"find_one": 0, "count_documents": 0}
+    assert by_id["r1"]["reply_to_message"]["body"] == "message 24"
+    assert by_id[announcement_id]["ack_count"] == 2
+    assert by_id[announcement_id]["acked_by_me"] is True
+
+
+@pytest.mark.asyncio
+async def test_legacy_announcement_ack_count_is_backfilled(channel_db):
+    await _seed(channel_db)
+    await channel_db.comms_messages.insert_one({
+        "id": "a-old", "channel_id": "ch", "type": "announcement", "title": "Old", "body": "b",
+        "created_at": "2025-01-01T00:03:00",
+    })
+    await channel_db.comms_announcement_acks.insert_one({"channel_id": "ch", "message_id": "a-old", "user_id": "x"})
+
+    page = await comm.get_channel_messages("ch", limit=1, current_user=MEMBER)
+
+    assert page["messages"][0]["ack_count"] == 1
+    assert page["messages"][0]["acked_by_me"] is False
+    stored = await channel_db.comms_messages.find_one({"id": "a-old"})
+    assert stored["ack_count"] == 1
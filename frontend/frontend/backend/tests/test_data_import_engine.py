@@ -0,0 +1,116 @@
+import io
+import os
+import sys
+
+import openpyxl
+import pytest
+
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import routes.data as data_routes
+from routes.data import ClaimImportEngine, _iter_import_rows, _iter_row_chunks
+
+ADMIN = {"id": "admin-1", "full_name": "Admin User"}
+
+
+@pytest.fixture
+def claims_db(mock_db, monkeypatch):
+    monkeypatch.setattr(data_routes, "db", mock_db)
+    return mock_db
+
+
+async def _run(engine, rows):
+    report = []
+    async for chunk_report in engine.run(rows):
+        report.extend(chunk_report)
+    return report
+
+
+def test_iter_import_rows_streams_csv_with_bom():
+    source = io.BytesIO("﻿Claim #,Insured Name\nA-1,Jane\nA-2,John\n".encode("utf-8"))
+    rows = list(_iter_import_rows(source, "claims.csv"))
+    assert rows == [
+        {"Claim #": "A-1", "Insured Name": "Jane"},
+        {"Claim #": "A-2", "Insured Name": "John"},
+    ]
+    assert not source.closed
+
+
+def test_iter_import_rows_reads_xlsx_like_pandas():
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["claim_number", "estimated_value", None])
+    sheet.append(["X-1", 25000.0, None])
+    sheet.append([None, None, None])
+    sheet.append(["X-2", 12.5, "extra"])
+    sheet.append([None, None, None])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+
+    rows = list(_iter_import_rows(buffer, "claims.xlsx"))
+
+    assert rows == [
+        {"claim_number": "X-1", "estimated_value": "25000", "Unnamed: 2": None},
+        {"claim_number": None, "estimated_value": None, "Unnamed: 2": None},
+        {"claim_number": "X-2", "estimated_value": "12.5", "Unnamed: 2": "extra"},
+    ]
+
+
+def test_iter_row_chunks_keeps_source_indexes():
+    chunks = list(_iter_row_chunks(({"n": i} for i in range(5)), chunk_size=2))
+    assert [[idx for idx, _ in chunk] for chunk in chunks] == [[0, 1], [2, 3], [4]]
+
+
+@pytest.mark.asyncio
+async def test_engine_bulk_inserts_and_skips_existing_and_in_file_duplicates(claims_db):
+    await claims_db.claims.insert_one({"id": "c-1", "claim_number": "EXIST-1"})
+    rows = [
+        {"claim_number": "NEW-1", "client_name": "A"},
+        {"claim_number": "EXIST-1", "client_name": "B"},
+        {"claim_number": "NEW-1", "client_name": "C"},
+        {"claim_number": "", "client_name": ""},
+        {"claim_number": "NEW-2", "client_name": "D"},
+    ]
+    engine = ClaimImportEngine(ADMIN, chunk_size=2)
+
+    report = await _run(engine, rows)
+
+    assert [entry["status"] for entry in report] == ["imported", "skipped", "skipped", "skipped", "imported"]
+    assert [entry["row"] for entry in report] == [2, 3, 4, 5, 6]
+    assert engine.summary()["imported"] == 2
+    assert engine.summary()["skipped"] == 3
+    assert sorted(d["claim_number"] for d in claims_db.claims._docs) == ["EXIST-1", "NEW-1", "NEW-2"]
+
+
+@pytest.mark.asyncio
+async def test_engine_update_blank_fields_folds_into_same_chunk_insert(claims_db):
+    await claims_db.claims.insert_one({"id": "c-1", "claim_number": "EXIST-1", "client_email": ""})
+    rows = [
+        {"claim_number": "EXIST-1", "client_email": "owner@example.com"},
+        {"claim_number": "NEW-1", "client_name": "A"},
+        {"claim_number": "NEW-1", "policy_number": "POL-9"},
+    ]
+    engine = ClaimImportEngine(ADMIN, duplicate_strategy="update_blank_fields")
+
+    report = await _run(engine, rows)
+
+    assert [entry["status"] for entry in report] == ["updated", "imported", "updated"]
+    assert engine.summary()["updated"] == 2
+    by_number = {d["claim_number"]: d for d in claims_db.claims._docs}
+    assert by_number["EXIST-1"]["client_email"] == "owner@example.com"
+    assert by_number["NEW-1"]["policy_number"] == "POL-9"
+    assert len(claims_db.claims._docs) == 2
+
+
+@pytest.mark.asyncio
+async def test_engine_dry_run_does_not_write(claims_db):
+    engine = ClaimImportEngine(ADMIN, dry_run=True)
+
+    report = await _run(engine, [{"claim_number": "NEW-1"}, {"claim_number": "NEW-1"}])
+
+    assert [entry["status"] for entry in report] == ["would_import", "skipped"]
+    assert engine.summary()["would_import"] == 1
+    assert claims_db.claims._docs == []
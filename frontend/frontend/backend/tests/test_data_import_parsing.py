@@ -5,7 +5,15 @@ os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
 os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
-from routes.data import _resolve_field, _parse_numeric, _clean_text, _build_header_mapping
+from routes.data import (
+    CANONICAL_IMPORT_FIELDS,
+    _build_field_lookup,
+    _build_header_mapping,
+    _clean_text,
+    _parse_numeric,
+    _resolve_field,
+    _resolve_field_with_mapping,
+)
 
 
 def test_resolve_field_supports_alias_headers():
@@ -43,3 +51,24 @@ def test_build_header_mapping_marks_unknown_and_known_headers():
     assert by_source["Claim #"]["mapped_field"] == "claim_number"
     assert by_source["Insured Name"]["mapped_field"] == "client_name"
     assert by_source["Totally Custom Column"]["mapped_field"] is None
+
+
+def test_build_field_lookup_matches_resolve_field_with_mapping():
+    row = {
+        "Claim #": "ABC-123",
+        "claim id": "",
+        "Homeowner": "Jane Doe",
+        "Custom Owner": "Mapped Owner",
+        "DOL": "2025-08-11",
+    }
+    mapping = {"Custom Owner": "client_name"}
+    lookup = _build_field_lookup(row.keys(), mapping)
+
+    def first_value(field_name):
+        for header in lookup[field_name]:
+            if row.get(header) not in (None, ""):
+                return row[header]
+        return ""
+
+    for field_name in CANONICAL_IMPORT_FIELDS:
+        assert first_value(field_name) == _resolve_field_with_mapping(row, field_name, mapping)
@@ -0,0 +1,103 @@
+import asyncio
+import time
+
+import pytest
+
+import eve_retrieval
+from eve_retrieval import Passage, assemble_eve_context, dedupe_passages, estimate_tokens, pack_passages
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    eve_retrieval.context_cache.clear()
+    yield
+    eve_retrieval.context_cache.clear()
+
+
+def test_dedupe_and_pack_respect_keys_overlap_and_budget():
+    statute = "The public adjuster contract may be rescinded within ten days after execution without penalty " * 3
+    passages = [
+        Passage("statutes", "statute:626.8796", statute, rank=0),
+        Passage("experts", "expert:chip-merlin", "**Chip Merlin** (Attorney):\n  - Document every carrier delay", rank=0),
+        Passage("knowledge", "knowledge:Contracts", "**Contracts** (Source: KB)\n" + statute, rank=0),
+        Passage("statutes", "statute:626.8796", "summary of the same section", rank=1),
+        Passage("knowledge", "knowledge:Long", "x " * 4000, rank=1),
+    ]
+    unique = dedupe_passages(passages)
+    assert [p.key for p in unique] == ["statute:626.8796", "expert:chip-merlin", "knowledge:Long"]
+
+    packed = pack_passages(unique, budget_tokens=400)
+    assert packed.tokens <= 400
+    assert packed.passages == ["statute:626.8796", "expert:chip-merlin", "knowledge:Long"]
+    assert "[... truncated" in packed.text
+    assert packed.text.index("FLORIDA STATUTES") < packed.text.index("EXPERT INSIGHTS") < packed.text.index("DEEP KNOWLEDGE")
+
+    # Verbatim statutes are packed first and never cut mid-text; one that
+    # cannot fit keeps its citation with an explicit notice
+    fits = Passage("statutes", "statute:626.8796", "**\u00a7626.8796**\nEXACT TEXT:\nten days", rank=1, verbatim=True)
+    too_long = Passage(
+        "statutes", "statute:626.854", "**\u00a7626.854, 2024 Fla. Stat.**\nEXACT TEXT:\n" + "y " * 2000,
+        rank=1, verbatim=True, citation="**\u00a7626.854, 2024 Fla. Stat.**\nHeading: Definitions",
+    )
+    packed = pack_passages([unique[1], fits, too_long], budget_tokens=400, mode="quote")
+    assert packed.passages == ["statute:626.8796", "statute:626.854", "expert:chip-merlin"]
+    assert packed.dropped == 0 and packed.tokens <= 400
+    assert "ten days" in packed.text and "y y" not in packed.text
+    assert "\u00a7626.854, 2024 Fla. Stat." in packed.text and eve_retrieval.VERBATIM_OMITTED_NOTICE in packed.text
+
+
+@pytest.mark.asyncio
+async def test_sources_run_concurrently_and_slow_ones_are_dropped(monkeypatch):
+    async def statutes(query, quote_mode):
+        await asyncio.sleep(0.05)
+        return [Passage("statutes", "statute:626.854", "Solicitation hours for public adjusters")]
+
+    async def experts(query):
+        await asyncio.sleep(0.05)
+        return [Passage("experts", "expert:john-voelpel", "Appraisal umpire selection")]
+
+    async def knowledge(query):
+        await asyncio.sleep(5)
+        return [Passage("knowledge", "knowledge:late", "never packed")]
+
+    monkeypatch.setattr(eve_retrieval, "_statute_passages", statutes)
+    monkeypatch.setattr(eve_retrieval, "_expert_passages", experts)
+    monkeypatch.setattr(eve_retrieval, "_knowledge_passages", knowledge)
+
+    started = time.perf_counter()
+    packed = await assemble_eve_context("appraisal rules", deadlines={"knowledge": 0.1})
+    assert time.perf_counter() - started < 0.5
+    assert packed.passages == ["statute:626.854", "expert:john-voelpel"]
+    assert packed.missing_sources == ["knowledge"]
+
+    # A partial result is not cached.
+    again = await assemble_eve_context("appraisal rules", deadlines={"knowledge": 0.1})
+    assert again.cached is False
+
+
+@pytest.mark.asyncio
+async def test_packed_context_is_cached_per_normalized_query_and_role(monkeypatch):
+    calls = []
+
+    async def statutes(query, quote_mode):
+        calls.append(query)
+        return [Passage("statutes", "statute:626.865", "Licensing and bond requirements")]
+
+    async def nothing(query):
+        return []
+
+    monkeypatch.setattr(eve_retrieval, "_statute_passages", statutes)
+    monkeypatch.setattr(eve_retrieval, "_expert_passages", nothing)
+    monkeypatch.setattr(eve_retrieval, "_knowledge_passages", nothing)
+    gamma_lookups = []
+    monkeypatch.setattr(eve_retrieval, "get_gamma_context", lambda query, user: gamma_lookups.append(user))
+
+    adjuster = {"id": "u1", "role": "adjuster"}
+    first = await assemble_eve_context("What is the bond requirement?", adjuster)
+    second = await assemble_eve_context("  what is the BOND requirement ", {"id": "u2", "role": "adjuster"})
+    assert second.cached and second.text == first.text and len(calls) == 1
+
+    await assemble_eve_context("What is the bond requirement?", {"id": "u3", "role": "admin"})
+    assert len(calls) == 2
+    assert estimate_tokens(first.text) == first.tokens
+    assert gamma_lookups == []  # no oauth_connections lookup per turn
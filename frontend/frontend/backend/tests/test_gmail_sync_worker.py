@@ -0,0 +1,147 @@
+import base64
+import os
+import sys
+
+import httpx
+import pytest
+from cryptography.fernet import Fernet
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("ENCRYPTION_KEY", Fernet.generate_key().decode())
+
+import motor.motor_asyncio
+
+import workers.gmail_sync_worker as worker
+from services.claim_matcher import invalidate_claim_matcher
+
+SYNC_USER = {"id": "adm-1", "full_name": "Avery Admin", "email": "ops@eden.com", "token": "tok"}
+PDF = base64.urlsafe_b64encode(b"%PDF-1.7 estimate").decode()
+
+
+class FakeBucket:
+    def __init__(self, db):
+        self.stored = []
+
+    async def upload_from_stream(self, filename, source, metadata=None):
+        self.stored.append(filename)
+        return f"grid-{len(self.stored)}"
+
+
+class FakeGmail:
+    """Mailbox served through httpx.MockTransport; records every request."""
+
+    def __init__(self, messages, history_id="900"):
+        self.messages = messages  # id -> subject
+        self.history_id = history_id
+        self.added = []
+        self.expired = False
+        self.timeouts = set()
+        self.requests = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        path, params = request.url.path, request.url.params
+        self.requests.append((path, params.get("format") or params.get("q") or params.get("startHistoryId")))
+        if path.endswith("/profile"):
+            return httpx.Response(200, json={"historyId": self.history_id})
+        if path.endswith("/history"):
+            if self.expired:
+                return httpx.Response(404, json={})
+            records = [{"messagesAdded": [{"message": {"id": mid, "labelIds": labels}}]}
+                       for mid, labels in self.added]
+            return httpx.Response(200, json={"history": records, "historyId": self.history_id})
+        if path.endswith("/messages"):
+            return httpx.Response(200, json={"messages": [{"id": mid} for mid in self.messages]})
+        if "/attachments/" in path:
+            return httpx.Response(200, json={"data": PDF})
+        msg_id = path.rsplit("/", 1)[-1]
+        if msg_id in self.timeouts:
+            raise httpx.ReadTimeout("timed out", request=request)
+        headers = [{"name": "Subject", "value": self.messages[msg_id]}, {"name": "From", "value": "carrier@ins.com"}]
+        payload = {"headers": headers}
+        if params.get("format") == "full":
+            payload["parts"] = [{"filename": f"{msg_id}.pdf", "mimeType": "application/pdf",
+                                 "body": {"attachmentId": f"att-{msg_id}", "size": 17}}]
+        return httpx.Response(200, json={"id": msg_id, "snippet": "", "payload": payload})
+
+
+@pytest.fixture
+def gmail_env(mock_db, monkeypatch):
+    invalidate_claim_matcher()
+    monkeypatch.setattr(motor.motor_asyncio, "AsyncIOMotorGridFSBucket", FakeBucket)
+    worker.init_gmail_sync_worker(mock_db)
+    yield mock_db
+    worker.init_gmail_sync_worker(None)
+    invalidate_claim_matcher()
+
+
+async def _run(gmail):
+    async with httpx.AsyncClient(transport=httpx.MockTransport(gmail.handler)) as client:
+        return await worker._run_gmail_auto_sync(SYNC_USER, client=client)
+
+
+@pytest.mark.asyncio
+async def test_first_run_backfills_then_reads_history_only(gmail_env):
+    await gmail_env.claims.insert_one({"id": "c1", "claim_number": "CLM-1001"})
+    gmail = FakeGmail({"m1": "Estimate for CLM-1001", "m2": "Lunch on Friday"})
+
+    first = await _run(gmail)
+    assert (first["mode"], first["history_id"], first["total_synced"]) == ("full", "900", 1)
+    state = await gmail_env.gmail_sync_state.find_one({"_id": "ops@eden.com"})
+    assert state["history_id"] == "900" and state["last_full_sync_at"]
+    # The unmatched message never had its full payload fetched
+    assert not any(path.endswith("/messages/m2") and fmt == "full" for path, fmt in gmail.requests)
+
+    gmail.requests.clear()
+    gmail.messages.update({"m3": "Supplement CLM-1001", "m4": "draft CLM-1001"})
+    gmail.added = [("m3", ["INBOX"]), ("m4", ["DRAFT"])]
+    gmail.history_id = "950"
+    second = await _run(gmail)
+    assert (second["mode"], second["history_id"], second["total_synced"]) == ("incremental", "950", 1)
+    assert second["messages_processed"] == 1
+    assert not any(path.endswith("/messages") for path, _ in gmail.requests)  # no re-search
+    assert await gmail_env.documents.count_documents({"claim_id": "c1"}) == 2
+
+
+@pytest.mark.asyncio
+async def test_expired_history_or_reset_falls_back_to_backfill(gmail_env):
+    await gmail_env.claims.insert_one({"id": "c1", "claim_number": "CLM-1001"})
+    gmail = FakeGmail({"m1": "Estimate for CLM-1001"})
+    await _run(gmail)
+
+    gmail.expired = True
+    rerun = await _run(gmail)
+    assert rerun["mode"] == "full" and rerun["total_skipped"] == 1  # already stored, deduped
+
+    gmail.expired = False
+    assert await worker.reset_gmail_sync_checkpoint("ops@eden.com") == 1
+    assert (await _run(gmail))["mode"] == "full"
+
+
+@pytest.mark.asyncio
+async def test_failed_messages_are_retried_and_overflow_forces_backfill(gmail_env, monkeypatch):
+    await gmail_env.claims.insert_one({"id": "c1", "claim_number": "CLM-1001"})
+    gmail = FakeGmail({"m1": "Estimate for CLM-1001", "m2": "Photos CLM-1001"})
+    gmail.timeouts = {"m1"}
+
+    first = await _run(gmail)
+    assert first["total_synced"] == 1 and first["messages_pending"] == 1
+    state = await gmail_env.gmail_sync_state.find_one({"_id": "ops@eden.com"})
+    assert state["pending_message_ids"] == ["m1"] and state["history_id"] == "900"
+
+    gmail.timeouts.clear()
+    retried = await _run(gmail)
+    assert (retried["mode"], retried["total_synced"], retried["messages_pending"]) == ("incremental", 1, 0)
+
+    monkeypatch.setattr(worker, "MAX_MESSAGES_PER_RUN", 1)
+    monkeypatch.setattr(worker, "MAX_PENDING_MESSAGES", 1)
+    gmail.messages.update({f"n{i}": "Invoice CLM-1001" for i in range(3)})
+    gmail.added = [(f"n{i}", ["INBOX"]) for i in range(3)]
+    behind = await _run(gmail)
+    assert behind["history_id"] is None
+    state = await gmail_env.gmail_sync_state.find_one({"_id": "ops@eden.com"})
+    assert state["history_id"] is None and state["pending_message_ids"] == ["n1"]
@@ -18,7 +18,7 @@ from services.inspection_pdf_service import (
     build_single_pdf,
     deduplicate_photos,
     preflight_check,
-    generate_email_safe_output,
+    render_photo_report,
     EMAIL_SAFE_TARGET_SIZE,
 )
 
@@ -149,18 +149,19 @@ class TestIntegration200Photos:
         assert pdf_buf.getbuffer().nbytes > 0
         assert pdf_buf.getvalue()[:5] == b"%PDF-"
 
-    def test_email_safe_pdf_under_15mb(self, photo_setup):
+    def test_email_safe_pdf_under_15mb(self, photo_setup, tmp_path):
         """Email-safe PDF for 200 320x240 photos must be under 15 MB."""
         photos, photo_dir = photo_setup
         by_room = {}
         for p in photos:
             by_room.setdefault(p["room"], []).append(p)
 
-        buf, content_type = generate_email_safe_output(
-            by_room, photos, CLAIM, USER,
-            photo_dir=photo_dir, claim_id=CLAIM_ID,
+        output = str(tmp_path / "report")
+        render_photo_report(
+            by_room, photos, CLAIM, USER, "email_safe",
+            photo_dir=photo_dir, claim_id=CLAIM_ID, output_path=output,
         )
-        size = buf.getbuffer().nbytes
+        size = os.path.getsize(output)
         # Whether single PDF or ZIP, should be under target
         assert size <= EMAIL_SAFE_TARGET_SIZE, (
             f"Output is {size / (1024*1024):.1f} MB, target is "
@@ -0,0 +1,120 @@
+import os
+import sys
+from datetime import datetime, timezone
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+
+import routes.comm_conversations as comm
+from routes.comm_conversations import SendChannelMessageRequest, UpdateChannelMessageRequest
+from services.message_search import (
+    backfill_message_search_index,
+    highlight,
+    index_fields,
+    query_prefixes,
+    rank_results,
+)
+
+ADMIN = {"id": "adm-1", "email": "adm@eden.com", "full_name": "Avery Admin", "role": "admin"}
+MEMBER = {"id": "adj-1", "email": "adj@eden.com", "full_name": "Alex Adjuster", "role": "adjuster"}
+
+
+@pytest.fixture
+def search_db(mock_db, monkeypatch):
+    monkeypatch.setattr(comm, "db", mock_db)
+    return mock_db
+
+
+async def _seed(mock_db):
+    for channel_id, archived in (("ops", False), ("private", False), ("old", True)):
+        await mock_db.comms_channels.insert_one({
+            "id": channel_id, "name": channel_id.title(), "type": "internal_public", "is_archived": archived,
+        })
+    await mock_db.comms_channel_memberships.insert_one({"channel_id": "ops", "user_id": MEMBER["id"], "is_active": True})
+    for channel_id in ("ops", "private", "old"):
+        await comm.send_channel_message(
+            channel_id, SendChannelMessageRequest(body=f"Hail damage on north slope ({channel_id})"), current_user=ADMIN,
+        )
+
+
+def test_index_fields_cover_prefixes_and_skip_deleted():
+    fields = index_fields({"title": "Roof", "body": "Hail damage, café"})
+
+    assert fields["search_terms"] == ["cafe", "damage", "hail", "roof"]
+    assert {"ha", "hai", "hail", "da", "damag", "ca"} <= set(fields["search_prefixes"])
+    assert "h" not in fields["search_prefixes"]
+    assert index_fields({"body": "[Message deleted]", "is_deleted": True}) == {"search_terms": [], "search_prefixes": []}
+    assert query_prefixes("Hail  a DAM") == ["dam", "hail"]
+
+
+def test_rank_prefers_exact_and_title_hits_and_highlights():
+    now = datetime(2025, 6, 1, tzinfo=timezone.utc)
+    messages = [
+        {"id": "prefix", "body": "hailstorm yesterday", "created_at": "2025-05-31T00:00:00+00:00"},
+        {"id": "exact", "body": "big hail", "created_at": "2025-01-01T00:00:00+00:00"},
+        {"id": "title", "title": "Hail report", "body": "see attached", "created_at": "2025-01-01T00:00:00+00:00"},
+    ]
+    for message in messages:
+        message.update(index_fields(message))
+
+    ranked = rank_results(messages, "hail", limit=10, now=now)
+
+    assert [m["id"] for m in ranked] == ["title", "exact", "prefix"]
+    assert "search_terms" not in ranked[0]
+    prefix_hit = ranked[2]
+    span = prefix_hit["highlights"][0]
+    assert prefix_hit["snippet"][span["start"]:span["end"]] == "hail"
+
+    long_text = "x " * 200 + "hail here"
+    snippet = highlight(long_text, ["hail"])
+    span = snippet["highlights"][0]
+    assert snippet["snippet"].startswith("…")
+    assert snippet["snippet"][span["start"]:span["end"]] == "hail"
+
+
+@pytest.mark.asyncio
+async def test_search_matches_prefixes_within_accessible_channels(search_db):
+    await _seed(search_db)
+
+    member = await comm.search_messages(q="hail dam", current_user=MEMBER)
+    admin = await comm.search_messages(q="hail dam", current_user=ADMIN)
+
+    assert [m["channel_id"] for m in member["results"]] == ["ops"]
+    assert member["results"][0]["channel_name"] == "Ops"
+    assert "search_prefixes" not in member["results"][0]
+    assert sorted(m["channel_id"] for m in admin["results"]) == ["ops", "private"]
+
+    # A channel filter cannot widen access
+    denied = await comm.search_messages(q="hail", channel_id="private", current_user=MEMBER)
+    assert denied["results"] == []
+    assert (await comm.search_messages(q="hail", channel_id="old", current_user=ADMIN))["results"] == []
+
+
+@pytest.mark.asyncio
+async def test_edits_deletes_and_backfill_keep_index_current(search_db):
+    await _seed(search_db)
+    sent = await comm.send_channel_message("ops", SendChannelMessageRequest(body="typo"), current_user=MEMBER)
+    message_id = sent["message"]["id"]
+    assert "search_terms" not in sent["message"]
+
+    updated = await comm.update_channel_message(
+        "ops", message_id, UpdateChannelMessageRequest(body="wind claim"), current_user=MEMBER,
+    )
+    assert "search_prefixes" not in updated["message"]
+    assert [m["id"] for m in (await comm.search_messages(q="wind", current_user=MEMBER))["results"]] == [message_id]
+
+    await comm.delete_channel_message("ops", message_id, current_user=MEMBER)
+    assert (await comm.search_messages(q="wind", current_user=MEMBER))["results"] == []
+
+    await search_db.comms_messages.insert_one({
+        "id": "legacy", "channel_id": "ops", "body": "Legacy flood note", "created_at": "2024-01-01T00:00:00",
+    })
+    assert await backfill_message_search_index(search_db) == 1
+    assert await backfill_message_search_index(search_db) == 0
+    assert [m["id"] for m in (await comm.search_messages(q="flo", current_user=MEMBER))["results"]] == ["legacy"]
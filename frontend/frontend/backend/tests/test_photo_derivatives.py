@@ -0,0 +1,99 @@
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+
+from PIL import Image as PILImage
+
+import services.photo_derivatives as photo_derivatives
+from services.photo_derivatives import (
+    DERIVATIVE_SPECS,
+    derivative_etag,
+    derivative_path,
+    generate_photo_derivatives,
+    remove_photo_derivatives,
+    render_derivatives,
+)
+
+EXIF_ORIENTATION = 0x0112
+
+
+@pytest.fixture
+def photo(temp_photo_dir):
+    claim_dir = os.path.join(temp_photo_dir, "claim-1")
+    os.makedirs(claim_dir)
+    img = PILImage.new("RGB", (4000, 3000), (120, 80, 40))
+    exif = img.getexif()
+    exif[EXIF_ORIENTATION] = 6  # rotate 90° CW on display
+    img.save(os.path.join(claim_dir, "abc123.jpg"), "JPEG", exif=exif)
+    return {"id": "abc123", "claim_id": "claim-1", "filename": "abc123.jpg", "sha256_hash": "abc123" + "0" * 58}
+
+
+def test_render_derivatives_applies_orientation_and_sizes(photo, temp_photo_dir):
+    original = os.path.join(temp_photo_dir, "claim-1", "abc123.jpg")
+    outputs = {size: derivative_path(photo, size, temp_photo_dir) for size in DERIVATIVE_SPECS}
+
+    results = render_derivatives(original, outputs)
+
+    for size, spec in DERIVATIVE_SPECS.items():
+        with PILImage.open(outputs[size]) as rendered:
+            # Portrait after the EXIF rotation
+            assert rendered.height == spec["max_px"]
+            assert rendered.width < rendered.height
+        assert results[size]["height"] == spec["max_px"]
+
+
+def test_render_derivatives_flattens_transparency(temp_photo_dir):
+    original = os.path.join(temp_photo_dir, "logo.png")
+    PILImage.new("RGBA", (500, 500), (0, 0, 0, 0)).save(original)
+    output = os.path.join(temp_photo_dir, "derivatives", "logo_thumb.jpg")
+
+    render_derivatives(original, {"thumb": output})
+
+    with PILImage.open(output) as rendered:
+        assert rendered.mode == "RGB"
+        assert rendered.getpixel((10, 10)) == (255, 255, 255)
+
+
+@pytest.mark.asyncio
+async def test_generate_records_derivatives_and_remove_cleans_up(photo, temp_photo_dir, mock_db, monkeypatch):
+    monkeypatch.setattr(photo_derivatives, "db", mock_db)
+    await mock_db.inspection_photos.insert_one(dict(photo))
+
+    derivatives = await generate_photo_derivatives(photo, temp_photo_dir)
+
+    stored = await mock_db.inspection_photos.find_one({"id": "abc123"})
+    assert stored["derivatives"] == derivatives
+    assert stored["derivatives_version"] == photo_derivatives.DERIVATIVE_VERSION
+    assert all(os.path.exists(derivative_path(photo, size, temp_photo_dir)) for size in DERIVATIVE_SPECS)
+
+    remove_photo_derivatives(photo, temp_photo_dir)
+    assert not any(os.path.exists(derivative_path(photo, size, temp_photo_dir)) for size in DERIVATIVE_SPECS)
+    photo_derivatives.shutdown_derivative_pool()
+
+
+def test_derivative_etag_is_stable_per_size_and_version(photo):
+    assert derivative_etag(photo, "thumb") == derivative_etag(dict(photo), "thumb")
+    assert derivative_etag(photo, "thumb") != derivative_etag(photo, "medium")
+
+
+@pytest.mark.asyncio
+async def test_missing_original_is_stamped_so_backfill_skips_it(temp_photo_dir, mock_db, monkeypatch):
+    monkeypatch.setattr(photo_derivatives, "db", mock_db)
+    gone = {"id": "gone1", "claim_id": "claim-1", "filename": "gone1.jpg"}
+    await mock_db.inspection_photos.insert_one(dict(gone))
+
+    first = await photo_derivatives.backfill_photo_derivatives(temp_photo_dir)
+    assert first["failed"] == 1
+    stored = await mock_db.inspection_photos.find_one({"id": "gone1"})
+    assert stored["derivatives_error"] == "original missing"
+
+    second = await photo_derivatives.backfill_photo_derivatives(temp_photo_dir)
+    assert second["processed"] == 0
@@ -0,0 +1,156 @@
+import json
+import os
+import sys
+import zipfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+
+from PIL import Image as PILImage
+
+import services.inspection_pdf_service as inspection_pdf_service
+import services.photo_report_jobs as photo_report_jobs
+from services.inspection_pdf_service import _resolve_report_image, render_photo_report
+from services.photo_derivatives import derivative_path
+from services.photo_report_jobs import (
+    report_cache_key,
+    serialize_job,
+    start_photo_report_job,
+    wait_for_photo_report_job,
+)
+
+CLAIM = {"id": "claim-1", "claim_number": "CLM-001", "client_name": "Jane Doe"}
+USER = {"id": "user-1", "name": "Inspector Gadget"}
+
+
+def _make_photos(photo_dir, count=3):
+    claim_dir = os.path.join(photo_dir, "claim-1")
+    os.makedirs(claim_dir, exist_ok=True)
+    photos = []
+    for i in range(count):
+        filename = f"p{i}.jpg"
+        PILImage.new("RGB", (320, 240), (40 * i, 90, 120)).save(os.path.join(claim_dir, filename), "JPEG")
+        photos.append({
+            "id": f"p{i}",
+            "claim_id": "claim-1",
+            "filename": filename,
+            "sha256_hash": f"{i}" * 64,
+            "room": "Kitchen" if i % 2 else "Roof",
+            "captured_at": f"2025-01-0{i + 1}T10:00:00",
+            "ai_caption": f"caption {i}",
+        })
+    return photos
+
+
+def test_render_photo_report_writes_file_and_progress(temp_photo_dir):
+    photos = _make_photos(temp_photo_dir)
+    by_room = {}
+    for photo in photos:
+        by_room.setdefault(photo["room"], []).append(photo)
+    output = os.path.join(temp_photo_dir, "report.pdf")
+    progress = output + ".progress.json"
+
+    content_type = render_photo_report(
+        by_room, photos, CLAIM, USER, "email_safe", temp_photo_dir, "claim-1",
+        output, progress_path=progress,
+    )
+
+    assert content_type == "application/pdf"
+    with open(output, "rb") as f:
+        assert f.read(5) == b"%PDF-"
+    with open(progress) as f:
+        assert json.load(f) == {"phase": "complete", "done": 3, "total": 3}
+
+
+def test_oversized_email_safe_report_is_split_from_room_sections(temp_photo_dir, monkeypatch):
+    import fitz
+
+    photos = _make_photos(temp_photo_dir)
+    by_room = {}
+    for photo in photos:
+        by_room.setdefault(photo["room"], []).append(photo)
+    output = os.path.join(temp_photo_dir, "report.pdf")
+    monkeypatch.setattr(inspection_pdf_service, "EMAIL_SAFE_TARGET_SIZE", 1)
+
+    content_type = render_photo_report(
+        by_room, photos, CLAIM, USER, "email_safe", temp_photo_dir, "claim-1", output,
+    )
+
+    assert content_type == "application/zip"
+    assert not os.path.exists(output + ".sections")
+    with zipfile.ZipFile(output) as zf:
+        names = zf.namelist()
+        assert names == ["photo_report_CLM-001_part1.pdf", "photo_report_CLM-001_part2.pdf"]
+        with fitz.open(stream=zf.read(names[0]), filetype="pdf") as part:
+            texts = [page.get_text() for page in part]
+    assert "Part 1 of 2" in texts[0]
+    assert all(f"Page {n}" in text for n, text in enumerate(texts, 1))
+
+
+def test_email_safe_report_prefers_medium_derivative(temp_photo_dir):
+    photo = _make_photos(temp_photo_dir, count=1)[0]
+    original = os.path.join(temp_photo_dir, "claim-1", "p0.jpg")
+    assert _resolve_report_image(photo, temp_photo_dir, "claim-1", "email_safe") == os.path.realpath(original)
+
+    medium = derivative_path(photo, "medium", temp_photo_dir)
+    os.makedirs(os.path.dirname(medium))
+    PILImage.new("RGB", (160, 120)).save(medium, "JPEG")
+    photo["derivatives"] = {"medium": {"filename": os.path.basename(medium)}}
+
+    assert _resolve_report_image(photo, temp_photo_dir, "claim-1", "email_safe") == medium
+    # Archive exports always embed the original
+    assert _resolve_report_image(photo, temp_photo_dir, "claim-1", "full_fidelity") == os.path.realpath(original)
+
+
+def test_cache_key_tracks_report_content():
+    photos = [{"id": "p0", "sha256_hash": "a" * 64, "room": "Roof", "ai_caption": "hail"}]
+    options = {"mode": "email_safe", "include_ai": True, "include_gps": True, "rooms": ["Roof"]}
+    key = report_cache_key(photos, CLAIM, USER, options)
+
+    assert key == report_cache_key([dict(photos[0], file_size=123)], CLAIM, USER, options)
+    assert key != report_cache_key([dict(photos[0], ai_caption="wind")], CLAIM, USER, options)
+    assert key != report_cache_key(photos, CLAIM, USER, dict(options, mode="full_fidelity"))
+    assert key != report_cache_key(photos, dict(CLAIM, client_name="John"), USER, options)
+
+
+@pytest.mark.asyncio
+async def test_job_renders_once_then_serves_cache(temp_photo_dir, mock_db, monkeypatch):
+    monkeypatch.setattr(photo_report_jobs, "db", mock_db)
+    await mock_db.claims.insert_one(dict(CLAIM))
+    for photo in _make_photos(temp_photo_dir):
+        await mock_db.inspection_photos.insert_one(photo)
+
+    job = await start_photo_report_job("claim-1", "email_safe", USER, temp_photo_dir)
+    assert job["status"] == "queued"
+    done = await wait_for_photo_report_job(job["id"], timeout=60)
+
+    assert done["status"] == "complete", done.get("error")
+    assert done["content_type"] == "application/pdf"
+    assert done["filename"].startswith("photo_report_CLM-001_")
+    assert os.path.getsize(done["path"]) == done["size_bytes"]
+    view = serialize_job(done)
+    assert view["download_url"].endswith(f"/photo-report-jobs/{job['id']}/download")
+    assert view["progress"]["done"] == 3
+
+    again = await start_photo_report_job("claim-1", "email_safe", USER, temp_photo_dir)
+    assert again["id"] == job["id"]
+    assert again["cached"] is True
+
+    await mock_db.inspection_photos.update_one({"id": "p1"}, {"$set": {"ai_caption": "edited"}})
+    rebuilt = await start_photo_report_job("claim-1", "email_safe", USER, temp_photo_dir)
+    assert rebuilt["id"] != job["id"]
+    await wait_for_photo_report_job(rebuilt["id"], timeout=60)
+    photo_report_jobs.shutdown_report_pool()
+
+
+@pytest.mark.asyncio
+async def test_job_for_missing_claim_raises(mock_db, temp_photo_dir, monkeypatch):
+    monkeypatch.setattr(photo_report_jobs, "db", mock_db)
+    with pytest.raises(ValueError):
+        await start_photo_report_job("nope", "email_safe", USER, temp_photo_dir)
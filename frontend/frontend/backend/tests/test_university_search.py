@@ -0,0 +1,84 @@
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+
+import routes.university.routes as university
+from routes.university.routes import CustomArticleCreate, CustomDocumentCreate
+from services.retrieval_index import RetrievalIndex
+
+ADMIN = {"id": "adm-1", "email": "adm@eden.com", "name": "Avery Admin", "role": "admin"}
+MEMBER = {"id": "adj-1", "email": "adj@eden.com", "role": "adjuster"}
+
+
+@pytest.fixture
+def search_env(mock_db, monkeypatch):
+    index = RetrievalIndex(snapshot_path=None)
+    monkeypatch.setattr(university, "db", mock_db)
+    monkeypatch.setattr(university, "retrieval_index", index)
+    return mock_db, index
+
+
+async def _seed(mock_db, index):
+    await mock_db.courses.insert_one({
+        "id": "c1", "title": "Understanding Carrier Tactics", "description": "Counter lowball offers",
+        "category": "Carrier Warfare", "tags": ["negotiation"], "is_published": True,
+        "lessons": [{"title": "The Playbook", "description": "", "content": "Depreciation holdback games"}],
+        "quiz": [{"question": "secret"}],
+    })
+    await mock_db.articles.insert_one({
+        "id": "a1", "title": "Roof Inspections", "description": "Hail and wind", "content": "Test squares",
+        "tags": ["roof"], "is_published": True,
+    })
+    await mock_db.articles.insert_one({"id": "a2", "title": "Draft carrier memo", "is_published": False})
+    await index.refresh(mock_db)
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_published_content_and_completes_the_last_word(search_env):
+    await _seed(*search_env)
+    result = await university.search_content(q="carrier tac", current_user=MEMBER)
+    assert [c["id"] for c in result["courses"]] == ["c1"]
+    assert "lessons" not in result["courses"][0] and "quiz" not in result["courses"][0]
+    assert result["articles"] == [] and result["total"] == 1
+
+    lesson_hit = await university.search_content(q="depreciation holdback", current_user=MEMBER)
+    assert [c["id"] for c in lesson_hit["courses"]] == ["c1"]
+
+    suggestions = await university.suggest_content(q="insp", current_user=MEMBER)
+    assert suggestions["suggestions"] == [{"id": "a1", "type": "article", "title": "Roof Inspections"}]
+
+
+@pytest.mark.asyncio
+async def test_custom_content_writes_update_the_index(search_env):
+    await _seed(*search_env)
+    created = await university.create_custom_article(
+        CustomArticleCreate(title="Appraisal Umpires", description="Choosing a neutral umpire",
+                            content="Umpire selection", is_published=True),
+        current_user=ADMIN,
+    )
+    doc = await university.create_custom_document(
+        CustomDocumentCreate(title="Appraisal SOP", description="Internal steps", doc_type="sop",
+                             content="Demand appraisal in writing", is_published=True),
+        current_user=ADMIN,
+    )
+    result = await university.search_content(q="apprais", current_user=MEMBER)
+    assert [a["id"] for a in result["articles"]] == [created["id"]]
+    assert [d["id"] for d in result["documents"]] == [doc["id"]]
+
+    await university.update_custom_article(
+        created["id"],
+        CustomArticleCreate(title="Appraisal Umpires", description="Choosing a neutral umpire",
+                            content="Umpire selection", is_published=False),
+        current_user=ADMIN,
+    )
+    await university.delete_custom_document(doc["id"], current_user=ADMIN)
+    result = await university.search_content(q="appraisal", current_user=MEMBER)
+    assert result["total"] == 0
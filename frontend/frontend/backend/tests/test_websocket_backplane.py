@@ -0,0 +1,86 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from websocket_backplane import InMemoryBackplane, InMemoryBus
+from websocket_manager import ConnectionManager
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+        self.closed = False
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, message):
+        self.sent.append(message)
+
+    async def close(self, code=1000, reason=""):
+        self.closed = True
+
+
+async def _cluster(*worker_ids):
+    bus = InMemoryBus()
+    managers = []
+    for worker_id in worker_ids:
+        manager = ConnectionManager(InMemoryBackplane(bus, worker_id=worker_id))
+        await manager.start()
+        managers.append(manager)
+    return managers
+
+
+@pytest.mark.asyncio
+async def test_send_to_user_reaches_socket_on_other_worker_once():
+    worker_a, worker_b = await _cluster("a", "b")
+    local_ws, remote_ws = FakeWebSocket(), FakeWebSocket()
+    await worker_a.connect(local_ws, "user-1")
+    await worker_b.connect(remote_ws, "user-1")
+
+    await worker_a.send_to_user("user-1", {"type": "chat_message"})
+    await worker_a.flush()
+    await worker_b.flush()
+
+    assert local_ws.sent == [{"type": "chat_message"}]
+    assert remote_ws.sent == [{"type": "chat_message"}]
+    await worker_a.stop()
+    await worker_b.stop()
+
+
+@pytest.mark.asyncio
+async def test_broadcast_only_forwards_to_workers_holding_users():
+    worker_a, worker_b, worker_c = await _cluster("a", "b", "c")
+    ws_b = FakeWebSocket()
+    await worker_b.connect(ws_b, "user-2")
+    forwarded = []
+
+    async def record(user_ids, message):
+        forwarded.append(user_ids)
+
+    worker_c.backplane.bus.handlers["c"] = record
+
+    await worker_a.broadcast_to_users(["user-1", "user-2"], {"type": "chat"})
+    await worker_b.flush()
+
+    assert ws_b.sent == [{"type": "chat"}]
+    assert forwarded == []
+    await worker_b.stop()
+
+
+@pytest.mark.asyncio
+async def test_connected_users_is_cluster_wide_and_tracks_disconnect():
+    worker_a, worker_b = await _cluster("a", "b")
+    ws_a, ws_b = FakeWebSocket(), FakeWebSocket()
+    await worker_a.register_accepted(ws_a, "user-1")
+    await worker_b.register_accepted(ws_b, "user-2")
+
+    assert sorted(await worker_a.get_connected_users()) == ["user-1", "user-2"]
+    assert worker_a.get_local_users() == ["user-1"]
+
+    await worker_b.disconnect(ws_b, "user-2")
+
+    assert await worker_a.get_connected_users() == ["user-1"]
+    await worker_a.stop()
@@ -0,0 +1,96 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import websocket_manager
+from websocket_backplane import InMemoryBackplane
+from websocket_manager import ConnectionManager, _coalesce
+
+
+class FakeWebSocket:
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.sent = []
+        self.delay = delay
+        self.fail = fail
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, message):
+        if self.fail:
+            raise RuntimeError("socket closed")
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(message)
+
+    async def close(self, code=1000, reason=""):
+        pass
+
+
+def test_coalesce_merges_notification_runs_and_preserves_order():
+    frames = _coalesce([
+        (1.0, {"type": "notification", "data": {"id": 1}}),
+        (2.0, {"type": "notification_batch", "data": [{"id": 2}, {"id": 3}]}),
+        (3.0, {"type": "chat_message", "data": {"id": "m"}}),
+        (4.0, {"type": "notification", "data": {"id": 4}}),
+    ])
+    assert frames == [
+        (1.0, {"type": "notification_batch", "data": [{"id": 1}, {"id": 2}, {"id": 3}]}),
+        (3.0, {"type": "chat_message", "data": {"id": "m"}}),
+        (4.0, {"type": "notification", "data": {"id": 4}}),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_burst_of_notifications_leaves_as_one_frame():
+    manager = ConnectionManager(InMemoryBackplane())
+    ws = FakeWebSocket()
+    await manager.connect(ws, "user-1")
+
+    for i in range(5):
+        await manager.send_to_user("user-1", {"type": "notification", "data": {"id": i}})
+    await manager.flush()
+
+    assert ws.sent == [{"type": "notification_batch", "data": [{"id": i} for i in range(5)]}]
+    await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_slow_socket_does_not_delay_other_tabs_and_drops_oldest(monkeypatch):
+    monkeypatch.setattr(websocket_manager, "OUTBOUND_QUEUE_SIZE", 3)
+    manager = ConnectionManager(InMemoryBackplane())
+    slow, fast = FakeWebSocket(delay=0.2), FakeWebSocket()
+    await manager.connect(slow, "user-1")
+    await manager.connect(fast, "user-1")
+
+    await manager.send_to_user("user-1", {"type": "chat_message", "data": 0})
+    await asyncio.sleep(0.01)  # slow writer is now mid-send
+    for i in range(1, 6):
+        await manager.send_to_user("user-1", {"type": "chat_message", "data": i})
+        await asyncio.sleep(0)  # fast writer keeps up; slow one is still blocked
+    await asyncio.sleep(0.05)
+
+    assert [m["data"] for m in fast.sent] == [0, 1, 2, 3, 4, 5]
+    assert slow.sent == []
+    stats = manager.get_outbound_stats()
+    assert stats["dropped_messages"] == 2
+    assert stats["max_queue_depth"] == 3
+
+    await manager.flush()
+    assert [m["data"] for m in slow.sent] == [0, 3, 4, 5]
+    await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_dead_socket_is_removed_by_writer():
+    manager = ConnectionManager(InMemoryBackplane())
+    await manager.connect(FakeWebSocket(fail=True), "user-1")
+
+    await manager.send_to_user("user-1", {"type": "chat_message"})
+    await asyncio.sleep(0.01)
+
+    assert manager.get_local_users() == []
+    assert await manager.get_connected_users() == []
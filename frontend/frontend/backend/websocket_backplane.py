@@ -0,0 +1,229 @@
+"""
+Cross-worker fan-out for WebSocket messages.
+
+Each Uvicorn worker only holds the sockets that connected to it. A backplane
+records which worker holds which user (presence) and forwards a message to
+the workers that actually hold the target users, so ``send_to_user`` works
+regardless of which worker the caller runs on.
+
+Backends (selected with ``WS_BACKPLANE``):
+- ``memory`` (default): in-process only. Correct for a single worker and used
+  as the fake in tests — several managers can share one ``InMemoryBus``.
+- ``mongo``: presence in ``ws_presence`` (TTL-expired heartbeats) and message
+  routing through inserts into ``ws_fanout`` observed with a change stream.
+  Requires a replica set (Atlas clusters are).
+"""
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Receives (user_ids, message) forwarded from another worker.
+DeliverHandler = Callable[[List[str], dict], Awaitable[None]]
+
+PRESENCE_HEARTBEAT_SECONDS = 30
+PRESENCE_TTL_SECONDS = 90
+FANOUT_TTL_SECONDS = 60
+
+
+def _new_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class WebSocketBackplane:
+    """Interface shared by all backplanes."""
+
+    def __init__(self, worker_id: Optional[str] = None):
+        self.worker_id = worker_id or _new_worker_id()
+
+    async def start(self, deliver: DeliverHandler) -> None:
+        raise NotImplementedError
+
+    async def stop(self) -> None:
+        raise NotImplementedError
+
+    async def set_presence(self, user_id: str, connected: bool) -> None:
+        """Record whether this worker holds at least one socket for ``user_id``."""
+        raise NotImplementedError
+
+    async def publish(self, user_ids: List[str], message: dict) -> None:
+        """Forward ``message`` to every *other* worker holding one of ``user_ids``."""
+        raise NotImplementedError
+
+    async def connected_users(self) -> List[str]:
+        """Cluster-wide list of users with at least one open socket."""
+        raise NotImplementedError
+
+
+class InMemoryBus:
+    """Shared state for in-process backplanes (one per simulated cluster)."""
+
+    def __init__(self):
+        self.handlers: Dict[str, DeliverHandler] = {}
+        self.presence: Dict[str, Set[str]] = {}
+
+
+class InMemoryBackplane(WebSocketBackplane):
+    def __init__(self, bus: Optional[InMemoryBus] = None, worker_id: Optional[str] = None):
+        super().__init__(worker_id)
+        self.bus = bus or InMemoryBus()
+
+    async def start(self, deliver: DeliverHandler) -> None:
+        self.bus.handlers[self.worker_id] = deliver
+
+    async def stop(self) -> None:
+        self.bus.handlers.pop(self.worker_id, None)
+        for user_id in list(self.bus.presence):
+            await self.set_presence(user_id, False)
+
+    async def set_presence(self, user_id: str, connected: bool) -> None:
+        workers = self.bus.presence.setdefault(user_id, set())
+        if connected:
+            workers.add(self.worker_id)
+        else:
+            workers.discard(self.worker_id)
+            if not workers:
+                del self.bus.presence[user_id]
+
+    async def publish(self, user_ids: List[str], message: dict) -> None:
+        targets: Dict[str, List[str]] = {}
+        for user_id in user_ids:
+            for worker_id in self.bus.presence.get(user_id, ()):
+                if worker_id != self.worker_id:
+                    targets.setdefault(worker_id, []).append(user_id)
+
+        for worker_id, worker_users in targets.items():
+            handler = self.bus.handlers.get(worker_id)
+            if handler:
+                await handler(worker_users, message)
+
+    async def connected_users(self) -> List[str]:
+        return list(self.bus.presence.keys())
+
+
+class MongoBackplane(WebSocketBackplane):
+    """Presence + routing over MongoDB.
+
+    Presence documents are keyed ``<worker_id>:<user_id>`` and refreshed by a
+    heartbeat, so a crashed worker's users age out via the TTL index. A
+    publish writes one ``ws_fanout`` document naming the target workers; each
+    worker's change stream only matches documents addressed to it.
+    """
+
+    def __init__(self, database, worker_id: Optional[str] = None):
+        super().__init__(worker_id)
+        self.db = database
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self, deliver: DeliverHandler) -> None:
+        try:
+            await self.db.ws_presence.create_index("heartbeat_at", expireAfterSeconds=PRESENCE_TTL_SECONDS)
+            await self.db.ws_presence.create_index([("user_id", 1), ("worker_id", 1)])
+            await self.db.ws_fanout.create_index("created_at", expireAfterSeconds=FANOUT_TTL_SECONDS)
+        except Exception as e:
+            logger.warning("WebSocket backplane index creation failed: %s", e)
+
+        self._tasks = [
+            asyncio.create_task(self._watch(deliver)),
+            asyncio.create_task(self._heartbeat()),
+        ]
+        logger.info("Mongo WebSocket backplane started (worker %s)", self.worker_id)
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        try:
+            await self.db.ws_presence.delete_many({"worker_id": self.worker_id})
+        except Exception as e:
+            logger.warning("Failed to clear WebSocket presence for %s: %s", self.worker_id, e)
+
+    async def _watch(self, deliver: DeliverHandler) -> None:
+        pipeline = [{"$match": {"operationType": "insert", "fullDocument.worker_ids": self.worker_id}}]
+        backoff = 1
+        while True:
+            try:
+                async with self.db.ws_fanout.watch(pipeline) as stream:
+                    backoff = 1
+                    async for change in stream:
+                        doc = change["fullDocument"]
+                        try:
+                            await deliver(doc.get("user_ids", []), doc.get("message", {}))
+                        except Exception as e:
+                            logger.warning("WebSocket fan-out delivery failed: %s", e)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("WebSocket backplane change stream error, retrying in %ss: %s", backoff, e)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60)
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(PRESENCE_HEARTBEAT_SECONDS)
+            try:
+                await self.db.ws_presence.update_many(
+                    {"worker_id": self.worker_id},
+                    {"$set": {"heartbeat_at": datetime.now(timezone.utc)}},
+                )
+            except Exception as e:
+                logger.warning("WebSocket presence heartbeat failed: %s", e)
+
+    async def set_presence(self, user_id: str, connected: bool) -> None:
+        key = f"{self.worker_id}:{user_id}"
+        if connected:
+            await self.db.ws_presence.update_one(
+                {"_id": key},
+                {"$set": {
+                    "worker_id": self.worker_id,
+                    "user_id": user_id,
+                    "heartbeat_at": datetime.now(timezone.utc),
+                }},
+                upsert=True,
+            )
+        else:
+            await self.db.ws_presence.delete_one({"_id": key})
+
+    async def publish(self, user_ids: List[str], message: dict) -> None:
+        if not user_ids:
+            return
+        worker_ids = set()
+        target_users = set()
+        async for doc in self.db.ws_presence.find(
+            {"user_id": {"$in": list(user_ids)}, "worker_id": {"$ne": self.worker_id}},
+            {"_id": 0, "worker_id": 1, "user_id": 1},
+        ):
+            worker_ids.add(doc["worker_id"])
+            target_users.add(doc["user_id"])
+
+        # Nobody else holds these users — skip the write entirely.
+        if not worker_ids:
+            return
+        await self.db.ws_fanout.insert_one({
+            "worker_ids": sorted(worker_ids),
+            "user_ids": sorted(target_users),
+            "message": message,
+            "origin": self.worker_id,
+            "created_at": datetime.now(timezone.utc),
+        })
+
+    async def connected_users(self) -> List[str]:
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=PRESENCE_TTL_SECONDS)
+        return await self.db.ws_presence.distinct("user_id", {"heartbeat_at": {"$gte": cutoff}})
+
+
+def create_backplane() -> WebSocketBackplane:
+    """Build the backplane selected by ``WS_BACKPLANE`` (memory | mongo)."""
+    kind = os.environ.get("WS_BACKPLANE", "memory").strip().lower()
+    if kind == "mongo":
+        from dependencies import db
+        return MongoBackplane(db)
+    if kind != "memory":
+        logger.warning("Unknown WS_BACKPLANE %r, falling back to in-memory", kind)
+    return InMemoryBackplane()
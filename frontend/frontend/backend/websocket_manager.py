@@ -1,99 +1,270 @@
 import asyncio
+import time
+from collections import deque
 from fastapi import WebSocket
-from typing import Dict, Set
+from typing import Awaitable, Callable, Dict, List, Optional, Set
 import logging
 
+from services.observability import MetricsCollector
+from websocket_backplane import WebSocketBackplane, create_backplane
+
 logger = logging.getLogger(__name__)
 
 MAX_CONNECTIONS_PER_USER = 10
 
+# Outbound queue per socket; when a slow consumer falls this far behind the
+# oldest queued message is dropped so one stalled phone cannot grow memory.
+OUTBOUND_QUEUE_SIZE = 256
+# How long a writer waits for more notifications before sending a batch.
+COALESCE_WINDOW_SECONDS = 0.025
+COALESCE_MAX_BATCH = 50
+# Message types merged into a single ``notification_batch`` frame.
+COALESCIBLE_TYPES = {"notification", "notification_batch"}
+
+
+def _coalesce(messages: List[tuple]) -> List[tuple]:
+    """Merge runs of notification messages into batched frames.
+
+    ``messages`` are ``(enqueued_at, message)`` pairs in send order. Any other
+    message type flushes the current run so ordering is preserved.
+    """
+    frames: List[tuple] = []
+    run: List[dict] = []
+    run_started = 0.0
+
+    def flush_run():
+        if not run:
+            return
+        if len(run) == 1:
+            frames.append((run_started, {"type": "notification", "data": run[0]}))
+        else:
+            frames.append((run_started, {"type": "notification_batch", "data": list(run)}))
+        run.clear()
+
+    for enqueued_at, message in messages:
+        if message.get("type") not in COALESCIBLE_TYPES:
+            flush_run()
+            frames.append((enqueued_at, message))
+            continue
+        items = message.get("data")
+        items = items if message["type"] == "notification_batch" else [items]
+        for item in items:
+            if not run:
+                run_started = enqueued_at
+            run.append(item)
+            if len(run) >= COALESCE_MAX_BATCH:
+                flush_run()
+    flush_run()
+    return frames
+
+
+class ConnectionWriter:
+    """Outbound queue for one socket, drained by its own writer task.
+
+    ``enqueue`` never awaits the network, so a slow socket only delays its
+    own messages, never another tab's or another user's.
+    """
+
+    def __init__(self, websocket: WebSocket, on_dead: Callable[[WebSocket], Awaitable[None]]):
+        self.websocket = websocket
+        self.queue: deque = deque()
+        self.dropped = 0
+        self._on_dead = on_dead
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task and self._task is not asyncio.current_task():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._idle.set()
+
+    def enqueue(self, message: dict):
+        if len(self.queue) >= OUTBOUND_QUEUE_SIZE:
+            self.queue.popleft()
+            self.dropped += 1
+            MetricsCollector.increment("ws_outbound_dropped_total")
+        self.queue.append((time.monotonic(), message))
+        self._idle.clear()
+        self._wakeup.set()
+
+    async def wait_idle(self):
+        await self._idle.wait()
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            if self.queue and self.queue[0][1].get("type") in COALESCIBLE_TYPES:
+                # Let a burst of notifications pile up so it leaves as one frame
+                await asyncio.sleep(COALESCE_WINDOW_SECONDS)
+            self._wakeup.clear()
+            pending = list(self.queue)
+            self.queue.clear()
+            for enqueued_at, frame in _coalesce(pending):
+                try:
+                    await self.websocket.send_json(frame)
+                except Exception as e:
+                    logger.warning("Failed to send WebSocket message: %s", e)
+                    self._idle.set()
+                    await self._on_dead(self.websocket)
+                    return
+                MetricsCollector.increment("ws_frames_sent_total", {"type": frame.get("type", "unknown")})
+                MetricsCollector.record_timing("ws_send_latency_ms", (time.monotonic() - enqueued_at) * 1000)
+            if not self.queue:
+                self._idle.set()
+
 
 class ConnectionManager:
-    """Manages WebSocket connections for real-time notifications"""
+    """Manages WebSocket connections for real-time notifications.
+
+    Sockets live in ``active_connections`` on the worker that accepted them.
+    Sends are delivered locally and forwarded through the backplane to any
+    other worker holding the same user, so callers never need to know where
+    a socket lives. Local delivery only enqueues onto each socket's
+    ``ConnectionWriter``.
+    """
 
-    def __init__(self):
+    def __init__(self, backplane: Optional[WebSocketBackplane] = None):
         # Map user_id to set of WebSocket connections (user can have multiple tabs)
         self.active_connections: Dict[str, Set[WebSocket]] = {}
+        self._writers: Dict[WebSocket, ConnectionWriter] = {}
+        self.backplane = backplane or create_backplane()
+
+    async def start(self):
+        """Attach this worker to the backplane (called from app lifespan)."""
+        await self.backplane.start(self._deliver_forwarded)
+
+    async def stop(self):
+        for writer in list(self._writers.values()):
+            await writer.close()
+        self._writers.clear()
+        await self.backplane.stop()
 
     async def connect(self, websocket: WebSocket, user_id: str):
         """Accept a new WebSocket connection"""
         await websocket.accept()
-        if user_id not in self.active_connections:
-            self.active_connections[user_id] = set()
-
-        # Enforce per-user connection cap — evict oldest if over limit
-        if len(self.active_connections[user_id]) >= MAX_CONNECTIONS_PER_USER:
-            oldest = next(iter(self.active_connections[user_id]))
-            self.active_connections[user_id].discard(oldest)
-            try:
-                await oldest.close(code=1008, reason="Too many connections")
-            except Exception:
-                pass
-
-        self.active_connections[user_id].add(websocket)
+        await self._register(websocket, user_id)
         logger.info("WebSocket connected for user %s. Total: %d", user_id, len(self.active_connections[user_id]))
 
     async def register_accepted(self, websocket: WebSocket, user_id: str):
         """Register an already-accepted WebSocket connection (message-based auth flow)."""
-        if user_id not in self.active_connections:
+        await self._register(websocket, user_id)
+        logger.info("WebSocket registered for user %s. Total: %d", user_id, len(self.active_connections[user_id]))
+
+    async def _register(self, websocket: WebSocket, user_id: str):
+        first_connection = user_id not in self.active_connections
+        if first_connection:
             self.active_connections[user_id] = set()
 
-        # Enforce per-user cap
+        # Enforce per-user connection cap — evict oldest if over limit
         if len(self.active_connections[user_id]) >= MAX_CONNECTIONS_PER_USER:
             oldest = next(iter(self.active_connections[user_id]))
             self.active_connections[user_id].discard(oldest)
+            await self._close_writer(oldest)
             try:
                 await oldest.close(code=1008, reason="Too many connections")
             except Exception:
                 pass
 
         self.active_connections[user_id].add(websocket)
-        logger.info("WebSocket registered for user %s. Total: %d", user_id, len(self.active_connections[user_id]))
+        writer = ConnectionWriter(websocket, lambda ws: self._remove(ws, user_id))
+        self._writers[websocket] = writer
+        writer.start()
+        if first_connection:
+            await self._set_presence(user_id, True)
 
-    def disconnect(self, websocket: WebSocket, user_id: str):
+    async def disconnect(self, websocket: WebSocket, user_id: str):
         """Remove a WebSocket connection"""
+        await self._remove(websocket, user_id)
+        logger.info("WebSocket disconnected for user %s", user_id)
+
+    async def _close_writer(self, websocket: WebSocket):
+        writer = self._writers.pop(websocket, None)
+        if writer:
+            await writer.close()
+
+    async def _remove(self, websocket: WebSocket, user_id: str):
+        await self._close_writer(websocket)
         if user_id in self.active_connections:
             self.active_connections[user_id].discard(websocket)
             if not self.active_connections[user_id]:
                 del self.active_connections[user_id]
-        logger.info("WebSocket disconnected for user %s", user_id)
+                await self._set_presence(user_id, False)
 
-    async def send_to_user(self, user_id: str, message: dict):
-        """Send a message to all connections of a specific user"""
-        if user_id not in self.active_connections:
-            return
+    async def _set_presence(self, user_id: str, connected: bool):
+        try:
+            await self.backplane.set_presence(user_id, connected)
+        except Exception as e:
+            logger.warning("WebSocket presence update failed for %s: %s", user_id, e)
 
-        # Snapshot the set to avoid mutation during iteration
-        connections = list(self.active_connections.get(user_id, set()))
-        dead_connections = []
+    async def _publish(self, user_ids: List[str], message: dict):
+        try:
+            await self.backplane.publish(user_ids, message)
+        except Exception as e:
+            logger.warning("WebSocket backplane publish failed: %s", e)
 
-        for websocket in connections:
-            try:
-                await websocket.send_json(message)
-            except Exception as e:
-                logger.warning("Failed to send WebSocket message to %s: %s", user_id, e)
-                dead_connections.append(websocket)
-
-        # Clean up dead connections
-        if dead_connections and user_id in self.active_connections:
-            for ws in dead_connections:
-                self.active_connections[user_id].discard(ws)
-            if not self.active_connections[user_id]:
-                del self.active_connections[user_id]
+    async def _send_local(self, user_id: str, message: dict):
+        """Queue a message on this worker's connections for ``user_id``."""
+        for websocket in list(self.active_connections.get(user_id, ())):
+            writer = self._writers.get(websocket)
+            if writer:
+                writer.enqueue(message)
+
+    async def _deliver_forwarded(self, user_ids: List[str], message: dict):
+        """Backplane callback: deliver a message another worker routed here."""
+        await asyncio.gather(
+            *(self._send_local(uid, message) for uid in user_ids),
+            return_exceptions=True,
+        )
+
+    async def send_to_user(self, user_id: str, message: dict):
+        """Send a message to all connections of a specific user, on any worker"""
+        await self._send_local(user_id, message)
+        await self._publish([user_id], message)
 
     async def broadcast_to_users(self, user_ids: list, message: dict):
-        """Send a message to multiple users concurrently"""
+        """Send a message to multiple users concurrently, on any worker"""
         if not user_ids:
             return
         await asyncio.gather(
-            *(self.send_to_user(uid, message) for uid in user_ids),
+            *(self._send_local(uid, message) for uid in user_ids),
             return_exceptions=True,
         )
+        # One backplane publish for the whole audience, not one per user
+        await self._publish(list(user_ids), message)
 
-    def get_connected_users(self) -> list:
-        """Get list of connected user IDs"""
+    async def flush(self):
+        """Wait until every local outbound queue has been written."""
+        await asyncio.gather(*(writer.wait_idle() for writer in list(self._writers.values())))
+
+    def get_outbound_stats(self) -> dict:
+        """Queue depth and drop counts for this worker's sockets."""
+        depths = [len(writer.queue) for writer in self._writers.values()]
+        return {
+            "connections": len(depths),
+            "queued_messages": sum(depths),
+            "max_queue_depth": max(depths, default=0),
+            "dropped_messages": sum(writer.dropped for writer in self._writers.values()),
+            "queue_limit": OUTBOUND_QUEUE_SIZE,
+        }
+
+    def get_local_users(self) -> list:
+        """Get list of user IDs connected to this worker"""
         return list(self.active_connections.keys())
 
+    async def get_connected_users(self) -> list:
+        """Get list of connected user IDs across all workers"""
+        try:
+            return await self.backplane.connected_users()
+        except Exception as e:
+            logger.warning("WebSocket presence lookup failed, using local users: %s", e)
+            return self.get_local_users()
+
 
 # Global connection manager instance
 manager = ConnectionManager()
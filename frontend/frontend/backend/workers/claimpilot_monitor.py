@@ -1,13 +1,36 @@
-"""ClaimPilot Monitor Worker — scans all active claims for stalls every 2 hours."""
+"""ClaimPilot Monitor Worker — scans all active claims for stalls every 2 hours.
 
+Each sweep only re-analyzes claims whose context inputs changed since the
+last analysis. The fingerprint covers the claim fields the monitor reads, the
+ids and timestamps of the context documents, and the stall level
+(``days_idle // threshold``), so an untouched claim is analyzed again only
+as it escalates. Contexts are built in batches with one ``$in`` query per
+collection, analyses run with bounded concurrency, and notifications and
+fingerprints are written in bulk per batch.
+"""
+
+import asyncio
+import hashlib
+import json
 import logging
+import os
 import uuid
 from datetime import datetime, timezone
 
+from pymongo import UpdateOne
+
 logger = logging.getLogger(__name__)
 
 _db = None
 
+MONITOR_BATCH_SIZE = 100
+MONITOR_CONCURRENCY = int(os.environ.get("CLAIMPILOT_MONITOR_CONCURRENCY", "4"))
+FINGERPRINT_CLAIM_FIELDS = (
+    "status", "updated_at", "assigned_to", "assigned_to_id", "claim_number",
+    "property_address", "claim_type", "is_in_litigation",
+)
+_CONTEXT_LISTS = ("recent_activity", "evidence", "notes", "tasks", "photos", "carrier_comms")
+
 
 def init_claimpilot_monitor(db):
     """Store database reference for the monitor worker."""
@@ -15,6 +38,89 @@ def init_claimpilot_monitor(db):
     _db = db
 
 
+def context_fingerprint(context, stall_level: int) -> str:
+    """Digest of everything the monitor's analysis depends on."""
+    payload = {
+        "claim": {field: context.claim.get(field) for field in FINGERPRINT_CLAIM_FIELDS},
+        "stall_level": stall_level,
+    }
+    for name in _CONTEXT_LISTS:
+        payload[name] = [
+            (doc.get("id"), doc.get("created_at"), doc.get("updated_at"))
+            for doc in getattr(context, name)
+        ]
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode()
+    return hashlib.sha1(encoded).hexdigest()
+
+
+def _stall_notification(claim: dict, result) -> dict:
+    return {
+        "id": uuid.uuid4().hex,
+        "user_id": claim.get("assigned_to_id") or claim.get("created_by"),
+        "type": "claimpilot_stall",
+        "title": f"Stalled: {claim.get('claim_number', 'Unknown')}",
+        "message": result.summary,
+        "claim_id": claim["id"],
+        "is_read": False,
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
+async def _sweep_batch(agent, context_builder, batch: list[dict], semaphore: asyncio.Semaphore) -> dict:
+    contexts = await context_builder.build_many([s["claim_id"] for s in batch])
+    previous = {
+        doc["claim_id"]: doc.get("fingerprint")
+        for doc in await _db.claimpilot_monitor_state.find(
+            {"claim_id": {"$in": list(contexts)}}, {"_id": 0, "claim_id": 1, "fingerprint": 1}
+        ).to_list(length=len(contexts))
+    }
+
+    changed = []
+    for stall in batch:
+        context = contexts.get(stall["claim_id"])
+        if context is None:
+            continue
+        fingerprint = context_fingerprint(context, stall["days_idle"] // max(stall["threshold"], 1))
+        if previous.get(stall["claim_id"]) != fingerprint:
+            changed.append((context, fingerprint))
+
+    async def analyze(context):
+        async with semaphore:
+            try:
+                return await agent.run(context)
+            except Exception as e:
+                logger.error("Monitor failed for claim %s: %s", context.claim.get("id"), e)
+                return None
+
+    results = await asyncio.gather(*(analyze(context) for context, _ in changed))
+
+    notifications, state_updates = [], []
+    now = datetime.now(timezone.utc)
+    for (context, fingerprint), result in zip(changed, results):
+        if result is None:
+            continue  # frozen or failed: leave the fingerprint so the next sweep retries
+        notify = result.insight_type == "stall_detection"
+        if notify:
+            notifications.append(_stall_notification(context.claim, result))
+        state_updates.append(UpdateOne(
+            {"claim_id": context.claim["id"]},
+            {"$set": {"fingerprint": fingerprint, "analyzed_at": now, "notified": notify}},
+            upsert=True,
+        ))
+
+    if notifications:
+        await _db.notifications.insert_many(notifications)
+    if state_updates:
+        await _db.claimpilot_monitor_state.bulk_write(state_updates, ordered=False)
+
+    return {
+        "skipped": len(contexts) - len(changed),
+        "analyzed": len(state_updates),
+        "failed": len(changed) - len(state_updates),
+        "notified": len(notifications),
+    }
+
+
 async def run_monitor_check():
     """Detect stalled claims and create notifications for assignees."""
     if _db is None:
@@ -27,28 +133,26 @@ async def run_monitor_check():
 
         agent = ClaimMonitorAgent(_db)
         context_builder = AgentContextBuilder(_db)
+        semaphore = asyncio.Semaphore(MONITOR_CONCURRENCY)
 
         stalled = await agent.detect_stalled_claims()
         logger.info("CLAIMPILOT_MONITOR: Found %d stalled claims", len(stalled))
 
-        for claim in stalled:
+        totals = {"skipped": 0, "analyzed": 0, "failed": 0, "notified": 0}
+        for start in range(0, len(stalled), MONITOR_BATCH_SIZE):
+            batch = stalled[start:start + MONITOR_BATCH_SIZE]
             try:
-                ctx = await context_builder.build(claim["id"])
-                result = await agent.run(ctx)
-
-                if result and result.details.get("is_stalled"):
-                    notification = {
-                        "id": uuid.uuid4().hex,
-                        "user_id": claim.get("assigned_to_id") or claim.get("created_by"),
-                        "type": "claimpilot_stall",
-                        "title": f"Stalled: {claim.get('claim_number', 'Unknown')}",
-                        "message": result.summary,
-                        "claim_id": claim["id"],
-                        "is_read": False,
-                        "created_at": datetime.now(timezone.utc),
-                    }
-                    await _db.notifications.insert_one(notification)
+                counts = await _sweep_batch(agent, context_builder, batch, semaphore)
             except Exception as e:
-                logger.error("Monitor failed for claim %s: %s", claim.get("id"), e)
+                logger.error("ClaimPilot monitor batch at %d failed: %s", start, e)
+                continue
+            for key, value in counts.items():
+                totals[key] += value
+
+        logger.info(
+            "CLAIMPILOT_MONITOR: analyzed %d, unchanged %d, failed %d, notified %d",
+            totals["analyzed"], totals["skipped"], totals["failed"], totals["notified"],
+        )
+        return totals
     except Exception as e:
         logger.error("ClaimPilot monitor check failed: %s", e)
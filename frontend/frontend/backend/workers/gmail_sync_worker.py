@@ -4,7 +4,8 @@ attachments, categorizes documents, and extracts PDF data.
 
 Runs every 6 hours via APScheduler. Pipeline:
   1. Find admin user with valid Google OAuth token
-  2. Auto-sync Gmail attachments to claims
+  2. Auto-sync Gmail attachments to claims (incremental from the stored
+     historyId checkpoint; full search only on first run or after a reset)
   3. Categorize new uncategorized documents
   4. Extract financial data from new PDFs via Gemini
   5. Log results to gmail_sync_runs collection
@@ -20,7 +21,7 @@ import logging
 import os
 import uuid
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +35,9 @@ SYNC_MAX_MESSAGES = 100
 GEMINI_RPM_DELAY = 4.2  # seconds between Gemini calls (14 RPM safe margin)
 BATCH_SIZE_CLAIMS = 20  # Gmail search batch size (query length limit)
 MAX_PDF_EXTRACTIONS_PER_RUN = 25  # Cap Gemini calls per cron run
+HISTORY_PAGE_SIZE = 500  # history.list page size (Gmail maximum)
+MAX_MESSAGES_PER_RUN = 500  # the rest wait in the checkpoint's pending list
+MAX_PENDING_MESSAGES = 5000
 
 
 def init_gmail_sync_worker(db) -> None:
@@ -95,27 +99,135 @@ async def _get_sync_user() -> Optional[Dict[str, Any]]:
 
 
 # ---------------------------------------------------------------------------
-# Step 1: Gmail Auto-Sync (mirrors routes/gmail_sync.py auto_sync logic)
+# Step 1: Gmail Auto-Sync (incremental from a per-mailbox historyId checkpoint)
 # ---------------------------------------------------------------------------
+#
+# The checkpoint lives in gmail_sync_state, one document per mailbox:
+#   {_id: <mailbox>, history_id, pending_message_ids, updated_at, last_full_sync_at}
+# A run with a checkpoint reads history.list from it and only looks at the
+# messages added since. The first run for a mailbox, a reset, or a
+# checkpoint Gmail no longer keeps history for (404) falls back to the
+# claim-number search backfill. Messages that failed transiently are kept
+# in pending_message_ids and retried on the next run.
+
+class _GmailSession:
+    """Gmail API requests over one pooled client; the token is refreshed only on a 401."""
+
+    def __init__(self, user_id: str, token: str, client) -> None:
+        self.user_id = user_id
+        self.token = token
+        self.client = client
+
+    async def request(self, method: str, url: str, **kwargs):
+        from routes.oauth import refresh_google_token
+
+        resp = await self.client.request(
+            method, url, headers={"Authorization": f"Bearer {self.token}"}, **kwargs,
+        )
+        if resp.status_code == 401:
+            token = await refresh_google_token(self.user_id)
+            if not token:
+                raise RuntimeError("Google token refresh failed")
+            self.token = token
+            resp = await self.client.request(
+                method, url, headers={"Authorization": f"Bearer {self.token}"}, **kwargs,
+            )
+        return resp
 
-async def _run_gmail_auto_sync(
-    sync_user: Dict[str, Any],
-) -> Dict[str, Any]:
-    """Execute Gmail auto-sync for all claims with claim numbers.
 
-    Returns a summary dict with counts.
+async def _current_history_id(session: _GmailSession) -> str:
+    from routes.gmail_sync import GMAIL_API
+
+    resp = await session.request("GET", f"{GMAIL_API}/profile")
+    if resp.status_code != 200:
+        raise RuntimeError(f"Gmail profile lookup failed: HTTP {resp.status_code}")
+    return str(resp.json()["historyId"])
+
+
+async def _history_message_ids(
+    session: _GmailSession, start_history_id: str,
+) -> Optional[Tuple[List[str], str]]:
+    """Ids of messages added since *start_history_id*, and the mailbox's latest historyId.
+
+    Returns None when Gmail no longer has history that far back (HTTP 404),
+    in which case the caller has to backfill.
+    """
+    from routes.gmail_sync import GMAIL_API
+
+    message_ids: List[str] = []
+    latest = start_history_id
+    page_token: Optional[str] = None
+    while True:
+        params: Dict[str, Any] = {
+            "startHistoryId": start_history_id,
+            "historyTypes": "messageAdded",
+            "maxResults": HISTORY_PAGE_SIZE,
+        }
+        if page_token:
+            params["pageToken"] = page_token
+        resp = await session.request("GET", f"{GMAIL_API}/history", params=params)
+        if resp.status_code == 404:
+            return None
+        if resp.status_code != 200:
+            raise RuntimeError(f"Gmail history.list failed: HTTP {resp.status_code}")
+
+        data = resp.json()
+        latest = str(data.get("historyId", latest))
+        for record in data.get("history", []):
+            for added in record.get("messagesAdded", []):
+                message = added.get("message", {})
+                if message.get("id") and "DRAFT" not in message.get("labelIds", []):
+                    message_ids.append(message["id"])
+        page_token = data.get("nextPageToken")
+        if not page_token:
+            return list(dict.fromkeys(message_ids)), latest
+
+
+async def _search_message_ids(session: _GmailSession, claim_numbers: List[str]) -> List[str]:
+    """Backfill: search Gmail for attachments mentioning any claim number."""
+    from routes.gmail_sync import GMAIL_API
+
+    message_ids: List[str] = []
+    for batch_start in range(0, len(claim_numbers), BATCH_SIZE_CLAIMS):
+        batch = claim_numbers[batch_start:batch_start + BATCH_SIZE_CLAIMS]
+        query_parts = " OR ".join(f'"{cn}"' for cn in batch)
+        search_resp = await session.request(
+            "GET",
+            f"{GMAIL_API}/messages",
+            params={"q": f"has:attachment ({query_parts})", "maxResults": SYNC_MAX_MESSAGES},
+        )
+        if search_resp.status_code != 200:
+            logger.warning(
+                "gmail_sync_worker: search failed batch %d: HTTP %d",
+                batch_start, search_resp.status_code,
+            )
+            continue
+        message_ids.extend(m["id"] for m in search_resp.json().get("messages", []))
+    return list(dict.fromkeys(message_ids))
+
+
+async def _sync_message(
+    session: _GmailSession,
+    msg_id: str,
+    matcher,
+    fs,
+    uploaded_by: str,
+    summary: Dict[str, Any],
+    claims_matched: set,
+) -> bool:
+    """Match one message to a claim and store its attachments.
+
+    Only Subject/From and the snippet are fetched to match; the full
+    payload is requested for matched messages alone. Returns False when
+    the message should be retried on the next run.
     """
-    import httpx
     import base64
     import io
-    import re
     from pathlib import Path
-    from motor.motor_asyncio import AsyncIOMotorGridFSBucket
 
-    from routes.oauth import get_valid_token, refresh_google_token
+    from services.claim_summary import refresh_claim_summary
     from routes.gmail_sync import (
         GMAIL_API,
-        SYNCABLE_MIME_TYPES,
         MIME_TO_EXT,
         MAX_ATTACHMENT_SIZE,
         _extract_attachments_from_payload,
@@ -123,233 +235,257 @@ async def _run_gmail_auto_sync(
         _sanitize_filename,
     )
 
-    user_id = sync_user["id"]
-    uploaded_by = sync_user["full_name"]
+    meta_resp = await session.request(
+        "GET",
+        f"{GMAIL_API}/messages/{msg_id}",
+        params=[("format", "metadata"), ("metadataHeaders", "Subject"), ("metadataHeaders", "From")],
+    )
+    if meta_resp.status_code == 404:
+        return True  # deleted since it was listed
+    if meta_resp.status_code != 200:
+        summary["total_errors"] += 1
+        return False
+
+    meta = meta_resp.json()
+    headers = _parse_gmail_headers(meta.get("payload", {}).get("headers", []))
+    subject = headers.get("subject", "")
+    matched_claim = matcher.match_claim_number(f"{subject} {meta.get('snippet', '')}")
+    if not matched_claim:
+        return True
+
+    claim_id = matched_claim["id"]
+    claims_matched.add(claim_id)
+
+    msg_resp = await session.request(
+        "GET", f"{GMAIL_API}/messages/{msg_id}", params={"format": "full"},
+    )
+    if msg_resp.status_code != 200:
+        summary["total_errors"] += 1
+        return False
+
+    complete = True
+    for att_meta in _extract_attachments_from_payload(msg_resp.json().get("payload", {})):
+        attachment_id = att_meta["attachment_id"]
+        filename = att_meta["filename"]
+        mime_type = att_meta["mime_type"]
+
+        # Dedup check
+        existing = await _db.documents.find_one({
+            "gmail_message_id": msg_id,
+            "gmail_attachment_id": attachment_id,
+        })
+        if existing:
+            summary["total_skipped"] += 1
+            continue
+
+        att_resp = await session.request(
+            "GET", f"{GMAIL_API}/messages/{msg_id}/attachments/{attachment_id}",
+        )
+        if att_resp.status_code != 200:
+            summary["total_errors"] += 1
+            complete = False
+            continue
+
+        raw_data = att_resp.json().get("data", "")
+        if not raw_data:
+            summary["total_errors"] += 1
+            continue
+
+        file_bytes = base64.urlsafe_b64decode(raw_data)
+        size_bytes = len(file_bytes)
+
+        if size_bytes > MAX_ATTACHMENT_SIZE:
+            summary["total_skipped"] += 1
+            continue
+
+        file_id = str(uuid.uuid4())
+        ext = MIME_TO_EXT.get(mime_type, Path(filename).suffix or ".bin")
+        safe_name = _sanitize_filename(filename)
+        storage_filename = f"{file_id}{ext}"
+        now = _now_iso()
+
+        grid_id = await fs.upload_from_stream(
+            storage_filename,
+            io.BytesIO(file_bytes),
+            metadata={
+                "file_id": file_id,
+                "original_name": safe_name,
+                "mime_type": mime_type,
+                "file_type": "document" if mime_type == "application/pdf" else "image",
+                "source": "gmail_sync",
+            },
+        )
+
+        doc_record = {
+            "id": file_id,
+            "claim_id": claim_id,
+            "name": safe_name,
+            "type": "gmail_attachment",
+            "mime_type": mime_type,
+            "size": f"{size_bytes / 1024:.2f} KB",
+            "size_bytes": size_bytes,
+            "uploaded_by": uploaded_by,
+            "uploaded_at": now,
+            "source": "gmail_sync",
+            "gmail_message_id": msg_id,
+            "gmail_attachment_id": attachment_id,
+            "grid_id": str(grid_id),
+            "storage": "gridfs",
+            "storage_filename": storage_filename,
+            "gmail_subject": subject,
+            "gmail_sender": headers.get("from", ""),
+        }
+        await _db.documents.insert_one(doc_record)
+        await refresh_claim_summary(claim_id, "documents", database=_db)
+
+        uploaded_file_record = {
+            "id": file_id,
+            "filename": storage_filename,
+            "original_name": safe_name,
+            "file_type": "document" if mime_type == "application/pdf" else "image",
+            "mime_type": mime_type,
+            "size": size_bytes,
+            "uploaded_by": uploaded_by,
+            "uploaded_at": now,
+            "content_id": claim_id,
+            "content_type": "claim",
+            "grid_id": str(grid_id),
+            "storage": "gridfs",
+            "source": "gmail_sync",
+        }
+        await _db.uploaded_files.insert_one(uploaded_file_record)
+        summary["total_synced"] += 1
+    return complete
+
+
+async def reset_gmail_sync_checkpoint(mailbox: Optional[str] = None, database=None) -> int:
+    """Drop the historyId checkpoint for *mailbox* (all mailboxes when None).
+
+    The next run backfills with the claim-number search. Returns the number
+    of checkpoints removed.
+    """
+    database = database if database is not None else _db
+    query = {"_id": mailbox} if mailbox else {}
+    result = await database.gmail_sync_state.delete_many(query)
+    return result.deleted_count
+
+
+async def _run_gmail_auto_sync(
+    sync_user: Dict[str, Any],
+    client=None,
+) -> Dict[str, Any]:
+    """Sync Gmail attachments added since the mailbox's checkpoint.
+
+    *client* is an ``httpx.AsyncClient`` to reuse; one is opened for the
+    run when omitted. Returns a summary dict with counts.
+    """
+    import httpx
+    from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+    from pymongo.errors import PyMongoError
+
+    from services.claim_matcher import get_claim_matcher
+
+    mailbox = sync_user.get("email") or sync_user["id"]
     fs = AsyncIOMotorGridFSBucket(_db)
 
     result_summary = {
+        "mode": None,
+        "history_id": None,
         "claims_searched": 0,
         "messages_processed": 0,
+        "messages_pending": 0,
         "claims_matched": 0,
         "total_synced": 0,
         "total_skipped": 0,
         "total_errors": 0,
     }
 
-    # Load all active claims with claim numbers
-    claims = await _db.claims.find(
-        {"claim_number": {"$exists": True, "$ne": ""}},
-        {"_id": 0, "id": 1, "claim_number": 1, "client_name": 1},
-    ).to_list(5000)
-
-    if not claims:
+    matcher = await get_claim_matcher(_db)
+    claim_numbers = matcher.claim_numbers
+    if not claim_numbers:
         logger.info("gmail_sync_worker: no claims with claim numbers found")
         return result_summary
 
-    claim_map: Dict[str, dict] = {}
-    for c in claims:
-        cn = c.get("claim_number", "").strip()
-        if cn:
-            claim_map[cn.lower()] = c
-
-    claim_numbers = list(claim_map.keys())
-    result_summary["claims_searched"] = len(claim_numbers)
-
-    processed_message_ids: set = set()
+    state = await _db.gmail_sync_state.find_one({"_id": mailbox}) or {}
+    pending = list(state.get("pending_message_ids", []))
     claims_matched_set: set = set()
 
-    async def _gmail_request(method: str, url: str, **kwargs):
-        """Authenticated Gmail API request with auto-refresh."""
-        nonlocal user_id
-        token = await get_valid_token(user_id, "google")
-        if not token:
-            raise RuntimeError("Google token expired mid-sync")
-
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            resp = await client.request(
-                method, url,
-                headers={"Authorization": f"Bearer {token}"},
-                **kwargs,
-            )
-            if resp.status_code == 401:
-                token = await refresh_google_token(user_id)
-                if not token:
-                    raise RuntimeError("Google token refresh failed")
-                resp = await client.request(
-                    method, url,
-                    headers={"Authorization": f"Bearer {token}"},
-                    **kwargs,
+    owns_client = client is None
+    if owns_client:
+        client = httpx.AsyncClient(timeout=30.0)
+    session = _GmailSession(sync_user["id"], sync_user["token"], client)
+    try:
+        fetched = None
+        if state.get("history_id"):
+            fetched = await _history_message_ids(session, state["history_id"])
+            if fetched is None:
+                logger.warning(
+                    "gmail_sync_worker: history %s expired for %s — backfilling",
+                    state["history_id"], mailbox,
                 )
-            return resp
-
-    # Search Gmail in batches of claim numbers
-    for batch_start in range(0, len(claim_numbers), BATCH_SIZE_CLAIMS):
-        batch = claim_numbers[batch_start:batch_start + BATCH_SIZE_CLAIMS]
-        query_parts = " OR ".join(f'"{cn}"' for cn in batch)
-        gmail_query = f"has:attachment ({query_parts})"
-
-        try:
-            search_resp = await _gmail_request(
-                "GET",
-                f"{GMAIL_API}/messages",
-                params={"q": gmail_query, "maxResults": SYNC_MAX_MESSAGES},
-            )
-        except RuntimeError as exc:
-            logger.error("gmail_sync_worker: auth failure during search: %s", exc)
-            result_summary["total_errors"] += 1
-            return result_summary
 
-        if search_resp.status_code != 200:
-            logger.warning(
-                "gmail_sync_worker: search failed batch %d: HTTP %d",
-                batch_start, search_resp.status_code,
-            )
-            continue
-
-        message_ids = [m["id"] for m in search_resp.json().get("messages", [])]
-
-        for msg_id in message_ids:
-            if msg_id in processed_message_ids:
-                continue
-            processed_message_ids.add(msg_id)
+        if fetched is None:
+            mode = "full"
+            # Read the checkpoint before searching so nothing arriving
+            # during the backfill falls between the two.
+            latest_history_id = await _current_history_id(session)
+            result_summary["claims_searched"] = len(claim_numbers)
+            message_ids = await _search_message_ids(session, claim_numbers)
+        else:
+            mode = "incremental"
+            message_ids, latest_history_id = fetched
 
+        queue = list(dict.fromkeys(pending + message_ids))
+        batch, leftover = queue[:MAX_MESSAGES_PER_RUN], queue[MAX_MESSAGES_PER_RUN:]
+        retry: List[str] = []
+        for msg_id in batch:
             try:
-                msg_resp = await _gmail_request(
-                    "GET",
-                    f"{GMAIL_API}/messages/{msg_id}",
-                    params={"format": "full"},
+                ok = await _sync_message(
+                    session, msg_id, matcher, fs, sync_user["full_name"],
+                    result_summary, claims_matched_set,
                 )
-            except RuntimeError:
+            except (httpx.HTTPError, PyMongoError) as exc:
+                logger.warning("gmail_sync_worker: message %s failed, will retry: %s", msg_id, exc)
                 result_summary["total_errors"] += 1
-                continue
-
-            if msg_resp.status_code != 200:
-                result_summary["total_errors"] += 1
-                continue
-
-            msg_data = msg_resp.json()
-            payload = msg_data.get("payload", {})
-            headers = _parse_gmail_headers(payload.get("headers", []))
-            snippet = msg_data.get("snippet", "")
-
-            subject = headers.get("subject", "")
-            combined_text = f"{subject} {snippet}".lower()
-            matched_claim = None
-
-            for cn_lower, claim in claim_map.items():
-                if cn_lower in combined_text:
-                    matched_claim = claim
-                    break
-
-            if not matched_claim:
-                continue
-
-            claim_id = matched_claim["id"]
-            claims_matched_set.add(claim_id)
-
-            attachment_metas = _extract_attachments_from_payload(payload)
-            if not attachment_metas:
-                continue
-
-            for att_meta in attachment_metas:
-                attachment_id = att_meta["attachment_id"]
-                filename = att_meta["filename"]
-                mime_type = att_meta["mime_type"]
-
-                # Dedup check
-                existing = await _db.documents.find_one({
-                    "gmail_message_id": msg_id,
-                    "gmail_attachment_id": attachment_id,
-                })
-                if existing:
-                    result_summary["total_skipped"] += 1
-                    continue
-
-                try:
-                    att_resp = await _gmail_request(
-                        "GET",
-                        f"{GMAIL_API}/messages/{msg_id}/attachments/{attachment_id}",
-                    )
-                except RuntimeError:
-                    result_summary["total_errors"] += 1
-                    continue
-
-                if att_resp.status_code != 200:
-                    result_summary["total_errors"] += 1
-                    continue
-
-                raw_data = att_resp.json().get("data", "")
-                if not raw_data:
-                    result_summary["total_errors"] += 1
-                    continue
-
-                import base64 as b64
-                file_bytes = b64.urlsafe_b64decode(raw_data)
-                size_bytes = len(file_bytes)
-
-                if size_bytes > MAX_ATTACHMENT_SIZE:
-                    result_summary["total_skipped"] += 1
-                    continue
-
-                file_id = str(uuid.uuid4())
-                ext = MIME_TO_EXT.get(mime_type, Path(filename).suffix or ".bin")
-                safe_name = _sanitize_filename(filename)
-                storage_filename = f"{file_id}{ext}"
-                now = _now_iso()
-
-                grid_id = await fs.upload_from_stream(
-                    storage_filename,
-                    io.BytesIO(file_bytes),
-                    metadata={
-                        "file_id": file_id,
-                        "original_name": safe_name,
-                        "mime_type": mime_type,
-                        "file_type": "document" if mime_type == "application/pdf" else "image",
-                        "source": "gmail_sync",
-                    },
-                )
-
-                doc_record = {
-                    "id": file_id,
-                    "claim_id": claim_id,
-                    "name": safe_name,
-                    "type": "gmail_attachment",
-                    "mime_type": mime_type,
-                    "size": f"{size_bytes / 1024:.2f} KB",
-                    "size_bytes": size_bytes,
-                    "uploaded_by": uploaded_by,
-                    "uploaded_at": now,
-                    "source": "gmail_sync",
-                    "gmail_message_id": msg_id,
-                    "gmail_attachment_id": attachment_id,
-                    "grid_id": str(grid_id),
-                    "storage": "gridfs",
-                    "storage_filename": storage_filename,
-                    "gmail_subject": subject,
-                    "gmail_sender": headers.get("from", ""),
-                }
-                await _db.documents.insert_one(doc_record)
-
-                uploaded_file_record = {
-                    "id": file_id,
-                    "filename": storage_filename,
-                    "original_name": safe_name,
-                    "file_type": "document" if mime_type == "application/pdf" else "image",
-                    "mime_type": mime_type,
-                    "size": size_bytes,
-                    "uploaded_by": uploaded_by,
-                    "uploaded_at": now,
-                    "content_id": claim_id,
-                    "content_type": "claim",
-                    "grid_id": str(grid_id),
-                    "storage": "gridfs",
-                    "source": "gmail_sync",
-                }
-                await _db.uploaded_files.insert_one(uploaded_file_record)
-                result_summary["total_synced"] += 1
-
-    result_summary["messages_processed"] = len(processed_message_ids)
-    result_summary["claims_matched"] = len(claims_matched_set)
+                ok = False
+            if not ok:
+                retry.append(msg_id)
+    except RuntimeError as exc:
+        # Checkpoint untouched: the next run picks up from the same place.
+        logger.error("gmail_sync_worker: Gmail sync aborted: %s", exc)
+        result_summary["total_errors"] += 1
+        return result_summary
+    finally:
+        if owns_client:
+            await client.aclose()
+
+    now = _now_iso()
+    pending = retry + leftover
+    if len(pending) > MAX_PENDING_MESSAGES:
+        # Too far behind to carry every id: keep the oldest and drop the
+        # checkpoint so the next run backfills instead of losing the rest.
+        logger.warning(
+            "gmail_sync_worker: %d messages pending for %s (cap %d) — next run will backfill",
+            len(pending), mailbox, MAX_PENDING_MESSAGES,
+        )
+        pending = pending[:MAX_PENDING_MESSAGES]
+        latest_history_id = None
+    update: Dict[str, Any] = {
+        "history_id": latest_history_id,
+        "pending_message_ids": pending,
+        "updated_at": now,
+    }
+    if mode == "full":
+        update["last_full_sync_at"] = now
+    await _db.gmail_sync_state.update_one({"_id": mailbox}, {"$set": update}, upsert=True)
+
+    result_summary.update({
+        "mode": mode,
+        "history_id": latest_history_id,
+        "messages_processed": len(batch),
+        "messages_pending": len(pending),
+        "claims_matched": len(claims_matched_set),
+    })
     return result_summary
 
 
@@ -365,6 +501,7 @@ async def _run_categorize() -> Dict[str, Any]:
     Griston, People's Trust, and other carriers.
     """
     from routes.gmail_sync import _categorize_document
+    from services.claim_summary import refresh_claim_summary
 
     summary = {"total_docs": 0, "updated": 0, "claims_affected": 0}
 
@@ -415,6 +552,7 @@ async def _run_categorize() -> Dict[str, Any]:
             "created_at": _now_iso(),
         }
         await _db.notes.insert_one(note_record)
+        await refresh_claim_summary(cid, "notes", "documents", database=_db)
 
     summary["claims_affected"] = len(claim_summaries)
     return summary
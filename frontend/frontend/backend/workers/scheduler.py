@@ -9,6 +9,9 @@ Jobs:
 - Claims Ops nightly summary: Daily at 9 PM UTC
 - Comms Bot periodic check: Every 2 hours
 - Gmail Sync pipeline: Every 6 hours (sync + categorize + PDF extract)
+- Photo derivative backfill: Daily at 4 AM UTC
+- Message search index backfill: Every 30 minutes
+- Claim summary read model rebuild: Daily at 4:30 AM UTC
 """
 import asyncio
 import logging
@@ -61,6 +64,10 @@ def init_scheduler(db):
     _add_legal_feed_jobs()
     _add_initial_run_job()
     _add_gmail_sync_jobs()
+    _add_photo_derivative_jobs()
+    _add_message_search_jobs()
+    _add_claim_summary_jobs()
+    _add_retrieval_index_jobs()
 
     logger.info("Background scheduler initialized with all bots")
 
@@ -267,6 +274,90 @@ def _add_gmail_sync_jobs():
     logger.info("Gmail sync job added: every 6 hours")
 
 
+def _add_photo_derivative_jobs():
+    """Add nightly backfill of inspection photo derivatives."""
+
+    async def _run_backfill():
+        from routes.inspection.helpers import PHOTO_DIR
+        from services.photo_derivatives import backfill_photo_derivatives
+
+        await backfill_photo_derivatives(PHOTO_DIR)
+
+    scheduler.add_job(
+        _run_async_job,
+        CronTrigger(hour=4, minute=0),
+        args=[_run_backfill],
+        id="photo_derivative_backfill",
+        name="Inspection Photos - Derivative Backfill",
+        replace_existing=True,
+        misfire_grace_time=3600,
+    )
+    logger.info("Photo derivative backfill job added: nightly at 04:00 UTC")
+
+
+def _add_message_search_jobs():
+    """Add periodic indexing of team messages stored before search fields existed."""
+
+    async def _run_backfill():
+        from services.message_search import backfill_message_search_index
+
+        await backfill_message_search_index(_db)
+
+    scheduler.add_job(
+        _run_async_job,
+        IntervalTrigger(minutes=30),
+        args=[_run_backfill],
+        id="message_search_backfill",
+        name="Comms - Message Search Index Backfill",
+        replace_existing=True,
+        misfire_grace_time=900,
+    )
+    logger.info("Message search backfill job added: every 30 minutes")
+
+
+def _add_claim_summary_jobs():
+    """Add nightly rebuild of the claim summary read model to heal drift."""
+
+    async def _run_rebuild():
+        from services.claim_summary import rebuild_claim_summaries
+
+        await rebuild_claim_summaries(_db)
+
+    scheduler.add_job(
+        _run_async_job,
+        CronTrigger(hour=4, minute=30),
+        args=[_run_rebuild],
+        id="claim_summary_rebuild",
+        name="Claims - Summary Read Model Rebuild",
+        replace_existing=True,
+        misfire_grace_time=3600,
+    )
+    logger.info("Claim summary rebuild job added: nightly at 04:30 UTC")
+
+
+def _add_retrieval_index_jobs():
+    """Build the BM25 retrieval index right after startup, then keep it fresh."""
+    from datetime import datetime, timezone
+    from services.retrieval_index import RETRIEVAL_REFRESH_MINUTES
+
+    async def _run_refresh():
+        from services.retrieval_index import refresh_retrieval_index
+
+        await refresh_retrieval_index(_db)
+
+    scheduler.add_job(
+        _run_async_job,
+        IntervalTrigger(minutes=RETRIEVAL_REFRESH_MINUTES),
+        args=[_run_refresh],
+        id="retrieval_index_refresh",
+        name="Eve - Retrieval Index Refresh",
+        replace_existing=True,
+        next_run_time=datetime.now(timezone.utc),
+        misfire_grace_time=300,
+    )
+    logger.info("Retrieval index refresh job added: at startup, then every %d minutes", RETRIEVAL_REFRESH_MINUTES)
+
+
 def _add_initial_run_job():
     """Schedule one-time ClaimPilot initial analysis 30s after startup."""
     from workers.claimpilot_initial_run import run_initial_analysis
@@ -94,6 +94,10 @@ const NotificationBell = () => {
           } else if (data.type === 'notification') {
             setNotifications(prev => [data.data, ...prev]);
             setUnreadCount(prev => prev + 1);
+          } else if (data.type === 'notification_batch' && Array.isArray(data.data)) {
+            // Several notifications coalesced into one frame, oldest first
+            setNotifications(prev => [...data.data.slice().reverse(), ...prev]);
+            setUnreadCount(prev => prev + data.data.length);
           }
         } catch (e) {
           // Ignore non-JSON messages (e.g. "pong")
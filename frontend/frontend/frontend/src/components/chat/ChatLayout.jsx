@@ -245,6 +245,8 @@ const ChatLayout = () => {
               onEdit={handleEdit}
               onDelete={handleDelete}
               onReaction={chat.toggleReaction}
+              hasOlder={chat.hasOlderMessages}
+              onLoadOlder={chat.loadOlderMessages}
             />
 
             {chat.activeChannel && (
@@ -34,6 +34,8 @@ const ChatMessages = ({
   onEdit,
   onDelete,
   onReaction,
+  hasOlder = false,
+  onLoadOlder,
 }) => {
   const endRef = useRef(null);
   const containerRef = useRef(null);
@@ -96,6 +98,16 @@ const ChatMessages = ({
   return (
     <div ref={containerRef} className="flex-1 overflow-y-auto scrollbar-hide">
       <div className="py-2">
+        {hasOlder && onLoadOlder && (
+          <div className="flex justify-center py-2">
+            <button
+              onClick={onLoadOlder}
+              className="text-[11px] font-mono text-zinc-500 hover:text-orange-400"
+            >
+              Load earlier messages
+            </button>
+          </div>
+        )}
         {messages.map((msg, i) => {
           const prev = messages[i - 1];
           const showDateSep = !prev || !isSameDay(prev.created_at, msg.created_at);
@@ -14,6 +14,24 @@ const formatTime = (iso) => {
     ' ' + d.toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' });
 };
 
+// Render the server snippet with its [start, end) highlight spans marked
+const HighlightedSnippet = ({ text, highlights = [] }) => {
+  const parts = [];
+  let cursor = 0;
+  highlights.forEach(({ start, end }, i) => {
+    if (start < cursor) return;
+    if (start > cursor) parts.push(text.slice(cursor, start));
+    parts.push(
+      <mark key={i} className="bg-orange-500/20 text-orange-300 rounded-sm">
+        {text.slice(start, end)}
+      </mark>
+    );
+    cursor = end;
+  });
+  parts.push(text.slice(cursor));
+  return <>{parts}</>;
+};
+
 const ChatSearch = ({ onSearch, onClose, onNavigate, channels = [] }) => {
   const [query, setQuery] = useState('');
   const [results, setResults] = useState([]);
@@ -163,7 +181,9 @@ const ChatSearch = ({ onSearch, onClose, onNavigate, channels = [] }) => {
                     </div>
                     <p className="text-sm text-zinc-400 truncate">
                       {msg.type === 'attachment' && <FileText className="w-3 h-3 inline mr-1 text-blue-400" />}
-                      {msg.body}
+                      {msg.snippet != null
+                        ? <HighlightedSnippet text={msg.snippet} highlights={msg.highlights} />
+                        : msg.body}
                     </p>
                   </div>
                 </button>
@@ -32,6 +32,8 @@ import { exportClaimsCsv } from '@/lib/exportCsv';
 
 const VIEW_MODES = { list: 'list', pipeline: 'pipeline', dashboard: 'dashboard' };
 const ITEMS_PER_PAGE = 25;
+const LIST_PAGE_SIZE = 200;
+const MAX_LIST_ROWS = 1000;
 
 const ClaimsList = () => {
   const navigate = useNavigate();
@@ -87,14 +89,22 @@ const ClaimsList = () => {
   const fetchClaims = useCallback(async () => {
     try {
       setLoading(true);
-      const query = filterStatus && filterStatus !== 'All' ? `?filter_status=${encodeURIComponent(filterStatus)}` : '';
-      const res = await apiGet(`/api/claims/${query}`);
-
-      if (!res.ok) {
-        throw new Error(res.error || 'Failed to fetch claims');
-      }
-
-      setClaims(Array.isArray(res.data) ? res.data : []);
+      // Walk the keyset-paginated list endpoint with the slim "list" projection
+      const params = new URLSearchParams({ fields: 'list', limit: String(LIST_PAGE_SIZE) });
+      if (filterStatus && filterStatus !== 'All') params.set('status', filterStatus);
+      const rows = [];
+      let cursor = null;
+      do {
+        if (cursor) params.set('cursor', cursor);
+        const res = await apiGet(`/api/claims/list?${params.toString()}`);
+        if (!res.ok) {
+          throw new Error(res.error || 'Failed to fetch claims');
+        }
+        rows.push(...(res.data?.claims || []));
+        cursor = res.data?.next_cursor || null;
+      } while (cursor && rows.length < MAX_LIST_ROWS);
+
+      setClaims(rows);
       setError('');
     } catch (err) {
       setError(err.message);
@@ -605,10 +615,10 @@ const ClaimsList = () => {
                         <p className="text-[10px] font-mono text-zinc-500 uppercase mb-1">Type</p>
                         <p className="text-sm text-zinc-300 truncate">{claim.claim_type}</p>
                       </div>
-                      {claim.carrier && (
+                      {claim.carrier_name && (
                         <div className="min-w-0">
                           <p className="text-[10px] font-mono text-zinc-500 uppercase mb-1">Carrier</p>
-                          <p className="text-sm text-zinc-300 truncate">{claim.carrier}</p>
+                          <p className="text-sm text-zinc-300 truncate">{claim.carrier_name}</p>
                         </div>
                       )}
                     </div>
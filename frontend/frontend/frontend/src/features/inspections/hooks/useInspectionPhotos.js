@@ -13,6 +13,8 @@ import { useState, useCallback, useEffect, useRef } from 'react';
 import { api, apiPost, apiUpload, apiDelete, API_URL, getAuthToken, clearCache } from '../../../lib/api';
 import { computeSha256, getStorageItem } from '../../../lib/core';
 
+const PDF_JOB_POLL_MS = 1500;
+
 /**
  * useInspectionPhotos Hook
  */
@@ -408,19 +410,28 @@ export function useInspectionPhotos(options = {}) {
     }
   }, [fetchPhotos]);
 
-  /**
-   * Get PDF export URL for a claim
-   */
   /**
    * Download PDF export for a claim via authenticated fetch (no token in URL).
+   * The report builds as a background job; poll its status, then download.
+   * Unchanged claims come back already complete from the report cache.
    */
   const downloadExportPdf = useCallback(async (claimIdOverride = null, mode = 'email_safe') => {
     const cid = claimIdOverride || claimId;
     if (!cid) return null;
-    const token = getAuthToken();
-    const url = `${API_URL}/api/inspections/claim/${cid}/photo-report-pdf?mode=${encodeURIComponent(mode)}`;
     try {
-      const res = await fetch(url, {
+      const started = await apiPost(`/api/inspections/claim/${cid}/photo-report-jobs?mode=${encodeURIComponent(mode)}`);
+      if (!started.ok) throw new Error(started.error || 'PDF export failed');
+      let job = started.data;
+      while (job.status === 'queued' || job.status === 'running') {
+        await new Promise((resolve) => setTimeout(resolve, PDF_JOB_POLL_MS));
+        const res = await api(`/api/inspections/photo-report-jobs/${job.id}`, { cache: false });
+        if (!res.ok) throw new Error(res.error || 'PDF export status failed');
+        job = res.data;
+      }
+      if (job.status !== 'complete') throw new Error(job.error || 'PDF export failed');
+
+      const token = getAuthToken();
+      const res = await fetch(`${API_URL}${job.download_url}`, {
         headers: token ? { Authorization: `Bearer ${token}` } : {},
         credentials: 'include',
       });
@@ -429,7 +440,7 @@ export function useInspectionPhotos(options = {}) {
       const blobUrl = URL.createObjectURL(blob);
       const a = document.createElement('a');
       a.href = blobUrl;
-      a.download = `photo-report-${cid}.pdf`;
+      a.download = job.filename || `photo-report-${cid}.pdf`;
       document.body.appendChild(a);
       a.click();
       document.body.removeChild(a);
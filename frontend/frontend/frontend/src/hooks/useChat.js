@@ -23,6 +23,7 @@ export default function useChat(initialChannelId = null) {
   const [allUsers, setAllUsers] = useState([]);
   const [loading, setLoading] = useState(true);
   const [messagesLoading, setMessagesLoading] = useState(false);
+  const [hasOlderMessages, setHasOlderMessages] = useState(false);
   const [error, setError] = useState(null);
 
   // Thread
@@ -36,6 +37,7 @@ export default function useChat(initialChannelId = null) {
   const wsRef = useRef(null);
   const pollRef = useRef(null);
   const skipNextPollRef = useRef(false);
+  const olderCursorRef = useRef(null);
 
   // ── Derived ────────────────────────────────────────────────────
   const activeChannel = channels.find((c) => c.id === activeChannelId) || null;
@@ -68,12 +70,34 @@ export default function useChat(initialChannelId = null) {
     if (!channelId) { setMessages([]); return; }
     setMessagesLoading(true);
     const res = await apiGet(`/api/comm/channels/${channelId}/messages?limit=100`, { cache: false });
-    if (res.ok) setMessages(res.data?.messages || []);
+    if (res.ok) {
+      setMessages(res.data?.messages || []);
+      olderCursorRef.current = res.data?.prev_cursor || null;
+      setHasOlderMessages(Boolean(res.data?.has_more_before));
+    }
     setMessagesLoading(false);
     // mark read
     apiPost(`/api/comm/channels/${channelId}/mark-read`, {});
   }, []);
 
+  // Scroll-back: fetch the page before the oldest loaded message
+  const loadOlderMessages = useCallback(async () => {
+    const cursor = olderCursorRef.current;
+    if (!activeChannelId || !cursor) return;
+    const res = await apiGet(
+      `/api/comm/channels/${activeChannelId}/messages?limit=50&before=${encodeURIComponent(cursor)}`,
+      { cache: false },
+    );
+    if (!res.ok) return;
+    const older = res.data?.messages || [];
+    setMessages((prev) => {
+      const known = new Set(prev.map((m) => m.id));
+      return [...older.filter((m) => !known.has(m.id)), ...prev];
+    });
+    olderCursorRef.current = res.data?.prev_cursor || null;
+    setHasOlderMessages(Boolean(res.data?.has_more_before));
+  }, [activeChannelId]);
+
   const loadMembers = useCallback(async (channelId) => {
     if (!channelId) { setMembers([]); return; }
     const res = await apiGet(`/api/comm/channels/${channelId}/members`, { cache: false });
@@ -427,6 +451,7 @@ export default function useChat(initialChannelId = null) {
     allUsers,
     loading,
     messagesLoading,
+    hasOlderMessages,
     error,
     canManage,
     canPost,
@@ -444,6 +469,7 @@ export default function useChat(initialChannelId = null) {
 
     // Actions
     setActiveChannelId,
+    loadOlderMessages,
     sendMessage,
     sendGif,
     uploadAttachment,